@@ -1,16 +1,37 @@
+"""Lightweight self-hosted Moji API on SQLite (single user, no Supabase).
+
+    pip install flask flask-sqlalchemy flask-cors
+    python app.py
+
+The database is ``app.db`` unless ``DATABASE_URL`` says otherwise, and the
+API acts as the user ``MOJI_USER_ID`` (1, created on first start). See
+models.py for the SQLite settings and bench/selfhost.py for its benchmark.
+
+The API has no login, so it listens on 127.0.0.1 and only answers browsers
+on ``ALLOWED_ORIGINS`` (the local frontend by default). Another ``HOST``
+serves everyone who can reach it, so it needs ``ALLOW_PUBLIC_HOST=1``.
+"""
+
+import ipaddress
+import os
+import sys
+
 from flask import Flask
 from flask_cors import CORS
-from models import User, Workspace, db
+from models import User, Workspace, db, init_db
 from routes.api import api
 from routes.test import test
 from routes.auth import auth
+from serialization import JSONProvider
 
 app = Flask(__name__)
-CORS(app)
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///app.db"
+app.json = JSONProvider(app)
+CORS(app, origins=os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:3001").split(","))
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///app.db")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["SECRET_KEY"] = "secret_key"
-db.init_app(app)
+app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "secret_key")
+app.config["MOJI_USER_ID"] = int(os.environ.get("MOJI_USER_ID", "1"))
+init_db(app)
 
 moji_data = {
     "name": "Moji",
@@ -39,6 +60,15 @@ app.register_blueprint(auth, url_prefix=API_VERSION + auth.url_prefix)
 # app.register_blueprint(test, url_prefix=API_VERSION + test.url_prefix)
 
 
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
 @app.route("/")
 def hello():
     return {"message": "Moji API is running!", "metadata": moji_metadata}
@@ -49,15 +79,20 @@ def metadata():
 
 
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
+    host = os.environ.get("HOST", "127.0.0.1")
+    if not is_loopback(host):
+        if os.environ.get("ALLOW_PUBLIC_HOST") != "1":
+            sys.exit(f"Refusing to serve the unauthenticated API on {host}; set ALLOW_PUBLIC_HOST=1 or HOST=127.0.0.1")
+        print(f"WARNING: serving the unauthenticated API on {host}; anyone who can reach it can read and change all data")
 
+    with app.app_context():
         # Create a test user and workspace for development
         if not User.query.first():
             test_user = User()
             test_user.from_dict({"name": "Noxire", "email": "nox@moji.com"})
             test_user.set_password("test123")
-            test_user.save()
+            test_user.save(commit=False)
+            db.session.flush()  # assigns test_user.id; both rows commit together
 
             # Create default "Personal" workspace
             personal_workspace = Workspace()
@@ -70,4 +105,5 @@ if __name__ == "__main__":
             print(f"Created test user: {test_user.email}")
             print(f"Created workspace: {personal_workspace.name}")
 
-    app.run(debug=True, port=5000)
+    # FLASK_DEBUG=1 turns on the debugger and reloader
+    app.run(host=host, port=int(os.environ.get("PORT", "5000")))
@@ -0,0 +1,274 @@
+"""Per-user read-through cache of GET route results.
+
+Read routes opt in with ``@cached(name, tags)``. Results are keyed by route
+name, user and request parameters, and kept in a size-bounded LRU with a TTL
+as a safety net. Each entry carries tags (``"tasks:<workspace_id>"``,
+``"task:<id>"`` ...) and write routes call ``invalidate(user_id, *tags)``
+after a successful change, which drops exactly the entries that could now be
+stale.
+
+The cache lives in the worker process. With several workers a write is only
+seen immediately by the worker that served it; the others catch up within
+``response_cache_ttl`` seconds.
+
+Misses are coalesced (single-flight): the first request for a key runs the
+endpoint as a task on the event loop, and identical requests arriving
+meanwhile await that task instead of calling Supabase again. This also applies to
+routes whose caching is disabled. A write invalidation by the user detaches
+their pending reads, so requests after the write start a fresh one.
+"""
+
+import asyncio
+import functools
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from app import metrics
+
+TagsFunc = Callable[..., Iterable[str]]
+
+_MISSING = object()
+
+# Endpoint arguments that never belong in a cache key
+_UNKEYED_ARGS = frozenset({"user", "supabase", "request"})
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires: float
+    tags: List[str]
+
+
+class ResponseCache:
+    """LRU of route results bounded by approximate serialized size."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float,
+        disabled_routes: Iterable[str] = (),
+        single_flight: bool = True,
+    ):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max(1, max_bytes // 10)
+        self.ttl = ttl
+        self.disabled_routes = frozenset(disabled_routes)
+        self.single_flight = single_flight
+        self.bytes = 0
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        # Bumped on every invalidation, so a result computed across a write isn't stored
+        self._epochs: Dict[str, int] = {}
+        # Reads in flight by key, and their keys by user. The cache may be
+        # shared by event loops on several threads (tests), hence the lock.
+        self._flight_lock = threading.Lock()
+        self._flights: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._user_flights: Dict[str, Set[Hashable]] = {}
+
+    def enabled_for(self, name: str) -> bool:
+        return self.max_bytes > 0 and name not in self.disabled_routes
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        if entry.expires <= time.monotonic():
+            self._remove(key, "expired")
+            return _MISSING
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def epoch(self, user_id: str) -> int:
+        return self._epochs.get(user_id, 0)
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str], user_id: str, epoch: int) -> bool:
+        """Store ``value`` unless the user's data changed since ``epoch`` or it is too large."""
+        if self._epochs.get(user_id, 0) != epoch:
+            return False
+        size = len(json.dumps(value, default=str))
+        if size > self.max_entry_bytes:
+            return False
+        if key in self._entries:
+            self._remove(key, None)
+        tags = list(tags)
+        self._entries[key] = _Entry(value, size, time.monotonic() + self.ttl, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)), "size")
+        self._update_gauges()
+        return True
+
+    def join_flight(
+        self, key: Hashable, user_id: str, start: Callable[[], Awaitable[Any]]
+    ) -> Tuple["asyncio.Future[Any]", bool]:
+        """The pending read of ``key`` on this event loop, or a new one running ``start()``.
+
+        Also returns whether the read was started by this call.
+        """
+        loop = asyncio.get_running_loop()
+        with self._flight_lock:
+            future = self._flights.get(key)
+            if future is not None and future.get_loop() is loop:
+                return future, False
+            # A task copies the context: the request's trace and round-trip log
+            future = self._flights[key] = loop.create_task(start())
+            self._user_flights.setdefault(user_id, set()).add(key)
+        future.add_done_callback(lambda _: self._end_flight(key, user_id, future))
+        return future, True
+
+    def _end_flight(self, key: Hashable, user_id: str, future: "asyncio.Future[Any]") -> None:
+        with self._flight_lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+                keys = self._user_flights.get(user_id)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._user_flights[user_id]
+
+    def invalidate(self, user_id: str, *tags: str) -> int:
+        """Drop every entry carrying one of ``tags``; returns how many were dropped.
+
+        The user's reads in flight are detached too: they may have read from
+        before the write, so later requests must not join them.
+        """
+        self._epochs[user_id] = self._epochs.get(user_id, 0) + 1
+        with self._flight_lock:
+            for key in self._user_flights.pop(user_id, ()):
+                self._flights.pop(key, None)
+        dropped = 0
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key, "invalidated")
+                dropped += 1
+        self._update_gauges()
+        return dropped
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self._epochs.clear()
+        with self._flight_lock:
+            self._flights.clear()
+            self._user_flights.clear()
+        self.bytes = 0
+        self._update_gauges()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable, reason: Optional[str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        if reason:
+            metrics.CACHE_EVICTIONS.inc("response", reason)
+
+    def _update_gauges(self) -> None:
+        metrics.CACHE_BYTES.set(self.bytes, "response")
+        metrics.CACHE_ENTRIES.set(len(self._entries), "response")
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide cache, configured from settings on first use."""
+    global _cache
+    if _cache is None:
+        from app.config import get_settings
+
+        settings = get_settings()
+        _cache = ResponseCache(
+            settings.response_cache_max_bytes if settings.response_cache_enabled else 0,
+            settings.response_cache_ttl,
+            [name.strip() for name in settings.response_cache_disabled_routes.split(",") if name.strip()],
+            single_flight=settings.single_flight_enabled,
+        )
+    return _cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """Replace the process-wide cache (tests and custom setups)."""
+    global _cache
+    _cache = cache
+
+
+def invalidate(user_id: str, *tags: str) -> None:
+    """Drop cached results carrying any of ``tags``; call after a successful write."""
+    get_response_cache().invalidate(user_id, *tags)
+
+
+def invalidate_daily(item: Dict[str, Any], user_id: str) -> None:
+    """Drop the Moji Daily views of a task or note after a write by ``user_id``.
+
+    Daily views show the items of the workspaces a user created, and items
+    carry that creator in ``user_id`` (supabase/daily.sql), so an editor's
+    write to a shared workspace reaches the creator's view.
+    """
+    creator = str(item.get("user_id") or user_id)
+    invalidate(creator, f"daily:{creator}")
+
+
+def cached(name: str, tags: TagsFunc) -> Callable:
+    """Cache a GET endpoint's result per user and parameters, coalescing concurrent misses.
+
+    ``tags(result=..., **endpoint_kwargs)`` returns the invalidation tags of
+    a result. Place it below ``@round_trip_budget``.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            cache = get_response_cache()
+            caching = cache.enabled_for(name)
+            if not caching and not cache.single_flight:
+                return await func(*args, **kwargs)
+
+            user_id = str(kwargs["user"].id)
+            params = tuple(sorted((k, str(v)) for k, v in kwargs.items() if k not in _UNKEYED_ARGS))
+            key = (name, user_id, params)
+            if caching:
+                value = cache.get(key)
+                if value is not _MISSING:
+                    metrics.record_cache_lookup(name, True)
+                    return value
+            if not cache.single_flight:
+                metrics.record_cache_lookup(name, False)
+                epoch = cache.epoch(user_id)
+                result = await func(*args, **kwargs)
+                cache.set(key, result, tags(result=result, **kwargs), user_id, epoch)
+                return result
+
+            epoch = cache.epoch(user_id)
+            flight, leader = cache.join_flight(key, user_id, lambda: func(*args, **kwargs))
+            if not leader:
+                metrics.CACHE_LOOKUPS.inc(name, "coalesced")
+                return await asyncio.shield(flight)
+            if caching:
+                metrics.record_cache_lookup(name, False)
+
+            # Shielded, so a cancelled first requester doesn't cancel the read for the others
+            result = await asyncio.shield(flight)
+            if caching:
+                cache.set(key, result, tags(result=result, **kwargs), user_id, epoch)
+            return result
+
+        return wrapper
+
+    return decorator
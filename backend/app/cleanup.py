@@ -0,0 +1,106 @@
+"""Periodic cleanup of completed tasks.
+
+Workspaces may set ``cleanup_after_days``; done tasks completed longer ago
+than that are deleted, or moved to ``archived_tasks`` with
+``cleanup_archive``. The work runs as ``tasks.cleanup`` background jobs:
+
+- Each job calls ``sweep_completed_tasks`` (supabase/cleanup.sql) for at most
+  ``cleanup_batches_per_job`` batches of ``cleanup_batch_size`` rows, walking
+  the index of expiring tasks from a cursor and pausing between batches so
+  the database, its locks and replicas keep up. Tasks of workspaces without
+  a retention are not in that index, so sweeps cost nothing for them.
+- When a sweep has more to do, the job queues its continuation with the
+  cursor in the payload. Progress therefore lives in the durable job queue
+  and an interrupted sweep resumes from its last finished job.
+- A finished sweep queues the next one for the following
+  ``cleanup_interval`` period, and ``schedule_periodically`` queues each
+  period's sweep as the period starts, so a sweep that failed for good
+  (e.g. through a database outage) delays retention by one period at most.
+  Every job's idempotency key is derived from its period, so all API
+  processes can schedule sweeps and only one runs.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app import metrics
+from app.config import get_settings
+from app.dependencies import get_supabase_admin_client
+from app.jobs import Job, JobQueue, get_job_queue, job_handler
+
+logger = logging.getLogger(__name__)
+
+CLEANUP_JOB = "tasks.cleanup"
+
+# Owner of scheduled jobs; idempotency keys are unique per owner
+SYSTEM_USER = "system"
+
+
+def schedule_cleanup(queue: JobQueue, interval: float, now: Optional[float] = None, next_period: bool = False) -> Job:
+    """Queue the sweep of the current (or next) period unless it already exists."""
+    now = time.time() if now is None else now
+    period = int(now // interval) + (1 if next_period else 0)
+    return queue.enqueue(
+        CLEANUP_JOB,
+        {"period": period, "part": 0, "cursor": None},
+        user_id=SYSTEM_USER,
+        idempotency_key=f"cleanup:{period}",
+        delay=max(0.0, period * interval - now),
+    )
+
+
+async def schedule_periodically(queue: JobQueue, interval: float) -> None:
+    """Queue the sweep of every period as it starts, until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(schedule_cleanup, queue, interval)
+        except Exception as e:
+            logger.warning(f"Failed to schedule cleanup: {e}")
+        await asyncio.sleep(interval - time.time() % interval)
+
+
+@job_handler(CLEANUP_JOB)
+async def sweep_completed_tasks(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one bounded slice of a sweep and queue whatever comes next."""
+    settings = get_settings()
+    admin = get_supabase_admin_client()
+    cursor = payload.get("cursor")
+    scanned = swept = 0
+    finished = False
+
+    for batch in range(settings.cleanup_batches_per_job):
+        if batch:
+            await asyncio.sleep(settings.cleanup_batch_pause)
+        params = {
+            "batch_size": settings.cleanup_batch_size,
+            # Cursors of sweeps queued before expires_at existed start over
+            "after_expires_at": cursor.get("expires_at") if cursor else None,
+            "after_id": cursor.get("id") if cursor else None,
+            "archive": settings.cleanup_archive,
+        }
+        response = await asyncio.to_thread(admin.rpc("sweep_completed_tasks", params).execute)
+        result = (response.data or [{}])[0]
+        scanned += result.get("scanned") or 0
+        swept += result.get("swept") or 0
+        if result.get("swept"):
+            metrics.CLEANUP_TASKS.inc("archived" if settings.cleanup_archive else "deleted", amount=result["swept"])
+        if (result.get("scanned") or 0) < settings.cleanup_batch_size:
+            finished = True
+            break
+        cursor = {"expires_at": result["last_expires_at"], "id": result["last_id"]}
+
+    queue = get_job_queue()
+    if finished:
+        schedule_cleanup(queue, settings.cleanup_interval, next_period=True)
+        logger.info(f"Cleanup sweep {payload['period']} finished after {payload['part'] + 1} jobs")
+    else:
+        part = payload["part"] + 1
+        queue.enqueue(
+            CLEANUP_JOB,
+            {"period": payload["period"], "part": part, "cursor": cursor},
+            user_id=SYSTEM_USER,
+            idempotency_key=f"cleanup:{payload['period']}:{part}",
+        )
+    return {"scanned": scanned, "swept": swept, "finished": finished}
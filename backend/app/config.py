@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
 from functools import lru_cache
+from typing import Optional
 import logging
 import sys
 
@@ -18,6 +19,84 @@ class Settings(BaseSettings):
     max_pages_per_workspace: int = 200
     max_notes_per_workspace: int = 500
     max_tasks_per_workspace: int = 500
+    import_max_bytes: int = 50_000_000  # streamed, so not bound by the 1 MB request limit
+
+    # Metrics
+    metrics_enabled: bool = True  # expose /metrics
+    metrics_dir: Optional[str] = None  # shared directory for multi-worker aggregation
+    metrics_flush_interval: float = 5.0
+    metrics_token: Optional[str] = None  # "Authorization: Bearer <token>" for /metrics; unset serves it only in debug
+
+    # Tracing
+    tracing_exporter: str = "none"  # none, ndjson, log or "package.module:factory"
+    tracing_file: str = "traces.ndjson"
+    tracing_sample_rate: float = 0.05  # share of new traces recorded; incoming sampled traces are kept
+
+    # Response cache
+    response_cache_enabled: bool = True
+    response_cache_max_bytes: int = 32_000_000  # per worker
+    response_cache_ttl: float = 30.0  # seconds; bounds staleness across workers
+    response_cache_disabled_routes: str = ""  # comma-separated names, e.g. "pages.get,tasks.list"
+    single_flight_enabled: bool = True  # identical concurrent reads share one upstream call
+    ownership_batch_window: float = 0.002  # seconds concurrent ownership checks are collected; 0 disables
+    ownership_batch_max: int = 50  # workspace ids per batched ownership query
+    membership_cache_ttl: float = 60.0  # seconds a user's role in a workspace is reused; 0 disables
+    membership_cache_max_entries: int = 100_000  # (user, workspace) roles kept per worker
+
+    # Public page sharing (see app/sharing.py)
+    share_cache_max_bytes: int = 16_000_000  # rendered shared pages kept per worker; 0 disables
+    share_cache_ttl: float = 60.0  # seconds; bounds staleness across hosts after an edit or unshare
+    share_max_age: int = 60  # Cache-Control max-age of /p/<token>
+    share_immutable_max_age: int = 31_536_000  # Cache-Control max-age of /p/<token>/<version>
+
+    # Background jobs
+    jobs_enabled: bool = True  # run job workers in this process
+    jobs_db_path: str = "jobs.db"  # SQLite queue shared by all local workers
+    jobs_concurrency: int = 2
+    jobs_poll_interval: float = 1.0
+    jobs_lease_seconds: float = 300.0  # a job is retried elsewhere if its worker is gone this long
+    jobs_backoff_base: float = 2.0
+
+    # Completed-task cleanup (runs as background jobs)
+    cleanup_enabled: bool = True
+    cleanup_interval: float = 3600.0  # seconds between sweeps
+    cleanup_batch_size: int = 500  # tasks examined per statement
+    cleanup_batch_pause: float = 0.5  # seconds between batches
+    cleanup_batches_per_job: int = 20  # then the sweep continues in a new job
+    cleanup_archive: bool = False  # move expired tasks to archived_tasks instead of deleting
+
+    # Supabase connection pool (per worker)
+    supabase_pool_size: int = 20
+    supabase_keepalive_expiry: float = 60.0  # seconds an idle pooled connection is kept
+
+    # Supabase timeouts, retries and circuit breaking (see app/resilience.py)
+    supabase_connect_timeout: float = 3.0
+    supabase_read_timeout: float = 10.0  # selects
+    supabase_write_timeout: float = 15.0  # inserts, updates and deletes
+    supabase_rpc_timeout: float = 30.0  # functions, e.g. clone_workspace or the cleanup sweep
+    supabase_auth_timeout: float = 5.0
+    supabase_read_retries: int = 2  # extra attempts for a failed select
+    supabase_retry_backoff: float = 0.05  # seconds, doubled per attempt, full jitter
+    supabase_hedge_after: float = 0.0  # seconds before a slow select is sent again; 0 disables
+    breaker_failure_threshold: int = 5  # consecutive upstream failures that open a circuit
+    breaker_reset_timeout: float = 30.0  # seconds a circuit stays open before a trial call
+
+    # Startup
+    openapi_schema_path: Optional[str] = None  # precomputed schema, see app/openapi.py
+    preload_imports: bool = True  # import supabase in the background once the app is serving
+    warm_up: bool = False  # open pooled connections and fill caches before serving; on under app.server
+    warm_up_connections: int = 4
+    jobs_drain_timeout: float = 10.0  # seconds running jobs get to finish on shutdown
+
+    # Production server (python -m app.server)
+    port: int = 8000
+    server_host: str = "0.0.0.0"
+    server_workers: int = 0  # 0 = one per available CPU
+    server_backlog: int = 2048  # pending connections per socket; capped by net.core.somaxconn
+    server_keep_alive: float = 75.0  # seconds; keep above the load balancer's idle timeout
+    server_graceful_timeout: float = 30.0  # seconds in-flight requests get to finish on SIGTERM
+    server_access_log: bool = False  # request metrics and traces cover this
+    forwarded_allow_ips: str = "127.0.0.1"  # proxies whose X-Forwarded-For is trusted; "*" only behind one
 
     @field_validator("supabase_url")
     @classmethod
@@ -76,6 +155,137 @@ class Settings(BaseSettings):
             raise ValueError("limits must be <= 100000")
         return v
 
+    @field_validator("metrics_flush_interval")
+    @classmethod
+    def validate_flush_interval(cls, v: float) -> float:
+        """Validate that the metrics flush interval is positive."""
+        if v <= 0:
+            raise ValueError("metrics_flush_interval must be positive")
+        return v
+
+    @field_validator("response_cache_ttl", "share_cache_ttl")
+    @classmethod
+    def validate_cache_ttl(cls, v: float) -> float:
+        """Validate that cache TTLs are positive."""
+        if v <= 0:
+            raise ValueError("cache TTLs must be positive")
+        return v
+
+    @field_validator("share_cache_max_bytes", "share_max_age", "share_immutable_max_age")
+    @classmethod
+    def validate_share_sizes(cls, v: int) -> int:
+        """Validate that share cache sizes and ages are not negative."""
+        if v < 0:
+            raise ValueError("share cache sizes and ages must not be negative")
+        return v
+
+    @field_validator("ownership_batch_window")
+    @classmethod
+    def validate_batch_window(cls, v: float) -> float:
+        """Validate that the ownership batch window is not negative."""
+        if v < 0:
+            raise ValueError("ownership_batch_window must not be negative")
+        return v
+
+    @field_validator("membership_cache_ttl")
+    @classmethod
+    def validate_membership_cache_ttl(cls, v: float) -> float:
+        """Validate that the membership cache TTL is not negative."""
+        if v < 0:
+            raise ValueError("membership_cache_ttl must not be negative")
+        return v
+
+    @field_validator("jobs_concurrency")
+    @classmethod
+    def validate_jobs_concurrency(cls, v: int) -> int:
+        """Validate that at least one job worker runs."""
+        if v < 1:
+            raise ValueError("jobs_concurrency must be at least 1")
+        return v
+
+    @field_validator("jobs_poll_interval", "jobs_lease_seconds", "jobs_backoff_base")
+    @classmethod
+    def validate_jobs_timing(cls, v: float) -> float:
+        """Validate that job timings are positive."""
+        if v <= 0:
+            raise ValueError("job timings must be positive")
+        return v
+
+    @field_validator("cleanup_interval", "cleanup_batch_size", "cleanup_batches_per_job")
+    @classmethod
+    def validate_cleanup_sizes(cls, v: float) -> float:
+        """Validate that sweeps make progress."""
+        if v <= 0:
+            raise ValueError("cleanup interval and batch sizes must be positive")
+        return v
+
+    @field_validator(
+        "supabase_connect_timeout",
+        "supabase_read_timeout",
+        "supabase_write_timeout",
+        "supabase_rpc_timeout",
+        "supabase_auth_timeout",
+        "breaker_reset_timeout",
+    )
+    @classmethod
+    def validate_upstream_timeouts(cls, v: float) -> float:
+        """Validate that upstream timeouts are positive."""
+        if v <= 0:
+            raise ValueError("upstream timeouts must be positive")
+        return v
+
+    @field_validator("supabase_read_retries", "supabase_retry_backoff", "supabase_hedge_after")
+    @classmethod
+    def validate_retries(cls, v: float) -> float:
+        """Validate that retry settings are not negative."""
+        if v < 0:
+            raise ValueError("retry settings must not be negative")
+        return v
+
+    @field_validator(
+        "supabase_pool_size",
+        "warm_up_connections",
+        "server_backlog",
+        "breaker_failure_threshold",
+        "ownership_batch_max",
+        "membership_cache_max_entries",
+    )
+    @classmethod
+    def validate_pool_sizes(cls, v: int) -> int:
+        """Validate that pool, backlog and threshold sizes are positive."""
+        if v < 1:
+            raise ValueError("pool, backlog and threshold sizes must be at least 1")
+        return v
+
+    @field_validator("server_workers")
+    @classmethod
+    def validate_server_workers(cls, v: int) -> int:
+        """Validate the worker count (0 picks one per CPU)."""
+        if v < 0:
+            raise ValueError("server_workers must be 0 or more")
+        return v
+
+    @field_validator(
+        "supabase_keepalive_expiry",
+        "jobs_drain_timeout",
+        "server_keep_alive",
+        "server_graceful_timeout",
+    )
+    @classmethod
+    def validate_server_timeouts(cls, v: float) -> float:
+        """Validate that timeouts are not negative."""
+        if v < 0:
+            raise ValueError("timeouts must not be negative")
+        return v
+
+    @field_validator("tracing_sample_rate")
+    @classmethod
+    def validate_sample_rate(cls, v: float) -> float:
+        """Validate that the sample rate is a ratio."""
+        if not 0.0 <= v <= 1.0:
+            raise ValueError("tracing_sample_rate must be between 0 and 1")
+        return v
+
     @property
     def cors_origins(self) -> list[str]:
         return [origin.strip() for origin in self.allowed_origins.split(",")]
@@ -0,0 +1,240 @@
+"""Instrumented data-layer wrapper around the Supabase client.
+
+``instrument(client)`` returns a proxy that behaves like the wrapped client
+but times every PostgREST ``execute()`` call, recording its latency by table
+and operation and counting it against the current request.
+
+Modules annotate clients with ``Client`` from here rather than from
+supabase: importing supabase (and httpx, gotrue, realtime and storage behind
+it) takes about a third of the app's import time, so it is deferred until
+the first client is created, see ``app.dependencies.create_client``.
+"""
+
+import math
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import partial
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Optional, Tuple
+
+from app import metrics
+from app.config import get_settings
+from app.resilience import call_upstream, hedged
+from app.tracing import get_tracer, propagation_headers
+
+if TYPE_CHECKING:
+    from supabase import Client
+else:
+    Client = Any
+
+# Builder methods that decide which kind of statement a query issues
+_OPERATIONS = {"select", "insert", "update", "upsert", "delete"}
+
+
+@dataclass
+class QueryLog:
+    """Supabase calls issued within one request (or one tracked block)."""
+
+    calls: List[Tuple[str, str, float]] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.calls)
+
+    @property
+    def route_calls(self) -> List[Tuple[str, str, float]]:
+        """Calls made on behalf of the route, i.e. excluding caller authentication."""
+        return [call for call in self.calls if call[:2] != AUTH_CALL]
+
+
+# Token verification done by get_current_user; not charged to route budgets
+AUTH_CALL = ("auth", "get_user")
+
+_current_log: ContextVar[Optional[QueryLog]] = ContextVar("moji_query_log", default=None)
+
+# Called with (route, QueryLog) after each request
+RequestListener = Callable[[Any, QueryLog], None]
+_request_listeners: List[RequestListener] = []
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryLog]:
+    """Collect every Supabase call made inside the block into a QueryLog."""
+    log = QueryLog()
+    token = _current_log.set(log)
+    try:
+        yield log
+    finally:
+        _current_log.reset(token)
+
+
+def current_query_log() -> Optional[QueryLog]:
+    """Return the QueryLog of the request being served, if any."""
+    return _current_log.get()
+
+
+# Budget of bulk routes whose call count grows with the payload; they batch instead
+UNBOUNDED = math.inf
+
+
+def round_trip_budget(limit: float) -> Callable:
+    """Declare the maximum number of Supabase calls a route may make per request.
+
+    Place it below the router decorator. Requests that go over the budget are
+    logged and counted; the test suite fails on them.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        func.round_trip_budget = limit
+        return func
+
+    return decorator
+
+
+def get_round_trip_budget(route: Any) -> Optional[float]:
+    """Return the budget declared on a matched route's endpoint, if any."""
+    return getattr(getattr(route, "endpoint", None), "round_trip_budget", None)
+
+
+def add_request_listener(listener: RequestListener) -> None:
+    _request_listeners.append(listener)
+
+
+def remove_request_listener(listener: RequestListener) -> None:
+    _request_listeners.remove(listener)
+
+
+def notify_request_complete(route: Any, log: QueryLog) -> None:
+    for listener in _request_listeners:
+        listener(route, log)
+
+
+def _inject_trace_headers(builder: Any) -> None:
+    """Add traceparent and request ID headers to a pending PostgREST request."""
+    request = getattr(builder, "request", builder)
+    headers = getattr(request, "headers", None)
+    if hasattr(headers, "__setitem__"):
+        for name, value in propagation_headers().items():
+            headers[name] = value
+
+
+def _disable_builtin_retry(builder: Any) -> None:
+    """Turn off postgrest's own retry of 503s (unjittered 1, 2, 4... second sleeps); see app.resilience."""
+    request = getattr(builder, "request", None)
+    if hasattr(request, "retry_enabled"):
+        request.retry_enabled = False
+
+
+def record_call(table: str, operation: str, duration: float, failed: bool = False) -> None:
+    """Record one upstream call in the metrics and the active QueryLog."""
+    metrics.UPSTREAM_DURATION.observe(duration, table, operation)
+    if failed:
+        metrics.UPSTREAM_ERRORS.inc(table, operation)
+    log = _current_log.get()
+    if log is not None:
+        log.calls.append((table, operation, duration))
+
+
+def timed_call(service: str, operation: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run a non-PostgREST Supabase call (auth, storage) through its breaker and record it."""
+
+    def send() -> Any:
+        start = perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            record_call(service, operation, perf_counter() - start, failed=True)
+            raise
+        record_call(service, operation, perf_counter() - start)
+        return result
+
+    with get_tracer().span(f"supabase {service}.{operation}", "client"):
+        return call_upstream(service, send)
+
+
+class InstrumentedQuery:
+    """Proxy for a PostgREST request builder that times ``execute()``."""
+
+    __slots__ = ("_builder", "_table", "_operation")
+
+    def __init__(self, builder: Any, table: str, operation: Optional[str] = None):
+        self._builder = builder
+        self._table = table
+        self._operation = operation
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+        operation = self._operation or (name if name in _OPERATIONS else None)
+
+        def chain(*args: Any, **kwargs: Any) -> "InstrumentedQuery":
+            return InstrumentedQuery(attr(*args, **kwargs), self._table, operation)
+
+        return chain
+
+    def execute(self) -> Any:
+        operation = self._operation or "select"
+        attributes = {"db.system": "postgrest", "db.table": self._table, "db.operation": operation}
+        with get_tracer().span(f"postgrest {operation} {self._table}", "client", attributes=attributes):
+            _inject_trace_headers(self._builder)
+            _disable_builtin_retry(self._builder)
+            settings = get_settings()
+            send = self._send
+            if operation != "select":
+                return call_upstream("rest", send)
+            if settings.supabase_hedge_after:
+                send = partial(
+                    hedged,
+                    self._send,
+                    settings.supabase_hedge_after,
+                    on_hedge=partial(metrics.UPSTREAM_HEDGED.inc, self._table),
+                )
+            return call_upstream(
+                "rest",
+                send,
+                retries=settings.supabase_read_retries,
+                on_retry=partial(metrics.UPSTREAM_RETRIES.inc, self._table, operation),
+            )
+
+    def _send(self) -> Any:
+        operation = self._operation or "select"
+        start = perf_counter()
+        try:
+            response = self._builder.execute()
+        except Exception:
+            record_call(self._table, operation, perf_counter() - start, failed=True)
+            raise
+        record_call(self._table, operation, perf_counter() - start)
+        return response
+
+
+class InstrumentedClient:
+    """Proxy for a Supabase client whose table and RPC calls are instrumented."""
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    @property
+    def raw(self) -> Any:
+        """The wrapped client."""
+        return self._client
+
+    def table(self, table_name: str) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.table(table_name), table_name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None, **kwargs: Any) -> InstrumentedQuery:
+        return InstrumentedQuery(self._client.rpc(fn, params or {}, **kwargs), fn, "rpc")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+def instrument(client: Any) -> Any:
+    """Wrap a Supabase client so its calls are measured. Idempotent."""
+    if isinstance(client, InstrumentedClient):
+        return client
+    return InstrumentedClient(client)
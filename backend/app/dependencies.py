@@ -1,27 +1,83 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from supabase import create_client, Client
-from functools import lru_cache
+from functools import lru_cache, partial
+from time import perf_counter
 from typing import Annotated, Any
 
 from app.config import get_settings, Settings
+from app.db import Client, instrument, record_call
+from app.resilience import UpstreamUnavailable, call_upstream, call_upstream_async, timeout_for
+from app.tracing import get_tracer, traced
 
 security = HTTPBearer()
 
 
+_http_client = None
+
+
+def get_http_client() -> Any:
+    """
+    Return the worker's pooled httpx client, shared by every Supabase client.
+
+    Clients are created per request (they carry the caller's token), but the
+    token travels in per-request headers, so all of them can reuse one pool
+    of keep-alive connections instead of opening a new TLS connection each.
+    """
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        settings = get_settings()
+
+        def set_timeout(request: httpx.Request) -> None:
+            # Per-operation timeout; the hook runs before the request is sent
+            timeout = timeout_for(request.method, request.url.path, get_settings())
+            request.extensions["timeout"] = httpx.Timeout(
+                timeout, connect=min(timeout, get_settings().supabase_connect_timeout)
+            ).as_dict()
+
+        _http_client = httpx.Client(
+            timeout=settings.supabase_rpc_timeout,
+            event_hooks={"request": [set_timeout]},
+            limits=httpx.Limits(
+                max_connections=settings.supabase_pool_size,
+                max_keepalive_connections=settings.supabase_pool_size,
+                keepalive_expiry=settings.supabase_keepalive_expiry,
+            ),
+        )
+    return _http_client
+
+
+def close_http_client() -> None:
+    """Close the pooled connections (on worker shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
+
+
+def create_client(supabase_url: str, supabase_key: str) -> Client:
+    """``supabase.create_client`` on the shared pool, importing supabase on first use."""
+    from supabase import create_client as _create_client
+    from supabase.lib.client_options import SyncClientOptions
+
+    return _create_client(supabase_url, supabase_key, SyncClientOptions(httpx_client=get_http_client()))
+
+
 @lru_cache()
 def get_supabase_client() -> Client:
     """Get a cached Supabase client instance."""
     settings = get_settings()
-    return create_client(settings.supabase_url, settings.supabase_anon_key)
+    return instrument(create_client(settings.supabase_url, settings.supabase_anon_key))
 
 
 def get_supabase_admin_client() -> Client:
     """Get Supabase client with service role for admin operations."""
     settings = get_settings()
-    return create_client(settings.supabase_url, settings.supabase_service_key)
+    return instrument(create_client(settings.supabase_url, settings.supabase_service_key))
 
 
+@traced("get_current_user")
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
 ) -> Any:
@@ -38,13 +94,20 @@ async def get_current_user(
 
         # Try to get user using the token
         # In supabase-py v2, get_user can accept a token parameter
+        start = perf_counter()
         try:
-            response = supabase.auth.get_user(credentials.credentials)
+            with get_tracer().span("supabase auth.get_user", "client"):
+                response = await call_upstream_async(
+                    "auth",
+                    partial(supabase.auth.get_user, credentials.credentials),
+                    retries=settings.supabase_read_retries,
+                )
+            record_call("auth", "get_user", perf_counter() - start)
             if response.user:
                 return response.user
         except (AttributeError, TypeError):
             # If get_user doesn't accept token parameter, use alternative method
-            pass
+            record_call("auth", "get_user", perf_counter() - start, failed=True)
 
         # Alternative: Use python-jose to decode and verify the JWT
         from jose import jwt, JWTError
@@ -81,7 +144,8 @@ async def get_current_user(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-    except HTTPException:
+    except (HTTPException, UpstreamUnavailable):
+        # An auth outage is a 503, not a reason to sign the user out
         raise
     except Exception as e:
         settings = get_settings()
@@ -94,6 +158,7 @@ async def get_current_user(
         )
 
 
+@traced("get_authenticated_client")
 def get_authenticated_client(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
 ) -> Client:
@@ -103,9 +168,14 @@ def get_authenticated_client(
     """
     settings = get_settings()
     supabase = create_client(settings.supabase_url, settings.supabase_anon_key)
-    supabase.auth.set_session(credentials.credentials, credentials.credentials)
+    # set_session looks the user up again, so it goes through the auth breaker too
+    call_upstream(
+        "auth",
+        partial(supabase.auth.set_session, credentials.credentials, credentials.credentials),
+        retries=settings.supabase_read_retries,
+    )
 
     # For supabase-py v2, we need to use postgrest with auth header
     supabase.postgrest.auth(credentials.credentials)
 
-    return supabase
+    return instrument(supabase)
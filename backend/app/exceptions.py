@@ -10,9 +10,15 @@ logger = logging.getLogger(__name__)
 class AppException(Exception):
     """Base exception for application errors."""
 
-    def __init__(self, message: str, status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR):
+    def __init__(
+        self,
+        message: str,
+        status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR,
+        headers: Optional[dict] = None,
+    ):
         self.message = message
         self.status_code = status_code
+        self.headers = headers
         super().__init__(self.message)
 
 
@@ -35,8 +41,10 @@ def handle_exception(e: Exception, operation: str, debug: bool = False) -> HTTPE
     if isinstance(e, HTTPException):
         return e
 
+    headers = None
     if isinstance(e, AppException):
         status_code = e.status_code
+        headers = e.headers
     else:
         status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
 
@@ -52,7 +60,9 @@ def handle_exception(e: Exception, operation: str, debug: bool = False) -> HTTPE
             detail = "Resource not found"
         elif status_code == status.HTTP_400_BAD_REQUEST:
             detail = f"Invalid request for {operation.lower()}"
+        elif status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+            detail = "Service temporarily unavailable, please retry shortly"
         else:
             detail = f"{operation} failed"
 
-    return HTTPException(status_code=status_code, detail=detail)
+    return HTTPException(status_code=status_code, detail=detail, headers=headers)
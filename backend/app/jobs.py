@@ -0,0 +1,394 @@
+"""Background jobs backed by a durable SQLite queue.
+
+Request handlers enqueue slow work and answer 202 with the job's ID; a small
+pool of asyncio workers in every API process claims due jobs, runs them and
+records the outcome, which clients poll through ``GET /api/v1/jobs/{id}``.
+
+Jobs are rows in a SQLite file (``jobs_db_path``), so they survive restarts
+and are shared by all worker processes on the host. Claiming a job takes a
+lease inside an immediate transaction; when a process dies mid-job the lease
+expires and another worker picks the job up again. Failed attempts are
+retried with exponential backoff up to ``max_attempts``. An idempotency key
+makes a repeated submission return the original job instead of a new one,
+unless that job has failed.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from app import metrics
+from app.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+Handler = Callable[[Dict[str, Any]], Any]
+_handlers: Dict[str, Handler] = {}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    user_id TEXT,
+    idempotency_key TEXT,
+    result TEXT,
+    error TEXT,
+    run_at REAL NOT NULL,
+    lease_until REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_run_at ON jobs(status, run_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_idempotency
+    ON jobs(user_id, idempotency_key) WHERE idempotency_key IS NOT NULL;
+"""
+
+
+def job_handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register a handler for jobs of ``kind``; sync handlers run in a thread."""
+
+    def register(func: Handler) -> Handler:
+        _handlers[kind] = func
+        return func
+
+    return register
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    status: str
+    attempts: int
+    max_attempts: int
+    user_id: Optional[str]
+    idempotency_key: Optional[str]
+    result: Any
+    error: Optional[str]
+    run_at: float
+    created_at: float
+    updated_at: float
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(
+            id=row["id"],
+            kind=row["kind"],
+            payload=json.loads(row["payload"]),
+            status=row["status"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            user_id=row["user_id"],
+            idempotency_key=row["idempotency_key"],
+            result=json.loads(row["result"]) if row["result"] is not None else None,
+            error=row["error"],
+            run_at=row["run_at"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+        )
+
+
+class JobQueue:
+    """Durable job queue in a SQLite database shared by all local processes."""
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = 300.0,
+        backoff_base: float = 2.0,
+        backoff_max: float = 300.0,
+    ):
+        self.lease_seconds = lease_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[], None]] = []
+        # Autocommit; multi-statement changes use explicit transactions
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Call ``listener`` whenever a job becomes due."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        with contextlib.suppress(ValueError):
+            self._listeners.remove(listener)
+
+    def _notify(self) -> None:
+        for listener in list(self._listeners):
+            listener()
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        user_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        max_attempts: int = 5,
+        delay: float = 0.0,
+    ) -> Job:
+        """
+        Queue a job; with an idempotency key an existing job for the same user is returned.
+
+        A job that failed for good gives up its key, so submitting it again
+        starts a new job.
+        """
+        if kind not in _handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+        now = time.time()
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if idempotency_key is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET idempotency_key = NULL, updated_at = ?"
+                        " WHERE user_id IS ? AND idempotency_key = ? AND status = ?",
+                        (now, user_id, idempotency_key, FAILED),
+                    )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO jobs (id, kind, payload, status, max_attempts, user_id,"
+                    " idempotency_key, run_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, kind, json.dumps(payload), QUEUED, max_attempts, user_id,
+                     idempotency_key, now + delay, now, now),
+                )
+                if idempotency_key is None:
+                    row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                else:
+                    row = self._conn.execute(
+                        "SELECT * FROM jobs WHERE user_id IS ? AND idempotency_key = ?",
+                        (user_id, idempotency_key),
+                    ).fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        job = Job.from_row(row)
+        if job.id == job_id:
+            metrics.JOBS_ENQUEUED.inc(kind)
+            self._notify()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def claim(self) -> Optional[Job]:
+        """Lease the next due job, including jobs whose previous lease expired."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # A worker died during the final attempt; don't run it again
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, lease_until = NULL, updated_at = ?"
+                    " WHERE status = ? AND lease_until <= ? AND attempts >= max_attempts",
+                    (FAILED, "Worker lost during final attempt", now, RUNNING, now),
+                )
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE (status = ? AND run_at <= ?) OR (status = ? AND lease_until <= ?)"
+                    " ORDER BY run_at LIMIT 1",
+                    (QUEUED, now, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, updated_at = ?"
+                    " WHERE id = ?",
+                    (RUNNING, now + self.lease_seconds, now, row["id"]),
+                )
+                claimed = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Job.from_row(claimed)
+
+    def complete(self, job: Job, result: Any = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, lease_until = NULL, updated_at = ?"
+                " WHERE id = ?",
+                (SUCCEEDED, json.dumps(result), time.time(), job.id),
+            )
+
+    def fail(self, job: Job, error: str, retry: bool = True) -> str:
+        """Record a failed attempt; returns the job's new status."""
+        now = time.time()
+        if retry and job.attempts < job.max_attempts:
+            status, run_at = QUEUED, now + self.backoff(job.attempts)
+        else:
+            status, run_at = FAILED, job.run_at
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, run_at = ?, lease_until = NULL, updated_at = ?"
+                " WHERE id = ?",
+                (status, error, run_at, now, job.id),
+            )
+        return status
+
+    def release(self, job: Job) -> None:
+        """Put a job interrupted by shutdown back without counting the attempt."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts - 1, lease_until = NULL, updated_at = ?"
+                " WHERE id = ? AND status = ?",
+                (QUEUED, time.time(), job.id, RUNNING),
+            )
+
+    def backoff(self, attempts: int) -> float:
+        """Delay before the next attempt: exponential with jitter, capped."""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobRunner:
+    """Pool of asyncio workers executing jobs from a JobQueue."""
+
+    def __init__(self, queue: JobQueue, concurrency: int = 2, poll_interval: float = 1.0):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+
+    def _wake(self) -> None:
+        # Enqueue may be called from the threadpool
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self.queue.add_listener(self._wake)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self, drain_timeout: float = 0.0) -> None:
+        """
+        Stop the workers. Running jobs get ``drain_timeout`` seconds to finish;
+        jobs still running after that are cancelled and released for a retry.
+        """
+        self.queue.remove_listener(self._wake)
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if drain_timeout > 0 and self._tasks:
+            await asyncio.wait(self._tasks, timeout=drain_timeout)
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+
+    async def _worker(self) -> None:
+        while not self._stopping:
+            try:
+                ran = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker error: {e}")
+                ran = False
+            if not ran and not self._stopping:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                self._wakeup.clear()
+
+    async def run_once(self) -> bool:
+        """Claim and execute one due job; returns False when none was due."""
+        job = await asyncio.to_thread(self.queue.claim)
+        if job is None:
+            return False
+        try:
+            await self._execute(job)
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.queue.release, job)
+            raise
+        return True
+
+    async def _execute(self, job: Job) -> None:
+        handler = _handlers.get(job.kind)
+        if handler is None:
+            self.queue.fail(job, f"No handler registered for job kind: {job.kind}", retry=False)
+            metrics.JOBS_COMPLETED.inc(job.kind, FAILED)
+            return
+
+        start = time.perf_counter()
+        with get_tracer().span(f"job {job.kind}", attributes={"job.id": job.id, "job.attempt": job.attempts}):
+            try:
+                if asyncio.iscoroutinefunction(handler):
+                    result = await handler(job.payload)
+                else:
+                    result = await asyncio.to_thread(handler, job.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                status = await asyncio.to_thread(self.queue.fail, job, f"{type(e).__name__}: {e}")
+                logger.warning(f"Job {job.kind} {job.id} attempt {job.attempts} failed ({status}): {e}")
+                outcome = "retried" if status == QUEUED else FAILED
+            else:
+                await asyncio.to_thread(self.queue.complete, job, result)
+                outcome = SUCCEEDED
+        metrics.JOBS_COMPLETED.inc(job.kind, outcome)
+        metrics.JOB_DURATION.observe(time.perf_counter() - start, job.kind)
+
+
+_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide queue, opened from settings on first use."""
+    global _queue
+    if _queue is None:
+        from app.config import get_settings
+
+        settings = get_settings()
+        _queue = JobQueue(
+            settings.jobs_db_path,
+            lease_seconds=settings.jobs_lease_seconds,
+            backoff_base=settings.jobs_backoff_base,
+        )
+    return _queue
+
+
+def set_job_queue(queue: Optional[JobQueue]) -> None:
+    """Replace the process-wide queue (tests and custom setups)."""
+    global _queue
+    _queue = queue
+
+
+def enqueue(kind: str, payload: Dict[str, Any], **kwargs: Any) -> Job:
+    """Queue a job on the process-wide queue; see JobQueue.enqueue."""
+    return get_job_queue().enqueue(kind, payload, **kwargs)
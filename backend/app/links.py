@@ -0,0 +1,116 @@
+"""Wiki links between pages and notes.
+
+``[[Title]]`` or ``[[Title|label]]`` in a page or note links to the page or
+note titled ``Title`` in the same workspace. Titles are compared by
+``link_key``: runs of ASCII whitespace collapsed, trimmed, lowercased. Links
+point at titles, not ids, so a link can be written before its target
+exists and resolves once a page or note of that title is created.
+
+The ``links`` table (supabase/links.sql) holds one row per distinct target
+of each source. Writes keep it up to date by diffing the old and new
+content's link sets (``sync_links``), so an edit that does not touch a
+link costs nothing and one that does costs one delete and/or one upsert.
+Clones, templates and imports write content in bulk and rebuild the
+links of the new workspaces instead (``rebuild_links``).
+"""
+
+import logging
+import re
+from typing import Any, Dict, Iterable, Optional
+
+from app.db import Client
+
+logger = logging.getLogger(__name__)
+
+# Must match the pattern of rebuild_links() in supabase/links.sql
+_LINK = re.compile(r"\[\[([^\[\]\n|]+)(?:\|[^\[\]\n]*)?\]\]")
+
+# Whitespace of link titles and keys; the SQL functions use the same set,
+# since str.split() and Postgres' \s each count other characters too
+_SPACE = " \t\n\r\f\v"
+_SPACES = re.compile(f"[{_SPACE}]+")
+
+# The source column of a link, by item table
+SOURCE_COLUMNS = {"pages": "page_id", "notes": "note_id"}
+
+
+def link_key(title: str) -> str:
+    """The form in which titles are compared; mirrors the SQL link_key()."""
+    return _SPACES.sub(" ", title).strip(" ").lower()
+
+
+def extract_links(content: Optional[str]) -> Dict[str, str]:
+    """Targets linked from ``content``: key -> title as first written."""
+    if not content or "[[" not in content:
+        return {}
+    links: Dict[str, str] = {}
+    for match in _LINK.finditer(content):
+        title = match.group(1).strip(_SPACE)
+        if title:
+            links.setdefault(link_key(title), title)
+    return links
+
+
+def sync_links(
+    supabase: Client,
+    table: str,
+    item: Dict[str, Any],
+    old_title: str,
+    old_content: Optional[str],
+) -> None:
+    """Bring the links of a just written page or note up to date.
+
+    ``item`` is the row as written. ``old_content`` is the content before
+    the write, ``""`` for a new item, or None when the content was not
+    changed; ``old_title`` is the title before the write.
+    """
+    column = SOURCE_COLUMNS[table]
+    retitled = item["title"] != old_title
+    if old_content is None:
+        if retitled:
+            supabase.table("links").update({"source_title": item["title"]}).eq(column, item["id"]).execute()
+        return
+
+    old, new = extract_links(old_content), extract_links(item.get("content"))
+    removed = [key for key in old if key not in new]
+    if removed:
+        supabase.table("links").delete().eq(column, item["id"]).in_("target_key", removed).execute()
+
+    # A rename rewrites every remaining link's source_title along with the new links
+    added = new if retitled else {key: title for key, title in new.items() if key not in old}
+    if added:
+        supabase.table("links").upsert(
+            [
+                {
+                    "workspace_id": item["workspace_id"],
+                    column: item["id"],
+                    "source_title": item["title"],
+                    "target_key": key,
+                    "target_title": title,
+                }
+                for key, title in added.items()
+            ],
+            on_conflict=f"{column},target_key",
+            ignore_duplicates=not retitled,
+        ).execute()
+
+
+def has_links(contents: Iterable[Optional[str]]) -> bool:
+    """Whether any of ``contents`` may contain a link (cheap pre-check for rebuilds)."""
+    return any(content and "[[" in content for content in contents)
+
+
+def rebuild_links(supabase: Client, workspace_ids: Iterable[str]) -> None:
+    """Recompute the links of whole workspaces from their content in one call.
+
+    Failures are logged, not raised: the content is already written, and
+    missing links only hide backlinks; running rebuild_links() again in SQL
+    restores them.
+    """
+    workspace_ids = list(workspace_ids)
+    if not workspace_ids:
+        return
+    try:
+        supabase.rpc("rebuild_links", {"workspace_ids": workspace_ids}).execute()
+    except Exception as e:
+        logger.error(f"Failed to rebuild links of {len(workspace_ids)} workspaces: {e}")
@@ -0,0 +1,242 @@
+"""Workspace membership checks: a cache in front of a micro-batching loader.
+
+Routes start by checking the user's role in the workspace they address
+(``require_workspace_role`` in app/utils.py). ``workspace_role`` answers
+from ``MembershipCache``, which keeps the roles of recently checked
+(user, workspace) pairs for ``membership_cache_ttl`` seconds, so a
+request to a personal or shared workspace the user has used lately makes
+no extra call. Misses go to ``MembershipLoader``.
+
+Views that load several workspaces at once (the sidebar, the dashboard)
+send concurrent requests that each start with a check. The loader
+collects the checks of one user that arrive within
+``ownership_batch_window`` seconds and answers all of them with a single
+query on the primary key of ``workspace_members`` (supabase/teams.sql)::
+
+    select workspace_id, role from workspace_members
+     where user_id = :user and workspace_id in (...)
+
+The first check of a batch waits out the window and then runs the query;
+the others await its result. A batch that reaches ``ownership_batch_max``
+ids runs at once. Batches never mix users.
+
+Only roles are cached, not the absence of one, so a user added to a
+workspace is let in at once. Adding, changing or removing a member and
+deleting a workspace invalidate the cache of the worker that served the
+write; other workers catch up within ``membership_cache_ttl`` seconds.
+Until then RLS still refuses what the user may no longer do, so a stale
+role can only turn a 403 or 404 into an empty result.
+
+Checks run on the event loop, but a batch whose leader was cancelled is
+loaded on a worker thread, so batches are guarded by a lock and resolved
+through ``concurrent.futures.Future``.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+
+from app import metrics
+from app.db import Client
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.waiters: Dict[str, Future] = {}
+        self.claimed = False
+
+
+class MembershipLoader:
+    """Batches membership checks per user. Thread-safe."""
+
+    def __init__(self, window: float, max_batch: int):
+        self.window = window
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._pending: Dict[str, _Batch] = {}
+
+    async def role(self, workspace_id: str, user_id: str, supabase: Client) -> Optional[str]:
+        """The role of ``user_id`` in ``workspace_id`` or None, checked together with concurrent checks."""
+        if self.window <= 0 or self.max_batch <= 1:
+            return self._query([workspace_id], user_id, supabase).get(workspace_id)
+
+        with self._lock:
+            batch = self._pending.get(user_id)
+            leader = batch is None
+            if leader:
+                batch = self._pending[user_id] = _Batch()
+            future = batch.waiters.get(workspace_id)
+            if future is None:
+                future = batch.waiters[workspace_id] = Future()
+            full = len(batch.waiters) >= self.max_batch
+            if full:
+                del self._pending[user_id]
+
+        result = asyncio.wrap_future(future)
+        if full:
+            self._load(batch, user_id, supabase)
+        elif leader:
+            try:
+                # Returns early once a later check fills the batch and runs it
+                await asyncio.wait([result], timeout=self.window)
+            except asyncio.CancelledError:
+                # The other checks of the batch still need an answer
+                asyncio.get_running_loop().run_in_executor(None, self._close_and_load, batch, user_id, supabase)
+                raise
+            self._close_and_load(batch, user_id, supabase)
+        # Shielded: a cancelled request must not cancel the shared future
+        return await asyncio.shield(result)
+
+    def _close_and_load(self, batch: _Batch, user_id: str, supabase: Client) -> None:
+        with self._lock:
+            if self._pending.get(user_id) is batch:
+                del self._pending[user_id]
+        self._load(batch, user_id, supabase)
+
+    def _load(self, batch: _Batch, user_id: str, supabase: Client) -> None:
+        with self._lock:
+            if batch.claimed:
+                return
+            batch.claimed = True
+        metrics.OWNERSHIP_BATCH_SIZE.observe(len(batch.waiters))
+        try:
+            roles = self._query(list(batch.waiters), user_id, supabase)
+        except Exception as e:
+            for future in batch.waiters.values():
+                future.set_exception(e)
+            return
+        for workspace_id, future in batch.waiters.items():
+            future.set_result(roles.get(workspace_id))
+
+    @staticmethod
+    def _query(workspace_ids: list, user_id: str, supabase: Client) -> Dict[str, str]:
+        query = supabase.table("workspace_members").select("workspace_id,role").eq("user_id", user_id)
+        if len(workspace_ids) == 1:
+            query = query.eq("workspace_id", workspace_ids[0])
+        else:
+            query = query.in_("workspace_id", workspace_ids)
+        return {str(row["workspace_id"]): row["role"] for row in query.execute().data or []}
+
+
+class MembershipCache:
+    """LRU of users' roles in workspaces, with a TTL. Thread-safe."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        # Bumped on every invalidation, so a role read across a change isn't stored
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, user_id: str, workspace_id: str) -> Optional[str]:
+        if self.ttl <= 0:
+            return None
+        key = (user_id, workspace_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                self._remove(key, "expired")
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        metrics.record_cache_lookup("membership", entry is not None)
+        return entry[0] if entry else None
+
+    def set(self, user_id: str, workspace_id: str, role: str, generation: int) -> bool:
+        """Store a role unless the cache was invalidated since ``generation``."""
+        if self.ttl <= 0:
+            return False
+        with self._lock:
+            if self._generation != generation:
+                return False
+            key = (user_id, workspace_id)
+            self._entries.pop(key, None)
+            self._entries[key] = (role, time.monotonic() + self.ttl)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)), "size")
+            metrics.CACHE_ENTRIES.set(len(self._entries), "membership")
+        return True
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop a user's roles after they were added to, changed in or removed from a workspace."""
+        self._invalidate(lambda key: key[0] == user_id)
+
+    def invalidate_workspace(self, workspace_id: str) -> None:
+        """Drop every role in a deleted workspace."""
+        self._invalidate(lambda key: key[1] == workspace_id)
+
+    def clear(self) -> None:
+        self._invalidate(lambda key: True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _invalidate(self, match: Callable[[Tuple[str, str]], bool]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if match(key)]:
+                self._remove(key, "invalidated")
+            metrics.CACHE_ENTRIES.set(len(self._entries), "membership")
+
+    def _remove(self, key: Tuple[str, str], reason: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            metrics.CACHE_EVICTIONS.inc("membership", reason)
+
+
+_loader: Optional[MembershipLoader] = None
+_cache: Optional[MembershipCache] = None
+
+
+def get_membership_loader() -> MembershipLoader:
+    """Return the process-wide loader, configured from settings on first use."""
+    global _loader
+    if _loader is None:
+        from app.config import get_settings
+
+        settings = get_settings()
+        _loader = MembershipLoader(settings.ownership_batch_window, settings.ownership_batch_max)
+    return _loader
+
+
+def set_membership_loader(loader: Optional[MembershipLoader]) -> None:
+    """Replace the process-wide loader (tests and custom setups)."""
+    global _loader
+    _loader = loader
+
+
+def get_membership_cache() -> MembershipCache:
+    """Return the process-wide cache, configured from settings on first use."""
+    global _cache
+    if _cache is None:
+        from app.config import get_settings
+
+        settings = get_settings()
+        _cache = MembershipCache(settings.membership_cache_ttl, settings.membership_cache_max_entries)
+    return _cache
+
+
+def set_membership_cache(cache: Optional[MembershipCache]) -> None:
+    """Replace the process-wide cache (tests and custom setups)."""
+    global _cache
+    _cache = cache
+
+
+async def workspace_role(workspace_id: str, user_id: str, supabase: Client) -> Optional[str]:
+    """The user's role in a workspace, or None if they are not a member."""
+    cache = get_membership_cache()
+    role = cache.get(user_id, workspace_id)
+    if role is not None:
+        return role
+    generation = cache.generation
+    role = await get_membership_loader().role(workspace_id, user_id, supabase)
+    if role is not None:
+        cache.set(user_id, workspace_id, role, generation)
+    return role
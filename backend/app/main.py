@@ -1,8 +1,14 @@
+import asyncio
+import contextlib
+import hmac
+import importlib
 import sys
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import JSONResponse, PlainTextResponse, Response
 
 # Add backend directory to path for imports to work
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -14,9 +20,28 @@ from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
+from app import cleanup, jobs, metrics, openapi, server, tracing
 from app.config import get_settings, setup_logging
+from app.db import get_round_trip_budget, notify_request_complete, track_queries
+from app.dependencies import close_http_client
+from app.resilience import UpstreamUnavailable
 from app.middleware import limiter
-from app.routes import workspaces_router, tasks_router, notes_router, pages_router, account_router
+from app.routes import (
+    workspaces_router,
+    members_router,
+    tasks_router,
+    notes_router,
+    pages_router,
+    account_router,
+    jobs_router,
+    templates_router,
+    daily_router,
+    transfer_router,
+    links_router,
+    sharing_router,
+    public_sharing_router,
+    IMPORT_PATH,
+)
 import logging
 
 # Initialize settings early for middleware
@@ -28,6 +53,87 @@ logger = logging.getLogger(__name__)
 abuse_logger = logging.getLogger("abuse")
 
 
+def route_label(request: Request) -> str:
+    """Return the matched route template, keeping metric label cardinality bounded."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RoundTripMiddleware(BaseHTTPMiddleware):
+    """Middleware to count each request's Supabase round trips and check its route's budget.
+
+    Runs whether or not metrics are enabled; the query log is left in
+    ``request.state.queries`` for MetricsMiddleware.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        try:
+            with track_queries() as queries:
+                request.state.queries = queries
+                return await call_next(request)
+        finally:
+            route = request.scope.get("route")
+            budget = get_round_trip_budget(route)
+            if budget is not None and len(queries.route_calls) > budget:
+                logger.warning(
+                    f"{request.method} {route_label(request)} made {len(queries.route_calls)} Supabase calls "
+                    f"(budget {budget})"
+                )
+            notify_request_complete(route, queries)
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Middleware to record latency, status codes and Supabase round trips per route."""
+
+    async def dispatch(self, request: Request, call_next):
+        method = request.method
+        metrics.HTTP_REQUESTS_IN_FLIGHT.inc(method)
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            duration = time.perf_counter() - start
+            route = route_label(request)
+            metrics.HTTP_REQUESTS_IN_FLIGHT.dec(method)
+            metrics.HTTP_REQUESTS.inc(method, route, str(status_code))
+            metrics.HTTP_REQUEST_DURATION.observe(duration, method, route)
+            queries = getattr(request.state, "queries", None)
+            if queries is not None:
+                metrics.DB_ROUND_TRIPS.observe(queries.count, method, route)
+                budget = get_round_trip_budget(request.scope.get("route"))
+                if budget is not None and len(queries.route_calls) > budget:
+                    metrics.ROUND_TRIP_BUDGET_EXCEEDED.inc(method, route)
+
+
+class TracingMiddleware(BaseHTTPMiddleware):
+    """Middleware to assign a request ID and open the server span for each request.
+
+    An incoming X-Request-ID and W3C traceparent are honoured; otherwise new
+    ones are generated. The request ID is echoed on the response.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = tracing.resolve_request_id(request.headers.get("x-request-id"))
+        parent = tracing.parse_traceparent(request.headers.get("traceparent"))
+        tracer = tracing.get_tracer()
+        with tracing.request_context(request_id):
+            with tracer.span(f"{request.method} request", "server", parent=parent) as span:
+                span.set_attribute("http.method", request.method)
+                span.set_attribute("request.id", request_id)
+                response = await call_next(request)
+                route = route_label(request)
+                span.name = f"{request.method} {route}"
+                span.set_attribute("http.route", route)
+                span.set_attribute("http.status_code", response.status_code)
+                if response.status_code >= 500:
+                    span.status = "error"
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     """Middleware to add security headers to all responses."""
 
@@ -70,6 +176,10 @@ class CacheControlMiddleware(BaseHTTPMiddleware):
             response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate"
             return response
 
+        # Routes that set their own policy (public shared pages) keep it
+        if "cache-control" in response.headers:
+            return response
+
         # For GET requests, add appropriate cache headers
         path = request.url.path
 
@@ -120,13 +230,19 @@ class SlowResponseTestMiddleware(BaseHTTPMiddleware):
 
 
 class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
-    """Reject requests with bodies larger than the configured limit."""
+    """Reject requests with bodies larger than the configured limit.
 
-    def __init__(self, app: FastAPI, max_bytes: int = 1_000_000):
+    Paths in ``exempt_paths`` stream their bodies and enforce their own limit.
+    """
+
+    def __init__(self, app: FastAPI, max_bytes: int = 1_000_000, exempt_paths: tuple = ()):
         super().__init__(app)
         self.max_bytes = max_bytes
+        self.exempt_paths = frozenset(exempt_paths)
 
     async def dispatch(self, request: Request, call_next):
+        if request.url.path in self.exempt_paths:
+            return await call_next(request)
         if request.method in {"POST", "PUT", "PATCH", "DELETE"}:
             content_length = request.headers.get("content-length")
             if content_length:
@@ -170,6 +286,51 @@ class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
 
         return await call_next(request)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop per-worker background tasks."""
+    preload = None
+    if settings.warm_up:
+        await server.warm_up(app)
+    elif settings.preload_imports:
+        # Deferred at import time (see app.db) so the worker binds sooner; load it
+        # off the event loop now rather than on the first authenticated request
+        preload = asyncio.create_task(asyncio.to_thread(importlib.import_module, "supabase"))
+    flusher = None
+    if settings.metrics_enabled and settings.metrics_dir:
+        flusher = asyncio.create_task(
+            metrics.flush_periodically(settings.metrics_dir, settings.metrics_flush_interval)
+        )
+    runner = scheduler = None
+    if settings.jobs_enabled:
+        runner = jobs.JobRunner(
+            jobs.get_job_queue(),
+            concurrency=settings.jobs_concurrency,
+            poll_interval=settings.jobs_poll_interval,
+        )
+        await runner.start()
+        if settings.cleanup_enabled:
+            scheduler = asyncio.create_task(cleanup.schedule_periodically(runner.queue, settings.cleanup_interval))
+    try:
+        yield
+    finally:
+        if preload:
+            await preload
+        if scheduler:
+            scheduler.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await scheduler
+        if runner:
+            await runner.stop(settings.jobs_drain_timeout)
+        if flusher:
+            flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await flusher
+            metrics.write_snapshot(settings.metrics_dir)
+        tracing.shutdown()
+        close_http_client()
+
+
 # App metadata
 app = FastAPI(
     title="Moji API",
@@ -177,6 +338,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 logger.info("Starting Moji API")
@@ -185,6 +347,7 @@ logger.info("Starting Moji API")
 app.state.limiter = limiter
 
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
+    metrics.RATE_LIMITED.inc(route_label(request))
     abuse_logger.warning(
         "rate_limit_exceeded",
         extra={
@@ -193,9 +356,20 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
             "client": request.client.host if request.client else "unknown",
         },
     )
-    return await _rate_limit_exceeded_handler(request, exc)
+    return _rate_limit_exceeded_handler(request, exc)
 
 app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
+
+
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailable):
+    """503 for Supabase outages that escape a route's own error handling (e.g. in dependencies)."""
+    return JSONResponse(
+        {"detail": "Service temporarily unavailable, please retry shortly"},
+        status_code=503,
+        headers=exc.headers,
+    )
+
+app.add_exception_handler(UpstreamUnavailable, upstream_unavailable_handler)
 app.add_middleware(SlowAPIMiddleware)
 
 # Security headers middleware (should be first)
@@ -209,7 +383,11 @@ if settings.debug:
     app.add_middleware(SlowResponseTestMiddleware)
 
 # Request size limit middleware
-app.add_middleware(RequestSizeLimitMiddleware, max_bytes=1_000_000)
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    max_bytes=1_000_000,
+    exempt_paths=(f"/api/v1{IMPORT_PATH}",),
+)
 
 # Compression middleware (should be added before CORS)
 app.add_middleware(
@@ -229,18 +407,40 @@ app.add_middleware(
         "Accept",
         "Origin",
         "X-Requested-With",
+        "X-Request-ID",
+        "traceparent",
     ],
     expose_headers=["ETag", "X-Request-ID"],
     max_age=3600,  # Cache preflight requests for 1 hour
 )
 
+# Request ID and tracing middleware
+app.add_middleware(TracingMiddleware)
+
+# Round-trip budgets, checked with or without metrics
+app.add_middleware(RoundTripMiddleware)
+
+# Metrics middleware (outermost, so it times the whole stack)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Register routers
 API_PREFIX = "/api/v1"
 app.include_router(workspaces_router, prefix=API_PREFIX)
+app.include_router(members_router, prefix=API_PREFIX)
 app.include_router(tasks_router, prefix=API_PREFIX)
 app.include_router(notes_router, prefix=API_PREFIX)
 app.include_router(pages_router, prefix=API_PREFIX)
 app.include_router(account_router, prefix=API_PREFIX)
+app.include_router(jobs_router, prefix=API_PREFIX)
+app.include_router(templates_router, prefix=API_PREFIX)
+app.include_router(daily_router, prefix=API_PREFIX)
+app.include_router(transfer_router, prefix=API_PREFIX)
+app.include_router(links_router, prefix=API_PREFIX)
+app.include_router(sharing_router, prefix=API_PREFIX)
+app.include_router(public_sharing_router)
+
+openapi.use_precomputed_schema(app, settings.openapi_schema_path)
 
 
 @app.get("/")
@@ -265,7 +465,25 @@ async def health_check(request: Request):
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+@limiter.exempt
+async def metrics_endpoint(request: Request):
+    """Prometheus scrape endpoint."""
+    if not settings.metrics_enabled:
+        return Response(status_code=404)
+    if not settings.metrics_token and not settings.debug:
+        # Route, upstream and cache figures are not for the public; only debug serves them openly
+        return Response(status_code=404)
+    if settings.metrics_token:
+        supplied = request.headers.get("authorization", "")
+        if not hmac.compare_digest(supplied, f"Bearer {settings.metrics_token}"):
+            return Response(status_code=401)
+    body = metrics.collect(settings.metrics_dir)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 if __name__ == "__main__":
+    # Development server; production runs "python -m app.server"
     import uvicorn
 
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,396 @@
+"""Prometheus-compatible metrics collection and exposition.
+
+Metrics live in a per-worker registry of plain dicts keyed by label tuples.
+Updates come from the event loop and from threads (the threadpool, hedged
+reads, ``asyncio.to_thread``), and a read-modify-write of a dict entry is not
+atomic across threads, so each metric family guards its values with a lock.
+
+When ``metrics_dir`` is configured, every worker periodically writes a JSON
+snapshot of its registry to ``<metrics_dir>/moji-<pid>.json`` and the
+``/metrics`` endpoint merges all snapshots, so a scrape against any worker of
+a multi-worker deployment returns totals for the whole process group.
+"""
+
+import asyncio
+import bisect
+import glob
+import json
+import logging
+import math
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Round trips per request
+ROUND_TRIP_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+
+# Items answered by one batched query
+BATCH_SIZE_BUCKETS = (1, 2, 3, 4, 6, 8, 12, 16, 25, 50, 100)
+
+
+class Metric:
+    """Base class for a metric family."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, object] = {}
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = [[list(labels), list(value) if isinstance(value, list) else value]
+                       for labels, value in self._values.items()]
+        return {
+            "type": self.type_name,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": samples,
+        }
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    type_name = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            values = self._values
+            values[labels] = values.get(labels, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+
+class Gauge(Metric):
+    """Value that can go up and down. Merged across workers by summing."""
+
+    type_name = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            values = self._values
+            values[labels] = values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            values = self._values
+            values[labels] = values.get(labels, 0.0) - amount
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+
+class Histogram(Metric):
+    """Bucketed distribution of observed values.
+
+    Each sample is stored as ``[bucket_counts..., sum, count]`` where bucket
+    counts are non-cumulative; they are accumulated at render time.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        bucket = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._values.get(labels)
+            if sample is None:
+                sample = [0] * (len(self.buckets) + 1) + [0.0, 0]
+                self._values[labels] = sample
+            sample[bucket] += 1
+            sample[-2] += value
+            sample[-1] += 1
+
+    def get_count(self, *labels: str) -> int:
+        sample = self._values.get(labels)
+        return sample[-1] if sample else 0
+
+    def snapshot(self) -> dict:
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        return data
+
+
+class Registry:
+    """Collection of metric families belonging to one worker."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def clear(self) -> None:
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+
+def merge_snapshots(snapshots: Iterable[Dict[str, dict]]) -> Dict[str, dict]:
+    """Sum samples of several worker snapshots into one snapshot."""
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                target = {key: value for key, value in family.items() if key != "samples"}
+                target["samples"] = {}
+                merged[name] = target
+            samples = target["samples"]
+            for labels, value in family["samples"]:
+                key = tuple(labels)
+                current = samples.get(key)
+                if current is None:
+                    samples[key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    samples[key] = [a + b for a, b in zip(current, value)]
+                else:
+                    samples[key] = current + value
+    for family in merged.values():
+        family["samples"] = [[list(labels), value] for labels, value in family["samples"].items()]
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render(snapshot: Dict[str, dict]) -> str:
+    """Render a snapshot in the Prometheus text exposition format (0.0.4)."""
+    lines: List[str] = []
+    for name, family in snapshot.items():
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        labelnames = family["labelnames"]
+        for labels, value in family["samples"]:
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(family["buckets"] + [math.inf], value[:-2]):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                lines.append(f"{name}_bucket{_format_labels(labelnames, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {_format_value(value[-2])}")
+            lines.append(f"{name}_count{_format_labels(labelnames, labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "moji_http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "moji_http_request_duration_seconds",
+    "HTTP request latency by method and route template.",
+    ("method", "route"),
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "moji_http_requests_in_flight",
+    "HTTP requests currently being served.",
+    ("method",),
+)
+DB_ROUND_TRIPS = REGISTRY.histogram(
+    "moji_db_round_trips_per_request",
+    "Supabase round trips issued while serving one request.",
+    ("method", "route"),
+    buckets=ROUND_TRIP_BUCKETS,
+)
+ROUND_TRIP_BUDGET_EXCEEDED = REGISTRY.counter(
+    "moji_db_round_trip_budget_exceeded_total",
+    "Requests that made more Supabase calls than their route's declared budget.",
+    ("method", "route"),
+)
+UPSTREAM_DURATION = REGISTRY.histogram(
+    "moji_upstream_request_duration_seconds",
+    "Supabase call latency by table (or RPC function) and operation.",
+    ("table", "operation"),
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "moji_upstream_errors_total",
+    "Supabase calls that raised, by table and operation.",
+    ("table", "operation"),
+)
+RATE_LIMITED = REGISTRY.counter(
+    "moji_rate_limit_rejections_total",
+    "Requests rejected by the rate limiter.",
+    ("route",),
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "moji_cache_lookups_total",
+    "In-process cache lookups by cache name and result (hit, miss or coalesced).",
+    ("cache", "result"),
+)
+CACHE_EVICTIONS = REGISTRY.counter(
+    "moji_cache_evictions_total",
+    "Entries removed from an in-process cache, by reason (size, expired or invalidated).",
+    ("cache", "reason"),
+)
+CACHE_BYTES = REGISTRY.gauge(
+    "moji_cache_bytes",
+    "Approximate serialized size of the entries held by an in-process cache.",
+    ("cache",),
+)
+CACHE_ENTRIES = REGISTRY.gauge(
+    "moji_cache_entries",
+    "Entries held by an in-process cache.",
+    ("cache",),
+)
+OWNERSHIP_BATCH_SIZE = REGISTRY.histogram(
+    "moji_ownership_batch_size",
+    "Workspace membership checks answered by one batched query.",
+    buckets=BATCH_SIZE_BUCKETS,
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "moji_upstream_retries_total",
+    "Supabase reads retried after an upstream failure, by table and operation.",
+    ("table", "operation"),
+)
+UPSTREAM_HEDGED = REGISTRY.counter(
+    "moji_upstream_hedged_total",
+    "Slow Supabase reads that were sent a second time, by table.",
+    ("table",),
+)
+CIRCUIT_OPEN = REGISTRY.gauge(
+    "moji_circuit_open",
+    "Workers whose circuit breaker for an upstream (rest or auth) is open.",
+    ("upstream",),
+)
+CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "moji_circuit_rejections_total",
+    "Supabase calls failed fast because the upstream's circuit was open.",
+    ("upstream",),
+)
+JOBS_ENQUEUED = REGISTRY.counter(
+    "moji_jobs_enqueued_total",
+    "Background jobs queued, by kind.",
+    ("kind",),
+)
+JOBS_COMPLETED = REGISTRY.counter(
+    "moji_jobs_completed_total",
+    "Background job attempts by kind and outcome (succeeded, retried or failed).",
+    ("kind", "outcome"),
+)
+JOB_DURATION = REGISTRY.histogram(
+    "moji_job_duration_seconds",
+    "Background job attempt duration by kind.",
+    ("kind",),
+)
+
+CLEANUP_TASKS = REGISTRY.counter(
+    "moji_cleanup_tasks_total",
+    "Completed tasks removed by the cleanup sweeper, by action (deleted or archived).",
+    ("action",),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a cache lookup; hit ratio is hits / (hits + misses)."""
+    CACHE_LOOKUPS.inc(cache, "hit" if hit else "miss")
+
+
+def _snapshot_path(directory: str, pid: Optional[int] = None) -> str:
+    return os.path.join(directory, f"moji-{pid or os.getpid()}.json")
+
+
+def write_snapshot(directory: str) -> None:
+    """Atomically write this worker's snapshot into the shared directory."""
+    os.makedirs(directory, exist_ok=True)
+    path = _snapshot_path(directory)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(REGISTRY.snapshot(), fh, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def collect(directory: Optional[str] = None) -> str:
+    """Return the exposition text for this worker or, with a directory, all workers."""
+    if not directory:
+        return render(REGISTRY.snapshot())
+
+    write_snapshot(directory)
+    snapshots = []
+    for path in glob.glob(os.path.join(directory, "moji-*.json")):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                snapshots.append(json.load(fh))
+        except (OSError, ValueError):
+            logger.warning("Skipping unreadable metrics snapshot %s", path)
+    return render(merge_snapshots(snapshots))
+
+
+async def flush_periodically(directory: str, interval: float) -> None:
+    """Write this worker's snapshot every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            write_snapshot(directory)
+        except OSError as e:
+            logger.warning(f"Failed to write metrics snapshot: {e}")
@@ -0,0 +1,57 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+from uuid import UUID
+
+
+class DailyTask(BaseModel):
+    """Task as listed on a day."""
+
+    id: UUID
+    workspace_id: UUID
+    content: str
+    done: bool
+    priority: int
+    due_date: Optional[date] = None
+    scheduled_date: Optional[date] = None
+
+
+class DailyNote(BaseModel):
+    """Note created on a day. Bodies are fetched per note when opened."""
+
+    id: UUID
+    workspace_id: UUID
+    title: str
+
+
+class DailyBucket(BaseModel):
+    """Everything that falls on one day, across all workspaces."""
+
+    date: date
+    tasks: List[DailyTask] = []
+    notes: List[DailyNote] = []
+
+
+class DailyRange(BaseModel):
+    """Non-empty days between ``start`` and ``end`` (inclusive)."""
+
+    start: date
+    end: date
+    days: List[DailyBucket]
+
+
+class DailyCount(BaseModel):
+    """Item counts of one day, for the calendar month view."""
+
+    date: date
+    tasks: int
+    done: int
+    notes: int
+
+
+class DailySummary(BaseModel):
+    """Per-day counts between ``start`` and ``end`` (inclusive)."""
+
+    start: date
+    end: date
+    days: List[DailyCount]
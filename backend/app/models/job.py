@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Literal, Optional
+from uuid import UUID
+
+
+class JobStatus(BaseModel):
+    """Public view of a background job."""
+
+    id: UUID
+    kind: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    attempts: int
+    max_attempts: int
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
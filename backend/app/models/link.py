@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Literal, Optional
+from uuid import UUID
+
+ItemType = Literal["page", "note"]
+
+
+class LinkedItem(BaseModel):
+    """A page or note on the other end of a link (backlinks, orphans)."""
+
+    type: ItemType
+    id: UUID
+    title: str
+
+
+class OutgoingLink(BaseModel):
+    """A ``[[Title]]`` in a page or note, with the item it resolves to.
+
+    ``type`` and ``id`` are null while no page or note has the title; when
+    both a page and a note have it, the page wins.
+    """
+
+    title: str
+    type: Optional[ItemType] = None
+    id: Optional[UUID] = None
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+# Owners manage the workspace and its members, editors change its items, viewers read them
+Role = Literal["owner", "editor", "viewer"]
+
+
+class MemberCreate(BaseModel):
+    """Schema for adding a user to a workspace."""
+
+    user_id: UUID
+    role: Role = "editor"
+
+
+class MemberUpdate(BaseModel):
+    """Schema for changing a member's role."""
+
+    role: Role
+
+
+class Member(BaseModel):
+    """A user's membership of a workspace."""
+
+    workspace_id: UUID
+    user_id: UUID
+    role: Role
+    created_at: datetime
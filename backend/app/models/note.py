@@ -31,6 +31,7 @@ class Note(NoteBase):
 
     id: UUID
     workspace_id: UUID
+    sort_key: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
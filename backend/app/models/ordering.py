@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+
+
+class ItemMove(BaseModel):
+    """Schema for moving a task, note or page. Omit one neighbor to move to that end."""
+
+    before_id: Optional[UUID] = None  # item that will come right before the moved one
+    after_id: Optional[UUID] = None  # item that will come right after it
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 
@@ -21,10 +21,20 @@ class PageUpdate(BaseModel):
     content: Optional[str] = None
 
 
+class OutlineHeading(BaseModel):
+    """One heading of a page's outline."""
+    level: int = Field(..., ge=1, le=6)
+    text: str
+    anchor: str
+    offset: int = Field(..., description="Byte offset of the heading line in the UTF-8 content")
+
+
 class Page(PageBase):
     """Full page model with all fields."""
     id: UUID
     workspace_id: UUID
+    sort_key: Optional[str] = None
+    outline: Optional[List[OutlineHeading]] = None
     created_at: datetime
     updated_at: datetime
     
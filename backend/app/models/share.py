@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from uuid import UUID
+
+
+class PageShare(BaseModel):
+    """A page's public share link."""
+
+    token: str
+    page_id: UUID
+    path: str = Field(..., description="Public path of the page, /p/<token>")
+    created_at: datetime
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
 from uuid import UUID
 
@@ -10,6 +10,8 @@ class TaskBase(BaseModel):
     content: str = Field(..., min_length=1, max_length=500)
     done: bool = Field(default=False)
     priority: int = Field(default=0, ge=0, le=3)  # 0=none, 1=low, 2=medium, 3=high
+    due_date: Optional[date] = None
+    scheduled_date: Optional[date] = None  # the day it shows up in Moji Daily
 
 
 class TaskCreate(TaskBase):
@@ -24,6 +26,8 @@ class TaskUpdate(BaseModel):
     content: Optional[str] = Field(None, min_length=1, max_length=500)
     done: Optional[bool] = None
     priority: Optional[int] = Field(None, ge=0, le=3)
+    due_date: Optional[date] = None
+    scheduled_date: Optional[date] = None
 
 
 class Task(TaskBase):
@@ -31,6 +35,8 @@ class Task(TaskBase):
 
     id: UUID
     workspace_id: UUID
+    completed_at: Optional[datetime] = None
+    sort_key: Optional[str] = None  # manual order, see app/ordering.py
     created_at: datetime
     updated_at: datetime
 
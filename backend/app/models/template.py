@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from app.models.task import TaskCreate
+
+
+class TemplateSummary(BaseModel):
+    """Catalog entry for a built-in workspace template."""
+
+    id: str
+    name: str
+    description: Optional[str] = None
+    tasks: int
+    notes: int
+    pages: int
+
+
+class WorkspaceCopy(BaseModel):
+    """Schema for cloning a workspace or instantiating a template."""
+
+    name: Optional[str] = Field(None, min_length=1, max_length=100)
+
+
+class TemplateTask(TaskCreate):
+    """A template's task; dates are given as days from the day it is used."""
+
+    due_in_days: Optional[int] = Field(None, ge=0, le=365)
+    scheduled_in_days: Optional[int] = Field(None, ge=0, le=365)
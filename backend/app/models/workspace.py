@@ -9,6 +9,7 @@ class WorkspaceBase(BaseModel):
 
     name: str = Field(..., min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=1000)
+    cleanup_after_days: Optional[int] = Field(None, ge=1, le=3650)  # delete done tasks after this long
 
 
 class WorkspaceCreate(WorkspaceBase):
@@ -22,6 +23,7 @@ class WorkspaceUpdate(BaseModel):
 
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=1000)
+    cleanup_after_days: Optional[int] = Field(None, ge=1, le=3650)
 
 
 class Workspace(WorkspaceBase):
@@ -34,3 +36,13 @@ class Workspace(WorkspaceBase):
 
     class Config:
         from_attributes = True
+
+
+class WorkspaceStats(BaseModel):
+    """Sidebar badge counts of one workspace."""
+
+    workspace_id: UUID
+    open_tasks: int
+    high_priority_tasks: int
+    notes: int
+    pages: int
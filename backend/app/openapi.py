@@ -0,0 +1,71 @@
+"""Precomputed OpenAPI schema.
+
+FastAPI builds the schema on the first request to ``/openapi.json`` (or
+``/docs``) by walking every route and model, which adds tens of milliseconds
+to that request on a freshly started worker. Writing the schema at build
+time with
+
+    python -m app.openapi openapi.json
+
+and setting ``OPENAPI_SCHEMA_PATH=openapi.json`` serves the file instead. A
+file that is missing, unreadable or written for another API version is
+ignored and the schema is generated as usual.
+"""
+
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+
+def load_schema(path: Optional[str], version: str) -> Optional[Dict[str, Any]]:
+    """Read a precomputed schema, or None when there is no usable one."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as fh:
+            schema = json.load(fh)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable OpenAPI schema {path}: {e}")
+        return None
+    if schema.get("info", {}).get("version") != version:
+        logger.warning(f"Ignoring OpenAPI schema {path} written for another API version")
+        return None
+    return schema
+
+
+def use_precomputed_schema(app: FastAPI, path: Optional[str]) -> None:
+    """Make ``app.openapi()`` load the schema from ``path`` before generating one."""
+    generate = app.openapi
+
+    def openapi() -> Dict[str, Any]:
+        if app.openapi_schema is None:
+            app.openapi_schema = load_schema(path, app.version) or generate()
+        return app.openapi_schema
+
+    openapi.generate = generate
+    app.openapi = openapi
+
+
+def write_schema(app: FastAPI, path: str) -> None:
+    """Generate the app's schema and atomically write it to ``path``."""
+    # Never copy a previously loaded file, regenerate from the routes
+    app.openapi_schema = None
+    schema = getattr(app.openapi, "generate", app.openapi)()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(schema, fh, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+if __name__ == "__main__":
+    from app.main import app
+
+    target = sys.argv[1] if len(sys.argv) > 1 else "openapi.json"
+    write_schema(app, target)
+    print(f"OpenAPI schema written to {target}")
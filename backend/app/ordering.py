@@ -0,0 +1,177 @@
+"""Manual ordering of tasks, notes and pages with fractional sort keys.
+
+Every item has a ``sort_key``: a string of base-62 digits read as a fraction
+and compared bytewise (the column uses the "C" collation). A key strictly
+between any two keys always exists, so moving an item writes that one row.
+
+New items are appended by the ``assign_sort_key`` trigger of
+supabase/ordering.sql, which increments the last digit of the workspace's
+highest key. Moves take the midpoint of the new neighbors' keys. Keys grow
+by about one digit per ~30 appends or per repeated insertion into the same
+gap; once a written key is longer than ``REBALANCE_KEY_LENGTH`` a
+background job rewrites the workspace's keys to short, evenly spaced ones
+without changing the order.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+
+from app.cache import invalidate
+from app.db import Client
+from app.dependencies import get_supabase_admin_client
+from app.jobs import enqueue, job_handler
+from app.utils import read_only_error
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_BASE = len(DIGITS)
+
+REBALANCE_KEY_LENGTH = 32
+
+REBALANCE_JOB = "ordering.rebalance"
+
+# Tables with a sort_key column
+ORDERED_TABLES = ("tasks", "notes", "pages")
+
+
+def is_valid_key(key: Any) -> bool:
+    """True for a non-empty base-62 string not ending in "0"."""
+    return (
+        isinstance(key, str)
+        and 0 < len(key) <= 255
+        and all(c in DIGITS for c in key)
+        and not key.endswith("0")
+    )
+
+
+def key_after(key: Optional[str]) -> str:
+    """Next key after ``key`` for appending; mirrors the SQL sort_key_after()."""
+    if not key:
+        return "V"
+    last = key[-1]
+    if last == "z":
+        return key + "V"
+    return key[:-1] + DIGITS[DIGITS.index(last) + 1]
+
+
+def key_at(n: int) -> str:
+    """Evenly spaced key for position ``n``; mirrors the SQL sort_key_at()."""
+    digits = ""
+    for _ in range(4):
+        n, digit = divmod(n, _BASE)
+        digits = DIGITS[digit] + digits
+    return digits + "V"
+
+
+def _midpoint(low: str, high: Optional[str]) -> str:
+    """Digits strictly between the fractions ``low`` and ``high`` (None = 1)."""
+    if high is not None:
+        # Shared leading digits stay as they are
+        n = 0
+        while n < len(high) and (low[n] if n < len(low) else "0") == high[n]:
+            n += 1
+        if n:
+            return high[:n] + _midpoint(low[n:], high[n:])
+    digit_low = DIGITS.index(low[0]) if low else 0
+    digit_high = DIGITS.index(high[0]) if high is not None else _BASE
+    if digit_high - digit_low > 1:
+        return DIGITS[(digit_low + digit_high + 1) // 2]
+    # Adjacent digits: a shorter prefix of ``high`` may still fit, otherwise go one digit deeper
+    if high is not None and len(high) > 1:
+        return high[:1]
+    return DIGITS[digit_low] + _midpoint(low[1:], None)
+
+
+def key_between(before: Optional[str], after: Optional[str]) -> str:
+    """A key that sorts after ``before`` and before ``after`` (either may be None)."""
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"{before!r} is not before {after!r}")
+    if after is None:
+        return key_after(before)
+    return _midpoint(before or "", after)
+
+
+def move_item(
+    supabase: Client,
+    table: str,
+    item_id: str,
+    before_id: Optional[str],
+    after_id: Optional[str],
+    user_id: str,
+) -> Dict[str, Any]:
+    """
+    Give an item a key between two neighbors in its workspace and return it.
+
+    One read of the three rows and one single-row update. Raises 404 when
+    the item is missing, 403 when the user may only view it, 400 for
+    neighbors outside its workspace and 409 when the neighbors' keys are
+    not in order, e.g. equal keys from two concurrent appends; that also
+    schedules a rebalance, after which the move can be retried.
+    """
+    if before_id is None and after_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="before_id or after_id is required",
+        )
+    ids = [item_id] + [i for i in (before_id, after_id) if i is not None]
+    rows = {
+        row["id"]: row
+        for row in supabase.table(table).select("id,workspace_id,sort_key").in_("id", ids).execute().data or []
+    }
+    item = rows.get(item_id)
+    if item is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{table[:-1].capitalize()} not found",
+        )
+    neighbors = [rows.get(i) for i in (before_id, after_id) if i is not None]
+    if item_id in (before_id, after_id) or any(
+        row is None or row["workspace_id"] != item["workspace_id"] for row in neighbors
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Neighbors must be other items in the same workspace",
+        )
+
+    try:
+        key = key_between(
+            rows[before_id]["sort_key"] if before_id else None,
+            rows[after_id]["sort_key"] if after_id else None,
+        )
+    except ValueError:
+        schedule_rebalance(table, item["workspace_id"], user_id)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Neighbors are out of order; reload and retry",
+        )
+
+    response = supabase.table(table).update({"sort_key": key}).eq("id", item_id).execute()
+    if not response.data:
+        # The item was readable, so RLS refused the write
+        raise read_only_error()
+    if len(key) > REBALANCE_KEY_LENGTH:
+        schedule_rebalance(table, item["workspace_id"], user_id)
+    return response.data[0]
+
+
+def schedule_rebalance(table: str, workspace_id: str, user_id: str) -> None:
+    """Queue a key rewrite for a workspace; repeated requests within a minute share one job."""
+    enqueue(
+        REBALANCE_JOB,
+        {"table": table, "workspace_id": workspace_id, "user_id": user_id},
+        user_id=user_id,
+        idempotency_key=f"rebalance:{table}:{workspace_id}:{int(time.time() // 60)}",
+    )
+
+
+@job_handler(REBALANCE_JOB)
+def rebalance_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Rewrite a workspace's sort keys in one statement, see supabase/ordering.sql."""
+    admin = get_supabase_admin_client()
+    response = admin.rpc(
+        "rebalance_sort_keys",
+        {"target": payload["table"], "target_workspace": payload["workspace_id"]},
+    ).execute()
+    invalidate(payload["user_id"], f"{payload['table']}:{payload['workspace_id']}")
+    return {"updated": response.data}
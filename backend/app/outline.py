@@ -0,0 +1,154 @@
+"""Heading outlines (tables of contents) of page content.
+
+Pages are markdown with ATX headings (``## Title``, as the editor writes
+them). The outline lists each heading's level, plain text, anchor (a
+GitHub-style slug, ``-1``, ``-2``... appended to repeats) and the byte
+offset of its line in the UTF-8 content. Headings inside fenced code
+blocks are skipped.
+
+``extract_outline`` scans a whole page. ``update_outline`` re-scans only
+the lines an edit touched: headings before them are kept, headings after
+them are shifted by the change in length, and anchors are renumbered.
+It falls back to a full scan when the edit adds or removes a code fence,
+which can turn any later line into a heading or out of one.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# A heading or a fence opener/closer, indented by at most three spaces
+_LINE = re.compile(r"^ {0,3}(?:(#{1,6})(?:[ \t]+(.*?))?[ \t\r]*$|(`{3,}|~{3,}))", re.MULTILINE)
+_FENCE = re.compile(r"^ {0,3}(?:`{3,}|~{3,})", re.MULTILINE)
+_CLOSING_HASHES = re.compile(r"(?:^|[ \t]+)#+$")
+_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_EMPHASIS = re.compile(r"\*\*|__|~~|`")
+_ESCAPE = re.compile(r"\\([\\`*_{}\[\]()#+\-.!~>|])")
+_NOT_SLUG = re.compile(r"[^\w\- ]")
+
+Heading = Dict[str, Any]
+
+
+def _plain(text: str) -> str:
+    """Heading text without inline markdown."""
+    text = _CLOSING_HASHES.sub("", text)
+    text = _LINK.sub(r"\1", text)
+    text = _EMPHASIS.sub("", text)
+    return _ESCAPE.sub(r"\1", text).strip()
+
+
+def _slug(text: str) -> str:
+    return _NOT_SLUG.sub("", text.lower()).replace(" ", "-")
+
+
+def _byte_length(text: str) -> int:
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def _scan(text: str, base_offset: int = 0, fence: Optional[str] = None) -> Tuple[List[Heading], Optional[str]]:
+    """Headings of ``text`` without anchors, and the fence still open at its end."""
+    headings: List[Heading] = []
+    ascii_only = text.isascii()
+    position, offset = 0, base_offset
+    for match in _LINE.finditer(text):
+        marker = match.group(3)
+        if marker is not None:
+            if fence is None:
+                fence = marker
+            elif marker[0] == fence[0] and len(marker) >= len(fence):
+                fence = None
+            continue
+        if fence is not None:
+            continue
+        heading = _plain(match.group(2) or "")
+        if not heading:
+            continue
+        offset += match.start() - position if ascii_only else _byte_length(text[position : match.start()])
+        position = match.start()
+        headings.append({"level": len(match.group(1)), "text": heading, "offset": offset})
+    return headings, fence
+
+
+def _common_prefix(a: str, b: str, limit: int) -> int:
+    """Length of the common prefix of ``a`` and ``b`` (at most ``limit``), by bisection."""
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle : len(a) - low] == b[len(b) - middle : len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _open_fence(text: str) -> Optional[str]:
+    """The fence left open at the end of ``text``, if any."""
+    if "```" not in text and "~~~" not in text:
+        return None
+    return _scan(text)[1]
+
+
+def _with_anchors(headings: List[Heading]) -> List[Heading]:
+    seen: Dict[str, int] = {}
+    outline = []
+    for heading in headings:
+        slug = _slug(heading["text"])
+        count = seen.get(slug, 0)
+        seen[slug] = count + 1
+        outline.append(
+            {
+                "level": heading["level"],
+                "text": heading["text"],
+                "anchor": f"{slug}-{count}" if count else slug,
+                "offset": heading["offset"],
+            }
+        )
+    return outline
+
+
+def extract_outline(content: str) -> List[Heading]:
+    """The outline of a whole page."""
+    return _with_anchors(_scan(content or "")[0])
+
+
+def update_outline(old_content: str, outline: Optional[List[Heading]], new_content: str) -> List[Heading]:
+    """The outline of ``new_content``, given ``old_content`` and its outline."""
+    old_content, new_content = old_content or "", new_content or ""
+    if outline is None:
+        return extract_outline(new_content)
+    if old_content == new_content:
+        return outline
+
+    # The edit spans old[start:old_end] -> new[start:new_end], widened to whole lines
+    limit = min(len(old_content), len(new_content))
+    prefix = _common_prefix(old_content, new_content, limit)
+    suffix = _common_suffix(old_content, new_content, limit - prefix)
+    start = old_content.rfind("\n", 0, prefix) + 1
+    old_end = old_content.find("\n", len(old_content) - suffix)
+    old_end = len(old_content) if old_end < 0 else old_end
+    new_end = old_end - len(old_content) + len(new_content)
+
+    old_region, new_region = old_content[start:old_end], new_content[start:new_end]
+    if _FENCE.search(old_region) or _FENCE.search(new_region):
+        return extract_outline(new_content)
+
+    start_offset = _byte_length(old_content[:start])
+    old_end_offset = start_offset + _byte_length(old_region)
+    shift = _byte_length(new_region) - _byte_length(old_region)
+    fence = _open_fence(old_content[:start])
+    region = _scan(new_region, start_offset, fence)[0] if fence is None else []
+
+    headings = [h for h in outline if h["offset"] < start_offset]
+    headings += region
+    headings += [{**h, "offset": h["offset"] + shift} for h in outline if h["offset"] > old_end_offset]
+    return _with_anchors(headings)
@@ -0,0 +1,199 @@
+"""HTML rendering of page content for public sharing.
+
+Covers the markdown the editor writes: ATX headings, fenced code, block
+quotes, bullet, numbered and task lists, rules, paragraphs, and inline
+code, emphasis, links and images. Everything is escaped first; links and
+images keep only http(s), mailto and in-page (``#``) targets. ``[[wiki]]``
+links render as plain text, since their targets are not shared.
+
+Headings are taken from ``extract_outline`` by byte offset, so they get
+the same anchors as the stored outline and its links land on them.
+"""
+
+import re
+from html import escape
+from typing import List, Optional
+
+from app.outline import extract_outline
+
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_RULE = re.compile(r"^ {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+_QUOTE = re.compile(r"^ {0,3}> ?(.*)$")
+_BULLET = re.compile(r"^[ \t]*[-*+][ \t]+(.*)$")
+_NUMBERED = re.compile(r"^[ \t]*\d{1,9}[.)][ \t]+(.*)$")
+_TASK = re.compile(r"^\[([ xX])\][ \t]+(.*)$")
+
+_CODE = re.compile(r"`([^`\n]+)`")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\(([^)\s]+)\)")
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+_WIKI = re.compile(r"\[\[([^\[\]\n|]+)(?:\|([^\[\]\n]*))?\]\]")
+_STRONG = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+_EMPHASIS = re.compile(r"(?<![\w*])([*_])(?=\S)(.+?)(?<=\S)\1(?![\w*])")
+_STRIKE = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~")
+_SAFE_URL = re.compile(r"^(?:https?:|mailto:|#)", re.IGNORECASE)
+
+# Placeholder for finished HTML (code spans, images, link tags) while the other inline rules run
+_STASH = "\x00{}\x00"
+
+
+def _url(url: str) -> Optional[str]:
+    """The escaped ``url`` if its scheme is allowed (``url`` is already escaped)."""
+    return url if _SAFE_URL.match(url) else None
+
+
+def render_inline(text: str) -> str:
+    """Inline markdown of one block as HTML."""
+    text = escape(text.replace("\x00", ""), quote=True)
+    codes: List[str] = []
+
+    def stash(html: str) -> str:
+        codes.append(html)
+        return _STASH.format(len(codes) - 1)
+
+    text = _CODE.sub(lambda m: stash(f"<code>{m.group(1)}</code>"), text)
+    text = _WIKI.sub(lambda m: f'<span class="wikilink">{(m.group(2) or m.group(1)).strip()}</span>', text)
+
+    def image(m: re.Match) -> str:
+        src = _url(m.group(2))
+        return stash(f'<img src="{src}" alt="{m.group(1)}">') if src else m.group(1)
+
+    def link(m: re.Match) -> str:
+        href = _url(m.group(2))
+        if href is None:
+            return m.group(1)
+        return stash(f'<a href="{href}" rel="nofollow noopener">') + m.group(1) + stash("</a>")
+
+    text = _IMAGE.sub(image, text)
+    text = _LINK.sub(link, text)
+    text = _STRONG.sub(r"<strong>\2</strong>", text)
+    text = _EMPHASIS.sub(r"<em>\2</em>", text)
+    text = _STRIKE.sub(r"<del>\1</del>", text)
+    return re.sub("\x00(\\d+)\x00", lambda m: codes[int(m.group(1))], text)
+
+
+def _list_item(text: str) -> str:
+    task = _TASK.match(text)
+    if task is None:
+        return f"<li>{render_inline(text)}</li>"
+    checked = " checked" if task.group(1) != " " else ""
+    return f'<li class="task"><input type="checkbox" disabled{checked}> {render_inline(task.group(2))}</li>'
+
+
+def render_markdown(content: str) -> str:
+    """Page content as an HTML fragment."""
+    content = content or ""
+    headings = {heading["offset"]: heading for heading in extract_outline(content)}
+    html: List[str] = []
+    paragraph: List[str] = []
+    quote: List[str] = []
+    items: List[str] = []
+    list_tag = ""
+    fence: Optional[str] = None
+    code: List[str] = []
+
+    def flush() -> None:
+        nonlocal list_tag
+        if paragraph:
+            html.append(f"<p>{render_inline(chr(10).join(paragraph))}</p>")
+            paragraph.clear()
+        if quote:
+            html.append(f"<blockquote><p>{render_inline(chr(10).join(quote))}</p></blockquote>")
+            quote.clear()
+        if items:
+            html.append(f"<{list_tag}>{''.join(items)}</{list_tag}>")
+            items.clear()
+            list_tag = ""
+
+    offset = 0
+    for line in content.split("\n"):
+        line_offset = offset
+        offset += len(line.encode("utf-8")) + 1
+
+        marker = _FENCE.match(line)
+        if fence is not None:
+            # Closed the way app/outline.py closes it, so headings agree with the outline
+            if marker and marker.group(1)[0] == fence[0] and len(marker.group(1)) >= len(fence):
+                html.append(f"<pre><code>{escape(chr(10).join(code))}</code></pre>")
+                fence, code = None, []
+            else:
+                code.append(line)
+            continue
+
+        if marker:
+            flush()
+            fence = marker.group(1)
+            continue
+
+        heading = headings.get(line_offset)
+        if heading is not None:
+            flush()
+            level = heading["level"]
+            html.append(f'<h{level} id="{escape(heading["anchor"])}">{render_inline(heading["text"])}</h{level}>')
+            continue
+
+        if not line.strip():
+            flush()
+            continue
+
+        if _RULE.match(line):
+            flush()
+            html.append("<hr>")
+            continue
+
+        quoted = _QUOTE.match(line)
+        bullet = _BULLET.match(line)
+        numbered = None if bullet else _NUMBERED.match(line)
+        if quoted:
+            if not quote:
+                flush()
+            quote.append(quoted.group(1))
+        elif bullet or numbered:
+            tag = "ul" if bullet else "ol"
+            if paragraph or quote or (items and list_tag != tag):
+                flush()
+            list_tag = tag
+            items.append(_list_item((bullet or numbered).group(1)))
+        elif items:
+            # A continuation line of the last item
+            items[-1] = items[-1][: -len("</li>")] + " " + render_inline(line.strip()) + "</li>"
+        else:
+            if quote:
+                flush()
+            paragraph.append(line.strip())
+
+    if fence is not None:
+        html.append(f"<pre><code>{escape(chr(10).join(code))}</code></pre>")
+    flush()
+    return "\n".join(html)
+
+
+_DOCUMENT = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="robots" content="noindex">
+<title>{title}</title>
+<style>
+body{{margin:0;font:16px/1.6 system-ui,sans-serif;color:#1f2328;background:#fff}}
+main{{max-width:46rem;margin:0 auto;padding:2rem 1.25rem 4rem}}
+pre{{overflow-x:auto;padding:1rem;background:#f6f8fa;border-radius:6px}}
+code{{font:0.9em ui-monospace,monospace}}
+blockquote{{margin:0;padding-left:1rem;border-left:3px solid #d0d7de;color:#57606a}}
+img{{max-width:100%}}
+li.task{{list-style:none}}
+</style>
+</head>
+<body>
+<main>
+<h1>{title}</h1>
+{body}
+</main>
+</body>
+</html>
+"""
+
+
+def render_page(title: str, content: str) -> str:
+    """A standalone HTML document for a shared page."""
+    return _DOCUMENT.format(title=escape(title or "Untitled"), body=render_markdown(content))
@@ -0,0 +1,298 @@
+"""Timeouts, retries, hedging and circuit breaking for Supabase calls.
+
+- Timeouts: every request on the pooled connection gets a timeout for its
+  kind of operation (``timeout_for``): reads, writes, RPCs and auth calls.
+- Retries: failed selects are retried ``supabase_read_retries`` times with
+  jittered exponential backoff. Writes and RPCs are never retried, since a
+  timed-out write may still have been applied. Async code such as the token
+  check uses ``call_upstream_async``, which awaits the backoff. A sync call
+  made on the event loop (a query run inline in an ``async def`` route) is
+  not retried, since sleeping there would stall every request of the worker.
+- Hedging: with ``supabase_hedge_after`` set, a select that has not
+  answered by then is sent a second time and the first response wins.
+- Circuit breaking: one breaker per upstream ("rest" and "auth") opens after
+  ``breaker_failure_threshold`` consecutive failures. While open, calls fail
+  at once with ``UpstreamUnavailable`` (a 503 with Retry-After) instead of
+  tying up workers. After ``breaker_reset_timeout`` seconds one trial call
+  is let through, and its outcome closes or re-opens the breaker. A trial
+  that is cancelled, or reports nothing within another reset timeout, makes
+  way for the next one.
+
+Only upstream failures count: connection errors, timeouts and 502/503/504/520
+responses. Client errors such as a constraint violation or an expired token
+mean the upstream is healthy.
+"""
+
+import asyncio
+import contextvars
+import random
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures import wait
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import status
+
+from app import metrics
+from app.config import Settings, get_settings
+from app.exceptions import AppException
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# PostgREST codes for "cannot reach the database", plus gateway statuses (520 from Cloudflare)
+_UNAVAILABLE_CODES = {"502", "503", "504", "520", "PGRST000", "PGRST001", "PGRST002"}
+
+
+class UpstreamUnavailable(AppException):
+    """An upstream is failing or its circuit is open; the request may be retried later."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(
+            f"{upstream} is unavailable",
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+        self.upstream = upstream
+
+
+def is_upstream_failure(e: BaseException) -> bool:
+    """True for errors that say the upstream is unhealthy rather than the request wrong."""
+    if isinstance(e, UpstreamUnavailable):
+        return True
+    httpx = sys.modules.get("httpx")
+    if httpx is not None and isinstance(e, httpx.TransportError):
+        return True  # connect and read timeouts, refused and dropped connections
+    if type(e).__name__ == "AuthRetryableError":
+        return True
+    code = getattr(e, "code", None) or getattr(e, "status", None)
+    return str(code) in _UNAVAILABLE_CODES
+
+
+def timeout_for(method: str, path: str, settings: Settings) -> float:
+    """Seconds a Supabase request may take, by kind of operation."""
+    if path.startswith("/auth/"):
+        return settings.supabase_auth_timeout
+    if "/rpc/" in path:
+        return settings.supabase_rpc_timeout
+    if method in ("GET", "HEAD"):
+        return settings.supabase_read_timeout
+    return settings.supabase_write_timeout
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 1.0) -> float:
+    """Full-jitter delay before retry number ``attempt`` (0-based)."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream. Thread-safe."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_at = 0.0
+        self._state = CLOSED
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def before_call(self) -> None:
+        """Raise UpstreamUnavailable unless a call may go ahead now."""
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            now = self._clock()
+            started = self._opened_at if self._state == OPEN else self._trial_at
+            remaining = started + self.reset_timeout - now
+            if remaining <= 0:
+                # Let exactly one trial call through, or replace one that never reported back
+                self._state = HALF_OPEN
+                self._trial_at = now
+                return
+        metrics.CIRCUIT_REJECTIONS.inc(self.name)
+        raise UpstreamUnavailable(self.name, max(remaining, 1.0))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self._state != CLOSED:
+                self._state = CLOSED
+                metrics.CIRCUIT_OPEN.set(0, self.name)
+
+    def record_abandoned(self) -> None:
+        """A call ended without an outcome (e.g. it was cancelled); free the trial slot."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                # _opened_at has passed, so the next call is the new trial
+                self._state = OPEN
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._clock()
+                metrics.CIRCUIT_OPEN.set(1, self.name)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(upstream: str) -> CircuitBreaker:
+    """Return the process-wide breaker of an upstream ("rest" or "auth")."""
+    breaker = _breakers.get(upstream)
+    if breaker is None:
+        settings = get_settings()
+        with _breakers_lock:
+            breaker = _breakers.setdefault(
+                upstream,
+                CircuitBreaker(upstream, settings.breaker_failure_threshold, settings.breaker_reset_timeout),
+            )
+    return breaker
+
+
+def reset_breakers() -> None:
+    """Forget all breaker state (tests)."""
+    with _breakers_lock:
+        _breakers.clear()
+    metrics.CIRCUIT_OPEN.clear()
+
+
+def _on_event_loop() -> bool:
+    """Whether the caller runs on an event loop thread, where sleeping blocks the loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def call_upstream(
+    upstream: str,
+    func: Callable[[], Any],
+    retries: int = 0,
+    on_retry: Optional[Callable[[], None]] = None,
+) -> Any:
+    """
+    Run ``func`` through the upstream's breaker, retrying upstream failures.
+
+    Other errors are re-raised unchanged. Once retries are exhausted the last
+    upstream failure is raised as UpstreamUnavailable. On the event loop no
+    retries are made, since the backoff would block it.
+    """
+    settings = get_settings()
+    breaker = get_breaker(upstream)
+    if retries and _on_event_loop():
+        retries = 0
+    for attempt in range(retries + 1):
+        breaker.before_call()
+        try:
+            result = func()
+        except BaseException as e:
+            if not isinstance(e, Exception):
+                breaker.record_abandoned()
+                raise
+            if not is_upstream_failure(e):
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt == retries:
+                raise UpstreamUnavailable(upstream, settings.breaker_reset_timeout) from e
+            if on_retry is not None:
+                on_retry()
+            time.sleep(backoff_delay(attempt, settings.supabase_retry_backoff))
+            continue
+        breaker.record_success()
+        return result
+
+
+async def call_upstream_async(
+    upstream: str,
+    func: Callable[[], Any],
+    retries: int = 0,
+) -> Any:
+    """
+    ``call_upstream`` for async callers: ``func`` runs in a thread and the
+    backoff between attempts is awaited, so a retry never blocks the event loop.
+    """
+    settings = get_settings()
+    breaker = get_breaker(upstream)
+    for attempt in range(retries + 1):
+        breaker.before_call()
+        try:
+            result = await asyncio.to_thread(func)
+        except BaseException as e:
+            if not isinstance(e, Exception):
+                # Cancelled, e.g. by a client disconnect
+                breaker.record_abandoned()
+                raise
+            if not is_upstream_failure(e):
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt == retries:
+                raise UpstreamUnavailable(upstream, settings.breaker_reset_timeout) from e
+            await asyncio.sleep(backoff_delay(attempt, settings.supabase_retry_backoff))
+            continue
+        breaker.record_success()
+        return result
+
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _hedge_pool_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(
+                    max_workers=get_settings().supabase_pool_size, thread_name_prefix="moji-hedge"
+                )
+    return _hedge_pool
+
+
+def hedged(func: Callable[[], Any], hedge_after: float, on_hedge: Optional[Callable[[], None]] = None) -> Any:
+    """
+    Run ``func``; if it has not returned after ``hedge_after`` seconds, run it
+    again and return whichever finishes first successfully.
+
+    The slower request is not cancelled; it finishes in the background.
+    """
+    pool = _get_hedge_pool()
+    # Each attempt runs in the caller's context, so it is traced and counted
+    first = pool.submit(contextvars.copy_context().run, func)
+    try:
+        return first.result(timeout=hedge_after)
+    except FutureTimeout:
+        pass
+    if on_hedge is not None:
+        on_hedge()
+    pending = {first, pool.submit(contextvars.copy_context().run, func)}
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
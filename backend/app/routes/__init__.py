@@ -1,7 +1,29 @@
 from app.routes.workspaces import router as workspaces_router
+from app.routes.members import router as members_router
 from app.routes.tasks import router as tasks_router
 from app.routes.notes import router as notes_router
 from app.routes.pages import router as pages_router
 from app.routes.account import router as account_router
+from app.routes.jobs import router as jobs_router
+from app.routes.templates import router as templates_router
+from app.routes.daily import router as daily_router
+from app.routes.transfer import router as transfer_router, IMPORT_PATH
+from app.routes.links import router as links_router
+from app.routes.sharing import router as sharing_router, public_router as public_sharing_router
 
-__all__ = ["workspaces_router", "tasks_router", "notes_router", "pages_router", "account_router"]
+__all__ = [
+    "workspaces_router",
+    "members_router",
+    "tasks_router",
+    "notes_router",
+    "pages_router",
+    "account_router",
+    "jobs_router",
+    "templates_router",
+    "daily_router",
+    "transfer_router",
+    "links_router",
+    "sharing_router",
+    "public_sharing_router",
+    "IMPORT_PATH",
+]
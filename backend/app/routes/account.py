@@ -1,19 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from typing import Any, Dict, Optional
 
 from app.dependencies import get_current_user, get_supabase_admin_client
+from app.models.job import JobStatus
 from app.exceptions import handle_exception
 from app.config import get_settings
+from app.db import round_trip_budget, timed_call
+from app.jobs import enqueue, job_handler
+from app.routes.jobs import job_status
 
 router = APIRouter(prefix="/account", tags=["account"])
 
 
-@router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_account(user=Depends(get_current_user)):
-    """Delete the authenticated user's account and all data."""
+@job_handler("account.delete")
+def delete_account_job(payload: Dict[str, Any]) -> None:
+    """Delete the user through the admin API; their data cascades."""
+    admin = get_supabase_admin_client()
+    timed_call("auth", "admin.delete_user", admin.auth.admin.delete_user, payload["user_id"])
+
+
+@router.delete("/", response_model=JobStatus, status_code=status.HTTP_202_ACCEPTED)
+@round_trip_budget(0)
+async def delete_account(
+    user=Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=128),
+):
+    """
+    Schedule deletion of the authenticated user's account and all data.
+
+    Poll ``GET /api/v1/jobs/{id}`` for completion. Repeated requests return
+    the already scheduled job; after a failed deletion they schedule a new one.
+    """
     try:
-        admin = get_supabase_admin_client()
-        admin.auth.admin.delete_user(str(user.id))
-        return None
+        job = enqueue(
+            "account.delete",
+            {"user_id": str(user.id)},
+            user_id=str(user.id),
+            idempotency_key=idempotency_key or "account.delete",
+        )
+        return job_status(job)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,120 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.dependencies import get_current_user, get_authenticated_client
+from app.models.daily import DailyRange, DailySummary
+from app.exceptions import handle_exception
+from app.config import get_settings
+from app.db import Client, round_trip_budget
+from app.cache import cached
+
+router = APIRouter(prefix="/daily", tags=["daily"])
+
+# Longest range one request may cover: a month view plus its leading/trailing weeks
+MAX_RANGE_DAYS = 62
+
+
+def _daily_range(
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    tz: str = Query("UTC", max_length=64),
+) -> Tuple[date, date, str]:
+    """
+    Resolve the requested range; a missing start means today in ``tz``.
+
+    A dependency, so the cache key holds the resolved dates and a range
+    cached for "today" is not served once the day has changed.
+    """
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unknown time zone",
+        )
+    if start is None:
+        start = datetime.now(zone).date()
+    end = end or start
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must not be before 'from'",
+        )
+    if (end - start).days + 1 > MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range is limited to {MAX_RANGE_DAYS} days",
+        )
+    return start, end, tz
+
+
+def _range_params(start: date, end: date, tz: str) -> Dict[str, str]:
+    return {"range_start": start.isoformat(), "range_end": end.isoformat(), "tz": tz}
+
+
+@router.get("/", response_model=DailyRange)
+@round_trip_budget(1)
+@cached("daily.range", lambda user, **_: [f"daily:{user.id}"])
+async def get_daily(
+    span: Tuple[date, date, str] = Depends(_daily_range),
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """
+    Tasks and notes by day across all of the user's workspaces.
+
+    Tasks fall on their scheduled and due dates, notes on the day they were
+    created in ``tz``. Days without items are left out. The whole range comes
+    from one indexed query, see supabase/daily.sql.
+    """
+    try:
+        start, end, tz = span
+        response = supabase.rpc("daily_items", _range_params(start, end, tz)).execute()
+
+        days: Dict[str, dict] = {}
+        for row in response.data or []:
+            bucket = days.setdefault(row["day"], {"date": row["day"], "tasks": [], "notes": []})
+            if row["kind"] == "task":
+                bucket["tasks"].append({
+                    "id": row["id"],
+                    "workspace_id": row["workspace_id"],
+                    "content": row["title"],
+                    "done": row["done"],
+                    "priority": row["priority"],
+                    "due_date": row["due_date"],
+                    "scheduled_date": row["scheduled_date"],
+                })
+            else:
+                bucket["notes"].append({"id": row["id"], "workspace_id": row["workspace_id"], "title": row["title"]})
+        return {"start": start, "end": end, "days": list(days.values())}
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching daily items", debug=settings.debug)
+
+
+@router.get("/summary", response_model=DailySummary)
+@round_trip_budget(1)
+@cached("daily.summary", lambda user, **_: [f"daily:{user.id}"])
+async def get_daily_summary(
+    span: Tuple[date, date, str] = Depends(_daily_range),
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Per-day task and note counts for the calendar month view, without item bodies."""
+    try:
+        start, end, tz = span
+        response = supabase.rpc("daily_counts", _range_params(start, end, tz)).execute()
+        days = [
+            {"date": row["day"], "tasks": row["tasks"], "done": row["done"], "notes": row["notes"]}
+            for row in response.data or []
+        ]
+        return {"start": start, "end": end, "days": days}
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching daily summary", debug=settings.debug)
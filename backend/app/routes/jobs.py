@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from uuid import UUID
+
+from app.dependencies import get_current_user
+from app.models.job import JobStatus
+from app.exceptions import handle_exception
+from app.config import get_settings
+from app.db import round_trip_budget
+from app.jobs import get_job_queue
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def job_status(job) -> JobStatus:
+    """Convert a queued job into its API representation."""
+    return JobStatus(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+@round_trip_budget(0)
+async def get_job(
+    job_id: UUID,
+    user=Depends(get_current_user),
+):
+    """Get the status of a background job started by the current user."""
+    try:
+        job = get_job_queue().get(str(job_id))
+        if job is None or job.user_id != str(user.id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found",
+            )
+        return job_status(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching job", debug=settings.debug)
@@ -0,0 +1,202 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from uuid import UUID
+from typing import Dict, List, Tuple
+
+from app.dependencies import get_current_user, get_authenticated_client
+from app.models.link import LinkedItem, OutgoingLink
+from app.exceptions import handle_exception
+from app.config import get_settings
+from app.db import Client, round_trip_budget
+from app.links import SOURCE_COLUMNS, link_key
+from app.utils import require_workspace_role
+
+router = APIRouter(tags=["links"])
+
+# Item type by table, for responses
+ITEM_TYPES = {"pages": "page", "notes": "note"}
+
+
+def _get_item(supabase: Client, table: str, item_id: UUID) -> dict:
+    response = supabase.table(table).select("id,title,workspace_id").eq("id", str(item_id)).execute()
+    if not response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{ITEM_TYPES[table].capitalize()} not found",
+        )
+    return response.data[0]
+
+
+def _titles(supabase: Client, workspace_id: str) -> List[Tuple[str, dict]]:
+    """(table, {id, title}) of every page, then every note, of a workspace."""
+    return [
+        (table, row)
+        for table in ("pages", "notes")
+        for row in supabase.table(table).select("id,title").eq("workspace_id", workspace_id).execute().data or []
+    ]
+
+
+def _resolve(supabase: Client, workspace_id: str, keys: List[str]) -> Dict[str, Tuple[str, str]]:
+    """key -> (type, id) of the pages, then notes, with these title keys; oldest first on ties.
+
+    ``title_key`` is the computed field of supabase/links.sql, served by an
+    index on (workspace_id, link_key(title)).
+    """
+    targets: Dict[str, Tuple[str, str]] = {}
+    for table in ("pages", "notes"):
+        rows = (
+            supabase.table(table)
+            .select("id,title")
+            .eq("workspace_id", workspace_id)
+            .in_("title_key", keys)
+            .order("created_at")
+            .execute()
+        ).data or []
+        for row in rows:
+            targets.setdefault(link_key(row["title"]), (ITEM_TYPES[table], row["id"]))
+    return targets
+
+
+def _source(link: dict) -> Tuple[str, str]:
+    return ("page", link["page_id"]) if link.get("page_id") else ("note", link["note_id"])
+
+
+def _outgoing(supabase: Client, table: str, item_id: UUID) -> List[dict]:
+    item = _get_item(supabase, table, item_id)
+    links = (
+        supabase.table("links")
+        .select("target_key,target_title")
+        .eq(SOURCE_COLUMNS[table], str(item_id))
+        .order("target_key")
+        .execute()
+    ).data or []
+    if not links:
+        return []
+
+    targets = _resolve(supabase, item["workspace_id"], [link["target_key"] for link in links])
+    result = []
+    for link in links:
+        kind, target_id = targets.get(link["target_key"], (None, None))
+        result.append({"title": link["target_title"], "type": kind, "id": target_id})
+    return result
+
+
+def _backlinks(supabase: Client, table: str, item_id: UUID) -> List[dict]:
+    item = _get_item(supabase, table, item_id)
+    links = (
+        supabase.table("links")
+        .select("page_id,note_id,source_title")
+        .eq("workspace_id", item["workspace_id"])
+        .eq("target_key", link_key(item["title"]))
+        .order("source_title")
+        .execute()
+    ).data or []
+    result = []
+    for link in links:
+        kind, source_id = _source(link)
+        if (kind, source_id) != (ITEM_TYPES[table], str(item_id)):
+            result.append({"type": kind, "id": source_id, "title": link["source_title"]})
+    return result
+
+
+@router.get("/pages/{page_id}/links", response_model=List[OutgoingLink])
+@round_trip_budget(4)
+async def get_page_links(
+    page_id: UUID,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Get the pages and notes a page links to, in title order."""
+    try:
+        return _outgoing(supabase, "pages", page_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching page links", debug=settings.debug)
+
+
+@router.get("/pages/{page_id}/backlinks", response_model=List[LinkedItem])
+@round_trip_budget(2)
+async def get_page_backlinks(
+    page_id: UUID,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Get the pages and notes that link to a page."""
+    try:
+        return _backlinks(supabase, "pages", page_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching page backlinks", debug=settings.debug)
+
+
+@router.get("/notes/{note_id}/links", response_model=List[OutgoingLink])
+@round_trip_budget(4)
+async def get_note_links(
+    note_id: UUID,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Get the pages and notes a note links to, in title order."""
+    try:
+        return _outgoing(supabase, "notes", note_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching note links", debug=settings.debug)
+
+
+@router.get("/notes/{note_id}/backlinks", response_model=List[LinkedItem])
+@round_trip_budget(2)
+async def get_note_backlinks(
+    note_id: UUID,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Get the pages and notes that link to a note."""
+    try:
+        return _backlinks(supabase, "notes", note_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching note backlinks", debug=settings.debug)
+
+
+@router.get("/workspaces/{workspace_id}/orphans", response_model=List[LinkedItem])
+@round_trip_budget(4)
+async def get_orphans(
+    workspace_id: UUID,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Get the pages and notes of a workspace that no other page or note links to."""
+    try:
+        # Any member may read
+        await require_workspace_role(workspace_id, str(user.id), supabase)
+
+        links = (
+            supabase.table("links")
+            .select("page_id,note_id,target_key")
+            .eq("workspace_id", str(workspace_id))
+            .execute()
+        ).data or []
+        # Sources of the links to each title; a link to itself does not count
+        sources: Dict[str, set] = {}
+        for link in links:
+            sources.setdefault(link["target_key"], set()).add(_source(link))
+
+        orphans = []
+        for table, row in _titles(supabase, str(workspace_id)):
+            kind = ITEM_TYPES[table]
+            if not sources.get(link_key(row["title"]), set()) - {(kind, str(row["id"]))}:
+                orphans.append({"type": kind, "id": row["id"], "title": row["title"]})
+        return orphans
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching orphans", debug=settings.debug)
@@ -0,0 +1,188 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from uuid import UUID
+from typing import List, Optional
+
+from app.dependencies import get_current_user, get_authenticated_client
+from app.models.member import Member, MemberCreate, MemberUpdate
+from app.exceptions import handle_exception
+from app.config import get_settings
+from app.db import Client, round_trip_budget
+from app.cache import cached, invalidate
+from app.loaders import get_membership_cache
+from app.utils import OWNER, RPC_LAST_OWNER, require_workspace_role
+
+router = APIRouter(prefix="/workspaces", tags=["members"])
+
+MEMBER_COLUMNS = "workspace_id,user_id,role,created_at"
+
+# Unique and foreign key violations of inserts into workspace_members
+DUPLICATE_KEY = "23505"
+FOREIGN_KEY = "23503"
+
+
+def _member_error(e: Exception) -> Optional[HTTPException]:
+    """Map a known database error of a membership write to an HTTPException."""
+    code = getattr(e, "code", None)
+    if code == RPC_LAST_OWNER:
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A workspace needs an owner")
+    if code == DUPLICATE_KEY:
+        return HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Already a member")
+    if code == FOREIGN_KEY:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return None
+
+
+def _membership_changed(user, workspace_id: UUID, member_id: str) -> None:
+    """Drop what a member's old role let them see and do, in this worker."""
+    get_membership_cache().invalidate_user(member_id)
+    # Entries tagged with the workspace include the member's cached lists and items
+    invalidate(str(user.id), f"members:{workspace_id}", f"workspace:{workspace_id}", f"workspaces:{member_id}")
+    if member_id != str(user.id):
+        invalidate(member_id)
+
+
+@router.get("/{workspace_id}/members", response_model=List[Member])
+@round_trip_budget(1)
+@cached("members.list", lambda workspace_id, **_: [f"workspace:{workspace_id}", f"members:{workspace_id}"])
+async def get_members(
+    workspace_id: UUID,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Get the members of a workspace and their roles, owners first."""
+    try:
+        # RLS shows a workspace's members to its members only
+        response = (
+            supabase.table("workspace_members")
+            .select(MEMBER_COLUMNS)
+            .eq("workspace_id", str(workspace_id))
+            .order("created_at")
+            .execute()
+        )
+
+        if not response.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Workspace not found",
+            )
+
+        return sorted(response.data, key=lambda member: member["role"] != OWNER)
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching members", debug=settings.debug)
+
+
+@router.post("/{workspace_id}/members", response_model=Member, status_code=status.HTTP_201_CREATED)
+@round_trip_budget(2)
+async def add_member(
+    workspace_id: UUID,
+    member: MemberCreate,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Share a workspace with a user (owners only)."""
+    try:
+        await require_workspace_role(workspace_id, str(user.id), supabase, OWNER)
+
+        response = (
+            supabase.table("workspace_members")
+            .insert({"workspace_id": str(workspace_id), "user_id": str(member.user_id), "role": member.role})
+            .execute()
+        )
+
+        if not response.data:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Failed to add member",
+            )
+
+        _membership_changed(user, workspace_id, str(member.user_id))
+        return response.data[0]
+    except HTTPException:
+        raise
+    except Exception as e:
+        error = _member_error(e)
+        if error:
+            raise error
+        settings = get_settings()
+        raise handle_exception(e, "Adding member", debug=settings.debug)
+
+
+@router.put("/{workspace_id}/members/{member_id}", response_model=Member)
+@round_trip_budget(2)
+async def update_member(
+    workspace_id: UUID,
+    member_id: UUID,
+    member: MemberUpdate,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Change a member's role (owners only). The last owner cannot step down."""
+    try:
+        await require_workspace_role(workspace_id, str(user.id), supabase, OWNER)
+
+        response = (
+            supabase.table("workspace_members")
+            .update({"role": member.role})
+            .eq("workspace_id", str(workspace_id))
+            .eq("user_id", str(member_id))
+            .execute()
+        )
+
+        if not response.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Member not found",
+            )
+
+        _membership_changed(user, workspace_id, str(member_id))
+        return response.data[0]
+    except HTTPException:
+        raise
+    except Exception as e:
+        error = _member_error(e)
+        if error:
+            raise error
+        settings = get_settings()
+        raise handle_exception(e, "Updating member", debug=settings.debug)
+
+
+@router.delete("/{workspace_id}/members/{member_id}", status_code=status.HTTP_204_NO_CONTENT)
+@round_trip_budget(2)
+async def remove_member(
+    workspace_id: UUID,
+    member_id: UUID,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Remove a member (owners only), or leave a workspace by removing yourself."""
+    try:
+        if str(member_id) != str(user.id):
+            await require_workspace_role(workspace_id, str(user.id), supabase, OWNER)
+
+        response = (
+            supabase.table("workspace_members")
+            .delete()
+            .eq("workspace_id", str(workspace_id))
+            .eq("user_id", str(member_id))
+            .execute()
+        )
+
+        if not response.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Member not found",
+            )
+
+        _membership_changed(user, workspace_id, str(member_id))
+        return None
+    except HTTPException:
+        raise
+    except Exception as e:
+        error = _member_error(e)
+        if error:
+            raise error
+        settings = get_settings()
+        raise handle_exception(e, "Removing member", debug=settings.debug)
@@ -1,39 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from uuid import UUID
-from typing import List
+from typing import List, Literal
 
 from app.dependencies import get_current_user, get_authenticated_client
 from app.models.note import Note, NoteCreate, NoteUpdate
+from app.models.ordering import ItemMove
 from app.exceptions import handle_exception
 from app.config import get_settings
-from app.utils import verify_workspace_ownership, is_over_limit
-from supabase import Client
+from app.db import Client, round_trip_budget
+from app.cache import cached, invalidate, invalidate_daily
+from app.utils import EDITOR, require_workspace_role, is_over_limit, read_only_error
+from app.ordering import move_item
+from app.links import sync_links
 
 router = APIRouter(tags=["notes"])
 
 
 @router.get("/workspaces/{workspace_id}/notes", response_model=List[Note])
+@round_trip_budget(2)
+@cached("notes.list", lambda workspace_id, **_: [f"workspace:{workspace_id}", f"notes:{workspace_id}"])
 async def get_notes(
     workspace_id: UUID,
+    order: Literal["updated", "manual"] = Query("updated"),
     user=Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_client),
 ):
-    """Get all notes in a workspace."""
+    """Get all notes in a workspace, most recently updated first or in their manual order."""
     try:
-        # Verify workspace ownership
-        if not await verify_workspace_ownership(workspace_id, str(user.id), supabase):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Workspace not found",
-            )
-
-        response = (
-            supabase.table("notes")
-            .select("*")
-            .eq("workspace_id", str(workspace_id))
-            .order("updated_at", desc=True)
-            .execute()
-        )
+        # Any member may read
+        await require_workspace_role(workspace_id, str(user.id), supabase)
+
+        query = supabase.table("notes").select("*").eq("workspace_id", str(workspace_id))
+        if order == "manual":
+            query = query.order("sort_key").order("created_at")
+        else:
+            query = query.order("updated_at", desc=True)
+        response = query.execute()
         return response.data
     except HTTPException:
         raise
@@ -47,6 +49,7 @@ async def get_notes(
     response_model=Note,
     status_code=status.HTTP_201_CREATED,
 )
+@round_trip_budget(4)
 async def create_note(
     workspace_id: UUID,
     note: NoteCreate,
@@ -55,12 +58,8 @@ async def create_note(
 ):
     """Create a new note in a workspace."""
     try:
-        # Verify workspace ownership
-        if not await verify_workspace_ownership(workspace_id, str(user.id), supabase):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Workspace not found",
-            )
+        # Viewers may read but not add
+        await require_workspace_role(workspace_id, str(user.id), supabase, EDITOR)
 
         settings = get_settings()
         if is_over_limit(
@@ -86,7 +85,11 @@ async def create_note(
                 detail="Failed to create note",
             )
 
-        return response.data[0]
+        created = response.data[0]
+        sync_links(supabase, "notes", created, created["title"], "")
+        invalidate(str(user.id), f"notes:{workspace_id}")
+        invalidate_daily(created, str(user.id))
+        return created
     except HTTPException:
         raise
     except Exception as e:
@@ -95,6 +98,8 @@ async def create_note(
 
 
 @router.get("/notes/{note_id}", response_model=Note)
+@round_trip_budget(1)
+@cached("notes.get", lambda result, note_id, **_: [f"workspace:{result['workspace_id']}", f"note:{note_id}"])
 async def get_note(
     note_id: UUID,
     user=Depends(get_current_user),
@@ -126,6 +131,7 @@ async def get_note(
 
 
 @router.put("/notes/{note_id}", response_model=Note)
+@round_trip_budget(4)
 async def update_note(
     note_id: UUID,
     note: NoteUpdate,
@@ -134,10 +140,10 @@ async def update_note(
 ):
     """Update a note."""
     try:
-        # Check note exists (RLS handles ownership)
+        # Check note exists (RLS handles ownership); the current content lets links be diffed
         check = (
             supabase.table("notes")
-            .select("id")
+            .select("id,title,content" if "content" in note.model_fields_set else "id,title")
             .eq("id", str(note_id))
             .execute()
         )
@@ -163,7 +169,17 @@ async def update_note(
             .execute()
         )
 
-        return response.data[0]
+        # The row was readable, so RLS refused the write
+        if not response.data:
+            raise read_only_error()
+
+        updated = response.data[0]
+        current = check.data[0]
+        old_content = current.get("content") if "content" in update_data else None
+        sync_links(supabase, "notes", updated, current["title"], old_content)
+        invalidate(str(user.id), f"note:{note_id}", f"notes:{updated['workspace_id']}")
+        invalidate_daily(updated, str(user.id))
+        return updated
     except HTTPException:
         raise
     except Exception as e:
@@ -171,7 +187,35 @@ async def update_note(
         raise handle_exception(e, "Updating note", debug=settings.debug)
 
 
+@router.post("/notes/{note_id}/move", response_model=Note)
+@round_trip_budget(2)
+async def move_note(
+    note_id: UUID,
+    move: ItemMove,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Move a note between two neighbors; only the moved note is written."""
+    try:
+        moved = move_item(
+            supabase,
+            "notes",
+            str(note_id),
+            str(move.before_id) if move.before_id else None,
+            str(move.after_id) if move.after_id else None,
+            str(user.id),
+        )
+        invalidate(str(user.id), f"note:{note_id}", f"notes:{moved['workspace_id']}")
+        return moved
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Moving note", debug=settings.debug)
+
+
 @router.delete("/notes/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
+@round_trip_budget(2)
 async def delete_note(
     note_id: UUID,
     user=Depends(get_current_user),
@@ -182,7 +226,7 @@ async def delete_note(
         # Check note exists (RLS handles ownership)
         check = (
             supabase.table("notes")
-            .select("id")
+            .select("id,workspace_id,user_id")
             .eq("id", str(note_id))
             .execute()
         )
@@ -193,8 +237,12 @@ async def delete_note(
                 detail="Note not found",
             )
 
-        supabase.table("notes").delete().eq("id", str(note_id)).execute()
+        deleted = supabase.table("notes").delete().eq("id", str(note_id)).execute()
+        if not deleted.data:
+            raise read_only_error()
 
+        invalidate(str(user.id), f"note:{note_id}", f"notes:{check.data[0]['workspace_id']}")
+        invalidate_daily(check.data[0], str(user.id))
         return None
     except HTTPException:
         raise
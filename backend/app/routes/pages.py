@@ -1,38 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from uuid import UUID
-from typing import List
+from typing import List, Literal
 
 from app.dependencies import get_current_user, get_authenticated_client
-from app.models.page import Page, PageCreate, PageUpdate
+from app.models.page import OutlineHeading, Page, PageCreate, PageUpdate
+from app.models.ordering import ItemMove
 from app.exceptions import handle_exception
 from app.config import get_settings
-from app.utils import verify_workspace_ownership, is_over_limit
-from supabase import Client
+from app.db import Client, round_trip_budget
+from app.cache import cached, invalidate
+from app.utils import EDITOR, require_workspace_role, is_over_limit, read_only_error
+from app.ordering import move_item
+from app.outline import extract_outline, update_outline
+from app.links import sync_links
+from app.sharing import purge_shared_page
 
 router = APIRouter(tags=["pages"])
 
+# Columns of a page in lists; the outline only when asked for
+PAGE_COLUMNS = "id,title,content,workspace_id,sort_key,created_at,updated_at"
+
+
+def _outline_of(page: dict) -> list:
+    """A page's stored outline, or one extracted from its content for pages without."""
+    if page.get("outline") is None:
+        return extract_outline(page.get("content") or "")
+    return page["outline"]
+
 
 @router.get("/workspaces/{workspace_id}/pages", response_model=List[Page])
+@round_trip_budget(2)
+@cached("pages.list", lambda workspace_id, **_: [f"workspace:{workspace_id}", f"pages:{workspace_id}"])
 async def get_pages(
     workspace_id: UUID,
+    order: Literal["updated", "manual"] = Query("updated"),
+    outline: bool = Query(False, description="Include each page's heading outline"),
     user=Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_client),
 ):
-    """Get all pages in a workspace."""
+    """Get all pages in a workspace, most recently updated first or in their manual order."""
     try:
-        if not await verify_workspace_ownership(workspace_id, str(user.id), supabase):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Workspace not found",
-            )
+        # Any member may read
+        await require_workspace_role(workspace_id, str(user.id), supabase)
 
-        response = (
-            supabase.table("pages")
-            .select("*")
-            .eq("workspace_id", str(workspace_id))
-            .order("updated_at", desc=True)
-            .execute()
-        )
+        columns = f"{PAGE_COLUMNS},outline" if outline else PAGE_COLUMNS
+        query = supabase.table("pages").select(columns).eq("workspace_id", str(workspace_id))
+        if order == "manual":
+            query = query.order("sort_key").order("created_at")
+        else:
+            query = query.order("updated_at", desc=True)
+        response = query.execute()
+        if outline:
+            for page in response.data:
+                page["outline"] = _outline_of(page)
         return response.data
     except HTTPException:
         raise
@@ -46,6 +66,7 @@ async def get_pages(
     response_model=Page,
     status_code=status.HTTP_201_CREATED,
 )
+@round_trip_budget(4)
 async def create_page(
     workspace_id: UUID,
     page: PageCreate,
@@ -54,11 +75,8 @@ async def create_page(
 ):
     """Create a new page in a workspace."""
     try:
-        if not await verify_workspace_ownership(workspace_id, str(user.id), supabase):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Workspace not found",
-            )
+        # Viewers may read but not add
+        await require_workspace_role(workspace_id, str(user.id), supabase, EDITOR)
 
         settings = get_settings()
         if is_over_limit(
@@ -75,6 +93,7 @@ async def create_page(
 
         data = page.model_dump()
         data["workspace_id"] = str(workspace_id)
+        data["outline"] = extract_outline(page.content)
 
         response = supabase.table("pages").insert(data).execute()
 
@@ -84,7 +103,10 @@ async def create_page(
                 detail="Failed to create page",
             )
 
-        return response.data[0]
+        created = response.data[0]
+        sync_links(supabase, "pages", created, created["title"], "")
+        invalidate(str(user.id), f"pages:{workspace_id}")
+        return created
     except HTTPException:
         raise
     except Exception as e:
@@ -93,6 +115,8 @@ async def create_page(
 
 
 @router.get("/pages/{page_id}", response_model=Page)
+@round_trip_budget(1)
+@cached("pages.get", lambda result, page_id, **_: [f"workspace:{result['workspace_id']}", f"page:{page_id}"])
 async def get_page(
     page_id: UUID,
     user=Depends(get_current_user),
@@ -122,7 +146,38 @@ async def get_page(
         raise handle_exception(e, "Fetching page", debug=settings.debug)
 
 
+@router.get("/pages/{page_id}/outline", response_model=List[OutlineHeading])
+@round_trip_budget(2)
+async def get_page_outline(
+    page_id: UUID,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Get a page's headings (level, text, anchor, byte offset) without its content."""
+    try:
+        response = supabase.table("pages").select("outline").eq("id", str(page_id)).execute()
+
+        if not response.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Page not found",
+            )
+
+        outline = response.data[0]["outline"]
+        if outline is None:
+            # Written before outlines were stored; the next edit stores one
+            content = supabase.table("pages").select("content").eq("id", str(page_id)).execute()
+            outline = extract_outline(content.data[0]["content"] if content.data else "")
+        return outline
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching page outline", debug=settings.debug)
+
+
 @router.put("/pages/{page_id}", response_model=Page)
+@round_trip_budget(4)
 async def update_page(
     page_id: UUID,
     page: PageUpdate,
@@ -131,9 +186,10 @@ async def update_page(
 ):
     """Update a page."""
     try:
+        # The current content and outline let the outline and links be updated for just the edit
         check = (
             supabase.table("pages")
-            .select("id")
+            .select("id,title,content,outline" if "content" in page.model_fields_set else "id,title")
             .eq("id", str(page_id))
             .execute()
         )
@@ -152,6 +208,12 @@ async def update_page(
                 detail="No fields to update",
             )
 
+        current = check.data[0]
+        if "content" in update_data:
+            update_data["outline"] = update_outline(
+                current.get("content"), current.get("outline"), update_data["content"]
+            )
+
         response = (
             supabase.table("pages")
             .update(update_data)
@@ -159,7 +221,16 @@ async def update_page(
             .execute()
         )
 
-        return response.data[0]
+        # The row was readable, so RLS refused the write
+        if not response.data:
+            raise read_only_error()
+
+        updated = response.data[0]
+        old_content = current.get("content") if "content" in update_data else None
+        sync_links(supabase, "pages", updated, current["title"], old_content)
+        purge_shared_page(str(page_id))
+        invalidate(str(user.id), f"page:{page_id}", f"pages:{updated['workspace_id']}")
+        return updated
     except HTTPException:
         raise
     except Exception as e:
@@ -167,7 +238,35 @@ async def update_page(
         raise handle_exception(e, "Updating page", debug=settings.debug)
 
 
+@router.post("/pages/{page_id}/move", response_model=Page)
+@round_trip_budget(2)
+async def move_page(
+    page_id: UUID,
+    move: ItemMove,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Move a page between two neighbors; only the moved page is written."""
+    try:
+        moved = move_item(
+            supabase,
+            "pages",
+            str(page_id),
+            str(move.before_id) if move.before_id else None,
+            str(move.after_id) if move.after_id else None,
+            str(user.id),
+        )
+        invalidate(str(user.id), f"page:{page_id}", f"pages:{moved['workspace_id']}")
+        return moved
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Moving page", debug=settings.debug)
+
+
 @router.delete("/pages/{page_id}", status_code=status.HTTP_204_NO_CONTENT)
+@round_trip_budget(2)
 async def delete_page(
     page_id: UUID,
     user=Depends(get_current_user),
@@ -177,7 +276,7 @@ async def delete_page(
     try:
         check = (
             supabase.table("pages")
-            .select("id")
+            .select("id,workspace_id")
             .eq("id", str(page_id))
             .execute()
         )
@@ -188,8 +287,12 @@ async def delete_page(
                 detail="Page not found",
             )
 
-        supabase.table("pages").delete().eq("id", str(page_id)).execute()
+        deleted = supabase.table("pages").delete().eq("id", str(page_id)).execute()
+        if not deleted.data:
+            raise read_only_error()
+        purge_shared_page(str(page_id))
 
+        invalidate(str(user.id), f"page:{page_id}", f"pages:{check.data[0]['workspace_id']}")
         return None
     except HTTPException:
         raise
@@ -0,0 +1,198 @@
+import re
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from uuid import UUID
+
+from app.dependencies import get_current_user, get_authenticated_client, get_supabase_client
+from app.models.share import PageShare
+from app.exceptions import handle_exception
+from app.config import get_settings
+from app.db import Client, round_trip_budget
+from app.sharing import SharedPage, fetch_shared_page, get_shared_page_cache, new_share_token, purge_shared_page
+from app.utils import RLS_DENIED, not_modified, read_only_error
+
+router = APIRouter(tags=["sharing"])
+
+# Served at the site root, without authentication
+public_router = APIRouter(tags=["sharing"], include_in_schema=False)
+
+PUBLIC_PATH = "/p"
+
+SHARE_COLUMNS = "token,page_id,created_at"
+
+# Tokens as new_share_token() makes them; anything else is a 404 without a query
+_TOKEN = re.compile(r"[A-Za-z0-9_-]{16,64}")
+
+
+def _share(row: dict) -> dict:
+    return {**row, "path": f"{PUBLIC_PATH}/{row['token']}"}
+
+
+@router.get("/pages/{page_id}/share", response_model=PageShare)
+@round_trip_budget(1)
+async def get_page_share(
+    page_id: UUID,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Get a page's public share link."""
+    try:
+        response = supabase.table("page_shares").select(SHARE_COLUMNS).eq("page_id", str(page_id)).execute()
+
+        if not response.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Page is not shared",
+            )
+
+        return _share(response.data[0])
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching page share", debug=settings.debug)
+
+
+@router.post("/pages/{page_id}/share", response_model=PageShare, status_code=status.HTTP_201_CREATED)
+@round_trip_budget(3)
+async def share_page(
+    page_id: UUID,
+    response: Response,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Share a page publicly; a page that is already shared keeps its link (200)."""
+    try:
+        existing = supabase.table("page_shares").select(SHARE_COLUMNS).eq("page_id", str(page_id)).execute()
+        if existing.data:
+            response.status_code = status.HTTP_200_OK
+            return _share(existing.data[0])
+
+        # RLS handles membership; viewers can read the page but not share it
+        page = supabase.table("pages").select("id,workspace_id").eq("id", str(page_id)).execute()
+
+        if not page.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Page not found",
+            )
+
+        created = (
+            supabase.table("page_shares")
+            .insert(
+                {
+                    "token": new_share_token(),
+                    "page_id": str(page_id),
+                    "workspace_id": page.data[0]["workspace_id"],
+                }
+            )
+            .execute()
+        )
+        return _share(created.data[0])
+    except HTTPException:
+        raise
+    except Exception as e:
+        if getattr(e, "code", None) == RLS_DENIED:
+            raise read_only_error()
+        settings = get_settings()
+        raise handle_exception(e, "Sharing page", debug=settings.debug)
+
+
+@router.delete("/pages/{page_id}/share", status_code=status.HTTP_204_NO_CONTENT)
+@round_trip_budget(1)
+async def unshare_page(
+    page_id: UUID,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Stop sharing a page; its link stops working at once. Sharing it again gives a new link."""
+    try:
+        response = supabase.table("page_shares").delete().eq("page_id", str(page_id)).execute()
+
+        if not response.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Page is not shared",
+            )
+
+        purge_shared_page(str(page_id))
+        return None
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Unsharing page", debug=settings.debug)
+
+
+def _load_shared_page(token: str, supabase: Client) -> SharedPage:
+    """The rendered page of a token, from the cache or with one call."""
+    not_found = HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Page not found",
+    )
+    if not _TOKEN.fullmatch(token):
+        raise not_found
+
+    cache = get_shared_page_cache()
+    page = cache.get(token)
+    if page is not None:
+        return page
+    generation = cache.generation
+    page = fetch_shared_page(supabase, token)
+    if page is None:
+        raise not_found
+    cache.set(page, generation)
+    return page
+
+
+def _page_response(request: Request, page: SharedPage, max_age: int, immutable: bool = False) -> Response:
+    headers = {
+        "ETag": page.etag,
+        "Cache-Control": f"public, max-age={max_age}" + (", immutable" if immutable else ""),
+    }
+    if not immutable:
+        headers["Content-Location"] = f"{PUBLIC_PATH}/{page.token}/{page.version}"
+    if not_modified(request, page.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(page.body, media_type="text/html; charset=utf-8", headers=headers)
+
+
+@public_router.get(PUBLIC_PATH + "/{token}")
+@round_trip_budget(1)
+async def get_shared_page(
+    token: str,
+    request: Request,
+    supabase: Client = Depends(get_supabase_client),
+):
+    """A shared page as HTML, cacheable for ``share_max_age`` seconds."""
+    try:
+        page = _load_shared_page(token, supabase)
+        return _page_response(request, page, get_settings().share_max_age)
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching shared page", debug=settings.debug)
+
+
+@public_router.get(PUBLIC_PATH + "/{token}/{version}")
+@round_trip_budget(1)
+async def get_shared_page_version(
+    token: str,
+    version: str,
+    request: Request,
+    supabase: Client = Depends(get_supabase_client),
+):
+    """One version of a shared page; immutable. Older versions redirect to the current one."""
+    try:
+        page = _load_shared_page(token, supabase)
+        if version != page.version:
+            return Response(
+                status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+                headers={"Location": f"{PUBLIC_PATH}/{token}", "Cache-Control": "no-cache"},
+            )
+        return _page_response(request, page, get_settings().share_immutable_max_age, immutable=True)
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching shared page", debug=settings.debug)
@@ -1,39 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from uuid import UUID
-from typing import List
+from typing import List, Literal, Optional
 
 from app.dependencies import get_current_user, get_authenticated_client
 from app.models.task import Task, TaskCreate, TaskUpdate
+from app.models.ordering import ItemMove
 from app.exceptions import handle_exception
 from app.config import get_settings
-from app.utils import verify_workspace_ownership, is_over_limit
-from supabase import Client
+from app.db import Client, round_trip_budget
+from app.cache import cached, invalidate, invalidate_daily
+from app.utils import EDITOR, require_workspace_role, is_over_limit, read_only_error
+from app.ordering import move_item
 
 router = APIRouter(tags=["tasks"])
 
 
+# Sort columns of the ``sort`` parameter and whether they default to descending
+TASK_SORTS = {
+    "manual": ("sort_key", False),
+    "priority": ("priority", True),
+    "created": ("created_at", False),
+    "updated": ("updated_at", True),
+}
+
+
+def _like_pattern(text: str) -> str:
+    """
+    ILIKE pattern matching ``text`` anywhere, with its wildcards escaped.
+
+    PostgREST turns every ``*`` into ``%`` and has no escape for it, so a
+    literal star is matched by ``_`` (any one character) instead.
+    """
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_").replace("*", "_")
+    return f"%{escaped}%"
+
+
 @router.get("/workspaces/{workspace_id}/tasks", response_model=List[Task])
+@round_trip_budget(2)
+@cached("tasks.list", lambda workspace_id, **_: [f"workspace:{workspace_id}", f"tasks:{workspace_id}"])
 async def get_tasks(
     workspace_id: UUID,
+    done: Optional[bool] = Query(None),
+    min_priority: Optional[int] = Query(None, ge=0, le=3),
+    max_priority: Optional[int] = Query(None, ge=0, le=3),
+    q: Optional[str] = Query(None, min_length=1, max_length=100, description="Text the content contains"),
+    sort: Literal["manual", "priority", "created", "updated"] = Query("manual"),
+    desc: Optional[bool] = Query(None, description="Defaults to descending for priority and updated"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
     user=Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_client),
 ):
-    """Get all tasks in a workspace."""
+    """
+    Get the tasks in a workspace, in their manual order by default.
+
+    Filters and sorting run in the database on the indexes of
+    supabase/task_filters.sql, so e.g. ``?done=false&min_priority=3`` only
+    transfers the open high-priority tasks. ``limit`` and ``offset`` page
+    through the filtered result.
+    """
     try:
-        # Verify workspace ownership
-        if not await verify_workspace_ownership(workspace_id, str(user.id), supabase):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Workspace not found",
-            )
-
-        response = (
-            supabase.table("tasks")
-            .select("*")
-            .eq("workspace_id", str(workspace_id))
-            .order("created_at", desc=False)
-            .execute()
-        )
+        # Any member may read
+        await require_workspace_role(workspace_id, str(user.id), supabase)
+
+        query = supabase.table("tasks").select("*").eq("workspace_id", str(workspace_id))
+        if done is not None:
+            query = query.eq("done", done)
+        if min_priority is not None:
+            query = query.gte("priority", min_priority)
+        if max_priority is not None:
+            query = query.lte("priority", max_priority)
+        if q:
+            query = query.ilike("content", _like_pattern(q))
+
+        column, default_desc = TASK_SORTS[sort]
+        query = query.order(column, desc=default_desc if desc is None else desc)
+        # Ties keep a stable order across pages
+        query = query.order("created_at").order("id")
+        if limit is not None:
+            query = query.range(offset, offset + limit - 1)
+        elif offset:
+            query = query.range(offset, offset + get_settings().max_tasks_per_workspace - 1)
+
+        response = query.execute()
         return response.data
     except HTTPException:
         raise
@@ -47,6 +96,7 @@ async def get_tasks(
     response_model=Task,
     status_code=status.HTTP_201_CREATED,
 )
+@round_trip_budget(3)
 async def create_task(
     workspace_id: UUID,
     task: TaskCreate,
@@ -55,12 +105,8 @@ async def create_task(
 ):
     """Create a new task in a workspace."""
     try:
-        # Verify workspace ownership
-        if not await verify_workspace_ownership(workspace_id, str(user.id), supabase):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Workspace not found",
-            )
+        # Viewers may read but not add
+        await require_workspace_role(workspace_id, str(user.id), supabase, EDITOR)
 
         settings = get_settings()
         if is_over_limit(
@@ -75,7 +121,7 @@ async def create_task(
                 detail="Task limit reached for this workspace",
             )
 
-        data = task.model_dump()
+        data = task.model_dump(mode="json")
         data["workspace_id"] = str(workspace_id)
 
         response = supabase.table("tasks").insert(data).execute()
@@ -86,7 +132,10 @@ async def create_task(
                 detail="Failed to create task",
             )
 
-        return response.data[0]
+        created = response.data[0]
+        invalidate(str(user.id), f"tasks:{workspace_id}")
+        invalidate_daily(created, str(user.id))
+        return created
     except HTTPException:
         raise
     except Exception as e:
@@ -95,6 +144,8 @@ async def create_task(
 
 
 @router.get("/tasks/{task_id}", response_model=Task)
+@round_trip_budget(1)
+@cached("tasks.get", lambda result, task_id, **_: [f"workspace:{result['workspace_id']}", f"task:{task_id}"])
 async def get_task(
     task_id: UUID,
     user=Depends(get_current_user),
@@ -126,6 +177,7 @@ async def get_task(
 
 
 @router.put("/tasks/{task_id}", response_model=Task)
+@round_trip_budget(2)
 async def update_task(
     task_id: UUID,
     task: TaskUpdate,
@@ -148,7 +200,7 @@ async def update_task(
                 detail="Task not found",
             )
 
-        update_data = task.model_dump(exclude_unset=True)
+        update_data = task.model_dump(mode="json", exclude_unset=True)
 
         if not update_data:
             raise HTTPException(
@@ -163,7 +215,14 @@ async def update_task(
             .execute()
         )
 
-        return response.data[0]
+        # The row was readable, so RLS refused the write
+        if not response.data:
+            raise read_only_error()
+
+        updated = response.data[0]
+        invalidate(str(user.id), f"task:{task_id}", f"tasks:{updated['workspace_id']}")
+        invalidate_daily(updated, str(user.id))
+        return updated
     except HTTPException:
         raise
     except Exception as e:
@@ -172,6 +231,7 @@ async def update_task(
 
 
 @router.patch("/tasks/{task_id}/toggle", response_model=Task)
+@round_trip_budget(2)
 async def toggle_task(
     task_id: UUID,
     user=Depends(get_current_user),
@@ -194,26 +254,24 @@ async def toggle_task(
                 detail="Task not found",
             )
 
-        # Toggle the done status and return updated task in single operation
+        # Toggle the done status; the update returns the updated row
         # RLS ensures only the owner can update
         new_done = not current.data["done"]
         response = (
             supabase.table("tasks")
             .update({"done": new_done})
             .eq("id", str(task_id))
-            .select()
-            .single()
             .execute()
         )
 
-        # If no data returned, task doesn't exist or RLS blocked access
+        # The task was readable, so RLS refused the write (a viewer)
         if not response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found",
-            )
+            raise read_only_error()
 
-        return response.data[0]
+        toggled = response.data[0]
+        invalidate(str(user.id), f"task:{task_id}", f"tasks:{toggled['workspace_id']}")
+        invalidate_daily(toggled, str(user.id))
+        return toggled
     except HTTPException:
         raise
     except Exception as e:
@@ -221,7 +279,35 @@ async def toggle_task(
         raise handle_exception(e, "Toggling task", debug=settings.debug)
 
 
+@router.post("/tasks/{task_id}/move", response_model=Task)
+@round_trip_budget(2)
+async def move_task(
+    task_id: UUID,
+    move: ItemMove,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Move a task between two neighbors; only the moved task is written."""
+    try:
+        moved = move_item(
+            supabase,
+            "tasks",
+            str(task_id),
+            str(move.before_id) if move.before_id else None,
+            str(move.after_id) if move.after_id else None,
+            str(user.id),
+        )
+        invalidate(str(user.id), f"task:{task_id}", f"tasks:{moved['workspace_id']}")
+        return moved
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Moving task", debug=settings.debug)
+
+
 @router.delete("/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+@round_trip_budget(2)
 async def delete_task(
     task_id: UUID,
     user=Depends(get_current_user),
@@ -232,7 +318,7 @@ async def delete_task(
         # Check task exists (RLS handles ownership)
         check = (
             supabase.table("tasks")
-            .select("id")
+            .select("id,workspace_id,user_id")
             .eq("id", str(task_id))
             .execute()
         )
@@ -243,8 +329,12 @@ async def delete_task(
                 detail="Task not found",
             )
 
-        supabase.table("tasks").delete().eq("id", str(task_id)).execute()
+        deleted = supabase.table("tasks").delete().eq("id", str(task_id)).execute()
+        if not deleted.data:
+            raise read_only_error()
 
+        invalidate(str(user.id), f"task:{task_id}", f"tasks:{check.data[0]['workspace_id']}")
+        invalidate_daily(check.data[0], str(user.id))
         return None
     except HTTPException:
         raise
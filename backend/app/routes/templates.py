@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+
+from app.dependencies import get_current_user, get_authenticated_client
+from app.models.template import TemplateSummary, WorkspaceCopy
+from app.models.workspace import Workspace
+from app.exceptions import handle_exception
+from app.config import get_settings
+from app.db import Client, round_trip_budget
+from app.cache import invalidate
+from app.links import has_links, rebuild_links
+from app.templates import get_template, template_catalog
+from app.utils import workspace_rpc_error
+
+router = APIRouter(prefix="/templates", tags=["templates"])
+
+
+@router.get("/", response_model=List[TemplateSummary])
+@round_trip_budget(0)
+async def list_templates(user=Depends(get_current_user)):
+    """List the built-in workspace templates."""
+    return template_catalog()
+
+
+@router.post("/{template_id}/workspaces", response_model=Workspace, status_code=status.HTTP_201_CREATED)
+@round_trip_budget(2)
+async def create_workspace_from_template(
+    template_id: str,
+    copy: Optional[WorkspaceCopy] = None,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Create a workspace with a template's tasks, notes and pages in one transaction."""
+    try:
+        template = get_template(template_id)
+        if template is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Template not found",
+            )
+
+        settings = get_settings()
+        response = supabase.rpc(
+            "create_workspace_from_template",
+            {
+                "template": template,
+                "new_name": copy.name if copy else None,
+                "max_workspaces": settings.max_workspaces_per_user,
+            },
+        ).execute()
+        if has_links(item.get("content") for table in ("notes", "pages") for item in template.get(table, [])):
+            rebuild_links(supabase, [response.data["id"]])
+        invalidate(str(user.id), f"workspaces:{user.id}", f"daily:{user.id}")
+        return response.data
+    except HTTPException:
+        raise
+    except Exception as e:
+        error = workspace_rpc_error(e)
+        if error:
+            raise error
+        settings = get_settings()
+        raise handle_exception(e, "Creating workspace from template", debug=settings.debug)
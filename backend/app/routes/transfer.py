@@ -0,0 +1,133 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from datetime import datetime, timezone
+from typing import Literal, Optional
+from uuid import UUID
+import json
+
+from app.dependencies import get_current_user, get_authenticated_client
+from app.exceptions import handle_exception
+from app.config import get_settings
+from app.db import UNBOUNDED, Client, round_trip_budget
+from app.cache import invalidate
+from app.transfer import (
+    BatchImporter,
+    TransferError,
+    iter_lines,
+    ndjson_stream,
+    zip_stream,
+    EXPORT_COLUMNS,
+)
+
+router = APIRouter(tags=["import/export"])
+
+IMPORT_PATH = "/import"
+
+
+@router.get("/export")
+@round_trip_budget(1)  # workspace list; content chunks are fetched while the body streams
+async def export_data(
+    format: Literal["ndjson", "zip"] = Query("ndjson"),
+    workspace_id: Optional[UUID] = Query(None),
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Stream all of the user's workspaces (or one) as NDJSON or a zip of markdown files."""
+    try:
+        settings = get_settings()
+        query = (
+            supabase.table("workspaces")
+            .select(EXPORT_COLUMNS["workspaces"])
+            .eq("user_id", str(user.id))
+        )
+        if workspace_id:
+            query = query.eq("id", str(workspace_id))
+        workspaces = query.order("id").limit(settings.max_workspaces_per_user).execute().data or []
+        if workspace_id and not workspaces:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Workspace not found",
+            )
+
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+        if format == "zip":
+            body = zip_stream(supabase, workspaces)
+            media_type, filename = "application/zip", f"moji-export-{stamp}.zip"
+        else:
+            body = ndjson_stream(supabase, workspaces)
+            media_type, filename = "application/x-ndjson", f"moji-export-{stamp}.ndjson"
+        return StreamingResponse(
+            body,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Exporting data", debug=settings.debug)
+
+
+@router.post(IMPORT_PATH, status_code=status.HTTP_201_CREATED)
+@round_trip_budget(UNBOUNDED)  # 1 quota check, then one insert per batch
+async def import_data(
+    request: Request,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """
+    Import an NDJSON export as new workspaces.
+
+    The body is parsed as it arrives and rows are inserted in batches. On any
+    error the workspaces created so far are removed again.
+    """
+    settings = get_settings()
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.import_max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Import too large",
+        )
+
+    importer = None
+    try:
+        existing = (
+            supabase.table("workspaces")
+            .select("id")
+            .eq("user_id", str(user.id))
+            .limit(settings.max_workspaces_per_user)
+            .execute()
+        )
+        importer = BatchImporter(
+            supabase,
+            str(user.id),
+            existing_workspaces=len(existing.data or []),
+            limits={
+                "workspaces": settings.max_workspaces_per_user,
+                "tasks": settings.max_tasks_per_workspace,
+                "notes": settings.max_notes_per_workspace,
+                "pages": settings.max_pages_per_workspace,
+            },
+        )
+        line_no = 0
+        async for line in iter_lines(request.stream(), settings.import_max_bytes):
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise TransferError(f"Line {line_no}: invalid JSON")
+            if not isinstance(record, dict):
+                raise TransferError(f"Line {line_no}: expected an object")
+            importer.add(line_no, record)
+        counts = importer.finish()
+        invalidate(str(user.id), f"workspaces:{user.id}", f"daily:{user.id}")
+        return {"imported": counts}
+    except Exception as e:
+        if importer:
+            importer.rollback()
+            invalidate(str(user.id), f"workspaces:{user.id}", f"daily:{user.id}")
+        if isinstance(e, TransferError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        raise handle_exception(e, "Importing data", debug=settings.debug)
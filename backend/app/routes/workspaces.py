@@ -1,44 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from uuid import UUID
-from typing import List
+from typing import List, Optional
+import hashlib
+import json
 
 from app.dependencies import get_current_user, get_authenticated_client
-from app.models.workspace import Workspace, WorkspaceCreate, WorkspaceUpdate
+from app.models.workspace import Workspace, WorkspaceCreate, WorkspaceStats, WorkspaceUpdate
+from app.models.template import WorkspaceCopy
 from app.exceptions import handle_exception
 from app.config import get_settings
-from app.utils import seed_default_workspaces, is_over_limit
-from supabase import Client
+from app.db import Client, round_trip_budget
+from app.cache import cached, invalidate
+from app.links import rebuild_links
+from app.sharing import get_shared_page_cache
+from app.loaders import get_membership_cache
+from app.utils import OWNER, is_over_limit, not_modified, require_workspace_role, workspace_rpc_error
 
 router = APIRouter(prefix="/workspaces", tags=["workspaces"])
 
 
+def _list_tags(result, user, **_) -> List[str]:
+    # A shared workspace's owner renaming or deleting it drops every member's list
+    return [f"workspaces:{user.id}", *(f"workspace:{row['id']}" for row in result)]
+
+
 @router.get("/", response_model=List[Workspace])
+@round_trip_budget(1)
+@cached("workspaces.list", _list_tags)
 async def get_workspaces(
     user=Depends(get_current_user),
     supabase: Client = Depends(get_authenticated_client),
 ):
-    """Get all workspaces for the current user."""
-    try:
-        response = (
-            supabase.table("workspaces")
-            .select("*")
-            .eq("user_id", str(user.id))
-            .order("created_at", desc=False)
-            .execute()
-        )
-        workspaces = response.data or []
-        should_seed = (
-            len(workspaces) == 0
-            or (
-                len(workspaces) == 1
-                and workspaces[0].get("name") == "Personal"
-                and workspaces[0].get("description") == "Your personal workspace"
-            )
-        )
-        if should_seed:
-            return seed_default_workspaces(str(user.id), supabase, workspaces)
+    """
+    Get all workspaces the current user is a member of, shared ones included.
 
-        return workspaces
+    A new user's defaults are seeded by the same call, see
+    supabase/seed_defaults.sql and supabase/teams.sql.
+    """
+    try:
+        response = supabase.rpc("member_workspaces").execute()
+        return response.data or []
     except HTTPException:
         raise
     except Exception as e:
@@ -46,7 +47,52 @@ async def get_workspaces(
         raise handle_exception(e, "Fetching workspaces", debug=settings.debug)
 
 
+def _stats_tags(result, user, **_) -> List[str]:
+    # Item writes already invalidate their workspace's list tags
+    tags = [f"workspaces:{user.id}"]
+    for row in result:
+        tags += [f"{kind}:{row['workspace_id']}" for kind in ("tasks", "notes", "pages")]
+    return tags
+
+
+@cached("workspaces.stats", _stats_tags)
+async def _workspace_stats(user, supabase: Client) -> list:
+    response = supabase.rpc("workspace_stats").execute()
+    return response.data or []
+
+
+@router.get("/stats", response_model=List[WorkspaceStats], responses={304: {"description": "Not modified"}})
+@round_trip_budget(1)
+async def get_workspace_stats(
+    request: Request,
+    response: Response,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """
+    Open task, high-priority, note and page counts of every workspace.
+
+    One grouped query, see supabase/stats.sql. Responses carry an ETag so
+    clients can revalidate with ``If-None-Match`` and get a bodyless 304.
+    """
+    try:
+        stats = await _workspace_stats(user=user, supabase=supabase)
+        body = json.dumps(stats, sort_keys=True, default=str).encode("utf-8")
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return stats
+    except HTTPException:
+        raise
+    except Exception as e:
+        settings = get_settings()
+        raise handle_exception(e, "Fetching workspace stats", debug=settings.debug)
+
+
 @router.get("/{workspace_id}", response_model=Workspace)
+@round_trip_budget(1)
+@cached("workspaces.get", lambda workspace_id, **_: [f"workspace:{workspace_id}"])
 async def get_workspace(
     workspace_id: UUID,
     user=Depends(get_current_user),
@@ -54,11 +100,11 @@ async def get_workspace(
 ):
     """Get a specific workspace by ID."""
     try:
+        # RLS lets members read it
         response = (
             supabase.table("workspaces")
             .select("*")
             .eq("id", str(workspace_id))
-            .eq("user_id", str(user.id))
             .single()
             .execute()
         )
@@ -78,6 +124,7 @@ async def get_workspace(
 
 
 @router.post("/", response_model=Workspace, status_code=status.HTTP_201_CREATED)
+@round_trip_budget(2)
 async def create_workspace(
     workspace: WorkspaceCreate,
     user=Depends(get_current_user),
@@ -109,7 +156,12 @@ async def create_workspace(
                 detail="Failed to create workspace",
             )
 
-        return response.data[0]
+        created = response.data[0]
+        # The insert made the user its owner (supabase/teams.sql); its first item costs no check
+        cache = get_membership_cache()
+        cache.set(str(user.id), str(created["id"]), OWNER, cache.generation)
+        invalidate(str(user.id), f"workspaces:{user.id}")
+        return created
     except HTTPException:
         raise
     except Exception as e:
@@ -118,6 +170,7 @@ async def create_workspace(
 
 
 @router.put("/{workspace_id}", response_model=Workspace)
+@round_trip_budget(2)
 async def update_workspace(
     workspace_id: UUID,
     workspace: WorkspaceUpdate,
@@ -126,20 +179,8 @@ async def update_workspace(
 ):
     """Update a workspace."""
     try:
-        # Check ownership first
-        check = (
-            supabase.table("workspaces")
-            .select("id")
-            .eq("id", str(workspace_id))
-            .eq("user_id", str(user.id))
-            .execute()
-        )
-
-        if not check.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Workspace not found",
-            )
+        # Only owners change or delete a workspace
+        await require_workspace_role(workspace_id, str(user.id), supabase, OWNER)
 
         # Update only provided fields
         update_data = workspace.model_dump(exclude_unset=True)
@@ -157,6 +198,7 @@ async def update_workspace(
             .execute()
         )
 
+        invalidate(str(user.id), f"workspaces:{user.id}", f"workspace:{workspace_id}")
         return response.data[0]
     except HTTPException:
         raise
@@ -166,6 +208,7 @@ async def update_workspace(
 
 
 @router.delete("/{workspace_id}", status_code=status.HTTP_204_NO_CONTENT)
+@round_trip_budget(2)
 async def delete_workspace(
     workspace_id: UUID,
     user=Depends(get_current_user),
@@ -173,26 +216,51 @@ async def delete_workspace(
 ):
     """Delete a workspace and all its tasks/notes (cascade)."""
     try:
-        # Check ownership first
-        check = (
-            supabase.table("workspaces")
-            .select("id")
-            .eq("id", str(workspace_id))
-            .eq("user_id", str(user.id))
-            .execute()
-        )
-
-        if not check.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Workspace not found",
-            )
+        # Only owners change or delete a workspace
+        await require_workspace_role(workspace_id, str(user.id), supabase, OWNER)
 
         supabase.table("workspaces").delete().eq("id", str(workspace_id)).execute()
+        get_shared_page_cache().purge_workspace(str(workspace_id))
+        get_membership_cache().invalidate_workspace(str(workspace_id))
 
+        # Cached child lists and items carry the workspace tag too
+        invalidate(str(user.id), f"workspaces:{user.id}", f"workspace:{workspace_id}", f"daily:{user.id}")
         return None
     except HTTPException:
         raise
     except Exception as e:
         settings = get_settings()
         raise handle_exception(e, "Deleting workspace", debug=settings.debug)
+
+
+@router.post("/{workspace_id}/clone", response_model=Workspace, status_code=status.HTTP_201_CREATED)
+@round_trip_budget(2)
+async def clone_workspace(
+    workspace_id: UUID,
+    copy: Optional[WorkspaceCopy] = None,
+    user=Depends(get_current_user),
+    supabase: Client = Depends(get_authenticated_client),
+):
+    """Copy a workspace with all its tasks, notes and pages in one transaction."""
+    try:
+        settings = get_settings()
+        response = supabase.rpc(
+            "clone_workspace",
+            {
+                "source_id": str(workspace_id),
+                "new_name": copy.name if copy else None,
+                "max_workspaces": settings.max_workspaces_per_user,
+            },
+        ).execute()
+        # The copies' links point at the copies, not the originals
+        rebuild_links(supabase, [response.data["id"]])
+        invalidate(str(user.id), f"workspaces:{user.id}", f"daily:{user.id}")
+        return response.data
+    except HTTPException:
+        raise
+    except Exception as e:
+        error = workspace_rpc_error(e)
+        if error:
+            raise error
+        settings = get_settings()
+        raise handle_exception(e, "Cloning workspace", debug=settings.debug)
@@ -0,0 +1,127 @@
+"""Production entrypoint.
+
+    python -m app.server
+
+Runs ``app.main:app`` under uvicorn with production settings, where
+``uvicorn --reload`` (run.sh, ``python -m app.main``) is for development:
+
+- One worker process per available CPU (``SERVER_WORKERS`` overrides), with
+  uvloop and httptools when installed. With several workers and no
+  ``METRICS_DIR``, a fresh temporary directory is used so ``/metrics``
+  reports totals for all of them.
+- Keep-alive (``SERVER_KEEP_ALIVE``) outlasts the hosting proxy's idle
+  timeout, so the proxy never reuses a connection the worker just closed,
+  and the listen backlog (``SERVER_BACKLOG``) absorbs bursts while workers
+  start.
+- Each worker runs ``warm_up`` during lifespan startup, before uvicorn
+  accepts connections: the Supabase pool gets its first connections and the
+  OpenAPI schema and templates are loaded.
+- On SIGTERM uvicorn stops accepting connections and gives in-flight
+  requests ``SERVER_GRACEFUL_TIMEOUT`` seconds. Lifespan shutdown then gives
+  running jobs ``JOBS_DRAIN_TIMEOUT`` seconds, writes the final metrics
+  snapshot, flushes buffered spans and closes the pool.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import math
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+from app.config import Settings, get_settings, setup_logging
+
+logger = logging.getLogger(__name__)
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+def available_cpus(cgroup_cpu_max: str = CGROUP_CPU_MAX) -> int:
+    """CPUs this process may use: its affinity mask, capped by a cgroup v2 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open(cgroup_cpu_max, encoding="utf-8") as fh:
+            quota, period = fh.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def uvicorn_options(settings: Settings, cpus: Optional[int] = None) -> Dict[str, Any]:
+    """Keyword arguments for ``uvicorn.run``."""
+    return {
+        "host": settings.server_host,
+        "port": settings.port,
+        "workers": settings.server_workers or cpus or available_cpus(),
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "backlog": settings.server_backlog,
+        "timeout_keep_alive": settings.server_keep_alive,
+        "timeout_graceful_shutdown": settings.server_graceful_timeout,
+        "proxy_headers": True,
+        "forwarded_allow_ips": settings.forwarded_allow_ips,
+        "access_log": settings.server_access_log,
+        "server_header": False,
+    }
+
+
+def _ping_supabase(settings: Settings) -> None:
+    from app.dependencies import get_http_client
+
+    get_http_client().get(
+        f"{settings.supabase_url}/auth/v1/health",
+        headers={"apikey": settings.supabase_anon_key},
+        timeout=5.0,
+    )
+
+
+async def warm_up(app: Any) -> None:
+    """Prepare a worker for traffic. Failures are logged, the worker still starts."""
+    from app.templates import template_catalog
+
+    settings = get_settings()
+    start = time.perf_counter()
+    try:
+        # Concurrent requests each open their own connection in the pool
+        await asyncio.gather(
+            *(asyncio.to_thread(_ping_supabase, settings) for _ in range(settings.warm_up_connections))
+        )
+    except Exception as e:
+        logger.warning(f"Warm-up could not reach Supabase: {e}")
+    try:
+        template_catalog()
+        app.openapi()
+    except Exception as e:
+        logger.warning(f"Warm-up failed: {e}")
+    logger.info(f"Worker warmed up in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+def main() -> None:
+    import uvicorn
+
+    os.environ.setdefault("WARM_UP", "true")
+    settings = get_settings()
+    setup_logging(debug=settings.debug)
+    options = uvicorn_options(settings)
+    if options["workers"] > 1 and not settings.metrics_dir:
+        os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="moji-metrics-")
+    logger.info(
+        f"Serving on {options['host']}:{options['port']} with {options['workers']} workers "
+        f"({options['loop']}, {options['http']})"
+    )
+    uvicorn.run("app.main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Public sharing of pages.
+
+A shared page has a random token (``page_shares`` in supabase/sharing.sql)
+and is served without authentication at ``/p/<token>``. Anonymous views
+never call ``get_current_user`` or build a per-request client: a miss is
+one call of the ``shared_page()`` SQL function on the process-wide anon
+client, and popular pages are served from ``SharedPageCache``, which keeps
+their rendered HTML in the worker.
+
+Every rendering has a version, a hash of its bytes, which is also its
+strong ETag. ``/p/<token>`` is cacheable for ``share_max_age`` seconds and
+names the current ``/p/<token>/<version>`` in ``Content-Location``; those
+versioned URLs never change and are cacheable for
+``share_immutable_max_age`` seconds (a year by default).
+
+Editing, deleting or unsharing a page, or deleting its workspace, purges
+it from the worker that served the write and appends the purge to a
+``PurgeLog``, a SQLite table in the jobs database (``jobs_db_path``) shared
+by all worker processes on the host. Before every lookup a worker applies
+the purges it has not seen, one read of the log's primary key, so an
+unshared page stops being served everywhere at once. Workers on other hosts
+drop it within ``share_cache_ttl`` seconds. Copies already held by browsers
+or a CDN are not recalled: ``/p/<token>`` ones expire after ``share_max_age`` seconds,
+versioned ones are only reachable by someone who already has the URL.
+"""
+
+import hashlib
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app import metrics
+from app.db import Client
+from app.render import render_page
+
+
+@dataclass
+class SharedPage:
+    """A shared page as served: its rendered HTML and version."""
+
+    token: str
+    page_id: str
+    workspace_id: str
+    body: bytes
+    version: str
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+
+@dataclass
+class _Entry:
+    page: SharedPage
+    expires: float
+
+
+def new_share_token() -> str:
+    """An unguessable token for a share URL (22 URL-safe characters)."""
+    return secrets.token_urlsafe(16)
+
+
+def build_shared_page(token: str, row: Dict) -> SharedPage:
+    """Render a row of ``shared_page()``."""
+    body = render_page(row.get("title") or "", row.get("content") or "").encode("utf-8")
+    version = hashlib.sha256(body).hexdigest()[:16]
+    return SharedPage(token, str(row["page_id"]), str(row["workspace_id"]), body, version)
+
+
+def fetch_shared_page(supabase: Client, token: str) -> Optional[SharedPage]:
+    """Look a share token up and render its page; None for unknown tokens."""
+    rows = supabase.rpc("shared_page", {"share_token": token}).execute().data or []
+    return build_shared_page(token, rows[0]) if rows else None
+
+
+_PURGE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS share_purges (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    page_id TEXT,
+    workspace_id TEXT,
+    at REAL NOT NULL
+);
+"""
+
+
+class PurgeLog:
+    """Purges of shared pages in a SQLite file, seen by every local worker."""
+
+    def __init__(self, path: str, keep: float):
+        # Entries expire after the cache TTL, so older purges can't matter
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_PURGE_SCHEMA)
+
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM share_purges").fetchone()[0]
+
+    def append(self, page_id: Optional[str] = None, workspace_id: Optional[str] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO share_purges (page_id, workspace_id, at) VALUES (?, ?, ?)",
+                (page_id, workspace_id, now),
+            )
+            self._conn.execute("DELETE FROM share_purges WHERE at < ?", (now - self.keep,))
+
+    def since(self, seq: int) -> List[Tuple[int, Optional[str], Optional[str]]]:
+        """Purges after ``seq``, oldest first, as (seq, page_id, workspace_id)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT seq, page_id, workspace_id FROM share_purges WHERE seq > ? ORDER BY seq", (seq,)
+            ).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SharedPageCache:
+    """LRU of rendered shared pages, bounded by size, purged per page. Thread-safe."""
+
+    def __init__(self, max_bytes: int, ttl: float, purges: Optional[PurgeLog] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._tokens: Dict[str, str] = {}  # page id -> token
+        # Bumped on every purge, so a page rendered across an edit isn't stored
+        self._generation = 0
+        self._purges = purges
+        self._seen = purges.last_seq() if purges else 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, token: str) -> Optional[SharedPage]:
+        with self._lock:
+            self._sync()
+            entry = self._entries.get(token)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._remove(token, "expired")
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(token)
+        metrics.record_cache_lookup("shared", entry is not None)
+        return entry.page if entry else None
+
+    def set(self, page: SharedPage, generation: int) -> bool:
+        """Store ``page`` unless a purge happened since ``generation`` or it is too large."""
+        if len(page.body) > self.max_bytes // 10:
+            return False
+        with self._lock:
+            self._sync()
+            if self._generation != generation:
+                return False
+            self._remove(page.token, None)
+            self._entries[page.token] = _Entry(page, time.monotonic() + self.ttl)
+            self._tokens[page.page_id] = page.token
+            self.bytes += len(page.body)
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)), "size")
+            self._update_gauges()
+        return True
+
+    def purge_page(self, page_id: str) -> None:
+        """Drop a page after it was edited, deleted or unshared, in every local worker."""
+        with self._lock:
+            self._drop_page(page_id)
+            self._update_gauges()
+        if self._purges is not None:
+            self._purges.append(page_id=page_id)
+
+    def purge_workspace(self, workspace_id: str) -> None:
+        """Drop every page of a deleted workspace, in every local worker."""
+        with self._lock:
+            self._drop_workspace(workspace_id)
+            self._update_gauges()
+        if self._purges is not None:
+            self._purges.append(workspace_id=workspace_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tokens.clear()
+            self.bytes = 0
+            self._update_gauges()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _sync(self) -> None:
+        """Apply the purges of other workers made since the last call."""
+        if self._purges is None:
+            return
+        for seq, page_id, workspace_id in self._purges.since(self._seen):
+            if page_id is not None:
+                self._drop_page(page_id)
+            else:
+                self._drop_workspace(workspace_id)
+            self._seen = seq
+
+    def _drop_page(self, page_id: str) -> None:
+        self._generation += 1
+        token = self._tokens.get(page_id)
+        if token is not None:
+            self._remove(token, "invalidated")
+
+    def _drop_workspace(self, workspace_id: str) -> None:
+        self._generation += 1
+        for token in [t for t, e in self._entries.items() if e.page.workspace_id == workspace_id]:
+            self._remove(token, "invalidated")
+
+    def _remove(self, token: str, reason: Optional[str]) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        self.bytes -= len(entry.page.body)
+        if self._tokens.get(entry.page.page_id) == token:
+            del self._tokens[entry.page.page_id]
+        if reason:
+            metrics.CACHE_EVICTIONS.inc("shared", reason)
+
+    def _update_gauges(self) -> None:
+        metrics.CACHE_BYTES.set(self.bytes, "shared")
+        metrics.CACHE_ENTRIES.set(len(self._entries), "shared")
+
+
+_cache: Optional[SharedPageCache] = None
+
+
+def get_shared_page_cache() -> SharedPageCache:
+    """Return the process-wide cache, configured from settings on first use."""
+    global _cache
+    if _cache is None:
+        from app.config import get_settings
+
+        settings = get_settings()
+        _cache = SharedPageCache(
+            settings.share_cache_max_bytes,
+            settings.share_cache_ttl,
+            PurgeLog(settings.jobs_db_path, settings.share_cache_ttl),
+        )
+    return _cache
+
+
+def set_shared_page_cache(cache: Optional[SharedPageCache]) -> None:
+    """Replace the process-wide cache (tests and custom setups)."""
+    global _cache
+    _cache = cache
+
+
+def purge_shared_page(page_id: str) -> None:
+    """Drop a page from the shared page cache; call after editing, deleting or unsharing it."""
+    get_shared_page_cache().purge_page(page_id)
@@ -0,0 +1,61 @@
+"""Built-in workspace templates.
+
+Each ``<template-id>.json`` file in this package describes a workspace with
+its starter tasks, notes and pages. Files are read and validated once per
+process; the parsed payload is passed as-is to the
+``create_workspace_from_template`` RPC (supabase/templates.sql).
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.models.note import NoteCreate
+from app.models.page import PageCreate
+from app.models.template import TemplateTask
+from app.models.workspace import WorkspaceCreate
+
+TEMPLATE_DIR = Path(__file__).parent
+
+
+def _validate(template_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a template through the create models so bad files fail at load."""
+    workspace = WorkspaceCreate.model_validate(data)
+    return {
+        "id": template_id,
+        **workspace.model_dump(),
+        "tasks": [TemplateTask.model_validate(t).model_dump(mode="json") for t in data.get("tasks", [])],
+        "notes": [NoteCreate.model_validate(n).model_dump(mode="json") for n in data.get("notes", [])],
+        "pages": [PageCreate.model_validate(p).model_dump(mode="json") for p in data.get("pages", [])],
+    }
+
+
+@lru_cache()
+def load_templates() -> Dict[str, Dict[str, Any]]:
+    """Return all built-in templates keyed by ID, in name order."""
+    templates = {}
+    for path in sorted(TEMPLATE_DIR.glob("*.json")):
+        with open(path, encoding="utf-8") as fh:
+            templates[path.stem] = _validate(path.stem, json.load(fh))
+    return dict(sorted(templates.items(), key=lambda item: item[1]["name"]))
+
+
+def get_template(template_id: str) -> Optional[Dict[str, Any]]:
+    return load_templates().get(template_id)
+
+
+@lru_cache()
+def template_catalog() -> List[Dict[str, Any]]:
+    """Summaries of the built-in templates for the catalog endpoint."""
+    return [
+        {
+            "id": template["id"],
+            "name": template["name"],
+            "description": template["description"],
+            "tasks": len(template["tasks"]),
+            "notes": len(template["notes"]),
+            "pages": len(template["pages"]),
+        }
+        for template in load_templates().values()
+    ]
@@ -0,0 +1,317 @@
+"""Lightweight distributed tracing with W3C trace context propagation.
+
+Spans are created for each request, for the auth and client dependencies and
+for every PostgREST call. Trace context is taken from an incoming
+``traceparent`` header when present and propagated upstream on Supabase
+requests. Finished spans of sampled traces are handed to a pluggable
+exporter; the NDJSON exporter writes them to a local file so traces can be
+inspected offline.
+"""
+
+import functools
+import importlib
+import inspect
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT_RE = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._\-]{1,128}$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    sampled: bool = False
+    kind: str = "internal"
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.sampled:
+            self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter:
+    """Receives finished spans of sampled traces."""
+
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        self.flush()
+
+
+class NoopExporter(SpanExporter):
+    """Drops spans. Trace context is still generated and propagated."""
+
+    def export(self, span: Span) -> None:
+        pass
+
+
+class LoggingExporter(SpanExporter):
+    """Writes spans to the ``tracing`` logger at DEBUG level."""
+
+    def __init__(self) -> None:
+        self._logger = logging.getLogger("tracing")
+
+    def export(self, span: Span) -> None:
+        self._logger.debug(json.dumps(span.to_dict(), default=str))
+
+
+class NDJSONFileExporter(SpanExporter):
+    """Appends spans to a local file, one JSON object per line.
+
+    Spans are buffered and written in batches to keep file I/O off the
+    per-span path.
+    """
+
+    def __init__(self, path: str, batch_size: int = 64):
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str, separators=(",", ":"))
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) < self.batch_size:
+                return
+            lines, self._buffer = self._buffer, []
+        self._write(lines)
+
+    def flush(self) -> None:
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if lines:
+            self._write(lines)
+
+    def _write(self, lines: List[str]) -> None:
+        try:
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to write spans to {self.path}: {e}")
+
+
+class Tracer:
+    """Creates spans, applies sampling and hands finished spans to an exporter."""
+
+    def __init__(self, exporter: Optional[SpanExporter] = None, sample_rate: float = 0.0):
+        self.exporter = exporter or NoopExporter()
+        self.sample_rate = sample_rate
+        self._threshold = int(max(0.0, min(1.0, sample_rate)) * (1 << 64))
+
+    def should_sample(self, trace_id: str) -> bool:
+        """Ratio-based sampling that is deterministic per trace ID."""
+        return int(trace_id[16:], 16) < self._threshold
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: str = "internal",
+        parent: Optional[Span] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Span]:
+        """Run the block inside a new span, child of ``parent`` or the current span."""
+        parent = parent or _current_span.get()
+        if parent is not None:
+            trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+            sampled = self.should_sample(trace_id)
+
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent_id,
+            sampled=sampled,
+            kind=kind,
+            start_ns=time.time_ns(),
+        )
+        if sampled and attributes:
+            span.attributes.update(attributes)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set_attribute("error.type", type(e).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if sampled:
+                self.exporter.export(span)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("moji_current_span", default=None)
+_request_id: ContextVar[Optional[str]] = ContextVar("moji_request_id", default=None)
+
+_tracer: Optional[Tracer] = None
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Span]:
+    """Return a remote parent span for a valid W3C ``traceparent`` header."""
+    if not header:
+        return None
+    match = _TRACEPARENT_RE.match(header.strip().lower())
+    if not match:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return Span(
+        name="remote",
+        trace_id=trace_id,
+        span_id=span_id,
+        sampled=bool(int(flags, 16) & 0x01),
+        kind="remote",
+    )
+
+
+def resolve_request_id(header: Optional[str]) -> str:
+    """Accept a well-formed incoming request ID or generate a new one."""
+    if header and _REQUEST_ID_RE.match(header):
+        return header
+    return uuid.uuid4().hex
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id: str) -> Iterator[None]:
+    """Bind the request ID for the duration of the request."""
+    token = _request_id.set(request_id)
+    try:
+        yield
+    finally:
+        _request_id.reset(token)
+
+
+def propagation_headers() -> Dict[str, str]:
+    """Headers that carry the current trace context and request ID upstream."""
+    headers = {}
+    span = _current_span.get()
+    if span is not None:
+        headers["traceparent"] = span.traceparent
+    request_id = _request_id.get()
+    if request_id:
+        headers["X-Request-ID"] = request_id
+    return headers
+
+
+def _load_exporter(name: str, file_path: str) -> SpanExporter:
+    if name in ("", "none"):
+        return NoopExporter()
+    if name == "ndjson":
+        return NDJSONFileExporter(file_path)
+    if name == "log":
+        return LoggingExporter()
+    # "package.module:factory" for custom exporters
+    module_name, _, attr = name.partition(":")
+    factory = getattr(importlib.import_module(module_name), attr or "exporter")
+    return factory()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, configured from settings on first use."""
+    global _tracer
+    if _tracer is None:
+        from app.config import get_settings
+
+        settings = get_settings()
+        exporter = _load_exporter(settings.tracing_exporter, settings.tracing_file)
+        _tracer = Tracer(exporter, settings.tracing_sample_rate)
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """Replace the process-wide tracer (tests and custom setups)."""
+    global _tracer
+    _tracer = tracer
+
+
+def shutdown() -> None:
+    """Flush buffered spans."""
+    if _tracer is not None:
+        _tracer.exporter.shutdown()
+
+
+def traced(name: str) -> Callable:
+    """Decorator that runs a sync or async function inside a span.
+
+    The wrapper keeps the wrapped signature, so it can decorate FastAPI
+    dependencies.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with get_tracer().span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
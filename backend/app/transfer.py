@@ -0,0 +1,316 @@
+"""Streaming export and import of workspaces.
+
+Exports are generators: rows are read in keyset-paginated chunks and written
+out as NDJSON lines or as markdown files inside a zip archive, so memory stays
+flat no matter how much a user has. Imports parse an NDJSON body line by line
+as it arrives and insert rows in bounded batches.
+
+NDJSON format, one object per line, children after their workspace::
+
+    {"type": "moji-export", "version": 1, "exported_at": "..."}
+    {"type": "workspace", "id": "...", "name": "...", "description": "..."}
+    {"type": "task", "workspace_id": "...", "content": "...", "done": false, "priority": 0}
+    {"type": "note", "workspace_id": "...", "title": "...", "content": "...", "tags": []}
+    {"type": "page", "workspace_id": "...", "title": "...", "content": "..."}
+"""
+
+import json
+import logging
+import re
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from app.db import Client
+from app.links import SOURCE_COLUMNS, has_links, rebuild_links
+from app.models.note import NoteCreate
+from app.models.page import PageCreate
+from app.models.task import TaskCreate
+from app.models.workspace import WorkspaceCreate
+from app.ordering import is_valid_key
+
+logger = logging.getLogger(__name__)
+
+EXPORT_VERSION = 1
+
+# Rows per keyset page; pages carry large bodies so they come in smaller chunks
+EXPORT_CHUNK_ROWS = {"workspaces": 100, "tasks": 500, "notes": 500, "pages": 50}
+
+# Columns written to the export (ids are only used to link children to workspaces)
+EXPORT_COLUMNS = {
+    "workspaces": "id,name,description,cleanup_after_days,created_at",
+    "tasks": "id,workspace_id,content,done,priority,due_date,scheduled_date,sort_key,created_at",
+    "notes": "id,workspace_id,title,content,tags,sort_key,created_at",
+    "pages": "id,workspace_id,title,content,sort_key,created_at",
+}
+
+# Import batches are flushed at whichever limit is reached first
+IMPORT_BATCH_ROWS = 500
+IMPORT_BATCH_BYTES = 1_000_000
+MAX_LINE_BYTES = 2_000_000
+
+# NDJSON record type -> (table, model validating the fields)
+RECORD_TYPES: Dict[str, tuple] = {
+    "workspace": ("workspaces", WorkspaceCreate),
+    "task": ("tasks", TaskCreate),
+    "note": ("notes", NoteCreate),
+    "page": ("pages", PageCreate),
+}
+
+
+class TransferError(ValueError):
+    """Raised for an invalid or over-quota import; the message is safe to show."""
+
+
+def iter_rows(
+    supabase: Client,
+    table: str,
+    columns: str,
+    filter_column: str,
+    filter_value: str,
+    chunk: int,
+) -> Iterator[Dict[str, Any]]:
+    """Yield rows ordered by id, one keyset page (``id > last``) per query."""
+    last_id: Optional[str] = None
+    while True:
+        query = supabase.table(table).select(columns).eq(filter_column, filter_value)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.order("id").limit(chunk).execute().data or []
+        yield from rows
+        if len(rows) < chunk:
+            return
+        last_id = rows[-1]["id"]
+
+
+def iter_export_records(
+    supabase: Client,
+    workspaces: List[Dict[str, Any]],
+) -> Iterator[Dict[str, Any]]:
+    """Yield the export records of ``workspaces`` and everything in them."""
+    for workspace in workspaces:
+        yield {"type": "workspace", **workspace}
+        for table, kind in (("tasks", "task"), ("notes", "note"), ("pages", "page")):
+            for row in iter_rows(
+                supabase, table, EXPORT_COLUMNS[table], "workspace_id", workspace["id"], EXPORT_CHUNK_ROWS[table]
+            ):
+                yield {"type": kind, **row}
+
+
+def ndjson_stream(supabase: Client, workspaces: List[Dict[str, Any]]) -> Iterator[bytes]:
+    header = {
+        "type": "moji-export",
+        "version": EXPORT_VERSION,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+    }
+    yield _ndjson_line(header)
+    for record in iter_export_records(supabase, workspaces):
+        yield _ndjson_line(record)
+
+
+def _ndjson_line(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class _ZipSink:
+    """Write-only, non-seekable file that buffers until drained.
+
+    zipfile switches to data descriptors when it cannot seek, which lets the
+    archive be produced front to back.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._offset = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+_UNSAFE_CHARS = re.compile(r'[\x00-\x1f<>:"/\\|?*]+')
+
+
+def _safe_name(name: str, taken: set) -> str:
+    """Filesystem-safe, unique (within ``taken``) file or folder name."""
+    base = _UNSAFE_CHARS.sub("-", name).strip(" .-")[:80] or "untitled"
+    candidate, n = base, 2
+    while candidate.lower() in taken:
+        candidate, n = f"{base} ({n})", n + 1
+    taken.add(candidate.lower())
+    return candidate
+
+
+def _markdown_files(supabase: Client, workspace: Dict[str, Any]) -> Iterator[tuple]:
+    """Yield (relative path, text) for one workspace's markdown files."""
+    readme = f"# {workspace['name']}\n"
+    if workspace.get("description"):
+        readme += f"\n{workspace['description']}\n"
+    yield "README.md", readme
+
+    lines = []
+    for task in iter_rows(
+        supabase, "tasks", EXPORT_COLUMNS["tasks"], "workspace_id", workspace["id"], EXPORT_CHUNK_ROWS["tasks"]
+    ):
+        mark = "x" if task.get("done") else " "
+        priority = f" (priority {task['priority']})" if task.get("priority") else ""
+        lines.append(f"- [{mark}] {task['content']}{priority}\n")
+    yield "tasks.md", "# Tasks\n\n" + "".join(lines)
+
+    for table, folder in (("notes", "notes"), ("pages", "pages")):
+        taken: set = set()
+        for row in iter_rows(
+            supabase, table, EXPORT_COLUMNS[table], "workspace_id", workspace["id"], EXPORT_CHUNK_ROWS[table]
+        ):
+            text = row.get("content") or ""
+            if table == "notes":
+                text = f"# {row['title']}\n\n{text}\n"
+                if row.get("tags"):
+                    text += "\n" + " ".join(f"#{tag}" for tag in row["tags"]) + "\n"
+            yield f"{folder}/{_safe_name(row['title'], taken)}.md", text
+
+
+def zip_stream(supabase: Client, workspaces: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """Yield a zip archive with one folder of markdown files per workspace."""
+    sink = _ZipSink()
+    folders: set = set()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for workspace in workspaces:
+            folder = _safe_name(workspace["name"], folders)
+            for path, text in _markdown_files(supabase, workspace):
+                with archive.open(f"{folder}/{path}", "w") as fh:
+                    fh.write(text.encode("utf-8"))
+                yield sink.drain()
+    yield sink.drain()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines, enforcing total and per-line size limits."""
+    buffer = b""
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        if total > max_bytes:
+            raise TransferError(f"Import is larger than {max_bytes} bytes")
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+        if len(buffer) > MAX_LINE_BYTES:
+            raise TransferError("Import line is too long")
+    if buffer:
+        yield buffer
+
+
+class BatchImporter:
+    """Insert parsed records in bounded batches, enforcing quotas as it goes.
+
+    Imported workspaces always become new workspaces. Their IDs are assigned
+    here so that workspaces can be batched like any other rows; children are
+    remapped from the exported workspace IDs.
+    """
+
+    def __init__(self, supabase: Client, user_id: str, existing_workspaces: int, limits: Dict[str, int]):
+        self.supabase = supabase
+        self.user_id = user_id
+        self.existing_workspaces = existing_workspaces
+        self.limits = limits
+        self.workspace_ids: Dict[str, str] = {}
+        self.counts: Dict[str, int] = {table: 0 for table, _ in RECORD_TYPES.values()}
+        self._per_workspace: Dict[tuple, int] = {}
+        self._pending: Dict[str, List[Dict[str, Any]]] = {table: [] for table in self.counts}
+        self._pending_bytes: Dict[str, int] = {table: 0 for table in self.counts}
+        self.created_workspace_ids: List[str] = []
+        self.has_links = False
+
+    def add(self, line_no: int, record: Dict[str, Any]) -> None:
+        kind = record.get("type")
+        if kind == "moji-export":
+            if record.get("version", EXPORT_VERSION) > EXPORT_VERSION:
+                raise TransferError(f"Line {line_no}: unsupported export version {record.get('version')}")
+            return
+        if kind not in RECORD_TYPES:
+            raise TransferError(f"Line {line_no}: unknown record type {kind!r}")
+        table, model = RECORD_TYPES[kind]
+        row = self._validate(line_no, model, record)
+
+        if table == "workspaces":
+            if self.existing_workspaces + len(self.workspace_ids) + 1 > self.limits["workspaces"]:
+                raise TransferError("Workspace limit reached")
+            new_id = str(uuid.uuid4())
+            self.workspace_ids[str(record.get("id") or new_id)] = new_id
+            row.update(id=new_id, user_id=self.user_id)
+        else:
+            workspace_id = self.workspace_ids.get(str(record.get("workspace_id")))
+            if workspace_id is None:
+                raise TransferError(f"Line {line_no}: {kind} refers to a workspace not in the import")
+            key = (table, workspace_id)
+            self._per_workspace[key] = self._per_workspace.get(key, 0) + 1
+            if self._per_workspace[key] > self.limits[table]:
+                raise TransferError(f"{kind.capitalize()} limit reached for an imported workspace")
+            row["workspace_id"] = workspace_id
+            # Without a key the insert trigger appends in import order
+            if is_valid_key(record.get("sort_key")):
+                row["sort_key"] = record["sort_key"]
+
+        if table in SOURCE_COLUMNS and not self.has_links:
+            self.has_links = has_links([row.get("content")])
+
+        self._pending[table].append(row)
+        self._pending_bytes[table] += len(json.dumps(row))
+        if len(self._pending[table]) >= IMPORT_BATCH_ROWS or self._pending_bytes[table] >= IMPORT_BATCH_BYTES:
+            self.flush(table)
+
+    @staticmethod
+    def _validate(line_no: int, model: Type[BaseModel], record: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return model.model_validate(record).model_dump(mode="json")
+        except ValidationError as e:
+            error = e.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
+            raise TransferError(f"Line {line_no}: {field}: {error['msg']}")
+
+    def flush(self, table: str) -> None:
+        # Children need their workspace to exist first
+        if table != "workspaces" and self._pending["workspaces"]:
+            self.flush("workspaces")
+        rows = self._pending[table]
+        if not rows:
+            return
+        self.supabase.table(table).insert(rows).execute()
+        if table == "workspaces":
+            self.created_workspace_ids.extend(row["id"] for row in rows)
+        self.counts[table] += len(rows)
+        self._pending[table] = []
+        self._pending_bytes[table] = 0
+
+    def finish(self) -> Dict[str, int]:
+        for table in self._pending:
+            self.flush(table)
+        if self.has_links:
+            rebuild_links(self.supabase, self.created_workspace_ids)
+        return dict(self.counts)
+
+    def rollback(self) -> None:
+        """Delete workspaces created so far; their content cascades."""
+        if not self.created_workspace_ids:
+            return
+        try:
+            self.supabase.table("workspaces").delete().in_("id", self.created_workspace_ids).execute()
+        except Exception as e:
+            logger.error(f"Failed to roll back import of {len(self.created_workspace_ids)} workspaces: {e}")
@@ -1,34 +1,69 @@
 """Utility functions for the application."""
 
+from fastapi import HTTPException, Request, status
 from uuid import UUID
-from typing import List, Dict, Any, Optional
-from supabase import Client
+from typing import Optional
 
+from app.db import Client
+from app.loaders import workspace_role
 
-async def verify_workspace_ownership(
+# Workspace roles from least to most access (supabase/teams.sql)
+VIEWER = "viewer"
+EDITOR = "editor"
+OWNER = "owner"
+ROLES = (VIEWER, EDITOR, OWNER)
+
+
+def has_role(role: Optional[str], required: str) -> bool:
+    """Whether ``role`` grants at least what ``required`` does."""
+    return role in ROLES and ROLES.index(role) >= ROLES.index(required)
+
+
+async def require_workspace_role(
     workspace_id: UUID,
     user_id: str,
     supabase: Client,
-) -> bool:
+    role: str = VIEWER,
+) -> str:
     """
-    Verify that the user owns the workspace.
+    Verify that the user has at least ``role`` in the workspace.
+
+    Roles are cached and concurrent checks by the same user are answered
+    by one query (see app/loaders.py), so a workspace the user used lately
+    costs no call, whether it is theirs or shared with them.
 
     Args:
         workspace_id: The UUID of the workspace to verify
-        user_id: The UUID of the user to check ownership for
+        user_id: The UUID of the user to check membership for
         supabase: Authenticated Supabase client
+        role: The least role the caller needs
 
     Returns:
-        True if the user owns the workspace, False otherwise
+        The user's role in the workspace
+
+    Raises:
+        HTTPException: 404 if the user is not a member, 403 if their role is lower
     """
-    check = (
-        supabase.table("workspaces")
-        .select("id")
-        .eq("id", str(workspace_id))
-        .eq("user_id", user_id)
-        .execute()
+    actual = await workspace_role(str(workspace_id), user_id, supabase)
+    if actual is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Workspace not found",
+        )
+    if not has_role(actual, role):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Requires the {role} role in this workspace",
+        )
+    return actual
+
+
+def read_only_error() -> HTTPException:
+    """The error for a write RLS refused on a row the user can read, i.e. a viewer's."""
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Requires the editor role in this workspace",
     )
-    return bool(check.data)
 
 
 def is_over_limit(
@@ -52,149 +87,27 @@ def is_over_limit(
     return len(response.data or []) >= limit
 
 
-def seed_default_workspaces(
-    user_id: str,
-    supabase: Client,
-    existing_workspaces: Optional[List[Dict[str, Any]]] = None,
-) -> List[Dict[str, Any]]:
-    """
-    Seed default workspaces and welcome content for a new user.
+# SQLSTATEs raised by the workspace RPCs in supabase/templates.sql and teams.sql
+RPC_NOT_FOUND = "P0002"
+RPC_WORKSPACE_LIMIT = "MJ001"
+RPC_LAST_OWNER = "MJ002"
+# Raised by an insert that RLS refuses
+RLS_DENIED = "42501"
 
-    Returns the list of workspaces after seeding.
-    """
-    existing = existing_workspaces or []
-    existing_names = {w.get("name") for w in existing if w.get("name")}
-
-    defaults = [
-        ("Welcome to Moji", "Start here to learn the Moji flow"),
-        ("Personal", "Personal tasks, notes, and pages"),
-        ("Work", "Work projects and collaboration"),
-    ]
-
-    workspaces_payload = [
-        {"name": name, "description": description, "user_id": user_id}
-        for name, description in defaults
-        if name not in existing_names
-    ]
-
-    if workspaces_payload:
-        supabase.table("workspaces").insert(workspaces_payload).execute()
-
-    workspaces_response = (
-        supabase.table("workspaces")
-        .select("*")
-        .eq("user_id", user_id)
-        .order("created_at", desc=False)
-        .execute()
-    )
-    workspaces = workspaces_response.data or []
-
-    # Find the Welcome workspace
-    welcome_workspace = next((w for w in workspaces if w.get("name") == "Welcome to Moji"), None)
-    if not welcome_workspace:
-        return workspaces
-
-    welcome_id = welcome_workspace["id"]
-
-    # Starter tasks
-    tasks_payload = [
-        {
-            "content": "Add your first task - quick, actionable, and small",
-            "done": False,
-            "priority": 2,
-            "workspace_id": welcome_id,
-        },
-        {
-            "content": "Use priorities to surface what matters today",
-            "done": False,
-            "priority": 3,
-            "workspace_id": welcome_id,
-        },
-        {
-            "content": "Mark tasks done to keep momentum visible",
-            "done": False,
-            "priority": 1,
-            "workspace_id": welcome_id,
-        },
-    ]
-
-    # Starter notes
-    notes_payload = [
-        {
-            "title": "Quick memory",
-            "content": "Wi-Fi code: MOJI-2026",
-            "tags": ["example", "note"],
-            "workspace_id": welcome_id,
-        },
-        {
-            "title": "Tiny reminder",
-            "content": "Sam - design review on Tuesday",
-            "tags": ["people"],
-            "workspace_id": welcome_id,
-        },
-        {
-            "title": "Useful link",
-            "content": "https://usemoji.app - keep handy links here",
-            "tags": ["link"],
-            "workspace_id": welcome_id,
-        },
-    ]
-
-    # Starter pages
-    pages_payload = [
-        {
-            "title": "Welcome to Moji",
-            "content": (
-                "# Welcome to Moji\n\n"
-                "Moji is built for focus. Each workspace keeps a single context so your brain\n"
-                "doesn't have to switch modes all day.\n\n"
-                "## The flow\n"
-                "- **Tasks** are small, actionable steps.\n"
-                "- **Notes** are quick memory - codes, names, links.\n"
-                "- **Pages** are for evolving work: plans, drafts, docs.\n"
-            ),
-            "workspace_id": welcome_id,
-        },
-        {
-            "title": "Notes vs Pages",
-            "content": (
-                "# Notes vs Pages\n\n"
-                "Notes capture short, single-purpose bits of information.\n"
-                "Pages are where ideas grow over time.\n\n"
-                "If it changes and expands, put it in a Page. If you just need to remember it,\n"
-                "put it in a Note.\n"
-            ),
-            "workspace_id": welcome_id,
-        },
-    ]
-
-    has_tasks = (
-        supabase.table("tasks")
-        .select("id")
-        .eq("workspace_id", str(welcome_id))
-        .limit(1)
-        .execute()
-    ).data
-    has_notes = (
-        supabase.table("notes")
-        .select("id")
-        .eq("workspace_id", str(welcome_id))
-        .limit(1)
-        .execute()
-    ).data
-    has_pages = (
-        supabase.table("pages")
-        .select("id")
-        .eq("workspace_id", str(welcome_id))
-        .limit(1)
-        .execute()
-    ).data
 
-    if not has_tasks:
-        supabase.table("tasks").insert(tasks_payload).execute()
-    if not has_notes:
-        supabase.table("notes").insert(notes_payload).execute()
-    if not has_pages:
-        supabase.table("pages").insert(pages_payload).execute()
+def workspace_rpc_error(e: Exception) -> Optional[HTTPException]:
+    """Map a known error of the clone/template RPCs to an HTTPException."""
+    code = getattr(e, "code", None)
+    if code == RPC_NOT_FOUND:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workspace not found")
+    if code == RPC_WORKSPACE_LIMIT:
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Workspace limit reached")
+    return None
+
 
-    return workspaces
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether the request's ``If-None-Match`` list matches ``etag`` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
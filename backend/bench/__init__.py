@@ -0,0 +1 @@
+"""Load tests, microbenchmarks and the in-memory data backend they run against."""
@@ -0,0 +1,782 @@
+"""In-memory stand-in for the Supabase client.
+
+Implements the subset of the PostgREST query builder the routes use, with
+row-level security emulated per user and an optional simulated round-trip
+latency, so the API can be exercised end to end without a Supabase project.
+"""
+
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from app.links import extract_links, link_key
+from app.ordering import key_after, key_at
+from app.utils import EDITOR, OWNER, VIEWER, has_role
+
+# Column defaults applied on insert, mirroring supabase/schema.sql
+TABLE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "workspaces": {"description": None, "cleanup_after_days": None},
+    "tasks": {"done": False, "priority": 0, "due_date": None, "scheduled_date": None, "completed_at": None},
+    "notes": {"content": "", "tags": []},
+    "pages": {"content": "", "outline": None},
+    "links": {"page_id": None, "note_id": None},
+    "page_shares": {},
+    "workspace_members": {"role": EDITOR},
+}
+
+# Primary keys checked on plain inserts, where they are not an id
+UNIQUE_KEYS = {"workspace_members": ("workspace_id", "user_id")}
+
+# Tables with a sort_key assigned on insert
+ORDERED_TABLES = ("tasks", "notes", "pages")
+
+# Child tables removed together with their workspace (ON DELETE CASCADE)
+CASCADE_TABLES = ("tasks", "notes", "pages")
+
+# Computed fields PostgREST filters by: (table, name) -> function of the row
+COMPUTED_FIELDS: Dict[tuple, Callable[[Dict[str, Any]], Any]] = {
+    ("pages", "title_key"): lambda row: link_key(row["title"]),
+    ("notes", "title_key"): lambda row: link_key(row["title"]),
+}
+
+# Link source columns by item table (supabase/links.sql)
+LINK_SOURCES = {"pages": "page_id", "notes": "note_id"}
+
+# Rows removed together with an item (ON DELETE CASCADE): (table, column)
+ITEM_CASCADES = {
+    "pages": (("links", "page_id"), ("page_shares", "page_id")),
+    "notes": (("links", "note_id"),),
+}
+
+
+class FakeAPIError(Exception):
+    """Raised where PostgREST would answer with an error."""
+
+    def __init__(self, message: str, code: str = "PGRST000"):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeDatabase:
+    """Shared in-memory tables used by every FakeSupabase client."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables: Dict[str, List[Dict[str, Any]]] = {name: [] for name in TABLE_DEFAULTS}
+        self.rpcs: Dict[str, Callable[["FakeSupabase", Dict[str, Any]], Any]] = {
+            "ensure_default_workspaces": ensure_default_workspaces,
+            "member_workspaces": member_workspaces,
+            "clone_workspace": clone_workspace,
+            "create_workspace_from_template": create_workspace_from_template,
+            "daily_items": daily_items,
+            "daily_counts": daily_counts,
+            "sweep_completed_tasks": sweep_completed_tasks,
+            "workspace_stats": workspace_stats,
+            "rebalance_sort_keys": rebalance_sort_keys,
+            "rebuild_links": rebuild_links,
+            "shared_page": shared_page,
+        }
+        self.seeded_users: set = set()
+        self.lock = threading.RLock()
+
+    def client(self, user_id: Optional[str] = None) -> "FakeSupabase":
+        """Return a client that sees the data as ``user_id`` would under RLS."""
+        return FakeSupabase(self, user_id)
+
+    def register_rpc(self, name: str, func: Callable[["FakeSupabase", Dict[str, Any]], Any]) -> None:
+        self.rpcs[name] = func
+
+    def owned_workspace_ids(self, user_id: str) -> set:
+        """Workspaces ``user_id`` created (workspaces.user_id)."""
+        return {w["id"] for w in self.tables["workspaces"] if w["user_id"] == user_id}
+
+    def member_workspace_ids(self, user_id: str, min_role: str = VIEWER) -> set:
+        """Mirror of the member_workspace_ids() SQL function."""
+        return {
+            m["workspace_id"] for m in self.tables["workspace_members"]
+            if m["user_id"] == user_id and has_role(m["role"], min_role)
+        }
+
+    def insert_rows(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        created = []
+        with self.lock:
+            for row in rows:
+                now = _now()
+                record = {"id": str(uuid.uuid4()), **TABLE_DEFAULTS.get(table, {}), "created_at": now, "updated_at": now}
+                record.update(row)
+                if table == "tasks" and record["done"] and not record["completed_at"]:
+                    record["completed_at"] = now
+                if table in ("tasks", "notes"):
+                    # set_item_user_id trigger of supabase/daily.sql
+                    record["user_id"] = next(
+                        (w["user_id"] for w in self.tables["workspaces"] if w["id"] == record["workspace_id"]), None
+                    )
+                if table in ORDERED_TABLES and not record.get("sort_key"):
+                    # assign_sort_key trigger of supabase/ordering.sql
+                    keys = [r["sort_key"] for r in self.tables[table] if r["workspace_id"] == record["workspace_id"]]
+                    record["sort_key"] = key_after(max(filter(None, keys), default=None))
+                self.tables.setdefault(table, []).append(record)
+                created.append(dict(record))
+                if table == "workspaces":
+                    # add_workspace_owner trigger of supabase/teams.sql
+                    self.insert_rows(
+                        "workspace_members",
+                        [{"workspace_id": record["id"], "user_id": record["user_id"], "role": OWNER}],
+                    )
+        return created
+
+    def seed_user(
+        self,
+        user_id: str,
+        workspaces: int = 3,
+        tasks: int = 20,
+        notes: int = 10,
+        pages: int = 5,
+        page_size: int = 2000,
+    ) -> List[Dict[str, Any]]:
+        """Create workspaces with tasks, notes and pages for one user."""
+        self.seeded_users.add(user_id)
+        created = self.insert_rows(
+            "workspaces",
+            [{"name": f"Workspace {i}", "description": "Seeded", "user_id": user_id} for i in range(workspaces)],
+        )
+        for workspace in created:
+            ws_id = workspace["id"]
+            self.insert_rows(
+                "tasks",
+                [{"content": f"Task {i}", "priority": i % 4, "done": i % 3 == 0, "workspace_id": ws_id} for i in range(tasks)],
+            )
+            self.insert_rows(
+                "notes",
+                [{"title": f"Note {i}", "content": "note " * 20, "tags": ["seed"], "workspace_id": ws_id} for i in range(notes)],
+            )
+            self.insert_rows(
+                "pages",
+                [{"title": f"Page {i}", "content": "x" * page_size, "workspace_id": ws_id} for i in range(pages)],
+            )
+        return created
+
+
+class FakeQuery:
+    """Chainable query mirroring the PostgREST request builders."""
+
+    def __init__(self, client: "FakeSupabase", table: str):
+        self._client = client
+        self._table = table
+        self._action = "select"
+        self._payload: Any = None
+        self._columns: Optional[List[str]] = None
+        self._filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self._order: List[tuple] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._single = False
+        self._maybe_single = False
+        self._count: Optional[str] = None
+        self._on_conflict: Optional[List[str]] = None
+        self._ignore_duplicates = False
+
+    # Statements
+
+    def select(self, *columns: str, count: Optional[str] = None, head: Optional[bool] = None) -> "FakeQuery":
+        if self._action == "select" or columns:
+            spec = ",".join(columns) if columns else "*"
+            names = [c.strip() for c in spec.split(",") if c.strip()]
+            self._columns = None if "*" in names else names
+        self._count = count
+        return self
+
+    def insert(self, json: Any, **kwargs: Any) -> "FakeQuery":
+        self._action, self._payload = "insert", json
+        return self
+
+    def upsert(self, json: Any, *, on_conflict: str = "", ignore_duplicates: bool = False, **kwargs: Any) -> "FakeQuery":
+        self._action, self._payload = "upsert", json
+        self._on_conflict = on_conflict.split(",") if on_conflict else None
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json: Dict[str, Any], **kwargs: Any) -> "FakeQuery":
+        self._action, self._payload = "update", json
+        return self
+
+    def delete(self, **kwargs: Any) -> "FakeQuery":
+        self._action = "delete"
+        return self
+
+    # Filters
+
+    def _filter(self, predicate: Callable[[Dict[str, Any]], bool]) -> "FakeQuery":
+        self._filters.append(predicate)
+        return self
+
+    def _field(self, row: Dict[str, Any], column: str) -> Any:
+        computed = COMPUTED_FIELDS.get((self._table, column))
+        return computed(row) if computed else row.get(column)
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(lambda row: _compare(self._field(row, column), value) == 0)
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(lambda row: _compare(row.get(column), value) != 0)
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(lambda row: row.get(column) is not None and _compare(row[column], value) > 0)
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(lambda row: row.get(column) is not None and _compare(row[column], value) >= 0)
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(lambda row: row.get(column) is not None and _compare(row[column], value) < 0)
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self._filter(lambda row: row.get(column) is not None and _compare(row[column], value) <= 0)
+
+    def in_(self, column: str, values: List[Any]) -> "FakeQuery":
+        wanted = {str(v) for v in values}
+        return self._filter(lambda row: str(self._field(row, column)) in wanted)
+
+    def is_(self, column: str, value: Any) -> "FakeQuery":
+        expected = None if value in (None, "null") else value
+        return self._filter(lambda row: row.get(column) is expected or row.get(column) == expected)
+
+    def ilike(self, column: str, pattern: str) -> "FakeQuery":
+        # PostgREST accepts * for % in like patterns
+        regex = re.compile(_like_to_regex(pattern.replace("*", "%")), re.IGNORECASE | re.DOTALL)
+        return self._filter(lambda row: regex.fullmatch(str(row.get(column) or "")) is not None)
+
+    # Modifiers
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None, **kwargs: Any) -> "FakeQuery":
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int, **kwargs: Any) -> "FakeQuery":
+        self._limit = size
+        return self
+
+    def offset(self, size: int) -> "FakeQuery":
+        self._offset = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs: Any) -> "FakeQuery":
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def single(self) -> "FakeQuery":
+        self._single = True
+        return self
+
+    def maybe_single(self) -> "FakeQuery":
+        self._maybe_single = True
+        return self
+
+    # Execution
+
+    def execute(self) -> SimpleNamespace:
+        database = self._client.database
+        if database.latency:
+            time.sleep(database.latency)
+        with database.lock:
+            if self._action == "select":
+                data = self._run_select()
+            elif self._action in ("insert", "upsert"):
+                data = self._run_insert()
+            elif self._action == "update":
+                data = self._run_update()
+            else:
+                data = self._run_delete()
+        count = len(data) if self._count else None
+        if self._single or self._maybe_single:
+            if len(data) > 1 or (self._single and not data):
+                raise FakeAPIError("JSON object requested, multiple (or no) rows returned", "PGRST116")
+            data = data[0] if data else None
+        return SimpleNamespace(data=data, count=count)
+
+    def _visible_rows(self, action: str = "select") -> List[Dict[str, Any]]:
+        rows = self._client.database.tables.setdefault(self._table, [])
+        allowed = self._client.row_filter(self._table, action)
+        return [row for row in rows if allowed(row) and all(f(row) for f in self._filters)]
+
+    def _project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        if self._columns is None:
+            return dict(row)
+        return {column: row.get(column) for column in self._columns}
+
+    def _run_select(self) -> List[Dict[str, Any]]:
+        rows = self._visible_rows()
+        for column, desc in reversed(self._order):
+            rows.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        rows = rows[self._offset:]
+        if self._limit is not None:
+            rows = rows[: self._limit]
+        return [self._project(row) for row in rows]
+
+    def _run_insert(self) -> List[Dict[str, Any]]:
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        self._client.check_insert(self._table, payload)
+        database = self._client.database
+        columns = UNIQUE_KEYS.get(self._table)
+        if self._action == "insert" and columns:
+            keys = [tuple(row.get(column) for column in columns) for row in payload]
+            existing = {tuple(row.get(column) for column in columns) for row in database.tables[self._table]}
+            if len(set(keys)) < len(keys) or existing.intersection(keys):
+                raise FakeAPIError("duplicate key value violates unique constraint", "23505")
+        if self._action == "upsert":
+            columns = self._on_conflict or ["id"]
+
+            def key(row: Dict[str, Any]) -> tuple:
+                return tuple(row.get(column) for column in columns)
+
+            existing = {key(row): row for row in database.tables.setdefault(self._table, [])}
+            updated, fresh = [], []
+            for row in payload:
+                match = existing.get(key(row)) if None not in key(row) else None
+                if match is None:
+                    fresh.append(row)
+                elif not self._ignore_duplicates:
+                    match.update(row, updated_at=_now())
+                    updated.append(dict(match))
+            return updated + database.insert_rows(self._table, fresh)
+        return database.insert_rows(self._table, payload)
+
+    def _run_update(self) -> List[Dict[str, Any]]:
+        changed = []
+        rows = self._visible_rows("update")
+        if self._table == "workspace_members" and "role" in self._payload:
+            _keep_owner(self._client.database, rows, self._payload["role"])
+        if self._table == "workspaces" and any(row["user_id"] != self._payload.get("user_id", row["user_id"]) for row in rows):
+            # keep_workspace_creator trigger of supabase/teams.sql
+            raise FakeAPIError("workspaces.user_id cannot be changed", "42501")
+        for row in rows:
+            was_done = row.get("done")
+            row.update(self._payload)
+            if set(self._payload) != {"sort_key"}:
+                row["updated_at"] = _now()
+            if self._table == "tasks" and row.get("done") != was_done:
+                # set_tasks_completed_at trigger of supabase/cleanup.sql
+                row["completed_at"] = row["updated_at"] if row.get("done") else None
+            changed.append(self._project(row))
+        return changed
+
+    def _run_delete(self) -> List[Dict[str, Any]]:
+        database = self._client.database
+        doomed = self._visible_rows("delete")
+        if self._table == "workspace_members":
+            _keep_owner(database, doomed, None)
+        doomed_ids = {row["id"] for row in doomed}
+        table = database.tables[self._table]
+        table[:] = [row for row in table if row["id"] not in doomed_ids]
+        if self._table == "workspaces":
+            for child in (*CASCADE_TABLES, "links", "page_shares", "workspace_members"):
+                rows = database.tables.get(child, [])
+                rows[:] = [row for row in rows if row.get("workspace_id") not in doomed_ids]
+        for child, column in ITEM_CASCADES.get(self._table, ()):
+            rows = database.tables[child]
+            rows[:] = [row for row in rows if row.get(column) not in doomed_ids]
+        return [dict(row) for row in doomed]
+
+
+def _keep_owner(database: "FakeDatabase", rows: List[Dict[str, Any]], new_role: Optional[str]) -> None:
+    """Mirror of the keep_workspace_owner trigger: each workspace keeps an owner."""
+    if new_role == OWNER:
+        return
+    changed = {(row["workspace_id"], row["user_id"]) for row in rows}
+    existing = {w["id"] for w in database.tables["workspaces"]}
+    for row in rows:
+        if row["role"] != OWNER or row["workspace_id"] not in existing:
+            continue
+        if not any(
+            m["workspace_id"] == row["workspace_id"] and m["role"] == OWNER
+            and (m["workspace_id"], m["user_id"]) not in changed
+            for m in database.tables["workspace_members"]
+        ):
+            raise FakeAPIError("A workspace needs an owner", "MJ002")
+
+
+class FakeRPC:
+    """Pending call of a registered fake RPC function."""
+
+    def __init__(self, client: "FakeSupabase", fn: str, params: Dict[str, Any]):
+        self._client = client
+        self._fn = fn
+        self._params = params
+
+    def execute(self) -> SimpleNamespace:
+        database = self._client.database
+        if self._fn not in database.rpcs:
+            raise FakeAPIError(f"Could not find the function {self._fn}", "PGRST202")
+        if database.latency:
+            time.sleep(database.latency)
+        with database.lock:
+            return SimpleNamespace(data=database.rpcs[self._fn](self._client, self._params), count=None)
+
+
+# Abbreviated starter content of supabase/seed_defaults.sql
+DEFAULT_WORKSPACES = (
+    ("Welcome to Moji", "Start here to learn the Moji flow"),
+    ("Personal", "Personal tasks, notes, and pages"),
+    ("Work", "Work projects and collaboration"),
+)
+LEGACY_PERSONAL = ("Personal", "Your personal workspace")
+
+
+def ensure_default_workspaces(client: "FakeSupabase", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Mirror of the ensure_default_workspaces() SQL function.
+
+    FakeRPC holds the database lock, which stands in for the advisory lock.
+    """
+    if client.user_id is None:
+        raise FakeAPIError("Not authenticated", "42501")
+    database, uid = client.database, client.user_id
+
+    def owned() -> List[Dict[str, Any]]:
+        rows = [dict(w) for w in database.tables["workspaces"] if w["user_id"] == uid]
+        return sorted(rows, key=lambda w: w["created_at"])
+
+    if uid not in database.seeded_users:
+        existing = owned()
+        legacy = len(existing) == 1 and (existing[0]["name"], existing[0].get("description")) == LEGACY_PERSONAL
+        if not existing or legacy:
+            names = {w["name"] for w in existing}
+            database.insert_rows(
+                "workspaces",
+                [{"name": name, "description": description, "user_id": uid}
+                 for name, description in DEFAULT_WORKSPACES if name not in names],
+            )
+            welcome_id = next(w["id"] for w in owned() if w["name"] == "Welcome to Moji")
+            database.insert_rows("tasks", [
+                {"content": "Add your first task - quick, actionable, and small", "priority": 2, "workspace_id": welcome_id},
+                {"content": "Use priorities to surface what matters today", "priority": 3, "workspace_id": welcome_id},
+                {"content": "Mark tasks done to keep momentum visible", "priority": 1, "workspace_id": welcome_id},
+            ])
+            database.insert_rows("notes", [
+                {"title": "Quick memory", "content": "Wi-Fi code: MOJI-2026", "tags": ["example", "note"], "workspace_id": welcome_id},
+                {"title": "Tiny reminder", "content": "Sam - design review on Tuesday", "tags": ["people"], "workspace_id": welcome_id},
+                {"title": "Useful link", "content": "https://usemoji.app - keep handy links here", "tags": ["link"], "workspace_id": welcome_id},
+            ])
+            database.insert_rows("pages", [
+                {"title": "Welcome to Moji", "content": "# Welcome to Moji\n", "workspace_id": welcome_id},
+                {"title": "Notes vs Pages", "content": "# Notes vs Pages\n", "workspace_id": welcome_id},
+            ])
+        database.seeded_users.add(uid)
+    return owned()
+
+
+def member_workspaces(client: "FakeSupabase", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Mirror of the member_workspaces() SQL function."""
+    ensure_default_workspaces(client, params)
+    ids = client.database.member_workspace_ids(client.user_id)
+    rows = [dict(w) for w in client.database.tables["workspaces"] if w["id"] in ids]
+    return sorted(rows, key=lambda w: w["created_at"])
+
+
+def _create_workspace(client: "FakeSupabase", params: Dict[str, Any], name: str, description: Any) -> Dict[str, Any]:
+    """Quota check and workspace insert shared by the clone and template RPCs."""
+    if client.user_id is None:
+        raise FakeAPIError("Not authenticated", "42501")
+    database = client.database
+    if len(database.owned_workspace_ids(client.user_id)) >= params.get("max_workspaces", 20):
+        raise FakeAPIError("Workspace limit reached", "MJ001")
+    row = {"name": params.get("new_name") or name, "description": description, "user_id": client.user_id}
+    return database.insert_rows("workspaces", [row])[0]
+
+
+def clone_workspace(client: "FakeSupabase", params: Dict[str, Any]) -> Dict[str, Any]:
+    """Mirror of the clone_workspace() SQL function."""
+    database = client.database
+    source = next(
+        (w for w in database.tables["workspaces"] if w["id"] == params["source_id"] and w["user_id"] == client.user_id),
+        None,
+    )
+    if source is None:
+        raise FakeAPIError("Workspace not found", "P0002")
+    created = _create_workspace(client, params, source["name"][:93] + " (copy)", source.get("description"))
+    for table in CASCADE_TABLES:
+        copies = [
+            {key: value for key, value in row.items() if key not in ("id", "updated_at")}
+            for row in database.tables[table]
+            if row["workspace_id"] == source["id"]
+        ]
+        database.insert_rows(table, [{**row, "workspace_id": created["id"]} for row in copies])
+    return created
+
+
+def create_workspace_from_template(client: "FakeSupabase", params: Dict[str, Any]) -> Dict[str, Any]:
+    """Mirror of the create_workspace_from_template() SQL function."""
+    template = params["template"]
+    created = _create_workspace(client, params, template["name"], template.get("description"))
+    today = datetime.now(timezone.utc).date()
+    for table in CASCADE_TABLES:
+        items = []
+        for item in template.get(table, []):
+            item = {**item, "workspace_id": created["id"]}
+            for column in ("due_date", "scheduled_date"):
+                # Days from CURRENT_DATE, as in daily.sql
+                days = item.pop(column.replace("_date", "_in_days"), None)
+                if item.get(column) is None and days is not None:
+                    item[column] = (today + timedelta(days=days)).isoformat()
+            items.append(item)
+        client.database.insert_rows(table, items)
+    return created
+
+
+class FakeAdminAuth:
+    def __init__(self, database: FakeDatabase):
+        self._database = database
+
+    def delete_user(self, user_id: str) -> None:
+        self._database.seeded_users.discard(user_id)
+        FakeQuery(FakeSupabase(self._database), "workspaces").delete().eq("user_id", user_id).execute()
+        # workspace_members.user_id ON DELETE CASCADE
+        members = self._database.tables["workspace_members"]
+        members[:] = [m for m in members if m["user_id"] != user_id]
+
+
+class FakeAuth:
+    def __init__(self, database: FakeDatabase):
+        self.admin = FakeAdminAuth(database)
+
+
+class FakeSupabase:
+    """Client bound to one user (RLS applies) or to none (service role)."""
+
+    def __init__(self, database: FakeDatabase, user_id: Optional[str] = None):
+        self.database = database
+        self.user_id = user_id
+        self.auth = FakeAuth(database)
+
+    def table(self, table_name: str) -> FakeQuery:
+        return FakeQuery(self, table_name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> FakeRPC:
+        return FakeRPC(self, fn, params or {})
+
+    def row_filter(self, table: str, action: str = "select") -> Callable[[Dict[str, Any]], bool]:
+        """Emulate the RLS policies of supabase/teams.sql for ``action``."""
+        if self.user_id is None:
+            return lambda row: True
+        database, uid = self.database, self.user_id
+        if table == "workspaces":
+            if action == "insert":
+                return lambda row: row.get("user_id") == uid
+            if action == "select":
+                visible = database.member_workspace_ids(uid)
+                return lambda row: row.get("user_id") == uid or row.get("id") in visible
+            owned = database.member_workspace_ids(uid, OWNER)
+            return lambda row: row.get("id") in owned
+        if table == "workspace_members" and action != "select":
+            owned = database.member_workspace_ids(uid, OWNER)
+            if action == "delete":
+                return lambda row: row.get("user_id") == uid or row.get("workspace_id") in owned
+            return lambda row: row.get("workspace_id") in owned
+        allowed = database.member_workspace_ids(uid, VIEWER if action == "select" else EDITOR)
+        return lambda row: row.get("workspace_id") in allowed
+
+    def check_insert(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        if self.user_id is None:
+            return
+        allowed = self.row_filter(table, "insert")
+        for row in rows:
+            if not allowed(row):
+                raise FakeAPIError("new row violates row-level security policy", "42501")
+
+
+def _like_to_regex(pattern: str) -> str:
+    """Translate a LIKE pattern (``%``, ``_`` and backslash escapes) to a regex."""
+    parts, chars = [], iter(pattern)
+    for char in chars:
+        if char == "\\":
+            parts.append(re.escape(next(chars, "\\")))
+        elif char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
+def _compare(left: Any, right: Any) -> int:
+    """Compare like PostgREST does on the wire: as text unless both are numbers."""
+    if isinstance(left, bool) or isinstance(right, bool):
+        left, right = str(left).lower(), str(right).lower()
+    elif not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
+        left, right = str(left), str(right)
+    return (left > right) - (left < right)
+
+
+def daily_items(client: "FakeSupabase", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Mirror of the daily_items() SQL function."""
+    if client.user_id is None:
+        raise FakeAPIError("Not authenticated", "42501")
+    database = client.database
+    owned = database.owned_workspace_ids(client.user_id)
+    start, end = params["range_start"], params["range_end"]
+    zone = ZoneInfo(params.get("tz") or "UTC")
+    rows = []
+    for task in database.tables["tasks"]:
+        if task["workspace_id"] not in owned:
+            continue
+        days = {task.get("scheduled_date"), task.get("due_date")} - {None}
+        for day in days:
+            if start <= day <= end:
+                rows.append({
+                    "kind": "task", "day": day, "id": task["id"], "workspace_id": task["workspace_id"],
+                    "title": task["content"], "done": task["done"], "priority": task["priority"],
+                    "due_date": task.get("due_date"), "scheduled_date": task.get("scheduled_date"),
+                })
+    for note in database.tables["notes"]:
+        if note["workspace_id"] not in owned:
+            continue
+        day = datetime.fromisoformat(note["created_at"]).astimezone(zone).date().isoformat()
+        if start <= day <= end:
+            rows.append({
+                "kind": "note", "day": day, "id": note["id"], "workspace_id": note["workspace_id"],
+                "title": note["title"], "done": None, "priority": None, "due_date": None, "scheduled_date": None,
+            })
+    rows.sort(key=lambda row: (row["day"], row["kind"] != "task", -(row["priority"] or 0)))
+    return rows
+
+
+def daily_counts(client: "FakeSupabase", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Mirror of the daily_counts() SQL function."""
+    counts: Dict[str, Dict[str, Any]] = {}
+    for row in daily_items(client, params):
+        day = counts.setdefault(row["day"], {"day": row["day"], "tasks": 0, "done": 0, "notes": 0})
+        if row["kind"] == "task":
+            day["tasks"] += 1
+            day["done"] += bool(row["done"])
+        else:
+            day["notes"] += 1
+    return sorted(counts.values(), key=lambda day: day["day"])
+
+
+def sweep_completed_tasks(client: "FakeSupabase", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Mirror of the sweep_completed_tasks() SQL function."""
+    if client.user_id is not None:
+        raise FakeAPIError("permission denied for function sweep_completed_tasks", "42501")
+    database = client.database
+    now = datetime.now(timezone.utc)
+    retention = {w["id"]: w.get("cleanup_after_days") for w in database.tables["workspaces"]}
+
+    def expires_at(task: Dict[str, Any]) -> Optional[str]:
+        # The expires_at column kept by the triggers of supabase/cleanup.sql
+        days = retention.get(task["workspace_id"])
+        if not (task["done"] and task.get("completed_at") and days):
+            return None
+        return (datetime.fromisoformat(task["completed_at"]) + timedelta(days=days)).isoformat()
+
+    cursor = (params["after_expires_at"], params["after_id"]) if params.get("after_expires_at") else None
+    batch = sorted(
+        ((expires, task) for task in database.tables["tasks"]
+         for expires in [expires_at(task)]
+         if expires and datetime.fromisoformat(expires) < now
+         and (cursor is None or (expires, task["id"]) > cursor)),
+        key=lambda item: (item[0], item[1]["id"]),
+    )[: params["batch_size"]]
+    expired = {task["id"] for _, task in batch}
+    if params.get("archive"):
+        archived = database.tables.setdefault("archived_tasks", [])
+        archived.extend(dict(task, archived_at=_now()) for _, task in batch)
+    database.tables["tasks"][:] = [task for task in database.tables["tasks"] if task["id"] not in expired]
+    last_expires, last = batch[-1] if batch else (None, {})
+    return [{
+        "scanned": len(batch),
+        "swept": len(expired),
+        "last_expires_at": last_expires,
+        "last_id": last.get("id"),
+    }]
+
+
+def workspace_stats(client: "FakeSupabase", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Mirror of the workspace_stats() SQL function."""
+    if client.user_id is None:
+        raise FakeAPIError("Not authenticated", "42501")
+    database = client.database
+    ids = database.member_workspace_ids(client.user_id)
+    workspaces = sorted(
+        (w for w in database.tables["workspaces"] if w["id"] in ids),
+        key=lambda w: w["created_at"],
+    )
+    stats = []
+    for workspace in workspaces:
+        open_tasks = [t for t in database.tables["tasks"] if t["workspace_id"] == workspace["id"] and not t["done"]]
+        stats.append({
+            "workspace_id": workspace["id"],
+            "open_tasks": len(open_tasks),
+            "high_priority_tasks": sum(1 for t in open_tasks if t["priority"] == 3),
+            "notes": sum(1 for n in database.tables["notes"] if n["workspace_id"] == workspace["id"]),
+            "pages": sum(1 for p in database.tables["pages"] if p["workspace_id"] == workspace["id"]),
+        })
+    return stats
+
+
+def rebuild_links(client: "FakeSupabase", params: Dict[str, Any]) -> int:
+    """Mirror of the rebuild_links() SQL function."""
+    database, workspace_ids = client.database, set(params["workspace_ids"])
+    allowed = client.row_filter("links", "insert")
+    links = database.tables["links"]
+    links[:] = [row for row in links if not (row["workspace_id"] in workspace_ids and allowed(row))]
+    rows = [
+        {
+            "workspace_id": item["workspace_id"],
+            column: item["id"],
+            "source_title": item["title"],
+            "target_key": key,
+            "target_title": title,
+        }
+        for table, column in LINK_SOURCES.items()
+        for item in database.tables[table]
+        if item["workspace_id"] in workspace_ids and allowed(item)
+        for key, title in extract_links(item.get("content")).items()
+    ]
+    return len(database.insert_rows("links", rows))
+
+
+def shared_page(client: "FakeSupabase", params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Mirror of the shared_page() SQL function (SECURITY DEFINER: no RLS)."""
+    database = client.database
+    share = next((s for s in database.tables["page_shares"] if s["token"] == params["share_token"]), None)
+    page = share and next((p for p in database.tables["pages"] if p["id"] == share["page_id"]), None)
+    if page is None:
+        return []
+    return [
+        {
+            "page_id": page["id"],
+            "workspace_id": page["workspace_id"],
+            "title": page["title"],
+            "content": page["content"],
+            "updated_at": page["updated_at"],
+        }
+    ]
+
+
+def rebalance_sort_keys(client: "FakeSupabase", params: Dict[str, Any]) -> int:
+    """Mirror of the rebalance_sort_keys() SQL function."""
+    if client.user_id is not None:
+        raise FakeAPIError("permission denied for function rebalance_sort_keys", "42501")
+    rows = sorted(
+        (r for r in client.database.tables[params["target"]] if r["workspace_id"] == params["target_workspace"]),
+        key=lambda r: (r["sort_key"], r["created_at"], r["id"]),
+    )
+    updated = 0
+    for n, row in enumerate(rows, start=1):
+        key = key_at(n)
+        if row["sort_key"] != key:
+            row["sort_key"] = key
+            updated += 1
+    return updated
+
@@ -0,0 +1,99 @@
+"""Local HTTP server standing in for Supabase's REST and auth endpoints.
+
+Unlike ``fake_supabase.py``, which replaces the client, this serves real
+HTTP on 127.0.0.1, so requests go through supabase-py, the pooled httpx
+client and its timeouts. Tests script it to answer slowly or fail::
+
+    with FakeUpstream() as upstream:
+        upstream.fail_next(2, status=503)
+        upstream.delay = 0.5
+        client = create_client(upstream.url, key)
+
+Every table answers ``[]``, ``/auth/v1/user`` answers a fixed user and
+``/auth/v1/health`` answers ``{}``.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+USER = {"id": "00000000-0000-4000-8000-000000000001", "aud": "authenticated", "email": "fake@example.com"}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address) -> None:
+        pass  # clients hang up on purpose (timeouts, losing hedges)
+
+
+class FakeUpstream:
+    """Threaded fake Supabase; use as a context manager."""
+
+    def __init__(self) -> None:
+        self.delay = 0.0  # seconds before every answer
+        self.delays: List[float] = []  # per-request delays, consumed first
+        self.requests: List[Tuple[str, str]] = []
+        self._failures: List[int] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fail_next(self, count: int, status: int = 503) -> None:
+        """Answer the next ``count`` requests with ``status``."""
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def _next(self, method: str, path: str) -> Tuple[Optional[int], float]:
+        with self._lock:
+            self.requests.append((method, path))
+            failure = self._failures.pop(0) if self._failures else None
+            delay = self.delays.pop(0) if self.delays else self.delay
+        return failure, delay
+
+    def __enter__(self) -> "FakeUpstream":
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _answer(self) -> None:
+                length = int(self.headers.get("content-length") or 0)
+                if length:
+                    self.rfile.read(length)
+                failure, delay = upstream._next(self.command, self.path)
+                if delay:
+                    time.sleep(delay)
+                if failure:
+                    status, body = failure, {"message": "upstream unavailable"}
+                elif self.path.startswith("/auth/v1/user"):
+                    status, body = 200, USER
+                elif self.path.startswith("/auth/v1/"):
+                    status, body = 200, {}
+                else:
+                    status, body = 200, []
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _answer
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
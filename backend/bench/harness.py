@@ -0,0 +1,81 @@
+"""Wire the FastAPI app to the in-memory data backend.
+
+Bearer tokens are taken as user IDs, rate limiting is switched off and the
+Supabase dependencies are overridden with FakeSupabase clients. Serving
+``bench.harness:app`` with uvicorn builds a seeded app on first access; it
+reads ``BENCH_USERS`` and ``BENCH_LATENCY_MS`` from the environment.
+"""
+
+import os
+from types import SimpleNamespace
+from typing import Annotated, List
+
+from fastapi import Depends, FastAPI
+from fastapi.security import HTTPAuthorizationCredentials
+
+from bench.fake_supabase import FakeDatabase
+
+# Settings are required at import time; harmless placeholders for local runs.
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench-anon-key-000000000000")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench-service-key-000000000000")
+
+from app.db import instrument  # noqa: E402
+from app.dependencies import (  # noqa: E402
+    get_authenticated_client,
+    get_current_user,
+    get_supabase_client,
+    security,
+)
+from app.main import app as moji_app  # noqa: E402
+from app.middleware import limiter  # noqa: E402
+
+
+def user_ids(count: int) -> List[str]:
+    return [f"00000000-0000-4000-8000-{i:012d}" for i in range(count)]
+
+
+def install_fake_backend(app: FastAPI, database: FakeDatabase) -> None:
+    """Route the app's Supabase dependencies to ``database``."""
+
+    async def fake_current_user(
+        credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    ):
+        return SimpleNamespace(id=credentials.credentials, email=None, user_metadata={})
+
+    def fake_authenticated_client(
+        credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    ):
+        return instrument(database.client(credentials.credentials))
+
+    app.dependency_overrides[get_current_user] = fake_current_user
+    app.dependency_overrides[get_authenticated_client] = fake_authenticated_client
+    # Anonymous callers only reach SECURITY DEFINER functions, which the fake runs unrestricted
+    app.dependency_overrides[get_supabase_client] = lambda: instrument(database.client())
+    limiter.enabled = False
+
+
+def uninstall_fake_backend(app: FastAPI) -> None:
+    """Undo install_fake_backend."""
+    app.dependency_overrides.clear()
+    limiter.enabled = True
+
+
+def build_app(users: int = 10, latency: float = 0.0) -> FastAPI:
+    """Return the Moji app backed by a freshly seeded FakeDatabase."""
+    database = FakeDatabase(latency=latency)
+    for user_id in user_ids(users):
+        database.seed_user(user_id)
+    install_fake_backend(moji_app, database)
+    moji_app.state.fake_database = database
+    return moji_app
+
+
+def __getattr__(name: str):
+    # Built lazily so importing the helpers above has no side effects
+    if name == "app":
+        return build_app(
+            users=int(os.environ.get("BENCH_USERS", "10")),
+            latency=float(os.environ.get("BENCH_LATENCY_MS", "0")) / 1000,
+        )
+    raise AttributeError(name)
@@ -0,0 +1,324 @@
+"""End-to-end load test with per-route latency percentiles.
+
+Runs virtual users through realistic Moji sessions (open a workspace, toggle
+tasks, autosave a page, create notes) against the app backed by the
+in-memory data backend, either in-process over ASGI or under uvicorn.
+
+Usage (from backend/):
+
+    python -m bench.loadtest --duration 20 --concurrency 16 --latency-ms 3
+    python -m bench.loadtest --mode uvicorn --output results.json
+    python -m bench.loadtest --baseline bench/baselines/loadtest.json
+    python -m bench.loadtest --baseline bench/baselines/loadtest.json --update-baseline
+
+With ``--baseline`` the run is compared route by route; the exit code is 1
+when a route's p95 or the overall throughput regresses beyond
+``--tolerance``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+API = "/api/v1"
+
+# Relative frequency of each scenario in the session mix
+SCENARIO_WEIGHTS = {
+    "open_workspace": 4,
+    "toggle_task": 3,
+    "autosave_page": 3,
+    "create_note": 1,
+}
+
+
+@dataclass
+class RouteStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+
+class Recorder:
+    """Collects latency samples keyed by route template."""
+
+    def __init__(self) -> None:
+        self.routes: Dict[str, RouteStats] = defaultdict(RouteStats)
+
+    async def call(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        stats = self.routes[route]
+        stats.latencies.append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            stats.errors += 1
+        return response
+
+
+class VirtualUser:
+    """One simulated user working through the scenario mix."""
+
+    def __init__(self, user_id: str, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.headers = {"Authorization": f"Bearer {user_id}"}
+        self.workspace_id: Optional[str] = None
+        self.task_ids: List[str] = []
+        self.page_ids: List[str] = []
+
+    async def request(self, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self.recorder.call(self.client, route, method, url, headers=self.headers, **kwargs)
+
+    async def open_workspace(self) -> None:
+        """Sidebar load followed by the workspace view's parallel fetches."""
+        response = await self.request("GET /workspaces/", "GET", f"{API}/workspaces/")
+        workspaces = response.json() if response.status_code == 200 else []
+        if not workspaces:
+            return
+        self.workspace_id = self.rng.choice(workspaces)["id"]
+        base = f"{API}/workspaces/{self.workspace_id}"
+        tasks, _, pages = await asyncio.gather(
+            self.request("GET /workspaces/{workspace_id}/tasks", "GET", f"{base}/tasks"),
+            self.request("GET /workspaces/{workspace_id}/notes", "GET", f"{base}/notes"),
+            self.request("GET /workspaces/{workspace_id}/pages", "GET", f"{base}/pages"),
+        )
+        self.task_ids = [t["id"] for t in tasks.json()] if tasks.status_code == 200 else []
+        self.page_ids = [p["id"] for p in pages.json()] if pages.status_code == 200 else []
+
+    async def toggle_task(self) -> None:
+        if not self.task_ids:
+            return
+        task_id = self.rng.choice(self.task_ids)
+        await self.request("PATCH /tasks/{task_id}/toggle", "PATCH", f"{API}/tasks/{task_id}/toggle")
+
+    async def autosave_page(self) -> None:
+        """Open a page and save it a few times, as the editor's autosave does."""
+        if not self.page_ids:
+            return
+        page_id = self.rng.choice(self.page_ids)
+        response = await self.request("GET /pages/{page_id}", "GET", f"{API}/pages/{page_id}")
+        content = response.json().get("content", "") if response.status_code == 200 else ""
+        for i in range(3):
+            content += f"\nEdit {i} at {time.time():.3f}"
+            await self.request(
+                "PUT /pages/{page_id}", "PUT", f"{API}/pages/{page_id}", json={"content": content[-4000:]}
+            )
+
+    async def create_note(self) -> None:
+        """Create a note and remove it again so the workspace stays under quota."""
+        if not self.workspace_id:
+            return
+        response = await self.request(
+            "POST /workspaces/{workspace_id}/notes",
+            "POST",
+            f"{API}/workspaces/{self.workspace_id}/notes",
+            json={"title": "Load test", "content": "Quick memory", "tags": ["bench"]},
+        )
+        if response.status_code == 201:
+            note_id = response.json()["id"]
+            await self.request("DELETE /notes/{note_id}", "DELETE", f"{API}/notes/{note_id}")
+
+    async def run(self, deadline: float) -> None:
+        await self.open_workspace()
+        names = list(SCENARIO_WEIGHTS)
+        weights = list(SCENARIO_WEIGHTS.values())
+        while time.perf_counter() < deadline:
+            scenario = self.rng.choices(names, weights)[0]
+            await getattr(self, scenario)()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def summarize(recorder: Recorder, elapsed: float, meta: dict) -> dict:
+    routes = {}
+    total = errors = 0
+    for route, stats in sorted(recorder.routes.items()):
+        values = sorted(stats.latencies)
+        total += len(values)
+        errors += stats.errors
+        routes[route] = {
+            "count": len(values),
+            "errors": stats.errors,
+            "rps": round(len(values) / elapsed, 2),
+            "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 3),
+            "p95_ms": round(percentile(values, 95) * 1000, 3),
+            "p99_ms": round(percentile(values, 99) * 1000, 3),
+        }
+    return {
+        "meta": {**meta, "elapsed_s": round(elapsed, 3)},
+        "total": {"requests": total, "errors": errors, "rps": round(total / elapsed, 2)},
+        "routes": routes,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Return human-readable regressions of ``current`` against ``baseline``."""
+    regressions = []
+    base_rps = baseline.get("total", {}).get("rps", 0)
+    if base_rps and current["total"]["rps"] < base_rps * (1 - tolerance):
+        regressions.append(f"throughput {current['total']['rps']} rps < baseline {base_rps} rps")
+    for route, base in baseline.get("routes", {}).items():
+        now = current["routes"].get(route)
+        if now is None:
+            continue
+        if base["p95_ms"] and now["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{route}: p95 {now['p95_ms']}ms > baseline {base['p95_ms']}ms")
+        if now["errors"] > base.get("errors", 0):
+            regressions.append(f"{route}: {now['errors']} errors (baseline {base.get('errors', 0)})")
+    return regressions
+
+
+def print_report(result: dict, baseline: Optional[dict]) -> None:
+    print(f"{'route':<42} {'count':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for route, stats in result["routes"].items():
+        line = (
+            f"{route:<42} {stats['count']:>7} {stats['rps']:>8} {stats['p50_ms']:>8} "
+            f"{stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['errors']:>5}"
+        )
+        base = (baseline or {}).get("routes", {}).get(route)
+        if base and base["p95_ms"]:
+            line += f"  p95 {(stats['p95_ms'] / base['p95_ms'] - 1) * 100:+.0f}%"
+        print(line)
+    total = result["total"]
+    print(f"\ntotal: {total['requests']} requests, {total['errors']} errors, {total['rps']} rps")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_ready(base_url: str, timeout: float = 20.0) -> None:
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server at {base_url} did not become ready")
+
+
+async def run_load(args: argparse.Namespace) -> dict:
+    from bench.harness import user_ids
+
+    server = None
+    if args.mode == "uvicorn":
+        port = _free_port()
+        env = {**os.environ, "BENCH_USERS": str(args.users), "BENCH_LATENCY_MS": str(args.latency_ms)}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "bench.harness:app", "--port", str(port), "--log-level", "warning"],
+            env=env,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        await _wait_until_ready(base_url)
+        transport = None
+    else:
+        from bench.harness import build_app
+
+        app = build_app(users=args.users, latency=args.latency_ms / 1000)
+        base_url = "http://bench"
+        transport = httpx.ASGITransport(app=app)
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, transport=transport, limits=limits, timeout=30) as client:
+            users = user_ids(args.users)
+            rng = random.Random(args.seed)
+            start = time.perf_counter()
+            deadline = start + args.duration
+            vus = [
+                VirtualUser(users[i % len(users)], client, recorder, random.Random(rng.random()))
+                for i in range(args.concurrency)
+            ]
+            await asyncio.gather(*(vu.run(deadline) for vu in vus))
+            elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    meta = {
+        "mode": args.mode,
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "latency_ms": args.latency_ms,
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    return summarize(recorder, elapsed, meta)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Moji API load test")
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn"), default="inprocess")
+    parser.add_argument("--users", type=int, default=10, help="distinct seeded users")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users running in parallel")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated Supabase round-trip time")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite --baseline with this run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    # Per-request client logging would dominate the measurement
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    result = asyncio.run(run_load(args))
+
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    print_report(result, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print("\nregressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nno regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""Microbenchmarks for the per-request building blocks.
+
+Each benchmark isolates one hot path: the middleware chain, Pydantic
+validation and serialization of task/note/page lists, ``handle_exception``,
+settings access, Supabase client construction and JWT decoding in
+``get_current_user``. Timings use ``timeit`` with the garbage collector
+disabled and report the best and median of several repeats, which keeps
+numbers comparable between runs on the same machine.
+
+Usage (from backend/):
+
+    python -m bench.micro                     # run everything
+    python -m bench.micro --filter validate   # substring match on names
+    python -m bench.micro --list
+    python -m bench.micro --baseline bench/baselines/micro.json
+    python -m bench.micro --baseline bench/baselines/micro.json --update-baseline
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import timeit
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from unittest.mock import patch
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench-anon-key-000000000000")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench-service-key-000000000000")
+
+# A factory does the setup and returns (operation, operations per call)
+Factory = Callable[[], Tuple[Callable[[], object], int]]
+BENCHMARKS: Dict[str, Factory] = {}
+
+# Teardown callbacks registered by the benchmark being measured
+CLEANUPS: List[Callable[[], None]] = []
+
+LIST_SIZES = (1, 50, 500)
+
+
+def benchmark(name: str) -> Callable[[Factory], Factory]:
+    def register(factory: Factory) -> Factory:
+        BENCHMARKS[name] = factory
+        return factory
+
+    return register
+
+
+def _rows(kind: str, count: int) -> List[dict]:
+    now = datetime.now(timezone.utc).isoformat()
+    workspace_id = str(uuid.uuid4())
+    rows = []
+    for i in range(count):
+        row = {"id": str(uuid.uuid4()), "workspace_id": workspace_id, "created_at": now, "updated_at": now}
+        if kind == "task":
+            row.update(content=f"Task {i}", done=i % 2 == 0, priority=i % 4)
+        elif kind == "note":
+            row.update(title=f"Note {i}", content="note " * 40, tags=["a", "b"])
+        else:
+            row.update(title=f"Page {i}", content="# Title\n\n" + "Lorem ipsum " * 400)
+        rows.append(row)
+    return rows
+
+
+def _asgi_requests(app, path: str, batch: int = 50) -> Callable[[], object]:
+    """Return an operation that pushes ``batch`` GET requests through ``app``."""
+    loop = asyncio.new_event_loop()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def run():
+        for _ in range(batch):
+            await app(dict(scope), receive, send)
+
+    return lambda: loop.run_until_complete(run())
+
+
+@benchmark("middleware_chain:/health")
+def bench_middleware_chain():
+    from app.main import app
+    from app.middleware import limiter
+
+    # The limiter would start answering 429 after 100 requests
+    limiter.enabled = False
+    CLEANUPS.append(lambda: setattr(limiter, "enabled", True))
+    return _asgi_requests(app, "/health"), 50
+
+
+@benchmark("middleware_chain:bare_route")
+def bench_bare_route():
+    """The same handler without middleware, to isolate the chain's cost."""
+    from fastapi import FastAPI
+
+    bare = FastAPI()
+
+    @bare.get("/health")
+    async def health():
+        return {"status": "healthy", "service": "moji-api", "version": "0.1.0"}
+
+    return _asgi_requests(bare, "/health"), 50
+
+
+def _register_model_benchmarks() -> None:
+    from pydantic import TypeAdapter
+
+    from app.models.note import Note
+    from app.models.page import Page
+    from app.models.task import Task
+
+    for kind, model in (("task", Task), ("note", Note), ("page", Page)):
+        adapter = TypeAdapter(List[model])
+        for size in LIST_SIZES:
+
+            def validate(adapter=adapter, kind=kind, size=size):
+                rows = _rows(kind, size)
+                return (lambda: adapter.validate_python(rows)), 1
+
+            def serialize(adapter=adapter, kind=kind, size=size):
+                items = adapter.validate_python(_rows(kind, size))
+                return (lambda: adapter.dump_json(items)), 1
+
+            BENCHMARKS[f"validate:{kind}[{size}]"] = validate
+            BENCHMARKS[f"serialize:{kind}[{size}]"] = serialize
+
+
+_register_model_benchmarks()
+
+
+def _quiet_logging() -> None:
+    """Send log output to memory so formatting is measured but not printed."""
+    root = logging.getLogger()
+    root.handlers = [logging.StreamHandler(io.StringIO())]
+
+
+@benchmark("handle_exception:generic")
+def bench_handle_exception():
+    from app.exceptions import handle_exception
+
+    _quiet_logging()
+    try:
+        raise ValueError("boom")
+    except ValueError as e:
+        error = e
+    return (lambda: handle_exception(error, "Fetching tasks", debug=False)), 1
+
+
+@benchmark("handle_exception:http")
+def bench_handle_http_exception():
+    from fastapi import HTTPException
+
+    from app.exceptions import handle_exception
+
+    _quiet_logging()
+    error = HTTPException(status_code=404, detail="Workspace not found")
+    return (lambda: handle_exception(error, "Fetching tasks", debug=False)), 1
+
+
+@benchmark("settings:get_settings")
+def bench_get_settings():
+    from app.config import get_settings
+
+    get_settings()
+    return (lambda: get_settings().debug), 1
+
+
+@benchmark("settings:construct")
+def bench_construct_settings():
+    from app.config import Settings
+
+    return Settings, 1
+
+
+@benchmark("client:create_client")
+def bench_create_client():
+    """Client construction, which get_current_user and get_authenticated_client pay per request."""
+    from supabase import create_client
+
+    from app.config import get_settings
+
+    settings = get_settings()
+    return (lambda: create_client(settings.supabase_url, settings.supabase_anon_key)), 1
+
+
+def _token() -> str:
+    from jose import jwt
+
+    claims = {"sub": str(uuid.uuid4()), "email": "bench@example.com", "user_metadata": {"name": "Bench"}}
+    return jwt.encode(claims, "bench-secret", algorithm="HS256")
+
+
+@benchmark("auth:get_current_user_jwt_fallback")
+def bench_get_current_user():
+    """JWT decode path of get_current_user, with the Supabase auth call stubbed out."""
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from app.dependencies import get_current_user
+
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=_token())
+    func = getattr(get_current_user, "__wrapped__", get_current_user)
+    loop = asyncio.new_event_loop()
+    batch = 50
+
+    async def run():
+        for _ in range(batch):
+            await func(credentials)
+
+    patcher = patch("app.dependencies.create_client")
+    create = patcher.start()
+    create.return_value.auth.get_user.side_effect = TypeError
+    CLEANUPS.append(patcher.stop)
+    return (lambda: loop.run_until_complete(run())), batch
+
+
+@benchmark("auth:jwt_get_unverified_claims")
+def bench_jwt_claims():
+    from jose import jwt
+
+    token = _token()
+    return (lambda: jwt.get_unverified_claims(token)), 1
+
+
+def measure(factory: Factory, repeat: int, min_time: float) -> dict:
+    op, per_call = factory()
+    try:
+        op()  # warm up caches and lazy imports
+        timer = timeit.Timer(op)
+        number, elapsed = timer.autorange()
+        if elapsed < min_time:
+            number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+        runs = [t / number / per_call for t in timer.repeat(repeat=repeat, number=number)]
+    finally:
+        while CLEANUPS:
+            CLEANUPS.pop()()
+    return {
+        "best_us": round(min(runs) * 1e6, 3),
+        "median_us": round(statistics.median(runs) * 1e6, 3),
+        "ops": number * per_call,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, base in baseline.get("benchmarks", {}).items():
+        now = current["benchmarks"].get(name)
+        if now and base["best_us"] and now["best_us"] > base["best_us"] * (1 + tolerance):
+            regressions.append(f"{name}: {now['best_us']}us > baseline {base['best_us']}us")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Moji backend microbenchmarks")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per repeat")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    results = {}
+    print(f"{'benchmark':<42} {'best':>12} {'median':>12}")
+    for name in names:
+        results[name] = stats = measure(BENCHMARKS[name], args.repeat, args.min_time)
+        line = f"{name:<42} {stats['best_us']:>10.2f}us {stats['median_us']:>10.2f}us"
+        base = (baseline or {}).get("benchmarks", {}).get(name)
+        if base and base["best_us"]:
+            line += f"  {(stats['best_us'] / base['best_us'] - 1) * 100:+.0f}%"
+        print(line, flush=True)
+
+    result = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "benchmarks": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+    if args.baseline and args.update_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as fh:
+                previous = json.load(fh).get("benchmarks", {})
+            result["benchmarks"] = {**previous, **results}
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print("\nregressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Benchmark of the self-hosted SQLite API (app.py), tuned against as it was.
+
+Each mode gets a fresh database file under a temporary directory, one user
+and workspace, and then:
+
+- seed: ``--rows`` tasks inserted. Legacy commits each row (``save()``);
+  tuned uses ``Task.bulk_insert``, one transaction per 1000 rows.
+- list: ``GET /tasks`` ``--repeat`` times. Legacy walks
+  ``user.workspaces[0].tasks`` and serializes ORM objects one by one; tuned
+  selects the columns through the workspace index (``fetch_dicts``) and
+  formats dates with ``serialization.JSONProvider``.
+- writes: ``--writes`` single-task POSTs, one commit each, as the frontend
+  sends them.
+
+Legacy runs without the SQLite pragmas (rollback journal, synchronous=FULL)
+and without the indexes, as the tables were before. Both modes need Flask
+and Flask-SQLAlchemy (``pip install flask flask-sqlalchemy flask-cors``).
+
+Usage (from backend/):
+
+    python -m bench.selfhost
+    python -m bench.selfhost --rows 50000 --repeat 20 --output selfhost.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from flask import Blueprint, Flask, jsonify
+
+from models import Task, User, Workspace, db, init_db
+from routes.api import api
+from serialization import JSONProvider
+
+legacy_api = Blueprint("legacy_api", __name__)
+
+
+@legacy_api.route("/tasks", methods=["GET"])
+def legacy_fetch_tasks():
+    """fetch_tasks as it was: lazy relationships and per-object to_dict."""
+    user = User.query.filter_by(id=1).first()
+    workspace = user.workspaces[0]
+    return jsonify([task.to_dict() for task in workspace.tasks])
+
+
+def make_app(path: str, tuned: bool) -> Flask:
+    app = Flask(f"moji-selfhost-{'tuned' if tuned else 'legacy'}")
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{path}",
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        MOJI_USER_ID=1,
+    )
+    if tuned:
+        app.json = JSONProvider(app)
+        init_db(app)
+    else:
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.drop(db.engine)
+    app.register_blueprint(api, url_prefix="/v1/api")
+    app.register_blueprint(legacy_api, url_prefix="/legacy")
+    with app.app_context():
+        user = User(name="Bench", email="bench@moji.local")
+        user.set_password("bench")
+        user.save(commit=False)
+        db.session.flush()
+        Workspace(name="Personal", description="", user_id=user.id).save()
+    return app
+
+
+def _ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def run_mode(tuned: bool, rows: int, repeat: int, writes: int, directory: str) -> Dict[str, float]:
+    app = make_app(os.path.join(directory, f"{'tuned' if tuned else 'legacy'}.db"), tuned)
+    client = app.test_client()
+    result = {}
+
+    with app.app_context():
+        workspace_id = db.session.execute(db.select(Workspace.id)).scalar()
+        start = time.perf_counter()
+        if tuned:
+            Task.bulk_insert(
+                [{"content": f"Task {i}", "priority": i % 4, "done": i % 3 == 0, "workspace_id": workspace_id} for i in range(rows)]
+            )
+        else:
+            for i in range(rows):
+                Task().from_dict(
+                    {"content": f"Task {i}", "priority": i % 4, "done": i % 3 == 0, "workspace_id": workspace_id}
+                ).save()
+        result["seed_ms"] = _ms(start)
+
+    url = "/v1/api/tasks" if tuned else "/legacy/tasks"
+    assert len(client.get(url).get_json()) == rows
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        client.get(url)
+        timings.append(_ms(start))
+    result["list_ms"] = statistics.median(timings)
+
+    start = time.perf_counter()
+    for i in range(writes):
+        client.post("/v1/api/tasks", json={"content": f"New {i}"})
+    result["write_ms"] = _ms(start) / max(writes, 1)
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Moji self-hosted SQLite benchmark")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10, help="task list requests per mode")
+    parser.add_argument("--writes", type=int, default=200, help="single-task POSTs per mode")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="moji-selfhost-") as directory:
+        results = {
+            mode: run_mode(mode == "tuned", args.rows, args.repeat, args.writes, directory)
+            for mode in ("legacy", "tuned")
+        }
+
+    labels = [
+        ("seed_ms", f"seed {args.rows} tasks"),
+        ("list_ms", f"list {args.rows} tasks"),
+        ("write_ms", "single-task POST"),
+    ]
+    print(f"{'measurement':<24} {'legacy':>12} {'tuned':>12} {'speedup':>8}")
+    for key, label in labels:
+        legacy, tuned = results["legacy"][key], results["tuned"][key]
+        print(f"{label:<24} {legacy:>10.1f}ms {tuned:>10.1f}ms {legacy / tuned:>7.1f}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "meta": {"python": platform.python_version(), "machine": platform.machine(), **vars(args)},
+                    "results": results,
+                },
+                fh,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
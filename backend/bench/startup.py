@@ -0,0 +1,189 @@
+"""Cold-start benchmark: import-time profile and time to first request.
+
+Scale-to-zero hosts start a worker when the first request arrives, so the
+time from process start to the first successful response is latency a user
+waits through. Two measurements, each in fresh interpreters:
+
+- import: ``python -X importtime -c "import app.main"``, reported as total
+  time plus the packages that cost the most (their own time, summed over
+  all of their modules).
+- first request: uvicorn serving ``app.main:app`` is started and
+  ``/health`` polled until it answers 200; the time from spawning the
+  process to that response is reported.
+
+Both report the median over ``--runs`` and are checked against budgets;
+the exit code is 1 when a median is over budget.
+
+Usage (from backend/):
+
+    python -m bench.startup
+    python -m bench.startup --runs 10 --top 15
+    python -m bench.startup --first-request-budget-ms 1500 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Medians above these fail the run (about 550ms and 800ms when they were set)
+IMPORT_BUDGET_MS = 800.0
+FIRST_REQUEST_BUDGET_MS = 1200.0
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def bench_env() -> Dict[str, str]:
+    """Environment for child processes: placeholder settings and no background work."""
+    env = dict(os.environ)
+    env.setdefault("SUPABASE_URL", "http://localhost:54321")
+    env.setdefault("SUPABASE_ANON_KEY", "bench-anon-key-000000000000")
+    env.setdefault("SUPABASE_SERVICE_KEY", "bench-service-key-000000000000")
+    env.setdefault("JOBS_ENABLED", "false")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int, int]]:
+    """Parse ``-X importtime`` output into (module, self_us, cumulative_us, depth) rows."""
+    rows = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def import_profile(module: str = "app.main") -> Tuple[float, Dict[str, float]]:
+    """Import ``module`` in a fresh interpreter; return (total ms, own ms per top-level package)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=bench_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = parse_importtime(result.stderr)
+    total_us = next((cumulative for name, _, cumulative, _ in rows if name == module), 0)
+    packages: Dict[str, float] = {}
+    for name, self_us, _, _ in rows:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + self_us / 1000
+    return total_us / 1000, packages
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def first_request(target: str = "app.main:app", path: str = "/health", timeout: float = 30.0) -> float:
+    """Start uvicorn and return milliseconds from spawning it to the first 200 on ``path``."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=bench_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise RuntimeError(f"no successful response from {url} within {timeout}s")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Moji backend cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="packages to list in the import profile")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--target", default="app.main:app", help="ASGI app for the first-request run")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--first-request-budget-ms", type=float, default=FIRST_REQUEST_BUDGET_MS)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    import_runs, first_request_runs = [], []
+    packages: Dict[str, List[float]] = {}
+    for _ in range(args.runs):
+        total, by_package = import_profile(args.module)
+        import_runs.append(total)
+        for package, ms in by_package.items():
+            packages.setdefault(package, []).append(ms)
+        first_request_runs.append(first_request(args.target))
+
+    top = sorted(
+        ((package, statistics.median(runs)) for package, runs in packages.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[: args.top]
+    print(f"import {args.module} (own time per package, median of {args.runs})")
+    for package, ms in top:
+        print(f"  {package:<32} {ms:>8.1f}ms")
+
+    checks = [
+        ("import", import_runs, args.import_budget_ms),
+        ("first request", first_request_runs, args.first_request_budget_ms),
+    ]
+    over_budget = []
+    print(f"\n{'measurement':<16} {'median':>10} {'min':>10} {'budget':>10}")
+    for name, runs, budget in checks:
+        median = statistics.median(runs)
+        print(f"{name:<16} {median:>8.1f}ms {min(runs):>8.1f}ms {budget:>8.0f}ms")
+        if median > budget:
+            over_budget.append(f"{name}: {median:.1f}ms > budget {budget:.0f}ms")
+
+    if args.output:
+        result = {
+            "meta": {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "import_ms": import_runs,
+            "first_request_ms": first_request_runs,
+            "packages_ms": dict(top),
+        }
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2)
+
+    if over_budget:
+        print("\nover budget:")
+        for line in over_budget:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
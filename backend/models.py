@@ -1,10 +1,42 @@
+import sqlite3
 from datetime import datetime
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from werkzeug.security import check_password_hash, generate_password_hash
 
 db = SQLAlchemy()
 
+# Applied to every new SQLite connection of the self-hosted server
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",  # readers don't block the writer, one fsync per checkpoint
+    "PRAGMA synchronous=NORMAL",  # safe with WAL; a power cut loses at most the last commits
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA busy_timeout=5000",  # wait for the write lock instead of failing
+    "PRAGMA cache_size=-16000",  # 16 MB page cache
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Rows per transaction in bulk_insert
+BULK_BATCH_SIZE = 1000
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def init_db(app):
+    """Set up ``db`` for ``app``: SQLite pragmas on every connection and the tables."""
+    db.init_app(app)
+    with app.app_context():
+        event.listen(db.engine, "connect", _set_sqlite_pragmas)
+        db.create_all()
+
 
 class BaseModel(db.Model):
     __abstract__ = True
@@ -14,31 +46,48 @@ class BaseModel(db.Model):
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+    # Columns of to_dict, also selected directly by fetch_dicts
+    dict_fields = ("id", "created_at", "updated_at")
+
     def to_dict(self):
-        return {
-            "id": self.id,
-            "created_at": self.created_at,
-            "updated_at": self.updated_at,
-        }
+        return {field: getattr(self, field) for field in self.dict_fields}
+
+    @classmethod
+    def fetch_dicts(cls, *criteria, order_by=()):
+        """Rows matching ``criteria`` as to_dict() returns them, without loading ORM objects."""
+        fields = cls.dict_fields
+        statement = db.select(*(getattr(cls, field) for field in fields)).where(*criteria).order_by(*order_by)
+        return [dict(zip(fields, row)) for row in db.session.execute(statement).all()]
+
+    @classmethod
+    def bulk_insert(cls, rows, batch_size=BULK_BATCH_SIZE):
+        """Insert many rows (dicts of column values), committing once per batch."""
+        for start in range(0, len(rows), batch_size):
+            db.session.execute(db.insert(cls), rows[start : start + batch_size])
+            db.session.commit()
 
-    def update(self, data):
+    def update(self, data, commit=True):
         try:
             for field, value in data.items():
                 setattr(self, field, value)
-            db.session.commit()
+            if commit:
+                db.session.commit()
             return self
         except Exception as e:
             print(f"Error in BaseModel.update: {e}")
             return None
 
-    def delete(self):
+    def delete(self, commit=True):
         db.session.delete(self)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return self
 
-    def save(self):
+    def save(self, commit=True):
+        """Add to the session; pass ``commit=False`` to commit several changes at once."""
         db.session.add(self)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return self
 
     def __eq__(self, other):
@@ -58,14 +107,9 @@ class Task(BaseModel):
     workspace_id = db.Column(db.Integer, db.ForeignKey("workspace.id"), nullable=False)
     workspace = db.relationship("Workspace", back_populates="tasks")
 
-    def to_dict(self):
-        base_dict = super().to_dict()
-        return {
-            **base_dict,
-            "content": self.content,
-            "done": self.done,
-            "priority": self.priority,
-        }
+    # A workspace's tasks in list order, read straight from the index
+    __table_args__ = (db.Index("ix_task_workspace_id_created_at", "workspace_id", "created_at"),)
+    dict_fields = BaseModel.dict_fields + ("content", "done", "priority")
 
     def from_dict(self, data):
         self.content = data.get("content", "")
@@ -82,18 +126,8 @@ class Note(BaseModel):
     workspace_id = db.Column(db.Integer, db.ForeignKey("workspace.id"), nullable=False)
     workspace = db.relationship("Workspace", back_populates="notes")
 
-    def to_dict(self):
-        try:
-            base_dict = super().to_dict()
-            return {
-            **base_dict,
-            "title": self.title,
-            "content": self.content,
-                "tags": self.tags,
-            }
-        except Exception as e:
-            print(f"Error in Note.to_dict: {e}")
-            return {}
+    __table_args__ = (db.Index("ix_note_workspace_id_updated_at", "workspace_id", "updated_at"),)
+    dict_fields = BaseModel.dict_fields + ("title", "content", "tags")
 
     def from_dict(self, data):
         self.title = data.get("title", "")
@@ -119,18 +153,12 @@ class Note(BaseModel):
 class Workspace(BaseModel):
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
-    tasks = db.relationship("Task", back_populates="workspace")
-    notes = db.relationship("Note", back_populates="workspace")
-    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    tasks = db.relationship("Task", back_populates="workspace", order_by="Task.id")
+    notes = db.relationship("Note", back_populates="workspace", order_by="Note.id")
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
     user = db.relationship("User", back_populates="workspaces")
 
-    def to_dict(self):
-        base_dict = super().to_dict()
-        return {
-            **base_dict,
-            "name": self.name,
-            "description": self.description,
-        }
+    dict_fields = BaseModel.dict_fields + ("name", "description")
 
     def from_dict(self, data):
         self.name = data.get("name", "")
@@ -148,15 +176,10 @@ class User(BaseModel):
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), nullable=False, unique=True)
     password_hash = db.Column(db.String(100), nullable=False)
-    workspaces = db.relationship("Workspace", back_populates="user")
+    # Few per user and needed whenever a user is: loaded with one extra query, not on access
+    workspaces = db.relationship("Workspace", back_populates="user", order_by="Workspace.id", lazy="selectin")
 
-    def to_dict(self):
-        base_dict = super().to_dict()
-        return {
-            **base_dict,
-            "name": self.name,
-            "email": self.email,
-        }
+    dict_fields = BaseModel.dict_fields + ("name", "email")
 
     def from_dict(self, data):
         self.name = data.get("name", "")
@@ -1,42 +1,54 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, g, jsonify, request
 from models import Note, Task, User, Workspace, db
 
 api = Blueprint("api", __name__, url_prefix="/api")
 
 
+def current_workspace_id():
+    """Id of the self-hosted user's first workspace (None if there is none), once per request."""
+    if "workspace_id" not in g:
+        g.workspace_id = db.session.execute(
+            db.select(Workspace.id)
+            .where(Workspace.user_id == current_app.config["MOJI_USER_ID"])
+            .order_by(Workspace.id)
+            .limit(1)
+        ).scalar()
+    return g.workspace_id
+
+
 @api.route("/tasks", methods=["GET"])
 def fetch_tasks():
-    user = User.query.filter_by(id=1).first()
-    if not user:
+    workspace_id = current_workspace_id()
+    if workspace_id is None:
         return jsonify({"error": "User not found"}), 404
-    workspace = user.workspaces[0]
-    tasks = workspace.tasks
-    return jsonify([task.to_dict() for task in tasks])
+    tasks = Task.fetch_dicts(Task.workspace_id == workspace_id, order_by=(Task.created_at, Task.id))
+    return jsonify(tasks)
 
 
 @api.route("/tasks", methods=["POST"])
 def create_task():
+    """Create a task, or several in one transaction when given a list."""
     try:
         data = request.get_json()
         if not data:
             return jsonify({"error": "No input data provided"}), 400
 
-        user = User.query.filter_by(id=1).first()
-        if not user:
-            return jsonify({"error": "User not found"}), 404
-
-        if not user.workspaces or len(user.workspaces) == 0:
+        workspace_id = current_workspace_id()
+        if workspace_id is None:
             return jsonify({"error": "User has no workspaces"}), 400
 
-        workspace = user.workspaces[0]
-
-        task = Task()
-        task.from_dict(data)
-        task.workspace_id = workspace.id
+        tasks = []
+        for item in data if isinstance(data, list) else [data]:
+            task = Task()
+            task.from_dict(item)
+            task.workspace_id = workspace_id
+            tasks.append(task.save(commit=False))
 
         try:
-            task.save()
-            return jsonify(task.to_dict()), 201
+            db.session.commit()
+            if isinstance(data, list):
+                return jsonify([task.to_dict() for task in tasks]), 201
+            return jsonify(tasks[0].to_dict()), 201
         except Exception as save_error:
             print(f"Database error while saving task: {str(save_error)}")
             db.session.rollback()
@@ -51,7 +63,7 @@ def create_task():
 def update_task(task_id):
     try:
         data = request.get_json()
-        task = Task.query.get_or_404(task_id)
+        task = db.get_or_404(Task, task_id)
         task.update(data)
         return jsonify(task.to_dict())
     except Exception as e:
@@ -62,9 +74,8 @@ def update_task(task_id):
 @api.route("/tasks/<int:task_id>", methods=["DELETE"])
 def delete_task(task_id):
     try:
-        task = Task.query.get_or_404(task_id)
-        db.session.delete(task)
-        db.session.commit()
+        task = db.get_or_404(Task, task_id)
+        task.delete()
         return jsonify({"message": "Task deleted successfully"})
     except Exception as e:
         print(f"Error deleting task: {str(e)}")
@@ -73,24 +84,21 @@ def delete_task(task_id):
 
 @api.route("/notes", methods=["GET"])
 def fetch_notes():
-    if user := User.query.filter_by(id=1).first():
-        workspace = user.workspaces[0]
-        notes = workspace.notes
-        return jsonify([note.to_dict() for note in notes])
-    return jsonify({"error": "User not found"}), 404
+    workspace_id = current_workspace_id()
+    if workspace_id is None:
+        return jsonify({"error": "User not found"}), 404
+    notes = Note.fetch_dicts(Note.workspace_id == workspace_id, order_by=(Note.updated_at.desc(),))
+    return jsonify(notes)
 
 
 @api.route("/notes", methods=["POST"])
 def create_notes():
     data = request.get_json()
-    user = User.query.filter_by(id=1).first()
-    print(user)
-    if user and data:
-        print(user)
-        workspace = user.workspaces[0]
+    workspace_id = current_workspace_id()
+    if workspace_id is not None and data:
         note = Note()
         note.from_dict(data)
-        note.workspace_id = workspace.id
+        note.workspace_id = workspace_id
         try:
             note.save()
             return jsonify(note.to_dict()), 201
@@ -104,7 +112,7 @@ def create_notes():
 def update_note(note_id):
     try:
         data = request.get_json()
-        note = Note.query.get_or_404(note_id)
+        note = db.get_or_404(Note, note_id)
         note.update(data)
         return jsonify(note.to_dict())
     except Exception as e:
@@ -115,9 +123,8 @@ def update_note(note_id):
 @api.route("/notes/<int:note_id>", methods=["DELETE"])
 def delete_note(note_id):
     try:
-        if user := User.query.filter_by(id=1).first():
-            workspace = user.workspaces[0]
-            note = Note.query.filter_by(id=note_id, workspace_id=workspace.id).first()
+        if (workspace_id := current_workspace_id()) is not None:
+            note = Note.query.filter_by(id=note_id, workspace_id=workspace_id).first()
             if note:
                 note.delete()
                 return jsonify({"message": "Note deleted successfully"})
@@ -131,16 +138,17 @@ def delete_note(note_id):
 
 @api.route("/workspaces", methods=["GET"])
 def fetch_workspaces():
-    if user := User.query.filter_by(id=1).first():
-        workspaces = user.workspaces
-        return jsonify([workspace.to_dict() for workspace in workspaces])
-    return jsonify({"error": "User not found"}), 404
+    user_id = current_app.config["MOJI_USER_ID"]
+    if db.session.get(User, user_id) is None:
+        return jsonify({"error": "User not found"}), 404
+    workspaces = Workspace.fetch_dicts(Workspace.user_id == user_id, order_by=(Workspace.id,))
+    return jsonify(workspaces)
 
 
 @api.route("/workspaces", methods=["POST"])
 def create_workspace():
     data = request.get_json()
-    user = User.query.filter_by(id=1).first()
+    user = db.session.get(User, current_app.config["MOJI_USER_ID"])
     if not user or not data:
         return jsonify({"error": "User not found or no input data provided"}), 400
     workspace = Workspace()
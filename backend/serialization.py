@@ -0,0 +1,31 @@
+"""JSON responses of the self-hosted API (app.py).
+
+Flask renders datetimes as HTTP dates through ``email.utils``, which is most
+of the time spent serializing a long task list. ``JSONProvider`` produces
+the same strings directly.
+"""
+
+from datetime import datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+_DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def http_date(value: datetime) -> str:
+    """``werkzeug.http.http_date`` for the naive UTC datetimes the models store."""
+    return (
+        f"{_DAYS[value.weekday()]}, {value.day:02d} {_MONTHS[value.month - 1]} {value.year:04d} "
+        f"{value.hour:02d}:{value.minute:02d}:{value.second:02d} GMT"
+    )
+
+
+def _default(value):
+    if type(value) is datetime and value.tzinfo is None:
+        return http_date(value)
+    return DefaultJSONProvider.default(value)
+
+
+class JSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
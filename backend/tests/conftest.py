@@ -6,6 +6,36 @@ from unittest.mock import Mock, patch
 
 from app.main import app
 from app.config import get_settings
+from app.cache import get_response_cache
+from app.sharing import PurgeLog, SharedPageCache, get_shared_page_cache, set_shared_page_cache
+from app.loaders import get_membership_cache
+from app.jobs import JobQueue, set_job_queue
+from app.db import add_request_listener, get_round_trip_budget, remove_request_listener
+from bench.fake_supabase import FakeDatabase
+from bench.harness import install_fake_backend, uninstall_fake_backend, user_ids
+
+
+@pytest.fixture(scope="session", autouse=True)
+def shared_page_cache():
+    """Keep shared page purges in memory instead of in jobs.db."""
+    settings = get_settings()
+    purges = PurgeLog(":memory:", settings.share_cache_ttl)
+    set_shared_page_cache(SharedPageCache(settings.share_cache_max_bytes, settings.share_cache_ttl, purges))
+    yield
+    set_shared_page_cache(None)
+    purges.close()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Start every test with empty response, shared page and membership caches."""
+    get_response_cache().clear()
+    get_shared_page_cache().clear()
+    get_membership_cache().clear()
+    yield
+    get_response_cache().clear()
+    get_shared_page_cache().clear()
+    get_membership_cache().clear()
 
 
 @pytest.fixture
@@ -30,3 +60,73 @@ def mock_supabase_client():
         mock_client = Mock()
         mock.return_value = mock_client
         yield mock_client
+
+
+@pytest.fixture
+def fake_db():
+    """In-memory Supabase stand-in wired into the app's dependencies."""
+    database = FakeDatabase()
+    install_fake_backend(app, database)
+    yield database
+    uninstall_fake_backend(app)
+
+
+@pytest.fixture
+def user_id(fake_db):
+    """A user with two seeded workspaces of tasks, notes and pages."""
+    uid = user_ids(1)[0]
+    fake_db.seed_user(uid, workspaces=2, tasks=3, notes=3, pages=2)
+    return uid
+
+
+@pytest.fixture
+def api(client, user_id):
+    """Test client authenticated as ``user_id`` against the fake backend."""
+    client.headers["Authorization"] = f"Bearer {user_id}"
+    return client
+
+
+class RoundTripTracker:
+    """Records the Supabase calls of every request served while installed."""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, route, log):
+        self.requests.append((route, log))
+
+    @property
+    def last(self):
+        """Route calls (table, operation) of the most recent request."""
+        return [(table, op) for table, op, _ in self.requests[-1][1].route_calls]
+
+    def assert_within_budget(self):
+        """Fail if any request made more calls than its route's declared budget."""
+        for route, log in self.requests:
+            budget = get_round_trip_budget(route)
+            calls = [f"{op} {table}" for table, op, _ in log.route_calls]
+            if budget is not None and len(calls) > budget:
+                methods = ",".join(sorted(getattr(route, "methods", ())))
+                pytest.fail(
+                    f"{methods} {route.path} made {len(calls)} Supabase calls, "
+                    f"budget is {budget}: {calls}"
+                )
+
+
+@pytest.fixture
+def round_trips():
+    """Track Supabase round trips per request; see RoundTripTracker."""
+    tracker = RoundTripTracker()
+    add_request_listener(tracker)
+    yield tracker
+    remove_request_listener(tracker)
+
+
+@pytest.fixture
+def job_queue():
+    """In-memory job queue installed as the process-wide queue."""
+    queue = JobQueue(":memory:", backoff_base=0.001)
+    set_job_queue(queue)
+    yield queue
+    set_job_queue(None)
+    queue.close()
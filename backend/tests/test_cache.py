@@ -0,0 +1,149 @@
+"""Tests for the per-user response cache."""
+
+import asyncio
+import time
+
+from fastapi import status
+
+from app import metrics
+from app.cache import ResponseCache
+
+
+def test_lru_evicts_by_size():
+    """Test that the least recently used entries go first once over the byte budget."""
+    cache = ResponseCache(max_bytes=100, ttl=60)
+    for key in "abcdefghij":
+        cache.set(key, "x" * 8, [], "u", 0)  # 10 bytes each, exactly full
+    cache.get("a")
+    cache.set("k", "x" * 8, [], "u", 0)
+
+    assert cache.bytes <= 100
+    assert cache.get("a") == "x" * 8
+    assert "b" not in cache._entries
+
+
+def test_ttl_expiry():
+    """Test that entries expire after the TTL."""
+    cache = ResponseCache(max_bytes=1000, ttl=0.01)
+    cache.set("a", [1], [], "u", 0)
+    time.sleep(0.02)
+    cache.get("a")
+    assert len(cache) == 0
+
+
+def test_invalidation_by_tag_and_epoch():
+    """Test that tags drop entries and results computed across a write aren't stored."""
+    cache = ResponseCache(max_bytes=1000, ttl=60)
+    cache.set("tasks", [1], ["tasks:w1"], "u", 0)
+    cache.set("notes", [2], ["notes:w1"], "u", 0)
+    epoch = cache.epoch("u")
+
+    assert cache.invalidate("u", "tasks:w1") == 1
+    assert len(cache) == 1
+    assert cache.set("tasks", [1], ["tasks:w1"], "u", epoch) is False
+
+
+def test_route_hits_skip_supabase(api, round_trips):
+    """Test that a repeated GET is served from the cache without round trips."""
+    workspace_id = api.get("/api/v1/workspaces/").json()[0]["id"]
+    first = api.get(f"/api/v1/workspaces/{workspace_id}/tasks")
+    hits = metrics.CACHE_LOOKUPS.get("tasks.list", "hit")
+    second = api.get(f"/api/v1/workspaces/{workspace_id}/tasks")
+
+    assert second.json() == first.json()
+    assert round_trips.last == []
+    assert metrics.CACHE_LOOKUPS.get("tasks.list", "hit") == hits + 1
+
+
+def test_writes_invalidate(api):
+    """Test that create, update, toggle and delete are visible on the next read."""
+    workspace_id = api.get("/api/v1/workspaces/").json()[0]["id"]
+    url = f"/api/v1/workspaces/{workspace_id}/tasks"
+    before = len(api.get(url).json())
+
+    task = api.post(url, json={"content": "Fresh"}).json()
+    assert len(api.get(url).json()) == before + 1
+    assert api.get(f"/api/v1/tasks/{task['id']}").json()["done"] is False
+
+    api.patch(f"/api/v1/tasks/{task['id']}/toggle")
+    assert api.get(f"/api/v1/tasks/{task['id']}").json()["done"] is True
+
+    api.delete(f"/api/v1/tasks/{task['id']}")
+    assert len(api.get(url).json()) == before
+
+    api.delete(f"/api/v1/workspaces/{workspace_id}")
+    assert api.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_cache_is_per_user(client, fake_db):
+    """Test that users never see each other's cached results."""
+    a, b = "00000000-0000-4000-8000-000000000101", "00000000-0000-4000-8000-000000000102"
+    fake_db.seed_user(a, workspaces=1)
+    fake_db.seed_user(b, workspaces=2)
+    assert len(client.get("/api/v1/workspaces/", headers={"Authorization": f"Bearer {a}"}).json()) == 1
+    assert len(client.get("/api/v1/workspaces/", headers={"Authorization": f"Bearer {b}"}).json()) == 2
+
+
+def test_route_can_be_disabled(api, round_trips, monkeypatch):
+    """Test that routes listed as disabled always go to Supabase."""
+    from app.cache import get_response_cache
+
+    monkeypatch.setattr(get_response_cache(), "disabled_routes", frozenset({"workspaces.list"}))
+    api.get("/api/v1/workspaces/")
+    api.get("/api/v1/workspaces/")
+    assert round_trips.last == [("member_workspaces", "rpc")]
+
+
+def _counting_read(calls, delay=0.05):
+    from types import SimpleNamespace
+
+    from app.cache import cached
+
+    @cached("test.read", lambda result, **kwargs: [])
+    async def read(user, workspace_id):
+        calls.append(workspace_id)
+        call = len(calls)
+        await asyncio.sleep(delay)  # a Supabase call in flight
+        return {"workspace": workspace_id, "call": call}
+
+    return read, SimpleNamespace(id="u1"), SimpleNamespace(id="u2")
+
+
+def test_concurrent_reads_are_coalesced():
+    """Test that identical concurrent reads share one call, and other users or parameters don't."""
+    calls = []
+    read, u1, u2 = _counting_read(calls)
+    coalesced = metrics.CACHE_LOOKUPS.get("test.read", "coalesced")
+
+    async def run():
+        return await asyncio.gather(
+            read(user=u1, workspace_id="w1"),
+            read(user=u1, workspace_id="w1"),
+            read(user=u1, workspace_id="w1"),
+            read(user=u1, workspace_id="w2"),
+            read(user=u2, workspace_id="w1"),
+        )
+
+    results = asyncio.run(run())
+    assert results[0] == results[1] == results[2]
+    assert sorted(calls) == ["w1", "w1", "w2"]
+    assert metrics.CACHE_LOOKUPS.get("test.read", "coalesced") == coalesced + 2
+
+
+def test_write_detaches_pending_read():
+    """Test that a read started after a write doesn't join the read in flight before it."""
+    from app.cache import get_response_cache
+
+    calls = []
+    read, u1, _ = _counting_read(calls, delay=0.1)
+
+    async def run():
+        first = asyncio.ensure_future(read(user=u1, workspace_id="w1"))
+        await asyncio.sleep(0.02)
+        get_response_cache().invalidate("u1", "tasks:w1")
+        second = await read(user=u1, workspace_id="w1")
+        return await first, second
+
+    first, second = asyncio.run(run())
+    assert len(calls) == 2
+    assert first != second
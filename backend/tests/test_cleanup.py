@@ -0,0 +1,124 @@
+"""Tests for the completed-task cleanup sweeper."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.cleanup import CLEANUP_JOB, SYSTEM_USER, schedule_cleanup, schedule_periodically
+from app.config import get_settings
+from app.db import instrument
+from app.jobs import FAILED, QUEUED, SUCCEEDED, JobRunner
+
+
+def _ago(days):
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+@pytest.fixture
+def sweeper(fake_db, job_queue, monkeypatch):
+    """Small batches, no pauses and the service-role client of the fake database."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "cleanup_batch_size", 2)
+    monkeypatch.setattr(settings, "cleanup_batches_per_job", 2)
+    monkeypatch.setattr(settings, "cleanup_batch_pause", 0)
+    monkeypatch.setattr("app.cleanup.get_supabase_admin_client", lambda: instrument(fake_db.client()))
+    return job_queue
+
+
+@pytest.fixture
+def old_tasks(fake_db):
+    """Six tasks done 10 days ago in a workspace keeping them for 7 days, plus a kept one."""
+    workspace = fake_db.insert_rows("workspaces", [{"name": "W", "user_id": "u1", "cleanup_after_days": 7}])[0]
+    forever = fake_db.insert_rows("workspaces", [{"name": "Keep", "user_id": "u1"}])[0]
+    fake_db.insert_rows(
+        "tasks",
+        [{"content": f"Old {i}", "done": True, "completed_at": _ago(10), "workspace_id": workspace["id"]} for i in range(6)]
+        + [
+            {"content": "Recent", "done": True, "completed_at": _ago(3), "workspace_id": workspace["id"]},
+            {"content": "Open", "workspace_id": workspace["id"]},
+            {"content": "Kept", "done": True, "completed_at": _ago(30), "workspace_id": forever["id"]},
+        ],
+    )
+
+
+def run_jobs(queue, rounds=10):
+    async def run():
+        runner = JobRunner(queue)
+        for _ in range(rounds):
+            if not await runner.run_once():
+                break
+
+    asyncio.run(run())
+
+
+def test_sweep_in_batches_and_continuations(sweeper, old_tasks, fake_db):
+    """Test that a sweep examines and removes only expired tasks, continuing in new jobs when a slice is used up."""
+    first = schedule_cleanup(sweeper, 3600)
+    run_jobs(sweeper)
+
+    assert sorted(t["content"] for t in fake_db.tables["tasks"]) == ["Kept", "Open", "Recent"]
+    parts = sweeper._conn.execute(
+        "SELECT idempotency_key, status FROM jobs WHERE kind = ? ORDER BY created_at", (CLEANUP_JOB,)
+    ).fetchall()
+    period = first.payload["period"]
+    assert [tuple(row) for row in parts] == [
+        (f"cleanup:{period}", SUCCEEDED),
+        (f"cleanup:{period}:1", SUCCEEDED),  # 6 expired tasks, 4 per job
+        (f"cleanup:{period + 1}", QUEUED),  # the next sweep
+    ]
+    # Done tasks of workspaces without a retention are never examined
+    results = [sweeper.get(row["id"]).result for row in sweeper._conn.execute(
+        "SELECT id FROM jobs WHERE kind = ? AND status = ?", (CLEANUP_JOB, SUCCEEDED)
+    )]
+    assert sum(result["scanned"] for result in results) == 6
+
+
+def test_sweep_archives(sweeper, old_tasks, fake_db, monkeypatch):
+    """Test that archive mode moves expired tasks instead of deleting them."""
+    monkeypatch.setattr(get_settings(), "cleanup_archive", True)
+    schedule_cleanup(sweeper, 3600)
+    run_jobs(sweeper)
+    assert len(fake_db.tables["archived_tasks"]) == 6
+
+
+def test_every_process_schedules_the_same_sweep(job_queue):
+    """Test that scheduling is idempotent per period."""
+    now = 7200.0 * 100 + 5
+    first = schedule_cleanup(job_queue, 7200, now=now)
+    again = schedule_cleanup(job_queue, 7200, now=now + 60)
+    assert again.id == first.id
+    assert first.user_id == SYSTEM_USER
+    assert schedule_cleanup(job_queue, 7200, now=now, next_period=True).id != first.id
+
+
+def test_failed_sweep_does_not_end_the_schedule(sweeper, monkeypatch):
+    """Test that after a sweep fails for good, the next period's sweep is still queued."""
+
+    def outage():
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr("app.cleanup.get_supabase_admin_client", outage)
+    failed = schedule_cleanup(sweeper, 0.2)
+    for _ in range(failed.max_attempts):
+        sweeper._conn.execute("UPDATE jobs SET run_at = 0 WHERE id = ?", (failed.id,))
+        run_jobs(sweeper, rounds=1)
+    assert sweeper.get(failed.id).status == FAILED
+
+    async def run():
+        scheduler = asyncio.create_task(schedule_periodically(sweeper, 0.2))
+        await asyncio.sleep(0.3)
+        scheduler.cancel()
+
+    asyncio.run(run())
+    queued = sweeper._conn.execute("SELECT id FROM jobs WHERE kind = ? AND status = ?", (CLEANUP_JOB, QUEUED))
+    assert max(sweeper.get(row["id"]).payload["period"] for row in queued) > failed.payload["period"]
+
+
+def test_completing_a_task_sets_completed_at(api):
+    """Test that toggling records when a task was completed."""
+    workspace_id = api.get("/api/v1/workspaces/").json()[0]["id"]
+    task = api.post(f"/api/v1/workspaces/{workspace_id}/tasks", json={"content": "Finish"}).json()
+    assert task["completed_at"] is None
+    toggled = api.patch(f"/api/v1/tasks/{task['id']}/toggle").json()
+    assert toggled["completed_at"] is not None
@@ -0,0 +1,85 @@
+"""Tests for the Moji Daily range views."""
+
+from datetime import datetime, timezone
+
+from fastapi import status
+
+
+def _workspace_ids(api):
+    return [w["id"] for w in api.get("/api/v1/workspaces/").json()]
+
+
+def test_daily_buckets_across_workspaces(api, round_trips):
+    """Test that tasks from every workspace land on their scheduled and due days."""
+    first, second = _workspace_ids(api)
+    api.post(
+        f"/api/v1/workspaces/{first}/tasks",
+        json={"content": "Plan", "scheduled_date": "2026-03-02", "due_date": "2026-03-04"},
+    )
+    api.post(f"/api/v1/workspaces/{second}/tasks", json={"content": "Ship", "due_date": "2026-03-04", "priority": 3})
+    api.post(f"/api/v1/workspaces/{second}/tasks", json={"content": "Later", "due_date": "2026-04-01"})
+
+    response = api.get("/api/v1/daily/?from=2026-03-01&to=2026-03-07")
+    assert response.status_code == status.HTTP_200_OK
+    assert round_trips.last == [("daily_items", "rpc")]
+    body = response.json()
+    assert [day["date"] for day in body["days"]] == ["2026-03-02", "2026-03-04"]
+    assert [t["content"] for t in body["days"][0]["tasks"]] == ["Plan"]
+    assert [t["content"] for t in body["days"][1]["tasks"]] == ["Ship", "Plan"]
+
+
+def test_daily_notes_have_no_bodies(api):
+    """Test that notes show up on their creation day without their content."""
+    today = datetime.now(timezone.utc).date().isoformat()
+    body = api.get(f"/api/v1/daily/?from={today}").json()
+    notes = [note for day in body["days"] for note in day["notes"]]
+    assert notes
+    assert all(set(note) == {"id", "workspace_id", "title"} for note in notes)
+
+
+def test_daily_summary_counts(api, round_trips):
+    """Test that the month view gets per-day counts from one call."""
+    workspace_id = _workspace_ids(api)[0]
+    for done in (True, False):
+        api.post(
+            f"/api/v1/workspaces/{workspace_id}/tasks",
+            json={"content": "Task", "done": done, "scheduled_date": "2026-05-10"},
+        )
+    response = api.get("/api/v1/daily/summary?from=2026-05-01&to=2026-05-31")
+    assert response.status_code == status.HTTP_200_OK
+    assert round_trips.last == [("daily_counts", "rpc")]
+    assert response.json()["days"] == [{"date": "2026-05-10", "tasks": 2, "done": 1, "notes": 0}]
+
+
+def test_daily_sees_writes(api):
+    """Test that a cached range is dropped when a task's date changes."""
+    workspace_id = _workspace_ids(api)[0]
+    url = "/api/v1/daily/?from=2026-06-01&to=2026-06-30"
+    assert api.get(url).json()["days"] == []
+    task = api.post(f"/api/v1/workspaces/{workspace_id}/tasks", json={"content": "Dated"}).json()
+    api.put(f"/api/v1/tasks/{task['id']}", json={"scheduled_date": "2026-06-15"})
+    assert [day["date"] for day in api.get(url).json()["days"]] == ["2026-06-15"]
+
+
+def test_daily_rejects_bad_ranges(api):
+    """Test range validation."""
+    assert api.get("/api/v1/daily/?from=2026-03-02&to=2026-03-01").status_code == status.HTTP_400_BAD_REQUEST
+    assert api.get("/api/v1/daily/?from=2026-01-01&to=2026-12-31").status_code == status.HTTP_400_BAD_REQUEST
+    assert api.get("/api/v1/daily/summary?tz=Not/AZone").status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_cached_today_rolls_over_at_midnight(api, monkeypatch):
+    """Test that a range without a start is not served from the cache once the local day changes."""
+    import app.routes.daily as daily
+
+    today = [datetime(2026, 3, 2, 23, 59, tzinfo=timezone.utc)]
+
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return today[0].astimezone(tz)
+
+    monkeypatch.setattr(daily, "datetime", Clock)
+    assert api.get("/api/v1/daily/summary").json()["start"] == "2026-03-02"
+    today[0] = datetime(2026, 3, 3, 0, 1, tzinfo=timezone.utc)
+    assert api.get("/api/v1/daily/summary").json()["start"] == "2026-03-03"
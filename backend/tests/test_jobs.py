@@ -0,0 +1,137 @@
+"""Tests for the background job queue and the job status endpoint."""
+
+import asyncio
+
+import pytest
+from fastapi import status
+
+from app.jobs import FAILED, QUEUED, SUCCEEDED, JobQueue, JobRunner, job_handler
+
+attempts = []
+
+
+@job_handler("test.flaky")
+def flaky(payload):
+    attempts.append(payload)
+    if len(attempts) < payload["fail_times"] + 1:
+        raise RuntimeError("temporary outage")
+    return {"ok": True}
+
+
+@pytest.fixture(autouse=True)
+def reset_attempts():
+    attempts.clear()
+
+
+def drain(queue, rounds=20):
+    """Run due jobs until none are left, waiting out short backoffs."""
+
+    async def run():
+        runner = JobRunner(queue)
+        for _ in range(rounds):
+            if not await runner.run_once():
+                await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+
+def test_job_retries_with_backoff(job_queue):
+    """Test that a failing job is retried until it succeeds."""
+    job = job_queue.enqueue("test.flaky", {"fail_times": 2}, max_attempts=5)
+    drain(job_queue)
+
+    job = job_queue.get(job.id)
+    assert job.status == SUCCEEDED
+    assert job.attempts == 3
+    assert job.result == {"ok": True}
+
+
+def test_job_fails_after_max_attempts(job_queue):
+    """Test that a job stops retrying once its attempts are used up."""
+    job = job_queue.enqueue("test.flaky", {"fail_times": 10}, max_attempts=2)
+    drain(job_queue)
+
+    job = job_queue.get(job.id)
+    assert job.status == FAILED
+    assert job.attempts == 2
+    assert "temporary outage" in job.error
+
+
+def test_idempotency_key_returns_existing_job(job_queue):
+    """Test that resubmitting with the same key doesn't queue a second job."""
+    first = job_queue.enqueue("test.flaky", {"fail_times": 0}, user_id="u1", idempotency_key="k")
+    second = job_queue.enqueue("test.flaky", {"fail_times": 0}, user_id="u1", idempotency_key="k")
+    other_user = job_queue.enqueue("test.flaky", {"fail_times": 0}, user_id="u2", idempotency_key="k")
+
+    assert second.id == first.id
+    assert other_user.id != first.id
+
+
+def test_failed_account_deletion_can_be_retried(api, job_queue, monkeypatch):
+    """Test that deleting the account again after a failed deletion starts a new job."""
+
+    def unavailable():
+        raise RuntimeError("auth admin unavailable")
+
+    monkeypatch.setattr("app.routes.account.get_supabase_admin_client", unavailable)
+    first = api.delete("/api/v1/account/").json()
+    drain(job_queue, rounds=50)
+    assert job_queue.get(first["id"]).status == FAILED
+    assert api.delete("/api/v1/account/").json()["id"] != first["id"]
+
+    pending = api.delete("/api/v1/account/").json()
+    assert api.delete("/api/v1/account/").json()["id"] == pending["id"]
+
+
+def test_jobs_survive_restart_and_expired_leases(tmp_path):
+    """Test that a job claimed by a worker that died is picked up after a restart."""
+    path = str(tmp_path / "jobs.db")
+    queue = JobQueue(path, lease_seconds=0.01)
+    job = queue.enqueue("test.flaky", {"fail_times": 0})
+    assert queue.claim().id == job.id  # the "crashed" worker's lease
+    queue.close()
+
+    reopened = JobQueue(path, lease_seconds=0.01)
+    assert reopened.get(job.id).status == "running"
+    drain(reopened)
+    assert reopened.get(job.id).status == SUCCEEDED
+    reopened.close()
+
+
+def test_unknown_job_kind_is_rejected(job_queue):
+    """Test that enqueueing a kind without a handler fails fast."""
+    with pytest.raises(ValueError):
+        job_queue.enqueue("test.missing", {})
+
+
+def test_job_status_endpoint(api, user_id, job_queue):
+    """Test that users can poll their own jobs and nobody else's."""
+    job = job_queue.enqueue("test.flaky", {"fail_times": 0}, user_id=user_id)
+
+    response = api.get(f"/api/v1/jobs/{job.id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == QUEUED
+
+    other = job_queue.enqueue("test.flaky", {"fail_times": 0}, user_id="someone-else")
+    assert api.get(f"/api/v1/jobs/{other.id}").status_code == status.HTTP_404_NOT_FOUND
+
+
+@job_handler("test.slow")
+async def slow(payload):
+    await asyncio.sleep(payload["seconds"])
+    return {"slept": payload["seconds"]}
+
+
+def test_stop_drains_running_jobs(job_queue):
+    """Test that stopping lets a running job finish and releases one that overruns."""
+
+    async def run(seconds, drain_timeout):
+        job = job_queue.enqueue("test.slow", {"seconds": seconds})
+        runner = JobRunner(job_queue, concurrency=1, poll_interval=0.01)
+        await runner.start()
+        await asyncio.sleep(0.02)  # claimed and running
+        await runner.stop(drain_timeout)
+        return job_queue.get(job.id)
+
+    assert asyncio.run(run(0.05, drain_timeout=1.0)).status == SUCCEEDED
+    assert asyncio.run(run(5.0, drain_timeout=0.05)).status == QUEUED
@@ -0,0 +1,85 @@
+"""Tests for wiki links between pages and notes."""
+
+import re
+from pathlib import Path
+
+from app.links import _SPACE, extract_links, link_key
+
+LINKS_SQL = Path(__file__).resolve().parents[2] / "supabase" / "links.sql"
+
+# Backslash escapes of Postgres E'' strings; any other escaped character stands for itself
+_E_ESCAPES = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def _e_string(body: str) -> str:
+    """Decode the body of a Postgres E'' string literal (no octal or unicode escapes)."""
+    return re.sub(
+        r"\\(x[0-9A-Fa-f]{1,2}|.)",
+        lambda m: chr(int(m.group(1)[1:], 16)) if m.group(1)[0] == "x" and len(m.group(1)) > 1
+        else _E_ESCAPES.get(m.group(1), m.group(1)),
+        body,
+    )
+
+
+def test_extract_links():
+    """Test labels, normalized keys, first spelling kept and malformed links skipped."""
+    content = "See [[Road  Map]] and [[road map|the plan]], [[Notes]].\n[[ ]] [[a\nb]] [[x[y]]"
+    assert extract_links(content) == {"road map": "Road  Map", "notes": "Notes"}
+    # Only ASCII whitespace counts, as in the SQL link_key()
+    assert link_key(" Road \t Map\x0b") == "road map"
+    assert link_key("Road\u00a0Map\x1f") == "road\u00a0map\x1f"
+
+
+def test_sql_link_title_trims_whitespace_only():
+    """Test that link_title() in links.sql trims the same set as extract_links(), and never a letter."""
+    trimmed = re.search(r"FUNCTION link_title\(.*?btrim\(title, E'([^']*)'\)", LINKS_SQL.read_text(), re.DOTALL)
+    assert trimmed is not None
+    chars = _e_string(trimmed.group(1))
+    assert set(chars) == set(_SPACE)
+    assert [title.strip(chars) for title in ("Dev", "v", "\x0bvia\t")] == ["Dev", "v", "via"]
+    assert extract_links("[[Dev]] [[v]]") == {"dev": "Dev", "v": "v"}
+
+
+def test_backlinks_follow_edits(api, fake_db, round_trips):
+    """Test that creates and updates diff links, and links resolve and count as backlinks."""
+    workspace_id = api.get("/api/v1/workspaces/").json()[0]["id"]
+    plan = api.post(f"/api/v1/workspaces/{workspace_id}/pages", json={"title": "Plan", "content": "[[Ideas]]"}).json()
+    note = api.post(
+        f"/api/v1/workspaces/{workspace_id}/notes", json={"title": "Ideas", "content": "Back to [[plan]], [[Later]]"}
+    ).json()
+
+    assert api.get(f"/api/v1/pages/{plan['id']}/backlinks").json() == [
+        {"type": "note", "id": note["id"], "title": "Ideas"}
+    ]
+    assert api.get(f"/api/v1/notes/{note['id']}/links").json() == [
+        {"title": "Later", "type": None, "id": None},
+        {"title": "plan", "type": "page", "id": plan["id"]},
+    ]
+
+    # Only the removed link is deleted; the rename rewrites the remaining link's source title
+    api.put(f"/api/v1/notes/{note['id']}", json={"title": "Thoughts", "content": "[[Later]] and [[Plan]]"})
+    assert api.get(f"/api/v1/pages/{plan['id']}/backlinks").json()[0]["title"] == "Thoughts"
+    api.put(f"/api/v1/notes/{note['id']}", json={"content": "[[Later]]"})
+    assert api.get(f"/api/v1/pages/{plan['id']}/backlinks").json() == []
+    assert sorted(link["target_key"] for link in fake_db.tables["links"]) == ["ideas", "later"]
+    round_trips.assert_within_budget()
+
+    api.delete(f"/api/v1/pages/{plan['id']}")
+    assert [link["target_key"] for link in fake_db.tables["links"]] == ["later"]
+
+
+def test_orphans_and_clone(api, fake_db):
+    """Test orphan detection, ignoring self-links, and links rebuilt for a cloned workspace."""
+    workspace_id = api.post("/api/v1/workspaces/", json={"name": "Wiki"}).json()["id"]
+    pages_url = f"/api/v1/workspaces/{workspace_id}/pages"
+    home = api.post(pages_url, json={"title": "Home", "content": "[[Guide]] [[Home]]"}).json()
+    guide = api.post(pages_url, json={"title": "Guide", "content": ""}).json()
+
+    orphans = api.get(f"/api/v1/workspaces/{workspace_id}/orphans").json()
+    assert [o["id"] for o in orphans] == [home["id"]]
+    assert guide["id"] not in {o["id"] for o in orphans}
+
+    copy = api.post(f"/api/v1/workspaces/{workspace_id}/clone").json()
+    copied_guide = next(p for p in api.get(f"/api/v1/workspaces/{copy['id']}/pages").json() if p["title"] == "Guide")
+    backlinks = api.get(f"/api/v1/pages/{copied_guide['id']}/backlinks").json()
+    assert [b["title"] for b in backlinks] == ["Home"] and backlinks[0]["id"] != home["id"]
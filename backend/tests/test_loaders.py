@@ -0,0 +1,55 @@
+"""Tests for cached and batched workspace membership checks."""
+
+import asyncio
+
+from app import metrics
+from app.loaders import MembershipLoader
+from bench.fake_supabase import FakeDatabase
+from bench.harness import user_ids
+
+
+def _setup(monkeypatch, window=0.05, max_batch=50):
+    database = FakeDatabase()
+    owner, other = user_ids(2)
+    mine = [w["id"] for w in database.seed_user(owner, workspaces=3, tasks=0, notes=0, pages=0)]
+    theirs = [w["id"] for w in database.seed_user(other, workspaces=1, tasks=0, notes=0, pages=0)]
+    loader = MembershipLoader(window, max_batch)
+    queries = []
+    query = loader._query
+    monkeypatch.setattr(loader, "_query", lambda ids, *args: queries.append(ids) or query(ids, *args))
+    return loader, database.client(owner), owner, mine, theirs, queries
+
+
+def test_concurrent_checks_share_one_query(monkeypatch):
+    """Test that checks arriving together are answered by one query, including foreign ids."""
+    loader, supabase, owner, mine, theirs, queries = _setup(monkeypatch)
+    batches = metrics.OWNERSHIP_BATCH_SIZE.get_count()
+
+    async def run():
+        return await asyncio.gather(*(loader.role(w, owner, supabase) for w in [*mine, theirs[0]]))
+
+    assert asyncio.run(run()) == ["owner", "owner", "owner", None]
+    assert len(queries) == 1
+    assert metrics.OWNERSHIP_BATCH_SIZE.get_count() == batches + 1
+
+
+def test_full_batch_runs_without_waiting(monkeypatch):
+    """Test that a batch reaching the size cap is queried at once, the rest in the next batch."""
+    loader, supabase, owner, mine, _, queries = _setup(monkeypatch, window=10.0, max_batch=2)
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(*(loader.role(w, owner, supabase) for w in mine[:2])), 1.0)
+
+    assert asyncio.run(run()) == ["owner", "owner"]
+    assert queries == [mine[:2]]
+
+
+def test_errors_reach_every_waiter(monkeypatch):
+    """Test that a failed batch query fails each check in it."""
+    loader, supabase, owner, mine, _, _ = _setup(monkeypatch)
+    monkeypatch.setattr(loader, "_query", lambda *args: 1 / 0)
+
+    async def run():
+        return await asyncio.gather(*(loader.role(w, owner, supabase) for w in mine), return_exceptions=True)
+
+    assert all(isinstance(result, ZeroDivisionError) for result in asyncio.run(run()))
@@ -0,0 +1,37 @@
+"""Smoke test for the load-test harness."""
+
+import asyncio
+from argparse import Namespace
+
+import pytest
+
+from bench import loadtest
+from bench.harness import uninstall_fake_backend
+from app.main import app
+
+
+@pytest.fixture
+def restore_app():
+    yield
+    uninstall_fake_backend(app)
+
+
+def test_load_test_runs_all_scenarios(restore_app):
+    """Test that a short in-process run covers every scenario without errors."""
+    args = Namespace(mode="inprocess", users=2, concurrency=2, duration=0.5, latency_ms=0.0, seed=1)
+    result = asyncio.run(loadtest.run_load(args))
+
+    assert result["total"]["errors"] == 0
+    assert "PATCH /tasks/{task_id}/toggle" in result["routes"]
+    assert "PUT /pages/{page_id}" in result["routes"]
+    assert result["routes"]["GET /workspaces/"]["p95_ms"] > 0
+
+
+def test_compare_flags_p95_regressions():
+    """Test that a slower p95 than the baseline is reported."""
+    route = {"count": 10, "errors": 0, "rps": 1.0, "p50_ms": 1.0, "p95_ms": 10.0, "p99_ms": 12.0}
+    baseline = {"total": {"rps": 100.0}, "routes": {"GET /x": route}}
+    current = {"total": {"rps": 100.0}, "routes": {"GET /x": {**route, "p95_ms": 20.0}}}
+
+    assert loadtest.compare(current, baseline, tolerance=0.25)
+    assert not loadtest.compare(baseline, baseline, tolerance=0.25)
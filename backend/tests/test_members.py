@@ -0,0 +1,109 @@
+"""Tests for team workspaces and cached membership checks."""
+
+import pytest
+from fastapi import status
+
+from app.cache import get_response_cache
+from app.loaders import get_membership_cache
+from bench.fake_supabase import FakeAPIError
+from bench.harness import user_ids
+
+
+def _share(api, fake_db, role):
+    """Share the owner's first workspace with a new user; return their headers and the workspace id."""
+    member = user_ids(2)[1]
+    fake_db.seed_user(member, workspaces=1, tasks=1, notes=0, pages=0)
+    workspace_id = api.get("/api/v1/workspaces/").json()[0]["id"]
+    response = api.post(f"/api/v1/workspaces/{workspace_id}/members", json={"user_id": member, "role": role})
+    assert response.status_code == status.HTTP_201_CREATED
+    return {"Authorization": f"Bearer {member}"}, workspace_id
+
+
+def test_shared_workspace_costs_no_extra_round_trips(api, fake_db, round_trips):
+    """Test that members see shared workspaces and their checks are cached like the owner's."""
+    headers, shared_id = _share(api, fake_db, "editor")
+    workspaces = api.get("/api/v1/workspaces/", headers=headers).json()
+    assert shared_id in [w["id"] for w in workspaces] and len(workspaces) == 2
+
+    for auth in ({}, headers):
+        get_membership_cache().clear()
+        get_response_cache().clear()
+        assert api.get(f"/api/v1/workspaces/{shared_id}/tasks", headers=auth).status_code == status.HTTP_200_OK
+        assert round_trips.last == [("workspace_members", "select"), ("tasks", "select")]
+        get_response_cache().clear()
+        api.get(f"/api/v1/workspaces/{shared_id}/tasks", headers=auth)
+        assert round_trips.last == [("tasks", "select")]
+
+    created = api.post(f"/api/v1/workspaces/{shared_id}/tasks", json={"content": "Team task"}, headers=headers)
+    assert created.status_code == status.HTTP_201_CREATED
+    round_trips.assert_within_budget()
+
+
+def test_viewer_reads_but_cannot_write(api, fake_db, round_trips):
+    """Test that viewers get 403 on writes, strangers 404, and only owners manage members."""
+    headers, shared_id = _share(api, fake_db, "viewer")
+    tasks = api.get(f"/api/v1/workspaces/{shared_id}/tasks", headers=headers)
+    assert tasks.status_code == status.HTTP_200_OK and tasks.json()
+    task_id = tasks.json()[0]["id"]
+
+    assert api.post(f"/api/v1/workspaces/{shared_id}/tasks", json={"content": "x"}, headers=headers).status_code == 403
+    assert api.put(f"/api/v1/tasks/{task_id}", json={"content": "x"}, headers=headers).status_code == 403
+    assert api.delete(f"/api/v1/tasks/{task_id}", headers=headers).status_code == 403
+    assert api.put(f"/api/v1/workspaces/{shared_id}", json={"name": "Mine"}, headers=headers).status_code == 403
+    assert api.get(f"/api/v1/tasks/{task_id}").json()["content"] != "x"
+
+    members = api.get(f"/api/v1/workspaces/{shared_id}/members", headers=headers).json()
+    assert [m["role"] for m in members] == ["owner", "viewer"]
+    owner_id = members[0]["user_id"]
+    assert api.delete(f"/api/v1/workspaces/{shared_id}/members/{owner_id}", headers=headers).status_code == 403
+
+    stranger = {"Authorization": f"Bearer {user_ids(3)[2]}"}
+    assert api.get(f"/api/v1/workspaces/{shared_id}/tasks", headers=stranger).status_code == 404
+    round_trips.assert_within_budget()
+
+
+def test_membership_changes_take_effect_at_once(api, fake_db, user_id):
+    """Test that role changes and removal invalidate cached roles and responses, and an owner stays."""
+    headers, shared_id = _share(api, fake_db, "editor")
+    member = headers["Authorization"].split()[1]
+    assert api.get(f"/api/v1/workspaces/{shared_id}/tasks", headers=headers).status_code == status.HTTP_200_OK
+
+    api.put(f"/api/v1/workspaces/{shared_id}/members/{member}", json={"role": "viewer"})
+    assert api.post(f"/api/v1/workspaces/{shared_id}/tasks", json={"content": "x"}, headers=headers).status_code == 403
+
+    assert api.delete(f"/api/v1/workspaces/{shared_id}/members/{member}").status_code == status.HTTP_204_NO_CONTENT
+    assert api.get(f"/api/v1/workspaces/{shared_id}/tasks", headers=headers).status_code == 404
+    assert shared_id not in [w["id"] for w in api.get("/api/v1/workspaces/", headers=headers).json()]
+
+    again = api.post(f"/api/v1/workspaces/{shared_id}/members", json={"user_id": member})
+    assert again.status_code == status.HTTP_201_CREATED
+    assert api.post(f"/api/v1/workspaces/{shared_id}/members", json={"user_id": member}).status_code == 409
+    # The only owner can neither leave nor step down
+    assert api.delete(f"/api/v1/workspaces/{shared_id}/members/{user_id}").status_code == 400
+    assert api.put(f"/api/v1/workspaces/{shared_id}/members/{user_id}", json={"role": "editor"}).status_code == 400
+    # A member can leave on their own
+    assert api.delete(f"/api/v1/workspaces/{shared_id}/members/{member}", headers=headers).status_code == 204
+
+
+def test_co_owner_cannot_take_the_workspace(api, fake_db, user_id):
+    """Test that an owner who did not create a workspace cannot change its creator."""
+    headers, shared_id = _share(api, fake_db, "owner")
+    member = headers["Authorization"].split()[1]
+    assert api.put(f"/api/v1/workspaces/{shared_id}", json={"name": "Ours"}, headers=headers).status_code == 200
+
+    workspaces = fake_db.client(member).table("workspaces")
+    with pytest.raises(FakeAPIError):
+        workspaces.update({"user_id": member}).eq("id", shared_id).execute()
+    assert next(w for w in fake_db.tables["workspaces"] if w["id"] == shared_id)["user_id"] == user_id
+
+
+def test_editor_writes_reach_the_creators_daily_view(api, fake_db):
+    """Test that a task an editor adds to a shared workspace shows in the creator's cached daily view."""
+    headers, shared_id = _share(api, fake_db, "editor")
+    day = "2026-03-02"
+    assert api.get(f"/api/v1/daily/?from={day}").json()["days"] == []
+
+    task = {"content": "Team deadline", "due_date": day}
+    assert api.post(f"/api/v1/workspaces/{shared_id}/tasks", json=task, headers=headers).status_code == 201
+    days = api.get(f"/api/v1/daily/?from={day}").json()["days"]
+    assert [task["content"] for task in days[0]["tasks"]] == ["Team deadline"]
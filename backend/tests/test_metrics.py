@@ -0,0 +1,115 @@
+"""Tests for metrics collection and the /metrics endpoint."""
+
+import sys
+import threading
+
+from fastapi import status
+from unittest.mock import Mock
+
+from app import metrics
+from app.config import get_settings
+from app.db import instrument, track_queries
+
+
+def test_metrics_endpoint_exposes_route_metrics(client, monkeypatch):
+    """Test that served requests show up in the exposition text."""
+    monkeypatch.setattr(get_settings(), "metrics_token", "scrape")
+    client.get("/health")
+    assert client.get("/metrics").status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'moji_http_requests_total{method="GET",route="/health",status="200"}' in response.text
+    assert "# TYPE moji_http_request_duration_seconds histogram" in response.text
+
+
+def test_metrics_need_a_token_outside_debug(client, monkeypatch):
+    """Test that without a token /metrics is hidden unless debugging."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "metrics_token", None)
+    assert client.get("/metrics").status_code == status.HTTP_404_NOT_FOUND
+    monkeypatch.setattr(settings, "debug", True)
+    assert client.get("/metrics").status_code == status.HTTP_200_OK
+
+
+def test_updates_from_threads_are_not_lost():
+    """Test that concurrent increments and observations from threads all count."""
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    registry = metrics.Registry()
+    counter = registry.counter("test_total", "Test counter.")
+    histogram = registry.histogram("test_seconds", "Test histogram.", buckets=(1.0,))
+
+    def work():
+        for _ in range(20_000):
+            counter.inc()
+            histogram.observe(0.5)
+
+    try:
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert counter.get() == 160_000
+    assert histogram.get_count() == 160_000
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test that histogram buckets are cumulative and end with +Inf."""
+    registry = metrics.Registry()
+    histogram = registry.histogram("test_latency", "Test latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/a")
+
+    text = metrics.render(registry.snapshot())
+    assert 'test_latency_bucket{route="/a",le="0.1"} 1' in text
+    assert 'test_latency_bucket{route="/a",le="1"} 2' in text
+    assert 'test_latency_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'test_latency_count{route="/a"} 3' in text
+
+
+def test_merge_snapshots_sums_workers():
+    """Test that snapshots from several workers are summed."""
+    registry = metrics.Registry()
+    counter = registry.counter("test_total", "Test counter.", ("route",))
+    histogram = registry.histogram("test_seconds", "Test histogram.", buckets=(1.0,))
+    counter.inc("/a")
+    histogram.observe(0.5)
+    snapshot = registry.snapshot()
+
+    merged = metrics.merge_snapshots([snapshot, snapshot])
+    assert merged["test_total"]["samples"] == [[["/a"], 2.0]]
+    assert merged["test_seconds"]["samples"][0][1][-1] == 2
+
+
+def test_instrumented_client_records_calls():
+    """Test that the data-layer wrapper counts and labels Supabase calls."""
+    raw = Mock()
+    supabase = instrument(raw)
+
+    with track_queries() as queries:
+        supabase.table("tasks").select("*").eq("workspace_id", "w").execute()
+        supabase.table("tasks").insert({"content": "x"}).execute()
+
+    assert queries.count == 2
+    assert [(table, op) for table, op, _ in queries.calls] == [
+        ("tasks", "select"),
+        ("tasks", "insert"),
+    ]
+    assert metrics.UPSTREAM_DURATION.get_count("tasks", "insert") >= 1
+
+
+def test_rate_limit_rejections_are_counted(client):
+    """Test that rate-limited requests get a 429 and are counted."""
+    from app.middleware import limiter
+
+    try:
+        responses = [client.get("/health") for _ in range(101)]
+        assert responses[-1].status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert metrics.RATE_LIMITED.get("/health") >= 1
+    finally:
+        limiter.reset()
@@ -0,0 +1,15 @@
+"""Smoke test for the microbenchmark suite."""
+
+from bench import micro
+
+
+def test_every_benchmark_runs_once():
+    """Test that each benchmark's setup and operation succeed."""
+    for name, factory in micro.BENCHMARKS.items():
+        try:
+            op, per_call = factory()
+            op()
+            assert per_call >= 1, name
+        finally:
+            while micro.CLEANUPS:
+                micro.CLEANUPS.pop()()
@@ -0,0 +1,118 @@
+"""Tests for fractional sort keys and moving items."""
+
+import asyncio
+import random
+
+import pytest
+from fastapi import status
+
+from app.db import instrument
+from app.jobs import JobRunner
+from app.ordering import REBALANCE_KEY_LENGTH, is_valid_key, key_after, key_at, key_between
+
+
+def test_key_between_stays_ordered():
+    """Test that repeated random insertions always produce valid keys in order."""
+    rng = random.Random(7)
+    keys = [key_after(None)]
+    for _ in range(2000):
+        i = rng.randint(0, len(keys))
+        before = keys[i - 1] if i > 0 else None
+        after = keys[i] if i < len(keys) else None
+        key = key_between(before, after)
+        assert is_valid_key(key)
+        assert (before is None or before < key) and (after is None or key < after)
+        keys.insert(i, key)
+    assert keys == sorted(keys)
+
+
+def test_evenly_spaced_keys():
+    """Test that rebalanced keys are short, ordered and leave room for moves."""
+    keys = [key_at(n) for n in range(1, 500)]
+    assert keys == sorted(keys)
+    assert all(len(key) == 5 for key in keys)
+    assert len(key_between(keys[10], keys[11])) <= 5
+
+
+def test_key_between_rejects_unordered_neighbors():
+    with pytest.raises(ValueError):
+        key_between("V", "V")
+
+
+@pytest.fixture
+def workspace_id(api):
+    return api.get("/api/v1/workspaces/").json()[0]["id"]
+
+
+def _contents(api, workspace_id):
+    return [task["content"] for task in api.get(f"/api/v1/workspaces/{workspace_id}/tasks").json()]
+
+
+def test_move_task_writes_one_row(api, workspace_id, round_trips):
+    """Test that a move reads the neighbors and updates only the moved task."""
+    tasks = api.get(f"/api/v1/workspaces/{workspace_id}/tasks").json()
+    first, last = tasks[0], tasks[-1]
+    response = api.post(f"/api/v1/tasks/{last['id']}/move", json={"after_id": first["id"]})
+    assert response.status_code == status.HTTP_200_OK
+    assert round_trips.last == [("tasks", "select"), ("tasks", "update")]
+    assert _contents(api, workspace_id)[0] == last["content"]
+
+    response = api.post(
+        f"/api/v1/tasks/{last['id']}/move", json={"before_id": first["id"], "after_id": tasks[1]["id"]}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert _contents(api, workspace_id) == [first["content"], last["content"], tasks[1]["content"]]
+
+
+def test_new_items_are_appended(api, workspace_id):
+    """Test that created tasks go to the end of the manual order."""
+    api.post(f"/api/v1/workspaces/{workspace_id}/tasks", json={"content": "Newest"})
+    assert _contents(api, workspace_id)[-1] == "Newest"
+
+
+def test_move_note_keeps_updated_at(api, workspace_id):
+    """Test that notes can be listed in manual order and a move is not an edit."""
+    notes = api.get(f"/api/v1/workspaces/{workspace_id}/notes?order=manual").json()
+    moved = api.post(f"/api/v1/notes/{notes[-1]['id']}/move", json={"after_id": notes[0]["id"]}).json()
+    assert moved["updated_at"] == notes[-1]["updated_at"]
+    manual = api.get(f"/api/v1/workspaces/{workspace_id}/notes?order=manual").json()
+    assert manual[0]["id"] == notes[-1]["id"]
+
+
+def test_move_rejects_foreign_neighbors(api, workspace_id, fake_db):
+    """Test that neighbors from another workspace are refused."""
+    other = api.get("/api/v1/workspaces/").json()[1]["id"]
+    task = api.get(f"/api/v1/workspaces/{workspace_id}/tasks").json()[0]
+    foreign = api.get(f"/api/v1/workspaces/{other}/tasks").json()[0]
+    response = api.post(f"/api/v1/tasks/{task['id']}/move", json={"after_id": foreign["id"]})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = api.post(f"/api/v1/tasks/{task['id']}/move", json={})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_tied_keys_are_rebalanced(api, workspace_id, fake_db, job_queue, monkeypatch):
+    """Test that a move between equal keys is refused and fixed by a background rebalance."""
+    monkeypatch.setattr("app.ordering.get_supabase_admin_client", lambda: instrument(fake_db.client()))
+    tasks = [t for t in fake_db.tables["tasks"] if t["workspace_id"] == workspace_id]
+    for task in tasks:
+        task["sort_key"] = "V"  # e.g. concurrent appends
+
+    response = api.post(
+        f"/api/v1/tasks/{tasks[0]['id']}/move", json={"before_id": tasks[1]["id"], "after_id": tasks[2]["id"]}
+    )
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert asyncio.run(JobRunner(job_queue).run_once())
+    assert sorted(t["sort_key"] for t in tasks) == [key_at(1), key_at(2), key_at(3)]
+
+
+def test_long_keys_schedule_a_rebalance(api, workspace_id, fake_db, job_queue):
+    """Test that squeezing into the same gap eventually queues a rebalance."""
+    tasks = api.get(f"/api/v1/workspaces/{workspace_id}/tasks").json()
+    first, second, third = tasks[0]["id"], tasks[1]["id"], tasks[2]["id"]
+    # Alternate the two last tasks right after the first one; every move halves the gap
+    for i in range(REBALANCE_KEY_LENGTH * 8):
+        mover, neighbor = (third, second) if i % 2 == 0 else (second, third)
+        api.post(f"/api/v1/tasks/{mover}/move", json={"before_id": first, "after_id": neighbor})
+    kinds = [row["kind"] for row in job_queue._conn.execute("SELECT kind FROM jobs").fetchall()]
+    # One job per minute however many moves asked for it
+    assert kinds and set(kinds) == {"ordering.rebalance"} and len(kinds) <= 2
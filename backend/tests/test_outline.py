@@ -0,0 +1,50 @@
+"""Tests for page heading outlines."""
+
+import random
+
+from fastapi import status
+
+from app.outline import extract_outline, update_outline
+
+
+def test_extract_outline():
+    """Test levels, plain text, deduplicated anchors, byte offsets and skipped code blocks."""
+    content = "# Intro **bold**\n\nété\n## Next steps ##\n```\n# not a heading\n```\n## Next steps\n#nospace\n"
+    assert extract_outline(content) == [
+        {"level": 1, "text": "Intro bold", "anchor": "intro-bold", "offset": 0},
+        {"level": 2, "text": "Next steps", "anchor": "next-steps", "offset": 24},
+        {"level": 2, "text": "Next steps", "anchor": "next-steps-1", "offset": 65},
+    ]
+
+
+def test_incremental_update_matches_full_extraction():
+    """Test that updating the outline for random edits gives the same result as a full scan."""
+    pieces = ["# A\n", "## B b\n", "text\n", "```\n", "~~~~\n", "### Ü\n", "\n", "para é\n", "  ## indented\n"]
+    rng = random.Random(7)
+    for _ in range(500):
+        old = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+        new = list(old)
+        for _ in range(rng.randint(1, 3)):
+            start = rng.randint(0, len(new))
+            new[start : start + rng.randint(0, 6)] = rng.choice(pieces + ["#", " ", "\n", "é"])
+        new = "".join(new)
+        assert update_outline(old, extract_outline(old), new) == extract_outline(new), (old, new)
+
+
+def test_outline_is_stored_and_served(api):
+    """Test that create and update store the outline and the list returns it on request."""
+    workspace_id = api.get("/api/v1/workspaces/").json()[0]["id"]
+    page = api.post(
+        f"/api/v1/workspaces/{workspace_id}/pages",
+        json={"title": "Plan", "content": "# Goals\ntext\n## Later\n"},
+    ).json()
+    assert [h["anchor"] for h in page["outline"]] == ["goals", "later"]
+
+    api.put(f"/api/v1/pages/{page['id']}", json={"content": "# Goals\ntext\n## Now\n## Later\n"})
+    response = api.get(f"/api/v1/pages/{page['id']}/outline")
+    assert response.status_code == status.HTTP_200_OK
+    assert [h["text"] for h in response.json()] == ["Goals", "Now", "Later"]
+
+    pages = api.get(f"/api/v1/workspaces/{workspace_id}/pages?outline=true").json()
+    assert all(p["outline"] is not None for p in pages)  # seeded pages have theirs extracted
+    assert all(p["outline"] is None for p in api.get(f"/api/v1/workspaces/{workspace_id}/pages").json())
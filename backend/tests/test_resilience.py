@@ -0,0 +1,225 @@
+"""Tests for Supabase timeouts, retries, hedging and circuit breaking."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import status
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app import metrics
+from app.config import get_settings
+from app.db import instrument
+from app.dependencies import close_http_client, create_client, get_current_user
+from app.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    UpstreamUnavailable,
+    call_upstream,
+    call_upstream_async,
+    get_breaker,
+    reset_breakers,
+)
+from bench.fake_upstream import FakeUpstream
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    reset_breakers()
+    yield
+    reset_breakers()
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """Settings with fast retries; tests adjust them further."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "supabase_retry_backoff", 0.0)
+    monkeypatch.setattr(settings, "supabase_read_retries", 2)
+    monkeypatch.setattr(settings, "supabase_hedge_after", 0.0)
+    monkeypatch.setattr(settings, "breaker_failure_threshold", 5)
+    return settings
+
+
+@pytest.fixture
+def upstream(settings, monkeypatch):
+    """A local fake Supabase, and a client of it on the shared pool."""
+    with FakeUpstream() as fake:
+        monkeypatch.setattr(settings, "supabase_url", fake.url)
+        fake.client = instrument(create_client(fake.url, settings.supabase_anon_key))
+        yield fake
+    close_http_client()
+
+
+def test_breaker_opens_and_recovers():
+    """Test the closed -> open -> half-open -> closed cycle."""
+    now = [0.0]
+    breaker = CircuitBreaker("rest", failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+
+    now[0] = 11
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()  # only one trial call at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    now[0] = 22
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_lost_trial_makes_way():
+    """Test that a trial call that never reports back is replaced after another reset timeout."""
+    now = [0.0]
+    breaker = CircuitBreaker("rest", failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 11
+    breaker.before_call()
+    now[0] = 20
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+    now[0] = 21
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+
+def test_cancelled_trial_frees_the_breaker(settings, monkeypatch):
+    """Test that a trial call cancelled by a disconnect does not leave the circuit half-open."""
+    monkeypatch.setattr(settings, "breaker_reset_timeout", 0.05)
+    breaker = get_breaker("auth")
+    for _ in range(settings.breaker_failure_threshold):
+        breaker.record_failure()
+    time.sleep(0.06)
+
+    async def run():
+        trial = asyncio.create_task(call_upstream_async("auth", lambda: time.sleep(0.2)))
+        await asyncio.sleep(0.01)
+        assert breaker.state == HALF_OPEN
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(run())
+    assert call_upstream("auth", lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_reads_are_retried(upstream):
+    """Test that a select succeeds after transient 503s, retrying each."""
+    retries = metrics.UPSTREAM_RETRIES.get("tasks", "select")
+    upstream.fail_next(2, status=503)
+    assert upstream.client.table("tasks").select("*").execute().data == []
+    assert len(upstream.requests) == 3
+    assert metrics.UPSTREAM_RETRIES.get("tasks", "select") == retries + 2
+
+
+def test_reads_on_the_event_loop_are_not_retried(upstream, settings, monkeypatch):
+    """Test that a select run inline in an async route fails at once instead of sleeping on the loop."""
+    monkeypatch.setattr(settings, "supabase_retry_backoff", 10.0)
+    upstream.fail_next(1, status=503)
+
+    async def run():
+        upstream.client.table("tasks").select("*").execute()
+
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(run())
+    assert len(upstream.requests) == 1
+
+
+def test_writes_are_not_retried(upstream):
+    """Test that a failed insert is reported as unavailable without a second attempt."""
+    upstream.fail_next(1, status=503)
+    with pytest.raises(UpstreamUnavailable):
+        upstream.client.table("tasks").insert({"content": "x"}).execute()
+    assert len(upstream.requests) == 1
+
+
+def test_read_timeout(upstream, settings, monkeypatch):
+    """Test that a slow select gives up after the read timeout."""
+    monkeypatch.setattr(settings, "supabase_read_timeout", 0.1)
+    monkeypatch.setattr(settings, "supabase_read_retries", 0)
+    upstream.delay = 1.0
+    start = time.perf_counter()
+    with pytest.raises(UpstreamUnavailable) as exc_info:
+        upstream.client.table("tasks").select("*").execute()
+    assert time.perf_counter() - start < 0.8
+    assert isinstance(exc_info.value.__cause__, httpx.TimeoutException)
+
+
+def test_open_circuit_fails_fast(upstream, settings, monkeypatch):
+    """Test that once the circuit opens, calls fail without reaching the upstream."""
+    monkeypatch.setattr(settings, "breaker_failure_threshold", 2)
+    monkeypatch.setattr(settings, "supabase_read_retries", 0)
+    upstream.fail_next(10, status=503)
+    for _ in range(3):
+        with pytest.raises(UpstreamUnavailable) as exc_info:
+            upstream.client.table("tasks").select("*").execute()
+    assert len(upstream.requests) == 2
+    assert get_breaker("rest").state == OPEN
+    assert "Retry-After" in exc_info.value.headers
+
+
+def test_hedged_read(upstream, settings, monkeypatch):
+    """Test that a slow select is sent again and the faster answer wins."""
+    monkeypatch.setattr(settings, "supabase_hedge_after", 0.05)
+    hedged = metrics.UPSTREAM_HEDGED.get("tasks")
+    upstream.delays = [0.6, 0.0]
+    start = time.perf_counter()
+    assert upstream.client.table("tasks").select("*").execute().data == []
+    assert time.perf_counter() - start < 0.5
+    assert len(upstream.requests) == 2
+    assert metrics.UPSTREAM_HEDGED.get("tasks") == hedged + 1
+
+
+def test_auth_outage_is_503_not_401(upstream):
+    """Test that failing token checks surface as unavailable rather than signing users out."""
+    upstream.fail_next(3, status=503)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="token")
+    with pytest.raises(UpstreamUnavailable):
+        asyncio.run(get_current_user(credentials))
+
+
+def test_auth_retry_backoff_does_not_block_the_loop(upstream, monkeypatch):
+    """Test that other requests are served while a token check waits to retry."""
+    monkeypatch.setattr("app.resilience.backoff_delay", lambda attempt, base: 0.2)
+    upstream.fail_next(3, status=503)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials="token")
+    ticks = []
+
+    async def run():
+        async def tick():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        try:
+            with pytest.raises(UpstreamUnavailable):
+                await get_current_user(credentials)
+        finally:
+            ticker.cancel()
+
+    asyncio.run(run())
+    assert len(ticks) > 10
+
+
+def test_route_returns_503_while_circuit_open(api, settings):
+    """Test that routes answer 503 with Retry-After while the REST circuit is open."""
+    breaker = get_breaker("rest")
+    for _ in range(settings.breaker_failure_threshold):
+        breaker.record_failure()
+
+    response = api.get("/api/v1/workspaces/")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert int(response.headers["Retry-After"]) >= 1
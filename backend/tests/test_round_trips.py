@@ -0,0 +1,86 @@
+"""Round-trip budget tests: every API route must stay within its declared budget."""
+
+import pytest
+from fastapi import status
+from fastapi.routing import APIRoute
+
+from app.db import get_round_trip_budget, instrument
+from app.main import app
+
+
+def test_every_api_route_declares_a_budget():
+    """Test that new routes can't skip declaring a round-trip budget."""
+    missing = [
+        route.path
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        and route.path.startswith("/api/")
+        and get_round_trip_budget(route) is None
+    ]
+    assert missing == []
+
+
+def test_workspace_routes_within_budget(api, round_trips):
+    """Test workspace CRUD round trips."""
+    workspaces = api.get("/api/v1/workspaces/").json()
+    workspace_id = workspaces[0]["id"]
+    api.get(f"/api/v1/workspaces/{workspace_id}")
+    created = api.post("/api/v1/workspaces/", json={"name": "Budget"})
+    assert created.status_code == status.HTTP_201_CREATED
+    new_id = created.json()["id"]
+    api.put(f"/api/v1/workspaces/{new_id}", json={"name": "Renamed"})
+    assert api.delete(f"/api/v1/workspaces/{new_id}").status_code == status.HTTP_204_NO_CONTENT
+
+    round_trips.assert_within_budget()
+
+
+@pytest.mark.parametrize("kind,payload,update", [
+    ("tasks", {"content": "Budget task"}, {"priority": 3}),
+    ("notes", {"title": "Budget note"}, {"content": "changed"}),
+    ("pages", {"title": "Budget page"}, {"content": "# changed"}),
+])
+def test_item_routes_within_budget(api, round_trips, kind, payload, update):
+    """Test list, create, get, update and delete round trips for each item type."""
+    workspace_id = api.get("/api/v1/workspaces/").json()[0]["id"]
+    assert api.get(f"/api/v1/workspaces/{workspace_id}/{kind}").status_code == status.HTTP_200_OK
+    created = api.post(f"/api/v1/workspaces/{workspace_id}/{kind}", json=payload)
+    assert created.status_code == status.HTTP_201_CREATED
+    item_id = created.json()["id"]
+    assert api.get(f"/api/v1/{kind}/{item_id}").status_code == status.HTTP_200_OK
+    assert api.put(f"/api/v1/{kind}/{item_id}", json=update).status_code == status.HTTP_200_OK
+    if kind == "tasks":
+        toggled = api.patch(f"/api/v1/tasks/{item_id}/toggle")
+        assert toggled.json()["done"] is True
+    assert api.delete(f"/api/v1/{kind}/{item_id}").status_code == status.HTTP_204_NO_CONTENT
+
+    round_trips.assert_within_budget()
+
+
+def test_delete_account_within_budget(api, fake_db, job_queue, round_trips, monkeypatch):
+    """Test that account deletion is queued without Supabase calls and runs one admin call."""
+    import asyncio
+
+    from app.db import track_queries
+    from app.jobs import JobRunner
+
+    monkeypatch.setattr("app.routes.account.get_supabase_admin_client", lambda: instrument(fake_db.client()))
+    response = api.delete("/api/v1/account/")
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert round_trips.last == []
+    round_trips.assert_within_budget()
+
+    with track_queries() as queries:
+        assert asyncio.run(JobRunner(job_queue).run_once())
+    assert [(table, op) for table, op, _ in queries.calls] == [("auth", "admin.delete_user")]
+
+
+def test_budget_violation_fails(api, round_trips, monkeypatch):
+    """Test that exceeding a declared budget is reported with the offending calls."""
+    from app.routes.tasks import create_task
+
+    monkeypatch.setattr(create_task, "round_trip_budget", 1)
+    workspace_id = api.get("/api/v1/workspaces/").json()[0]["id"]
+    api.post(f"/api/v1/workspaces/{workspace_id}/tasks", json={"content": "Over budget"})
+
+    with pytest.raises(pytest.fail.Exception, match="budget is 1"):
+        round_trips.assert_within_budget()
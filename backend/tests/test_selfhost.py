@@ -0,0 +1,48 @@
+"""Tests for the self-hosted SQLite API (app.py, models.py, routes/api.py)."""
+
+import pytest
+
+pytest.importorskip("flask_sqlalchemy")
+
+from models import Task, Workspace, db  # noqa: E402
+from bench.selfhost import make_app  # noqa: E402
+
+
+@pytest.fixture
+def selfhost(tmp_path):
+    app = make_app(str(tmp_path / "moji.db"), tuned=True)
+    with app.app_context():
+        workspace_id = db.session.execute(db.select(Workspace.id)).scalar()
+        Task.bulk_insert([{"content": f"Task {i}", "priority": i % 4, "workspace_id": workspace_id} for i in range(25)])
+    return app
+
+
+def test_connections_use_wal_and_indexes(selfhost):
+    """Test that the pragmas are applied and task lists are read through the workspace index."""
+    with selfhost.app_context():
+        connection = db.session.connection()
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+        plan = connection.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT id FROM task WHERE workspace_id = 1 ORDER BY created_at, id"
+        ).all()
+        assert any("ix_task_workspace_id_created_at" in row[-1] for row in plan)
+        assert not any("TEMP B-TREE" in row[-1] for row in plan)
+
+
+def test_task_list_matches_orm_serialization(selfhost):
+    """Test that the column-level list renders exactly what the per-object to_dict did."""
+    client = selfhost.test_client()
+    tasks = client.get("/v1/api/tasks").get_json()
+    legacy = client.get("/legacy/tasks").get_json()
+    assert len(tasks) == 25
+    assert tasks == legacy
+
+
+def test_bulk_create_commits_once(selfhost):
+    """Test that a list of tasks is created in one request and transaction."""
+    client = selfhost.test_client()
+    response = client.post("/v1/api/tasks", json=[{"content": "a"}, {"content": "b", "priority": 3}])
+    assert response.status_code == 201
+    assert [task["content"] for task in response.get_json()] == ["a", "b"]
+    assert len(client.get("/v1/api/tasks").get_json()) == 27
@@ -0,0 +1,45 @@
+"""Tests for the production launcher."""
+
+import asyncio
+
+from app import server
+from app.config import get_settings
+
+
+def test_available_cpus_respects_cgroup_quota(tmp_path):
+    """Test that a CPU quota caps the worker count and "max" leaves it alone."""
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("150000 100000\n")
+    assert server.available_cpus(str(cpu_max)) == min(2, server.available_cpus(str(tmp_path / "none")))
+
+    cpu_max.write_text("max 100000\n")
+    assert server.available_cpus(str(cpu_max)) == server.available_cpus(str(tmp_path / "none"))
+
+
+def test_uvicorn_options():
+    """Test that workers default to one per CPU and production settings are applied."""
+    settings = get_settings().model_copy(update={"server_workers": 0, "server_keep_alive": 75.0})
+    options = server.uvicorn_options(settings, cpus=3)
+    assert options["workers"] == 3
+    assert options["timeout_keep_alive"] == 75.0
+    assert options["proxy_headers"] is True
+    assert options["forwarded_allow_ips"] == "127.0.0.1"
+
+    settings = settings.model_copy(update={"server_workers": 2})
+    assert server.uvicorn_options(settings, cpus=8)["workers"] == 2
+
+
+def test_warm_up_survives_unreachable_supabase(monkeypatch):
+    """Test that a failing warm-up step is logged and the worker still starts."""
+    calls = []
+
+    def unreachable(settings):
+        calls.append(settings)
+        raise ConnectionError("no route to host")
+
+    monkeypatch.setattr(server, "_ping_supabase", unreachable)
+    from app.main import app
+
+    asyncio.run(server.warm_up(app))
+    assert len(calls) == get_settings().warm_up_connections
+    assert app.openapi_schema is not None
@@ -0,0 +1,83 @@
+"""Tests for public page sharing."""
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.render import render_markdown
+from app.sharing import PurgeLog, SharedPage, SharedPageCache
+
+
+def test_render_markdown_escapes_and_anchors():
+    """Test that markup is escaped, unsafe links dropped and headings get the outline's anchors."""
+    html = render_markdown("# Intro\n<script>x</script> [go](javascript:x) [ok](https://a.b/?q=1&r=2)\n# Intro\n")
+    assert '<h1 id="intro">Intro</h1>' in html and '<h1 id="intro-1">Intro</h1>' in html
+    assert "&lt;script&gt;" in html and "javascript" not in html
+    assert '<a href="https://a.b/?q=1&amp;r=2" rel="nofollow noopener">ok</a>' in html
+
+
+def test_shared_page_is_served_anonymously_and_cached(api, round_trips):
+    """Test sharing, anonymous views from the hot cache, ETags, versioned URLs and purge on edit."""
+    workspace_id = api.get("/api/v1/workspaces/").json()[0]["id"]
+    page = api.post(f"/api/v1/workspaces/{workspace_id}/pages", json={"title": "Launch", "content": "# Plan\nShip it"}).json()
+    share = api.post(f"/api/v1/pages/{page['id']}/share")
+    assert share.status_code == status.HTTP_201_CREATED
+    again = api.post(f"/api/v1/pages/{page['id']}/share")
+    assert again.status_code == status.HTTP_200_OK and again.json()["token"] == share.json()["token"]
+    path = share.json()["path"]
+
+    anonymous = TestClient(app)
+    first = anonymous.get(path)
+    assert first.status_code == status.HTTP_200_OK
+    assert "<h1>Launch</h1>" in first.text and "Ship it" in first.text
+    assert first.headers["cache-control"] == "public, max-age=60"
+    assert round_trips.last == [("shared_page", "rpc")]
+
+    assert anonymous.get(path).text == first.text
+    assert round_trips.last == []  # served from the hot cache
+    etag = first.headers["etag"]
+    assert anonymous.get(path, headers={"If-None-Match": etag}).status_code == status.HTTP_304_NOT_MODIFIED
+
+    versioned = first.headers["content-location"]
+    response = anonymous.get(versioned)
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert response.headers["etag"] == etag
+
+    api.put(f"/api/v1/pages/{page['id']}", json={"content": "# Plan\nShipped"})
+    edited = anonymous.get(path)
+    assert "Shipped" in edited.text and edited.headers["etag"] != etag
+    stale = anonymous.get(versioned, follow_redirects=False)
+    assert stale.status_code == status.HTTP_307_TEMPORARY_REDIRECT and stale.headers["location"] == path
+    round_trips.assert_within_budget()
+
+
+def test_unshare_stops_serving_at_once(api, round_trips):
+    """Test that an unshared page is a 404 right away and junk tokens never reach Supabase."""
+    page = api.get(f"/api/v1/workspaces/{api.get('/api/v1/workspaces/').json()[0]['id']}/pages").json()[0]
+    path = api.post(f"/api/v1/pages/{page['id']}/share").json()["path"]
+    anonymous = TestClient(app)
+    assert anonymous.get(path).status_code == status.HTTP_200_OK
+
+    assert api.delete(f"/api/v1/pages/{page['id']}/share").status_code == status.HTTP_204_NO_CONTENT
+    assert anonymous.get(path).status_code == status.HTTP_404_NOT_FOUND
+    assert api.get(f"/api/v1/pages/{page['id']}/share").status_code == status.HTTP_404_NOT_FOUND
+
+    assert anonymous.get("/p/not-a-token!").status_code == status.HTTP_404_NOT_FOUND
+    assert round_trips.last == []
+
+
+def test_purges_reach_other_workers(tmp_path):
+    """Test that a purge in one worker's cache drops the page from another's sharing the log."""
+    path = str(tmp_path / "jobs.db")
+    here, there = (SharedPageCache(1_000_000, 60.0, PurgeLog(path, 60.0)) for _ in range(2))
+    page = SharedPage("t" * 22, "page-1", "workspace-1", b"<p>Hi</p>", "v1")
+    assert there.set(page, there.generation)
+    generation = here.generation
+
+    here.purge_page("page-1")
+    assert there.get(page.token) is None
+    assert not here.set(page, generation)  # rendered before the purge
+
+    assert there.set(page, there.generation)
+    here.purge_workspace("workspace-1")
+    assert there.get(page.token) is None
@@ -0,0 +1,72 @@
+"""Tests for cold-start behavior: deferred imports and the precomputed OpenAPI schema."""
+
+import json
+import subprocess
+import sys
+
+from fastapi import FastAPI
+
+from app.openapi import use_precomputed_schema, write_schema
+from bench.startup import BACKEND_DIR, bench_env, parse_importtime
+
+
+def _app(version: str = "1.0.0") -> FastAPI:
+    app = FastAPI(title="Test", version=version)
+
+    @app.get("/items")
+    async def items():
+        return []
+
+    return app
+
+
+def test_importing_the_app_does_not_import_supabase():
+    """Test that supabase is only loaded once a client is created."""
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print('supabase' in sys.modules)"],
+        cwd=BACKEND_DIR,
+        env=bench_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_parse_importtime():
+    """Test that -X importtime lines are parsed and other lines skipped."""
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   fastapi.params\n"
+        "import time:      2000 |       2120 | fastapi\n"
+        "unrelated output\n"
+    )
+    assert parse_importtime(output) == [("fastapi.params", 120, 120, 1), ("fastapi", 2000, 2120, 0)]
+
+
+def test_precomputed_schema_is_served(tmp_path):
+    """Test that a written schema is loaded instead of generated."""
+    path = tmp_path / "openapi.json"
+    write_schema(_app(), str(path))
+    schema = json.loads(path.read_text())
+    assert "/items" in schema["paths"]
+
+    schema["info"]["title"] = "From file"
+    path.write_text(json.dumps(schema))
+    app = _app()
+    use_precomputed_schema(app, str(path))
+    assert app.openapi()["info"]["title"] == "From file"
+
+
+def test_stale_or_missing_schema_is_regenerated(tmp_path):
+    """Test that a schema for another version, or no file at all, falls back to generation."""
+    path = tmp_path / "openapi.json"
+    write_schema(_app(version="0.9.0"), str(path))
+
+    app = _app()
+    use_precomputed_schema(app, str(path))
+    assert app.openapi()["info"]["version"] == "1.0.0"
+
+    app = _app()
+    use_precomputed_schema(app, str(tmp_path / "missing.json"))
+    assert "/items" in app.openapi()["paths"]
@@ -0,0 +1,59 @@
+"""Tests for task list filtering, sorting and pagination."""
+
+import pytest
+from fastapi import status
+
+
+@pytest.fixture
+def workspace_id(api):
+    workspace_id = api.get("/api/v1/workspaces/").json()[0]["id"]
+    for content, priority, done in (
+        ("Write report", 3, False),
+        ("Call 100% of clients", 2, False),
+        ("File_taxes", 3, True),
+        ("Water plants", 0, False),
+    ):
+        api.post(
+            f"/api/v1/workspaces/{workspace_id}/tasks",
+            json={"content": content, "priority": priority, "done": done},
+        )
+    return workspace_id
+
+
+def _contents(api, workspace_id, query):
+    response = api.get(f"/api/v1/workspaces/{workspace_id}/tasks?{query}")
+    assert response.status_code == status.HTTP_200_OK
+    return [task["content"] for task in response.json()]
+
+
+def test_filter_open_high_priority(api, workspace_id):
+    """Test that done and priority filters are applied by the query."""
+    assert _contents(api, workspace_id, "done=false&min_priority=3") == ["Write report"]
+    tasks = _contents(api, workspace_id, "max_priority=0")
+    assert "Water plants" in tasks and "Write report" not in tasks
+
+
+def test_text_filter_escapes_wildcards(api, workspace_id):
+    """Test that the text filter matches literally and ignores case."""
+    assert _contents(api, workspace_id, "q=100%25") == ["Call 100% of clients"]
+    assert _contents(api, workspace_id, "q=file_") == ["File_taxes"]
+    assert _contents(api, workspace_id, "q=te_r") == []
+    assert _contents(api, workspace_id, "q=wr*rep") == []
+    api.post(f"/api/v1/workspaces/{workspace_id}/tasks", json={"content": "Rate 5*"})
+    assert _contents(api, workspace_id, "q=5*") == ["Rate 5*"]
+
+
+def test_sort_and_paginate(api, workspace_id):
+    """Test sorting by priority (descending by default) combined with limit and offset."""
+    # Seeded "Task 2" has priority 2 as well and was created first
+    by_priority = _contents(api, workspace_id, "sort=priority&min_priority=2")
+    assert by_priority == ["Write report", "File_taxes", "Task 2", "Call 100% of clients"]
+    assert _contents(api, workspace_id, "sort=priority&min_priority=2&limit=2") == by_priority[:2]
+    assert _contents(api, workspace_id, "sort=priority&min_priority=2&limit=2&offset=2") == by_priority[2:]
+    assert _contents(api, workspace_id, "sort=priority&desc=false&min_priority=2")[0] == "Task 2"
+
+
+def test_invalid_filters(api, workspace_id):
+    """Test that out-of-range parameters are rejected."""
+    assert api.get(f"/api/v1/workspaces/{workspace_id}/tasks?min_priority=4").status_code == 422
+    assert api.get(f"/api/v1/workspaces/{workspace_id}/tasks?sort=random").status_code == 422
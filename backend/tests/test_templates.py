@@ -0,0 +1,72 @@
+"""Tests for workspace clone and templates."""
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import status
+
+from app.config import get_settings
+from app.templates import load_templates
+
+
+def test_builtin_templates_are_valid():
+    """Test that every bundled template file loads through the create models."""
+    templates = load_templates()
+    assert templates
+    for template in templates.values():
+        assert template["name"] and template["tasks"]
+
+
+def test_template_catalog(api, round_trips):
+    """Test that the catalog is served from memory."""
+    response = api.get("/api/v1/templates/")
+    assert response.status_code == status.HTTP_200_OK
+    assert {t["id"] for t in response.json()} == set(load_templates())
+    assert round_trips.last == []
+
+
+def test_create_workspace_from_template(api, round_trips):
+    """Test that a template becomes a workspace with its content in one call."""
+    response = api.post("/api/v1/templates/weekly-planning/workspaces", json={"name": "This week"})
+    assert response.status_code == status.HTTP_201_CREATED
+    workspace = response.json()
+    assert workspace["name"] == "This week"
+    assert round_trips.last == [("create_workspace_from_template", "rpc")]
+
+    tasks = api.get(f"/api/v1/workspaces/{workspace['id']}/tasks").json()
+    assert len(tasks) == len(load_templates()["weekly-planning"]["tasks"])
+    review = next(t for t in tasks if t["content"].startswith("Friday"))
+    assert review["due_date"] == (datetime.now(timezone.utc).date() + timedelta(days=4)).isoformat()
+
+
+def test_unknown_template(api):
+    """Test that an unknown template ID is a 404."""
+    response = api.post("/api/v1/templates/nope/workspaces")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_clone_workspace(api, round_trips):
+    """Test that a clone copies every item in a single call, then rebuilds its links."""
+    source = api.get("/api/v1/workspaces/").json()[0]
+    response = api.post(f"/api/v1/workspaces/{source['id']}/clone")
+    assert response.status_code == status.HTTP_201_CREATED
+    clone = response.json()
+    assert clone["name"] == f"{source['name']} (copy)"
+    assert round_trips.last == [("clone_workspace", "rpc"), ("rebuild_links", "rpc")]
+
+    for kind in ("tasks", "notes", "pages"):
+        original = api.get(f"/api/v1/workspaces/{source['id']}/{kind}").json()
+        copied = api.get(f"/api/v1/workspaces/{clone['id']}/{kind}").json()
+        assert len(copied) == len(original)
+
+
+def test_clone_checks_ownership_and_quota(api, fake_db, monkeypatch):
+    """Test that clones of other users' workspaces and over-quota clones are rejected."""
+    other = fake_db.seed_user("00000000-0000-4000-8000-000000000042", workspaces=1)[0]
+    response = api.post(f"/api/v1/workspaces/{other['id']}/clone")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    monkeypatch.setattr(get_settings(), "max_workspaces_per_user", 2)
+    source = api.get("/api/v1/workspaces/").json()[0]
+    response = api.post(f"/api/v1/workspaces/{source['id']}/clone")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Workspace limit reached"
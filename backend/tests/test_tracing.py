@@ -0,0 +1,72 @@
+"""Tests for request IDs and trace spans."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from app import tracing
+from app.db import instrument
+
+
+@pytest.fixture
+def ndjson_tracer(tmp_path):
+    """Install a tracer that samples everything into an NDJSON file."""
+    path = tmp_path / "traces.ndjson"
+    tracer = tracing.Tracer(tracing.NDJSONFileExporter(str(path), batch_size=1), sample_rate=1.0)
+    tracing.set_tracer(tracer)
+    yield path
+    tracing.set_tracer(None)
+
+
+def read_spans(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_request_id_is_generated(client):
+    """Test that responses carry a generated request ID."""
+    response = client.get("/health")
+    assert len(response.headers["X-Request-ID"]) == 32
+
+
+def test_request_id_is_accepted_from_client(client):
+    """Test that a well-formed incoming request ID is echoed back."""
+    response = client.get("/health", headers={"X-Request-ID": "abc-123"})
+    assert response.headers["X-Request-ID"] == "abc-123"
+
+    response = client.get("/health", headers={"X-Request-ID": "bad id!"})
+    assert response.headers["X-Request-ID"] != "bad id!"
+
+
+def test_incoming_traceparent_is_continued(client, ndjson_tracer):
+    """Test that the server span joins the caller's trace."""
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    client.get("/health", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+
+    spans = read_spans(ndjson_tracer)
+    server = next(s for s in spans if s["kind"] == "server")
+    assert server["name"] == "GET /health"
+    assert server["trace_id"] == trace_id
+    assert server["parent_id"] == "00f067aa0ba902b7"
+
+
+def test_postgrest_calls_get_child_spans_and_traceparent(ndjson_tracer):
+    """Test that PostgREST calls are traced and carry trace headers upstream."""
+    raw = MagicMock()
+    builder = raw.table.return_value.select.return_value
+    builder.request.headers = {}
+
+    with tracing.get_tracer().span("parent") as parent:
+        instrument(raw).table("tasks").select("*").execute()
+
+    spans = read_spans(ndjson_tracer)
+    call = next(s for s in spans if s["kind"] == "client")
+    assert call["name"] == "postgrest select tasks"
+    assert call["parent_id"] == parent.span_id
+    assert builder.request.headers["traceparent"].split("-")[2] == call["span_id"]
+
+
+def test_invalid_traceparent_is_ignored():
+    """Test that malformed or all-zero trace contexts are rejected."""
+    assert tracing.parse_traceparent("garbage") is None
+    assert tracing.parse_traceparent(f"00-{'0' * 32}-00f067aa0ba902b7-01") is None
@@ -0,0 +1,90 @@
+"""Tests for streaming export and import."""
+
+import io
+import json
+import zipfile
+
+from fastapi import status
+
+from app import transfer
+from app.config import get_settings
+
+
+def export_lines(api, **params):
+    response = api.get("/api/v1/export", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_export_ndjson_includes_everything(api, monkeypatch):
+    """Test that the export pages through every row of every workspace."""
+    monkeypatch.setitem(transfer.EXPORT_CHUNK_ROWS, "tasks", 2)
+    records = export_lines(api)
+
+    assert records[0]["type"] == "moji-export"
+    kinds = [r["type"] for r in records[1:]]
+    assert kinds.count("workspace") == 2
+    assert kinds.count("task") == 6
+    assert kinds.count("note") == 6
+    assert kinds.count("page") == 4
+
+
+def test_export_zip_of_markdown(api):
+    """Test that the zip export is a valid archive of markdown files."""
+    response = api.get("/api/v1/export", params={"format": "zip"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/zip"
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    names = archive.namelist()
+    assert "Workspace 0/tasks.md" in names
+    assert sum(name.startswith("Workspace 1/pages/") for name in names) == 2
+    assert archive.read("Workspace 0/tasks.md").decode().count("- [") == 3
+
+
+def test_import_round_trip(api, fake_db, user_id):
+    """Test that importing an export recreates the workspaces as new ones."""
+    body = api.get("/api/v1/export").content
+    response = api.post("/api/v1/import", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["imported"] == {"workspaces": 2, "tasks": 6, "notes": 6, "pages": 4}
+    assert len(fake_db.owned_workspace_ids(user_id)) == 4
+
+
+def test_import_is_streamed_past_the_request_size_limit(api, fake_db, user_id):
+    """Test that large imports aren't rejected by the generic 1 MB body limit."""
+    lines = [{"type": "workspace", "id": "w", "name": "Big"}]
+    lines += [{"type": "page", "workspace_id": "w", "title": f"P{i}", "content": "x" * 20_000} for i in range(60)]
+    body = "\n".join(json.dumps(line) for line in lines).encode()
+    assert len(body) > 1_000_000
+
+    response = api.post("/api/v1/import", content=body)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["imported"]["pages"] == 60
+
+
+def test_import_error_rolls_back(api, fake_db, user_id):
+    """Test that a bad line fails the import without leaving partial data."""
+    body = "\n".join([
+        json.dumps({"type": "workspace", "id": "w", "name": "Half"}),
+        json.dumps({"type": "task", "workspace_id": "w", "content": "ok"}),
+        "{not json",
+    ])
+    response = api.post("/api/v1/import", content=body)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "Line 3" in response.json()["detail"]
+    assert len(fake_db.owned_workspace_ids(user_id)) == 2
+
+
+def test_import_enforces_quotas(api, fake_db, user_id, monkeypatch):
+    """Test that per-workspace quotas apply to imported rows."""
+    monkeypatch.setattr(get_settings(), "max_tasks_per_workspace", 2)
+    lines = [{"type": "workspace", "id": "w", "name": "Busy"}]
+    lines += [{"type": "task", "workspace_id": "w", "content": f"T{i}"} for i in range(3)]
+    response = api.post("/api/v1/import", content="\n".join(json.dumps(line) for line in lines))
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "limit" in response.json()["detail"]
+    assert len(fake_db.owned_workspace_ids(user_id)) == 2
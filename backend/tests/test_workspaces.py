@@ -32,3 +32,83 @@ def test_root_endpoint(client):
     response = client.get("/")
     assert response.status_code == status.HTTP_200_OK
     assert "message" in response.json()
+
+
+NEW_USER = "00000000-0000-4000-8000-999999999999"
+
+
+def test_first_load_seeds_defaults_in_one_call(client, fake_db, round_trips):
+    """Test that a new user's first load seeds defaults with a single RPC."""
+    headers = {"Authorization": f"Bearer {NEW_USER}"}
+    response = client.get("/api/v1/workspaces/", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [w["name"] for w in response.json()] == ["Welcome to Moji", "Personal", "Work"]
+    assert round_trips.last == [("member_workspaces", "rpc")]
+    welcome_id = response.json()[0]["id"]
+    assert len(client.get(f"/api/v1/workspaces/{welcome_id}/tasks", headers=headers).json()) == 3
+
+
+def test_seeding_is_idempotent(client, fake_db):
+    """Test that repeated and concurrent loads seed only once."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    headers = {"Authorization": f"Bearer {NEW_USER}"}
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        responses = list(pool.map(lambda _: client.get("/api/v1/workspaces/", headers=headers), range(4)))
+
+    assert all(len(r.json()) == 3 for r in responses)
+    assert len(fake_db.owned_workspace_ids(NEW_USER)) == 3
+
+    # Deleting a default afterwards must not bring it back
+    work = next(w for w in responses[0].json() if w["name"] == "Work")
+    client.delete(f"/api/v1/workspaces/{work['id']}", headers=headers)
+    assert len(client.get("/api/v1/workspaces/", headers=headers).json()) == 2
+
+
+def test_legacy_personal_workspace_is_upgraded(client, fake_db):
+    """Test that a user with only the old default workspace gets the new defaults."""
+    fake_db.insert_rows(
+        "workspaces",
+        [{"name": "Personal", "description": "Your personal workspace", "user_id": NEW_USER}],
+    )
+    response = client.get("/api/v1/workspaces/", headers={"Authorization": f"Bearer {NEW_USER}"})
+    assert sorted(w["name"] for w in response.json()) == ["Personal", "Welcome to Moji", "Work"]
+
+
+def test_workspace_stats(api, round_trips):
+    """Test that sidebar counts for all workspaces come from one call."""
+    response = api.get("/api/v1/workspaces/stats")
+    assert response.status_code == status.HTTP_200_OK
+    assert round_trips.last == [("workspace_stats", "rpc")]
+    stats = response.json()
+    assert len(stats) == 2
+    assert {row["notes"] for row in stats} == {3}
+    assert all(row["open_tasks"] <= 3 for row in stats)
+
+
+def test_workspace_stats_etag(api):
+    """Test that an unchanged stats response revalidates with 304 and a write changes the ETag."""
+    first = api.get("/api/v1/workspaces/stats")
+    etag = first.headers["ETag"]
+    cached = api.get("/api/v1/workspaces/stats", headers={"If-None-Match": etag})
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.content == b""
+
+    workspace_id = first.json()[0]["workspace_id"]
+    api.post(f"/api/v1/workspaces/{workspace_id}/tasks", json={"content": "Urgent", "priority": 3})
+    changed = api.get("/api/v1/workspaces/stats", headers={"If-None-Match": etag})
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.headers["ETag"] != etag
+    assert changed.json()[0]["high_priority_tasks"] == first.json()[0]["high_priority_tasks"] + 1
+
+
+def test_workspace_stats_etag_matches_exactly(api):
+    """Test that If-None-Match is compared tag by tag, with weak tags and ``*`` honoured."""
+    etag = api.get("/api/v1/workspaces/stats").headers["ETag"]
+    for header in (f'"other", W/{etag}', "*"):
+        response = api.get("/api/v1/workspaces/stats", headers={"If-None-Match": header})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    for header in (f'"x{etag[1:]}', etag[:-2] + '"'):
+        response = api.get("/api/v1/workspaces/stats", headers={"If-None-Match": header})
+        assert response.status_code == status.HTTP_200_OK
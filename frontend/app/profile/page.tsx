@@ -78,6 +78,17 @@ function ProfileContent() {
     }
   }
 
+  // Deletion runs as a background job; wait for its outcome
+  async function accountDeleted(job: api.Job): Promise<boolean> {
+    try {
+      return (await api.waitForJob(job, token)).status === "succeeded";
+    } catch (err) {
+      // Once the account is gone its token no longer validates
+      if (err instanceof api.ApiError && err.status === 401) return true;
+      throw err;
+    }
+  }
+
   async function handleDeleteAccount() {
     if (isDemo) {
       toast.message("Account deletion is disabled in demo mode");
@@ -87,7 +98,10 @@ function ProfileContent() {
 
     try {
       setDeleting(true);
-      await api.deleteAccount(token);
+      if (!(await accountDeleted(await api.deleteAccount(token)))) {
+        toast.error("Failed to delete account. Please try again.");
+        return;
+      }
       toast.success("Account deleted");
       await signOut();
     } catch (err) {
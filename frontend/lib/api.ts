@@ -34,16 +34,29 @@ export interface Workspace {
   id: string;
   name: string;
   description: string | null;
+  cleanup_after_days: number | null;
   user_id: string;
   created_at: string;
   updated_at: string;
 }
 
+export interface WorkspaceStats {
+  workspace_id: string;
+  open_tasks: number;
+  high_priority_tasks: number;
+  notes: number;
+  pages: number;
+}
+
 export interface Task {
   id: string;
   content: string;
   done: boolean;
   priority: number;
+  due_date: string | null;
+  scheduled_date: string | null;
+  completed_at: string | null;
+  sort_key: string | null;
   workspace_id: string;
   created_at: string;
   updated_at: string;
@@ -54,6 +67,7 @@ export interface Note {
   title: string;
   content: string;
   tags: string[];
+  sort_key: string | null;
   workspace_id: string;
   created_at: string;
   updated_at: string;
@@ -63,11 +77,37 @@ export interface Page {
   id: string;
   title: string;
   content: string;
+  sort_key: string | null;
   workspace_id: string;
   created_at: string;
   updated_at: string;
 }
 
+export interface Job {
+  id: string;
+  kind: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  attempts: number;
+  max_attempts: number;
+  result: unknown;
+  error: string | null;
+  created_at: string;
+  updated_at: string;
+}
+
+export interface DailyDay {
+  date: string;
+  tasks: Pick<Task, "id" | "workspace_id" | "content" | "done" | "priority" | "due_date" | "scheduled_date">[];
+  notes: Pick<Note, "id" | "workspace_id" | "title">[];
+}
+
+export interface DailyCount {
+  date: string;
+  tasks: number;
+  done: number;
+  notes: number;
+}
+
 // API Error type
 export class ApiError extends Error {
   constructor(
@@ -166,9 +206,14 @@ export async function createWorkspace(data: {
   }, token);
 }
 
+// Counts only; the browser revalidates with the ETag
+export async function getWorkspaceStats(token?: string | null): Promise<WorkspaceStats[]> {
+  return apiFetch<WorkspaceStats[]>("/workspaces/stats", {}, token);
+}
+
 export async function updateWorkspace(
   id: string,
-  data: { name?: string; description?: string },
+  data: { name?: string; description?: string; cleanup_after_days?: number | null },
   token?: string | null
 ): Promise<Workspace> {
   return apiFetch<Workspace>(`/workspaces/${id}`, {
@@ -187,8 +232,28 @@ export async function deleteWorkspace(id: string, token?: string | null): Promis
 // Task API
 // ============================================
 
-export async function getTasks(workspaceId: string, token?: string | null): Promise<Task[]> {
-  return apiFetch<Task[]>(`/workspaces/${workspaceId}/tasks`, {}, token);
+export interface TaskQuery {
+  done?: boolean;
+  min_priority?: number;
+  max_priority?: number;
+  q?: string;
+  sort?: "manual" | "priority" | "created" | "updated";
+  desc?: boolean;
+  limit?: number;
+  offset?: number;
+}
+
+export async function getTasks(
+  workspaceId: string,
+  token?: string | null,
+  query: TaskQuery = {}
+): Promise<Task[]> {
+  const params = new URLSearchParams();
+  for (const [key, value] of Object.entries(query)) {
+    if (value !== undefined && value !== "") params.set(key, String(value));
+  }
+  const search = params.toString();
+  return apiFetch<Task[]>(`/workspaces/${workspaceId}/tasks${search ? `?${search}` : ""}`, {}, token);
 }
 
 export async function getTask(taskId: string, token?: string | null): Promise<Task> {
@@ -197,7 +262,7 @@ export async function getTask(taskId: string, token?: string | null): Promise<Ta
 
 export async function createTask(
   workspaceId: string,
-  data: { content: string; priority?: number },
+  data: { content: string; priority?: number; due_date?: string | null; scheduled_date?: string | null },
   token?: string | null
 ): Promise<Task> {
   return apiFetch<Task>(`/workspaces/${workspaceId}/tasks`, {
@@ -208,7 +273,13 @@ export async function createTask(
 
 export async function updateTask(
   taskId: string,
-  data: { content?: string; done?: boolean; priority?: number },
+  data: {
+    content?: string;
+    done?: boolean;
+    priority?: number;
+    due_date?: string | null;
+    scheduled_date?: string | null;
+  },
   token?: string | null
 ): Promise<Task> {
   return apiFetch<Task>(`/tasks/${taskId}`, {
@@ -309,12 +380,70 @@ export async function deletePage(pageId: string, token?: string | null): Promise
   }, token);
 }
 
+// ============================================
+// Ordering API
+// ============================================
+
+// Place an item between two neighbors; omit one to move it to that end
+export async function moveItem<T>(
+  kind: "tasks" | "notes" | "pages",
+  id: string,
+  neighbors: { before_id?: string | null; after_id?: string | null },
+  token?: string | null
+): Promise<T> {
+  return apiFetch<T>(`/${kind}/${id}/move`, {
+    method: "POST",
+    body: JSON.stringify(neighbors),
+  }, token);
+}
+
+// ============================================
+// Daily API
+// ============================================
+
+function dailyQuery(from: string, to: string, tz?: string): string {
+  const params = new URLSearchParams({ from, to });
+  if (tz) params.set("tz", tz);
+  return params.toString();
+}
+
+export async function getDaily(
+  from: string,
+  to: string,
+  tz?: string,
+  token?: string | null
+): Promise<{ start: string; end: string; days: DailyDay[] }> {
+  return apiFetch(`/daily/?${dailyQuery(from, to, tz)}`, {}, token);
+}
+
+export async function getDailySummary(
+  from: string,
+  to: string,
+  tz?: string,
+  token?: string | null
+): Promise<{ start: string; end: string; days: DailyCount[] }> {
+  return apiFetch(`/daily/summary?${dailyQuery(from, to, tz)}`, {}, token);
+}
+
 // ============================================
 // Account API
 // ============================================
 
-export async function deleteAccount(token?: string | null): Promise<void> {
-  return apiFetch<void>("/account", {
+export async function deleteAccount(token?: string | null): Promise<Job> {
+  return apiFetch<Job>("/account", {
     method: "DELETE",
   }, token);
 }
+
+export async function getJob(jobId: string, token?: string | null): Promise<Job> {
+  return apiFetch<Job>(`/jobs/${jobId}`, {}, token);
+}
+
+// Poll a background job until it has succeeded or failed
+export async function waitForJob(job: Job, token?: string | null, intervalMs = 1000): Promise<Job> {
+  while (job.status === "queued" || job.status === "running") {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    job = await getJob(job.id, token);
+  }
+  return job;
+}
@@ -0,0 +1,161 @@
+-- Auto-cleanup of completed tasks
+-- Run this in Supabase SQL Editor after daily.sql
+--
+-- Workspaces get an optional retention (cleanup_after_days). Tasks record
+-- when they were completed and, in workspaces with a retention, when they
+-- expire (expires_at, kept by triggers). A background sweeper removes (or
+-- archives) expired tasks in small batches walked along the partial
+-- (expires_at, id) index, so it never reads tasks that are kept forever,
+-- and no statement holds many row locks or produces a large burst of WAL.
+
+-- ============================================
+-- COLUMNS
+-- ============================================
+
+ALTER TABLE workspaces ADD COLUMN IF NOT EXISTS cleanup_after_days INTEGER
+    CHECK (cleanup_after_days IS NULL OR cleanup_after_days BETWEEN 1 AND 3650);
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS completed_at TIMESTAMPTZ;
+-- completed_at plus the workspace's retention; NULL for open tasks and
+-- workspaces without one
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS expires_at TIMESTAMPTZ;
+
+CREATE OR REPLACE FUNCTION set_task_completed_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.done AND (TG_OP = 'INSERT' OR NOT OLD.done) THEN
+        NEW.completed_at := NOW();
+    ELSIF NOT NEW.done THEN
+        NEW.completed_at := NULL;
+    END IF;
+    NEW.expires_at := NEW.completed_at + (
+        SELECT make_interval(days => cleanup_after_days) FROM workspaces WHERE id = NEW.workspace_id
+    );
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS set_tasks_completed_at ON tasks;
+CREATE TRIGGER set_tasks_completed_at
+    BEFORE INSERT OR UPDATE OF done ON tasks
+    FOR EACH ROW EXECUTE FUNCTION set_task_completed_at();
+
+-- A changed retention moves the expiry of the workspace's done tasks
+CREATE OR REPLACE FUNCTION set_workspace_task_expiry()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE tasks
+       SET expires_at = completed_at + make_interval(days => NEW.cleanup_after_days)
+     WHERE workspace_id = NEW.id AND done;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS set_workspace_task_expiry ON workspaces;
+CREATE TRIGGER set_workspace_task_expiry
+    AFTER UPDATE OF cleanup_after_days ON workspaces
+    FOR EACH ROW
+    WHEN (OLD.cleanup_after_days IS DISTINCT FROM NEW.cleanup_after_days)
+    EXECUTE FUNCTION set_workspace_task_expiry();
+
+-- Backfill: the last change of a done task is the best guess of its completion
+UPDATE tasks SET completed_at = updated_at WHERE done AND completed_at IS NULL;
+UPDATE tasks t
+   SET expires_at = t.completed_at + make_interval(days => w.cleanup_after_days)
+  FROM workspaces w
+ WHERE w.id = t.workspace_id AND w.cleanup_after_days IS NOT NULL AND t.done;
+
+-- Only tasks that will expire; the sweep never sees the rest
+CREATE INDEX IF NOT EXISTS idx_tasks_expires ON tasks(expires_at, id) WHERE expires_at IS NOT NULL;
+DROP INDEX IF EXISTS idx_tasks_completed;
+
+-- ============================================
+-- ARCHIVE
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS archived_tasks (
+    id UUID PRIMARY KEY,
+    workspace_id UUID NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE,
+    user_id UUID,
+    content TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    due_date DATE,
+    scheduled_date DATE,
+    created_at TIMESTAMPTZ NOT NULL,
+    completed_at TIMESTAMPTZ,
+    archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_archived_tasks_workspace ON archived_tasks(workspace_id);
+
+ALTER TABLE archived_tasks ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own archived tasks" ON archived_tasks;
+CREATE POLICY "Users can view own archived tasks" ON archived_tasks
+    FOR SELECT USING (
+        workspace_id IN (SELECT id FROM workspaces WHERE user_id = auth.uid())
+    );
+
+-- ============================================
+-- SWEEP
+-- ============================================
+
+-- Remove up to batch_size expired tasks after the (after_expires_at, after_id)
+-- cursor, first expired first. Returns how many were examined and removed
+-- and the cursor to continue from; fewer examined than batch_size means the
+-- sweep is complete. Rows locked by a concurrent edit are skipped until the
+-- next sweep.
+DROP FUNCTION IF EXISTS sweep_completed_tasks(INTEGER, TIMESTAMPTZ, UUID, BOOLEAN);
+CREATE FUNCTION sweep_completed_tasks(
+    batch_size INTEGER DEFAULT 500,
+    after_expires_at TIMESTAMPTZ DEFAULT NULL,
+    after_id UUID DEFAULT NULL,
+    archive BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (scanned INTEGER, swept INTEGER, last_expires_at TIMESTAMPTZ, last_id UUID)
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH batch AS (
+        SELECT t.id, t.expires_at
+          FROM tasks t
+         WHERE t.expires_at < NOW()
+           AND (after_expires_at IS NULL OR (t.expires_at, t.id) > (after_expires_at, after_id))
+         ORDER BY t.expires_at, t.id
+         LIMIT batch_size
+           FOR UPDATE SKIP LOCKED
+    ),
+    archived AS (
+        INSERT INTO archived_tasks (id, workspace_id, user_id, content, priority, due_date, scheduled_date,
+                                    created_at, completed_at)
+        SELECT t.id, t.workspace_id, t.user_id, t.content, t.priority, t.due_date, t.scheduled_date,
+               t.created_at, t.completed_at
+          FROM tasks t
+          JOIN batch b ON b.id = t.id
+         WHERE archive
+        ON CONFLICT (id) DO NOTHING
+        RETURNING id
+    ),
+    removed AS (
+        DELETE FROM tasks t
+         USING batch b
+         WHERE t.id = b.id
+        RETURNING t.id
+    )
+    SELECT (SELECT COUNT(*) FROM batch)::INTEGER,
+           (SELECT COUNT(*) FROM removed)::INTEGER,
+           last.expires_at,
+           last.id
+      FROM (SELECT 1) one
+      LEFT JOIN LATERAL (
+            SELECT expires_at, id FROM batch ORDER BY expires_at DESC, id DESC LIMIT 1
+      ) last ON TRUE
+$$;
+
+-- Only the API's service role runs the sweeper
+REVOKE EXECUTE ON FUNCTION sweep_completed_tasks(INTEGER, TIMESTAMPTZ, UUID, BOOLEAN) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION sweep_completed_tasks(INTEGER, TIMESTAMPTZ, UUID, BOOLEAN) TO service_role;
@@ -0,0 +1,176 @@
+-- Moji Daily: date-indexed views across workspaces
+-- Run this in Supabase SQL Editor after schema.sql
+--
+-- Tasks get due and scheduled dates. Tasks and notes carry their owner's
+-- user_id (kept in sync by a trigger) so a user's items for a date range are
+-- one index range scan instead of a join per workspace.
+
+-- ============================================
+-- COLUMNS
+-- ============================================
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS due_date DATE;
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS scheduled_date DATE;
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS user_id UUID;
+ALTER TABLE notes ADD COLUMN IF NOT EXISTS user_id UUID;
+
+CREATE OR REPLACE FUNCTION set_item_user_id()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    SELECT user_id INTO NEW.user_id FROM workspaces WHERE id = NEW.workspace_id;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS set_tasks_user_id ON tasks;
+CREATE TRIGGER set_tasks_user_id
+    BEFORE INSERT OR UPDATE OF workspace_id ON tasks
+    FOR EACH ROW EXECUTE FUNCTION set_item_user_id();
+
+DROP TRIGGER IF EXISTS set_notes_user_id ON notes;
+CREATE TRIGGER set_notes_user_id
+    BEFORE INSERT OR UPDATE OF workspace_id ON notes
+    FOR EACH ROW EXECUTE FUNCTION set_item_user_id();
+
+-- Backfill existing rows
+UPDATE tasks SET user_id = w.user_id FROM workspaces w WHERE w.id = tasks.workspace_id AND tasks.user_id IS NULL;
+UPDATE notes SET user_id = w.user_id FROM workspaces w WHERE w.id = notes.workspace_id AND notes.user_id IS NULL;
+
+-- ============================================
+-- INDEXES
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_tasks_user_scheduled ON tasks(user_id, scheduled_date)
+    WHERE scheduled_date IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_tasks_user_due ON tasks(user_id, due_date)
+    WHERE due_date IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_notes_user_created ON notes(user_id, created_at);
+
+-- ============================================
+-- RANGE QUERIES
+-- ============================================
+
+-- One row per item and day; tasks appear on their scheduled and due dates.
+-- Note bodies are not returned.
+CREATE OR REPLACE FUNCTION daily_items(range_start DATE, range_end DATE, tz TEXT DEFAULT 'UTC')
+RETURNS TABLE (
+    kind TEXT,
+    day DATE,
+    id UUID,
+    workspace_id UUID,
+    title TEXT,
+    done BOOLEAN,
+    priority INTEGER,
+    due_date DATE,
+    scheduled_date DATE
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+    SELECT 'task', t.scheduled_date, t.id, t.workspace_id, t.content, t.done, t.priority, t.due_date, t.scheduled_date
+      FROM tasks t
+     WHERE t.user_id = auth.uid() AND t.scheduled_date BETWEEN range_start AND range_end
+    UNION ALL
+    SELECT 'task', t.due_date, t.id, t.workspace_id, t.content, t.done, t.priority, t.due_date, t.scheduled_date
+      FROM tasks t
+     WHERE t.user_id = auth.uid() AND t.due_date BETWEEN range_start AND range_end
+       AND t.due_date IS DISTINCT FROM t.scheduled_date
+    UNION ALL
+    SELECT 'note', (n.created_at AT TIME ZONE tz)::DATE, n.id, n.workspace_id, n.title, NULL, NULL, NULL, NULL
+      FROM notes n
+     WHERE n.user_id = auth.uid()
+       AND n.created_at >= (range_start::TIMESTAMP AT TIME ZONE tz)
+       AND n.created_at < ((range_end + 1)::TIMESTAMP AT TIME ZONE tz)
+     ORDER BY 2, 1 DESC, 7 DESC NULLS LAST
+$$;
+
+-- Per-day counts for the calendar month view
+CREATE OR REPLACE FUNCTION daily_counts(range_start DATE, range_end DATE, tz TEXT DEFAULT 'UTC')
+RETURNS TABLE (day DATE, tasks BIGINT, done BIGINT, notes BIGINT)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+    SELECT day,
+           COUNT(*) FILTER (WHERE kind = 'task'),
+           COUNT(*) FILTER (WHERE kind = 'task' AND done),
+           COUNT(*) FILTER (WHERE kind = 'note')
+      FROM daily_items(range_start, range_end, tz)
+     GROUP BY day
+     ORDER BY day
+$$;
+
+-- ============================================
+-- CLONE AND TEMPLATES
+-- ============================================
+
+-- clone_workspace (templates.sql) copies every item column, dates included.
+--
+-- Deliberately replaces create_workspace_from_template of templates.sql,
+-- which predates task dates, to set them: template tasks give them as days
+-- from today (due_in_days, scheduled_in_days), or as fixed dates. The rest
+-- is unchanged; keep the two in step.
+CREATE OR REPLACE FUNCTION create_workspace_from_template(
+    template JSONB,
+    new_name TEXT DEFAULT NULL,
+    max_workspaces INTEGER DEFAULT 20
+)
+RETURNS workspaces
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+    uid UUID := auth.uid();
+    created workspaces;
+BEGIN
+    IF uid IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated' USING ERRCODE = '42501';
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('moji.workspace_quota'), hashtext(uid::text));
+    IF (SELECT COUNT(*) FROM workspaces WHERE user_id = uid) >= max_workspaces THEN
+        RAISE EXCEPTION 'Workspace limit reached' USING ERRCODE = 'MJ001';
+    END IF;
+
+    INSERT INTO workspaces (name, description, user_id)
+    VALUES (COALESCE(NULLIF(new_name, ''), template->>'name'), template->>'description', uid)
+    RETURNING * INTO created;
+
+    -- Offset created_at so items keep the template's order (NOW() is per transaction)
+    INSERT INTO tasks (content, done, priority, due_date, scheduled_date, workspace_id, created_at)
+    SELECT item->>'content',
+           COALESCE((item->>'done')::BOOLEAN, FALSE),
+           COALESCE((item->>'priority')::INTEGER, 0),
+           COALESCE((item->>'due_date')::DATE, CURRENT_DATE + (item->>'due_in_days')::INTEGER),
+           COALESCE((item->>'scheduled_date')::DATE, CURRENT_DATE + (item->>'scheduled_in_days')::INTEGER),
+           created.id,
+           NOW() + ord * INTERVAL '1 millisecond'
+      FROM jsonb_array_elements(COALESCE(template->'tasks', '[]')) WITH ORDINALITY AS t(item, ord);
+
+    INSERT INTO notes (title, content, tags, workspace_id, created_at)
+    SELECT item->>'title',
+           COALESCE(item->>'content', ''),
+           COALESCE(ARRAY(SELECT jsonb_array_elements_text(item->'tags')), '{}'),
+           created.id,
+           NOW() + ord * INTERVAL '1 millisecond'
+      FROM jsonb_array_elements(COALESCE(template->'notes', '[]')) WITH ORDINALITY AS n(item, ord);
+
+    INSERT INTO pages (title, content, workspace_id, created_at)
+    SELECT item->>'title',
+           COALESCE(item->>'content', ''),
+           created.id,
+           NOW() + ord * INTERVAL '1 millisecond'
+      FROM jsonb_array_elements(COALESCE(template->'pages', '[]')) WITH ORDINALITY AS p(item, ord);
+
+    RETURN created;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION daily_items(DATE, DATE, TEXT) TO authenticated;
+GRANT EXECUTE ON FUNCTION daily_counts(DATE, DATE, TEXT) TO authenticated;
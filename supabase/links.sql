@@ -0,0 +1,142 @@
+-- Wiki links between pages and notes for Moji
+-- Run this in Supabase SQL Editor after outline.sql
+--
+-- A [[Title]] (or [[Title|label]]) in a page or note links to the page or
+-- note of that title in the same workspace, compared case-insensitively with
+-- runs of whitespace collapsed (target_key); whitespace is space and
+-- \t \n \v \f \r, here and in backend/app/links.py. One row per distinct
+-- link of a source; the API diffs a source's old and new links on every
+-- write (see backend/app/links.py), so backlinks, outgoing links and orphans
+-- are index lookups instead of scans of all content. Links follow titles:
+-- renaming a page leaves links to the old title unresolved.
+
+-- ============================================
+-- TABLE
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS links (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    workspace_id UUID NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE,
+    -- The source: exactly one of page_id and note_id
+    page_id UUID REFERENCES pages(id) ON DELETE CASCADE,
+    note_id UUID REFERENCES notes(id) ON DELETE CASCADE,
+    source_title TEXT NOT NULL,
+    target_key TEXT NOT NULL,
+    target_title TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    CONSTRAINT links_one_source CHECK ((page_id IS NULL) <> (note_id IS NULL)),
+    CONSTRAINT links_page_target UNIQUE (page_id, target_key),
+    CONSTRAINT links_note_target UNIQUE (note_id, target_key)
+);
+
+-- Outgoing links come from the unique constraints; backlinks and orphans from this
+CREATE INDEX IF NOT EXISTS idx_links_workspace_target ON links(workspace_id, target_key);
+
+ALTER TABLE links ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own links" ON links
+    FOR SELECT USING (
+        EXISTS (SELECT 1 FROM workspaces WHERE workspaces.id = links.workspace_id AND workspaces.user_id = auth.uid())
+    );
+
+CREATE POLICY "Users can insert own links" ON links
+    FOR INSERT WITH CHECK (
+        EXISTS (SELECT 1 FROM workspaces WHERE workspaces.id = links.workspace_id AND workspaces.user_id = auth.uid())
+    );
+
+CREATE POLICY "Users can update own links" ON links
+    FOR UPDATE USING (
+        EXISTS (SELECT 1 FROM workspaces WHERE workspaces.id = links.workspace_id AND workspaces.user_id = auth.uid())
+    );
+
+CREATE POLICY "Users can delete own links" ON links
+    FOR DELETE USING (
+        EXISTS (SELECT 1 FROM workspaces WHERE workspaces.id = links.workspace_id AND workspaces.user_id = auth.uid())
+    );
+
+-- ============================================
+-- REBUILD
+-- ============================================
+
+-- The key of a link target; must match link_key() in backend/app/links.py
+CREATE OR REPLACE FUNCTION link_key(title TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT lower(btrim(regexp_replace(title, '[ \t\n\r\f\v]+', ' ', 'g'), ' '))
+$$;
+
+-- A link's target as written, without surrounding whitespace; must match
+-- extract_links() in backend/app/links.py. E-strings have no \v escape
+-- (E'\v' is the letter v), so the vertical tab is spelled \x0B.
+CREATE OR REPLACE FUNCTION link_title(title TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT btrim(title, E' \t\n\r\f\x0B')
+$$;
+
+-- title_key computed fields, so the API resolves outgoing links with
+-- title_key=in.(...) instead of reading every title of the workspace. The
+-- functions are inlined, so the expression indexes below serve them.
+CREATE OR REPLACE FUNCTION title_key(pages)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT link_key($1.title)
+$$;
+
+CREATE OR REPLACE FUNCTION title_key(notes)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT link_key($1.title)
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_pages_title_key ON pages(workspace_id, link_key(title));
+CREATE INDEX IF NOT EXISTS idx_notes_title_key ON notes(workspace_id, link_key(title));
+
+-- Recompute the links of whole workspaces from their content: used for the
+-- backfill below and after clone, template and import, which copy content
+-- without going through the API's per-item maintenance
+CREATE OR REPLACE FUNCTION rebuild_links(workspace_ids UUID[])
+RETURNS BIGINT
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+    inserted BIGINT;
+BEGIN
+    DELETE FROM links WHERE workspace_id = ANY(workspace_ids);
+
+    INSERT INTO links (workspace_id, page_id, note_id, source_title, target_key, target_title)
+    SELECT DISTINCT ON (s.page_id, s.note_id, link_key(m.found[1]))
+           s.workspace_id, s.page_id, s.note_id, s.title, link_key(m.found[1]),
+           link_title(m.found[1])
+      FROM (
+            SELECT workspace_id, id AS page_id, NULL::UUID AS note_id, title, content
+              FROM pages WHERE workspace_id = ANY(workspace_ids)
+            UNION ALL
+            SELECT workspace_id, NULL, id, title, content
+              FROM notes WHERE workspace_id = ANY(workspace_ids)
+      ) s
+      CROSS JOIN LATERAL regexp_matches(COALESCE(s.content, ''), '\[\[([^][|\n]+)(?:\|[^][\n]*)?\]\]', 'g')
+           WITH ORDINALITY AS m(found, n)
+     WHERE link_title(m.found[1]) <> ''
+     -- Keep each target's first spelling in the content, as extract_links() does
+     ORDER BY s.page_id, s.note_id, link_key(m.found[1]), m.n;
+
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    RETURN inserted;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION rebuild_links(UUID[]) TO authenticated;
+
+-- Backfill existing content
+SELECT rebuild_links(ARRAY(SELECT id FROM workspaces));
@@ -0,0 +1,132 @@
+-- Manual ordering of tasks, notes and pages
+-- Run this in Supabase SQL Editor after daily.sql
+--
+-- Items get a fractional sort_key: base-62 digits read as a fraction and
+-- compared bytewise, so there is always room between two keys and a move
+-- updates one row. See backend/app/ordering.py for the key arithmetic.
+
+-- ============================================
+-- KEYS
+-- ============================================
+
+-- Next key after k for appending: bump the last digit, or extend after 'z'
+CREATE OR REPLACE FUNCTION sort_key_after(k TEXT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT CASE
+        WHEN k IS NULL OR k = '' THEN 'V'
+        WHEN right(k, 1) = 'z' THEN k || 'V'
+        ELSE left(k, -1) || substr(d, strpos(d, right(k, 1)) + 1, 1)
+    END
+    FROM (SELECT '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'::TEXT AS d) digits
+$$;
+
+-- Evenly spaced key for position n: four base-62 digits and a final 'V',
+-- so keys never end in '0' and a move between two neighbors stays short
+CREATE OR REPLACE FUNCTION sort_key_at(n BIGINT)
+RETURNS TEXT
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT string_agg(substr(d, ((n / power(62, p)::BIGINT) % 62)::INTEGER + 1, 1), '' ORDER BY p DESC) || 'V'
+      FROM generate_series(0, 3) p,
+           (SELECT '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'::TEXT AS d) digits
+$$;
+
+-- ============================================
+-- COLUMNS
+-- ============================================
+
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS sort_key TEXT COLLATE "C";
+ALTER TABLE notes ADD COLUMN IF NOT EXISTS sort_key TEXT COLLATE "C";
+ALTER TABLE pages ADD COLUMN IF NOT EXISTS sort_key TEXT COLLATE "C";
+
+-- Backfill in creation order
+UPDATE tasks t SET sort_key = sort_key_at(r.n)
+  FROM (SELECT id, row_number() OVER (PARTITION BY workspace_id ORDER BY created_at, id) AS n FROM tasks) r
+ WHERE t.id = r.id AND t.sort_key IS NULL;
+UPDATE notes t SET sort_key = sort_key_at(r.n)
+  FROM (SELECT id, row_number() OVER (PARTITION BY workspace_id ORDER BY created_at, id) AS n FROM notes) r
+ WHERE t.id = r.id AND t.sort_key IS NULL;
+UPDATE pages t SET sort_key = sort_key_at(r.n)
+  FROM (SELECT id, row_number() OVER (PARTITION BY workspace_id ORDER BY created_at, id) AS n FROM pages) r
+ WHERE t.id = r.id AND t.sort_key IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_workspace_sort ON tasks(workspace_id, sort_key);
+CREATE INDEX IF NOT EXISTS idx_notes_workspace_sort ON notes(workspace_id, sort_key);
+CREATE INDEX IF NOT EXISTS idx_pages_workspace_sort ON pages(workspace_id, sort_key);
+
+-- New items go after the workspace's last item. Rows inserted earlier by
+-- the same statement are visible here, so bulk inserts keep their order.
+CREATE OR REPLACE FUNCTION assign_sort_key()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+VOLATILE
+AS $$
+DECLARE
+    last_key TEXT;
+BEGIN
+    IF NEW.sort_key IS NULL THEN
+        EXECUTE format(
+            'SELECT sort_key FROM %I WHERE workspace_id = $1 ORDER BY sort_key DESC NULLS LAST LIMIT 1',
+            TG_TABLE_NAME
+        ) INTO last_key USING NEW.workspace_id;
+        NEW.sort_key := sort_key_after(last_key);
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS assign_tasks_sort_key ON tasks;
+CREATE TRIGGER assign_tasks_sort_key BEFORE INSERT ON tasks
+    FOR EACH ROW EXECUTE FUNCTION assign_sort_key();
+DROP TRIGGER IF EXISTS assign_notes_sort_key ON notes;
+CREATE TRIGGER assign_notes_sort_key BEFORE INSERT ON notes
+    FOR EACH ROW EXECUTE FUNCTION assign_sort_key();
+DROP TRIGGER IF EXISTS assign_pages_sort_key ON pages;
+CREATE TRIGGER assign_pages_sort_key BEFORE INSERT ON pages
+    FOR EACH ROW EXECUTE FUNCTION assign_sort_key();
+
+-- Moving a page is not an edit; keep updated_at (and the "recent" order) as is
+DROP TRIGGER IF EXISTS update_pages_updated_at ON pages;
+CREATE TRIGGER update_pages_updated_at
+    BEFORE UPDATE OF title, content, workspace_id ON pages
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+-- ============================================
+-- REBALANCE
+-- ============================================
+
+-- Rewrite one workspace's keys to evenly spaced ones in the current order.
+-- Only rows whose key changes are written. Returns the number of rows updated.
+CREATE OR REPLACE FUNCTION rebalance_sort_keys(target TEXT, target_workspace UUID)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    IF target NOT IN ('tasks', 'notes', 'pages') THEN
+        RAISE EXCEPTION 'Unknown table %', target USING ERRCODE = '22023';
+    END IF;
+    EXECUTE format(
+        'UPDATE %1$I t SET sort_key = sort_key_at(r.n)
+           FROM (SELECT id, row_number() OVER (ORDER BY sort_key, created_at, id) AS n
+                   FROM %1$I WHERE workspace_id = $1) r
+          WHERE t.id = r.id AND t.sort_key IS DISTINCT FROM sort_key_at(r.n)',
+        target
+    ) USING target_workspace;
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION rebalance_sort_keys(TEXT, UUID) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION rebalance_sort_keys(TEXT, UUID) TO service_role;
+
+-- clone_workspace (templates.sql) copies sort_key with the other item
+-- columns, so a copy keeps the order of its source
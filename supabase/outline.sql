@@ -0,0 +1,11 @@
+-- Page outlines for Moji
+-- Run this in Supabase SQL Editor after ordering.sql
+--
+-- The heading outline of each page ([{level, text, anchor, offset}], see
+-- backend/app/outline.py), written by the API together with the content so
+-- that tables of contents are served without downloading and parsing the
+-- page. NULL for pages written before this column existed or by the
+-- clone/template/import paths; the API extracts those from the content on
+-- read and stores the outline on the next edit.
+
+ALTER TABLE pages ADD COLUMN IF NOT EXISTS outline JSONB;
@@ -0,0 +1,114 @@
+-- Single-call onboarding for Moji
+-- Run this in Supabase SQL Editor after schema.sql and add_pages.sql
+--
+-- GET /api/v1/workspaces calls ensure_default_workspaces() once per load.
+-- The function seeds the default workspaces and welcome content in one
+-- transaction the first time a user is seen, then returns the user's
+-- workspaces. A per-user marker makes it idempotent and a transaction-scoped
+-- advisory lock keeps two tabs loading at once from seeding twice.
+
+-- ============================================
+-- ONBOARDING MARKER
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS user_onboarding (
+    user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    seeded_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Only reachable through ensure_default_workspaces(); no client policies
+ALTER TABLE user_onboarding ENABLE ROW LEVEL SECURITY;
+
+-- ============================================
+-- SEED FUNCTION
+-- ============================================
+
+CREATE OR REPLACE FUNCTION ensure_default_workspaces()
+RETURNS SETOF workspaces
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    uid UUID := auth.uid();
+    welcome_id UUID;
+    existing_count INTEGER;
+    only_legacy_personal BOOLEAN;
+BEGIN
+    IF uid IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated' USING ERRCODE = '42501';
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM user_onboarding WHERE user_id = uid) THEN
+        -- Serialize concurrent first loads of the same user, then re-check
+        PERFORM pg_advisory_xact_lock(hashtext('moji.seed_defaults'), hashtext(uid::text));
+
+        IF NOT EXISTS (SELECT 1 FROM user_onboarding WHERE user_id = uid) THEN
+            SELECT COUNT(*),
+                   COUNT(*) = 1 AND BOOL_AND(name = 'Personal' AND description = 'Your personal workspace')
+              INTO existing_count, only_legacy_personal
+              FROM workspaces
+             WHERE user_id = uid;
+
+            -- Users who already organised their own workspaces are left alone
+            IF existing_count = 0 OR only_legacy_personal THEN
+                -- Offset created_at so the defaults keep their order (NOW() is per transaction)
+                INSERT INTO workspaces (name, description, user_id, created_at, updated_at)
+                SELECT d.name, d.description, uid,
+                       NOW() + d.position * INTERVAL '1 millisecond',
+                       NOW() + d.position * INTERVAL '1 millisecond'
+                  FROM (VALUES
+                        (1, 'Welcome to Moji', 'Start here to learn the Moji flow'),
+                        (2, 'Personal', 'Personal tasks, notes, and pages'),
+                        (3, 'Work', 'Work projects and collaboration')
+                       ) AS d(position, name, description)
+                 WHERE NOT EXISTS (
+                        SELECT 1 FROM workspaces w WHERE w.user_id = uid AND w.name = d.name
+                       );
+
+                SELECT id INTO welcome_id
+                  FROM workspaces
+                 WHERE user_id = uid AND name = 'Welcome to Moji'
+                 ORDER BY created_at
+                 LIMIT 1;
+
+                INSERT INTO tasks (content, done, priority, workspace_id) VALUES
+                    ('Add your first task - quick, actionable, and small', FALSE, 2, welcome_id),
+                    ('Use priorities to surface what matters today', FALSE, 3, welcome_id),
+                    ('Mark tasks done to keep momentum visible', FALSE, 1, welcome_id);
+
+                INSERT INTO notes (title, content, tags, workspace_id) VALUES
+                    ('Quick memory', 'Wi-Fi code: MOJI-2026', ARRAY['example', 'note'], welcome_id),
+                    ('Tiny reminder', 'Sam - design review on Tuesday', ARRAY['people'], welcome_id),
+                    ('Useful link', 'https://usemoji.app - keep handy links here', ARRAY['link'], welcome_id);
+
+                INSERT INTO pages (title, content, workspace_id) VALUES
+                    ('Welcome to Moji',
+                     E'# Welcome to Moji\n\n'
+                     E'Moji is built for focus. Each workspace keeps a single context so your brain\n'
+                     E'doesn''t have to switch modes all day.\n\n'
+                     E'## The flow\n'
+                     E'- **Tasks** are small, actionable steps.\n'
+                     E'- **Notes** are quick memory - codes, names, links.\n'
+                     E'- **Pages** are for evolving work: plans, drafts, docs.\n',
+                     welcome_id),
+                    ('Notes vs Pages',
+                     E'# Notes vs Pages\n\n'
+                     E'Notes capture short, single-purpose bits of information.\n'
+                     E'Pages are where ideas grow over time.\n\n'
+                     E'If it changes and expands, put it in a Page. If you just need to remember it,\n'
+                     E'put it in a Note.\n',
+                     welcome_id);
+            END IF;
+
+            INSERT INTO user_onboarding (user_id) VALUES (uid) ON CONFLICT (user_id) DO NOTHING;
+        END IF;
+    END IF;
+
+    RETURN QUERY
+        SELECT * FROM workspaces WHERE user_id = uid ORDER BY created_at ASC;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION ensure_default_workspaces() FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION ensure_default_workspaces() TO authenticated;
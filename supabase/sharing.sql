@@ -0,0 +1,67 @@
+-- Public page sharing for Moji
+-- Run this in Supabase SQL Editor after links.sql
+--
+-- A shared page has one random token and is served to anyone at /p/<token>
+-- (see backend/app/sharing.py). Owners manage shares through RLS like any
+-- other workspace row. Anonymous viewers cannot read page_shares or pages;
+-- they only get the one page a token names, through shared_page().
+
+-- ============================================
+-- TABLE
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS page_shares (
+    token TEXT PRIMARY KEY CHECK (char_length(token) BETWEEN 16 AND 64),
+    page_id UUID NOT NULL UNIQUE REFERENCES pages(id) ON DELETE CASCADE,
+    workspace_id UUID NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_page_shares_workspace ON page_shares(workspace_id);
+
+ALTER TABLE page_shares ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own page shares" ON page_shares
+    FOR SELECT USING (
+        EXISTS (SELECT 1 FROM workspaces WHERE workspaces.id = page_shares.workspace_id AND workspaces.user_id = auth.uid())
+    );
+
+-- The page must be in the same, owned workspace
+CREATE POLICY "Users can insert own page shares" ON page_shares
+    FOR INSERT WITH CHECK (
+        EXISTS (SELECT 1 FROM workspaces WHERE workspaces.id = page_shares.workspace_id AND workspaces.user_id = auth.uid())
+        AND EXISTS (SELECT 1 FROM pages WHERE pages.id = page_shares.page_id AND pages.workspace_id = page_shares.workspace_id)
+    );
+
+CREATE POLICY "Users can delete own page shares" ON page_shares
+    FOR DELETE USING (
+        EXISTS (SELECT 1 FROM workspaces WHERE workspaces.id = page_shares.workspace_id AND workspaces.user_id = auth.uid())
+    );
+
+-- ============================================
+-- PUBLIC READ
+-- ============================================
+
+-- The page a token names, or no row. SECURITY DEFINER so the anon role can
+-- read exactly this without any policy on pages; one indexed lookup.
+CREATE OR REPLACE FUNCTION shared_page(share_token TEXT)
+RETURNS TABLE (
+    page_id UUID,
+    workspace_id UUID,
+    title TEXT,
+    content TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT p.id, p.workspace_id, p.title, p.content, p.updated_at
+      FROM page_shares s
+      JOIN pages p ON p.id = s.page_id
+     WHERE s.token = share_token
+$$;
+
+REVOKE ALL ON FUNCTION shared_page(TEXT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION shared_page(TEXT) TO anon, authenticated;
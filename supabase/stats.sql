@@ -0,0 +1,37 @@
+-- Sidebar stats for Moji
+-- Run this in Supabase SQL Editor after schema.sql and add_pages.sql
+--
+-- Counts for every workspace of the caller in one query. Each count is an
+-- index-only scan of the workspace's index range; no item bodies are read.
+
+-- ============================================
+-- INDEXES
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_tasks_workspace_open ON tasks(workspace_id, priority) WHERE NOT done;
+CREATE INDEX IF NOT EXISTS idx_notes_workspace_id ON notes(workspace_id);
+
+-- ============================================
+-- STATS
+-- ============================================
+
+CREATE OR REPLACE FUNCTION workspace_stats()
+RETURNS TABLE (workspace_id UUID, open_tasks BIGINT, high_priority_tasks BIGINT, notes BIGINT, pages BIGINT)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+    SELECT w.id, t.open_tasks, t.high_priority_tasks, n.notes, p.pages
+      FROM workspaces w
+      CROSS JOIN LATERAL (
+            SELECT COUNT(*) AS open_tasks, COUNT(*) FILTER (WHERE priority = 3) AS high_priority_tasks
+              FROM tasks WHERE workspace_id = w.id AND NOT done
+      ) t
+      CROSS JOIN LATERAL (SELECT COUNT(*) AS notes FROM notes WHERE workspace_id = w.id) n
+      CROSS JOIN LATERAL (SELECT COUNT(*) AS pages FROM pages WHERE workspace_id = w.id) p
+     WHERE w.user_id = auth.uid()
+     ORDER BY w.created_at
+$$;
+
+GRANT EXECUTE ON FUNCTION workspace_stats() TO authenticated;
@@ -0,0 +1,19 @@
+-- Task list filters for Moji
+-- Run this in Supabase SQL Editor after ordering.sql
+--
+-- Indexes behind the filter and sort parameters of
+-- GET /workspaces/{id}/tasks. Every list is scoped to one workspace, so each
+-- index leads with workspace_id; idx_tasks_workspace_open (stats.sql) already
+-- serves open tasks by priority.
+
+-- ?done=...&sort=priority and ?min_priority/max_priority ranges
+CREATE INDEX IF NOT EXISTS idx_tasks_workspace_done_priority
+    ON tasks(workspace_id, done, priority DESC, created_at);
+
+-- ?sort=created and ?sort=updated
+CREATE INDEX IF NOT EXISTS idx_tasks_workspace_created ON tasks(workspace_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_workspace_updated ON tasks(workspace_id, updated_at DESC);
+
+-- ?q=... (content ILIKE '%text%') uses a trigram index
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_tasks_content_trgm ON tasks USING gin (content gin_trgm_ops);
@@ -0,0 +1,275 @@
+-- Team workspaces for Moji
+-- Run this in Supabase SQL Editor after sharing.sql
+--
+-- A workspace has members, each with a role: owners manage the workspace and
+-- its members, editors change its tasks, notes and pages, viewers read them.
+-- Every policy below asks one question, "which workspaces may the caller
+-- (read|edit|own)?", answered by member_workspace_ids() from the primary key
+-- (user_id, workspace_id) of workspace_members. The function does not
+-- depend on the row being checked, so Postgres runs it once per statement
+-- and filters with a hashed set, instead of a correlated EXISTS per row.
+-- The API caches the same lookup per user (see backend/app/loaders.py).
+--
+-- workspaces.user_id stays as the creator, who counts against the workspace
+-- quota and whose items appear in Moji Daily (supabase/daily.sql).
+
+-- ============================================
+-- MEMBERS
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS workspace_members (
+    workspace_id UUID NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    role TEXT NOT NULL DEFAULT 'editor' CHECK (role IN ('owner', 'editor', 'viewer')),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    -- Serves "the caller's workspaces" and "the caller's role here"
+    PRIMARY KEY (user_id, workspace_id)
+);
+
+-- Member lists and cascades from workspaces
+CREATE INDEX IF NOT EXISTS idx_workspace_members_workspace ON workspace_members(workspace_id);
+
+-- Creators own their existing workspaces
+INSERT INTO workspace_members (workspace_id, user_id, role)
+SELECT id, user_id, 'owner' FROM workspaces
+ON CONFLICT DO NOTHING;
+
+-- ...and every new one, whichever way it is created (API, seed, clone, template, import)
+CREATE OR REPLACE FUNCTION add_workspace_owner()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    INSERT INTO workspace_members (workspace_id, user_id, role)
+    VALUES (NEW.id, NEW.user_id, 'owner')
+    ON CONFLICT DO NOTHING;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS add_workspace_owner ON workspaces;
+CREATE TRIGGER add_workspace_owner
+    AFTER INSERT ON workspaces
+    FOR EACH ROW EXECUTE FUNCTION add_workspace_owner();
+
+-- A workspace keeps at least one owner; removing or demoting the last one
+-- fails with MJ002, unless the workspace or the user is being deleted
+CREATE OR REPLACE FUNCTION keep_workspace_owner()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF OLD.role = 'owner'
+       AND (TG_OP = 'DELETE' OR NEW.role <> 'owner')
+       AND EXISTS (SELECT 1 FROM workspaces WHERE id = OLD.workspace_id)
+       AND EXISTS (SELECT 1 FROM auth.users WHERE id = OLD.user_id)
+       AND NOT EXISTS (
+            SELECT 1 FROM workspace_members
+             WHERE workspace_id = OLD.workspace_id AND role = 'owner' AND user_id <> OLD.user_id
+       ) THEN
+        RAISE EXCEPTION 'A workspace needs an owner' USING ERRCODE = 'MJ002';
+    END IF;
+    RETURN COALESCE(NEW, OLD);
+END;
+$$;
+
+DROP TRIGGER IF EXISTS keep_workspace_owner ON workspace_members;
+CREATE TRIGGER keep_workspace_owner
+    BEFORE UPDATE OF role OR DELETE ON workspace_members
+    FOR EACH ROW EXECUTE FUNCTION keep_workspace_owner();
+
+-- The creator never changes: quotas, export, clone and Moji Daily go by
+-- workspaces.user_id, so a co-owner must not take it or hand it on
+CREATE OR REPLACE FUNCTION keep_workspace_creator()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+BEGIN
+    IF NEW.user_id IS DISTINCT FROM OLD.user_id THEN
+        RAISE EXCEPTION 'workspaces.user_id cannot be changed' USING ERRCODE = '42501';
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS keep_workspace_creator ON workspaces;
+CREATE TRIGGER keep_workspace_creator
+    BEFORE UPDATE OF user_id ON workspaces
+    FOR EACH ROW EXECUTE FUNCTION keep_workspace_creator();
+
+-- ============================================
+-- ACCESS
+-- ============================================
+
+-- The caller's workspaces where they have at least min_role. SECURITY
+-- DEFINER so policies on workspace_members itself can use it without
+-- recursing; it only ever returns the caller's own memberships.
+CREATE OR REPLACE FUNCTION member_workspace_ids(min_role TEXT DEFAULT 'viewer')
+RETURNS SETOF UUID
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT workspace_id
+      FROM workspace_members
+     WHERE user_id = auth.uid()
+       AND CASE min_role
+               WHEN 'owner' THEN role = 'owner'
+               WHEN 'editor' THEN role IN ('owner', 'editor')
+               ELSE TRUE
+           END
+$$;
+
+REVOKE ALL ON FUNCTION member_workspace_ids(TEXT) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION member_workspace_ids(TEXT) TO authenticated;
+
+-- ============================================
+-- POLICIES
+-- ============================================
+
+-- Replace the per-user policies of schema.sql, add_pages.sql, cleanup.sql,
+-- links.sql and sharing.sql
+DO $$
+DECLARE
+    policy RECORD;
+BEGIN
+    FOR policy IN
+        SELECT policyname, tablename FROM pg_policies
+         WHERE schemaname = 'public'
+           AND tablename IN ('workspaces', 'workspace_members', 'tasks', 'notes', 'pages',
+                             'links', 'page_shares', 'archived_tasks')
+    LOOP
+        EXECUTE format('DROP POLICY %I ON %I', policy.policyname, policy.tablename);
+    END LOOP;
+END;
+$$;
+
+ALTER TABLE workspace_members ENABLE ROW LEVEL SECURITY;
+
+-- Workspaces: members read, the creator inserts, owners change and delete.
+-- The user_id check lets INSERT ... RETURNING see the row before its owner
+-- membership exists.
+CREATE POLICY "Members can view workspaces" ON workspaces
+    FOR SELECT USING (
+        user_id = (SELECT auth.uid())
+        OR id IN (SELECT member_workspace_ids())
+    );
+
+CREATE POLICY "Users can create workspaces" ON workspaces
+    FOR INSERT WITH CHECK (user_id = (SELECT auth.uid()));
+
+-- keep_workspace_creator() above keeps user_id as it was
+CREATE POLICY "Owners can update workspaces" ON workspaces
+    FOR UPDATE USING (id IN (SELECT member_workspace_ids('owner')))
+    WITH CHECK (id IN (SELECT member_workspace_ids('owner')));
+
+CREATE POLICY "Owners can delete workspaces" ON workspaces
+    FOR DELETE USING (id IN (SELECT member_workspace_ids('owner')));
+
+-- Members see each other; owners add, change and remove members; anyone may leave
+CREATE POLICY "Members can view members" ON workspace_members
+    FOR SELECT USING (workspace_id IN (SELECT member_workspace_ids()));
+
+CREATE POLICY "Owners can add members" ON workspace_members
+    FOR INSERT WITH CHECK (workspace_id IN (SELECT member_workspace_ids('owner')));
+
+CREATE POLICY "Owners can change members" ON workspace_members
+    FOR UPDATE USING (workspace_id IN (SELECT member_workspace_ids('owner')));
+
+CREATE POLICY "Owners can remove members, members can leave" ON workspace_members
+    FOR DELETE USING (
+        user_id = (SELECT auth.uid())
+        OR workspace_id IN (SELECT member_workspace_ids('owner'))
+    );
+
+-- Items: members read, editors and owners write
+DO $$
+DECLARE
+    item TEXT;
+BEGIN
+    FOREACH item IN ARRAY ARRAY['tasks', 'notes', 'pages', 'links'] LOOP
+        EXECUTE format(
+            'CREATE POLICY "Members can view %1$s" ON %1$I FOR SELECT '
+            'USING (workspace_id IN (SELECT member_workspace_ids()))', item);
+        EXECUTE format(
+            'CREATE POLICY "Editors can insert %1$s" ON %1$I FOR INSERT '
+            'WITH CHECK (workspace_id IN (SELECT member_workspace_ids(''editor'')))', item);
+        EXECUTE format(
+            'CREATE POLICY "Editors can update %1$s" ON %1$I FOR UPDATE '
+            'USING (workspace_id IN (SELECT member_workspace_ids(''editor'')))', item);
+        EXECUTE format(
+            'CREATE POLICY "Editors can delete %1$s" ON %1$I FOR DELETE '
+            'USING (workspace_id IN (SELECT member_workspace_ids(''editor'')))', item);
+    END LOOP;
+END;
+$$;
+
+CREATE POLICY "Members can view page shares" ON page_shares
+    FOR SELECT USING (workspace_id IN (SELECT member_workspace_ids()));
+
+-- The page must be in the same workspace
+CREATE POLICY "Editors can insert page shares" ON page_shares
+    FOR INSERT WITH CHECK (
+        workspace_id IN (SELECT member_workspace_ids('editor'))
+        AND EXISTS (SELECT 1 FROM pages WHERE pages.id = page_shares.page_id AND pages.workspace_id = page_shares.workspace_id)
+    );
+
+CREATE POLICY "Editors can delete page shares" ON page_shares
+    FOR DELETE USING (workspace_id IN (SELECT member_workspace_ids('editor')));
+
+CREATE POLICY "Members can view archived tasks" ON archived_tasks
+    FOR SELECT USING (workspace_id IN (SELECT member_workspace_ids()));
+
+-- ============================================
+-- FUNCTIONS
+-- ============================================
+
+-- GET /api/v1/workspaces: seeds a new user's defaults, then returns every
+-- workspace the caller is a member of, shared ones included
+CREATE OR REPLACE FUNCTION member_workspaces()
+RETURNS SETOF workspaces
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+BEGIN
+    PERFORM 1 FROM ensure_default_workspaces();
+    RETURN QUERY
+        SELECT w.*
+          FROM workspace_members m
+          JOIN workspaces w ON w.id = m.workspace_id
+         WHERE m.user_id = auth.uid()
+         ORDER BY w.created_at;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION member_workspaces() TO authenticated;
+
+-- Sidebar counts (stats.sql) for shared workspaces too
+CREATE OR REPLACE FUNCTION workspace_stats()
+RETURNS TABLE (workspace_id UUID, open_tasks BIGINT, high_priority_tasks BIGINT, notes BIGINT, pages BIGINT)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+    SELECT w.id, t.open_tasks, t.high_priority_tasks, n.notes, p.pages
+      FROM workspace_members m
+      JOIN workspaces w ON w.id = m.workspace_id
+      CROSS JOIN LATERAL (
+            SELECT COUNT(*) AS open_tasks, COUNT(*) FILTER (WHERE priority = 3) AS high_priority_tasks
+              FROM tasks WHERE workspace_id = w.id AND NOT done
+      ) t
+      CROSS JOIN LATERAL (SELECT COUNT(*) AS notes FROM notes WHERE workspace_id = w.id) n
+      CROSS JOIN LATERAL (SELECT COUNT(*) AS pages FROM pages WHERE workspace_id = w.id) p
+     WHERE m.user_id = auth.uid()
+     ORDER BY w.created_at
+$$;
+
+GRANT EXECUTE ON FUNCTION workspace_stats() TO authenticated;
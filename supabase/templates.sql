@@ -0,0 +1,132 @@
+-- Workspace clone and templates for Moji
+-- Run this in Supabase SQL Editor after schema.sql and add_pages.sql
+--
+-- Both functions create a whole workspace in one transaction with set-based
+-- INSERT ... SELECT statements, so the API makes a single call instead of one
+-- create per item. They run as the caller (RLS applies) and check the
+-- workspace quota once, under a per-user advisory lock.
+--
+-- Errors: P0002 = source workspace not found, MJ001 = workspace limit reached.
+
+-- ============================================
+-- CLONE
+-- ============================================
+
+-- The only definition of clone_workspace: it copies every column of the
+-- items except their keys, so columns added later (dates in daily.sql, sort
+-- keys in ordering.sql, outlines in outline.sql) are copied without
+-- redefining it. Later files must not replace it.
+CREATE OR REPLACE FUNCTION clone_workspace(
+    source_id UUID,
+    new_name TEXT DEFAULT NULL,
+    max_workspaces INTEGER DEFAULT 20
+)
+RETURNS workspaces
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+    uid UUID := auth.uid();
+    source workspaces;
+    created workspaces;
+    item TEXT;
+    columns TEXT;
+BEGIN
+    SELECT * INTO source FROM workspaces WHERE id = source_id AND user_id = uid;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Workspace not found' USING ERRCODE = 'P0002';
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('moji.workspace_quota'), hashtext(uid::text));
+    IF (SELECT COUNT(*) FROM workspaces WHERE user_id = uid) >= max_workspaces THEN
+        RAISE EXCEPTION 'Workspace limit reached' USING ERRCODE = 'MJ001';
+    END IF;
+
+    INSERT INTO workspaces (name, description, user_id)
+    VALUES (COALESCE(NULLIF(new_name, ''), LEFT(source.name, 93) || ' (copy)'), source.description, uid)
+    RETURNING * INTO created;
+
+    -- created_at is kept so items stay in their original order; user_id is
+    -- set by the set_item_user_id trigger of daily.sql
+    FOREACH item IN ARRAY ARRAY['tasks', 'notes', 'pages'] LOOP
+        SELECT string_agg(quote_ident(column_name), ', ' ORDER BY ordinal_position) INTO columns
+          FROM information_schema.columns
+         WHERE table_schema = 'public' AND table_name = item AND is_generated = 'NEVER'
+           AND column_name NOT IN ('id', 'workspace_id', 'user_id', 'updated_at');
+        EXECUTE format(
+            'INSERT INTO %1$I (workspace_id, %2$s) SELECT $1, %2$s FROM %1$I WHERE workspace_id = $2',
+            item, columns
+        ) USING created.id, source_id;
+    END LOOP;
+
+    RETURN created;
+END;
+$$;
+
+-- ============================================
+-- TEMPLATES
+-- ============================================
+
+-- template: {"name", "description", "tasks": [{content, done, priority}],
+--            "notes": [{title, content, tags}], "pages": [{title, content}]}
+-- daily.sql replaces this function to add task dates.
+CREATE OR REPLACE FUNCTION create_workspace_from_template(
+    template JSONB,
+    new_name TEXT DEFAULT NULL,
+    max_workspaces INTEGER DEFAULT 20
+)
+RETURNS workspaces
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+    uid UUID := auth.uid();
+    created workspaces;
+BEGIN
+    IF uid IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated' USING ERRCODE = '42501';
+    END IF;
+
+    PERFORM pg_advisory_xact_lock(hashtext('moji.workspace_quota'), hashtext(uid::text));
+    IF (SELECT COUNT(*) FROM workspaces WHERE user_id = uid) >= max_workspaces THEN
+        RAISE EXCEPTION 'Workspace limit reached' USING ERRCODE = 'MJ001';
+    END IF;
+
+    INSERT INTO workspaces (name, description, user_id)
+    VALUES (COALESCE(NULLIF(new_name, ''), template->>'name'), template->>'description', uid)
+    RETURNING * INTO created;
+
+    -- Offset created_at so items keep the template's order (NOW() is per transaction)
+    INSERT INTO tasks (content, done, priority, workspace_id, created_at)
+    SELECT item->>'content',
+           COALESCE((item->>'done')::BOOLEAN, FALSE),
+           COALESCE((item->>'priority')::INTEGER, 0),
+           created.id,
+           NOW() + ord * INTERVAL '1 millisecond'
+      FROM jsonb_array_elements(COALESCE(template->'tasks', '[]')) WITH ORDINALITY AS t(item, ord);
+
+    INSERT INTO notes (title, content, tags, workspace_id, created_at)
+    SELECT item->>'title',
+           COALESCE(item->>'content', ''),
+           COALESCE(ARRAY(SELECT jsonb_array_elements_text(item->'tags')), '{}'),
+           created.id,
+           NOW() + ord * INTERVAL '1 millisecond'
+      FROM jsonb_array_elements(COALESCE(template->'notes', '[]')) WITH ORDINALITY AS n(item, ord);
+
+    INSERT INTO pages (title, content, workspace_id, created_at)
+    SELECT item->>'title',
+           COALESCE(item->>'content', ''),
+           created.id,
+           NOW() + ord * INTERVAL '1 millisecond'
+      FROM jsonb_array_elements(COALESCE(template->'pages', '[]')) WITH ORDINALITY AS p(item, ord);
+
+    RETURN created;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION clone_workspace(UUID, TEXT, INTEGER) FROM PUBLIC, anon;
+REVOKE ALL ON FUNCTION create_workspace_from_template(JSONB, TEXT, INTEGER) FROM PUBLIC, anon;
+GRANT EXECUTE ON FUNCTION clone_workspace(UUID, TEXT, INTEGER) TO authenticated;
+GRANT EXECUTE ON FUNCTION create_workspace_from_template(JSONB, TEXT, INTEGER) TO authenticated;